@@ -4,6 +4,7 @@ Module Docstring
 """
 
 import argparse
+import multiprocessing
 import sys
 
 from modswap.helpers.consoleHelpers import setConsoleWindow, sprint, sprintPad
@@ -35,6 +36,9 @@ __license__ = License
 
 if __name__ == '__main__':
     """ This is executed when run from the command line """
+    # worker processes (e.g., for mixing) need this in the packaged executable
+    multiprocessing.freeze_support()
+
     parser = argparse.ArgumentParser(
         prog=ProgramName,
         description='''Swaps mod configs and character model accessories
@@ -129,6 +133,16 @@ settings file, configuring `modGroups` and `modConfigs`. Finally, run `ActiveMod
         help='rename each attachment file to match its attachment name',
         action='store_true',
     )
+    parser.add_argument(
+        '--packAttachments',
+        help='pack the attachment definition files into the `attachmentsLibrary` file',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--unpackAttachments',
+        help='unpack the `attachmentsLibrary` file into attachment definition files',
+        action='store_true',
+    )
     parser.add_argument(
         '--srcPakPath',
         help='path to source pakchunk',
@@ -184,6 +198,11 @@ settings file, configuring `modGroups` and `modConfigs`. Finally, run `ActiveMod
         help='search pakchunks and assets',
         action='store_true',
     )
+    parser.add_argument(
+        '--batchJobs',
+        help='how many `batch` settings files to run at a time, in worker processes (0 for one per CPU; default: 1, or `batchJobs` from the settings file)',
+        type=int,
+    )
     parser.add_argument(
         '--overwrite',
         help='overwrite existing files (default: ask to confirm)',
@@ -222,6 +241,8 @@ settings file, configuring `modGroups` and `modConfigs`. Finally, run `ActiveMod
         and not args.extract
         and not args.create
         and not args.rename
+        and not args.packAttachments
+        and not args.unpackAttachments
         and not args.upgrade
         and not args.mix
         and not args.pak
@@ -246,6 +267,8 @@ settings file, configuring `modGroups` and `modConfigs`. Finally, run `ActiveMod
             creatingAttachments=args.create,
             extractingAttachments=args.extract,
             renamingAttachmentFiles=args.rename,
+            packingAttachments=args.packAttachments,
+            unpackingAttachments=args.unpackAttachments,
             srcPakPath=args.srcPakPath,
             customizationItemDbPath=args.customizationItemDbPath,
             prevGameVersion=args.prevGameVersion,
@@ -265,6 +288,7 @@ settings file, configuring `modGroups` and `modConfigs`. Finally, run `ActiveMod
             overwriteOverride=args.overwrite,
             debug=args.debug,
             nonInteractive=args.ni,
+            batchJobs=args.batchJobs,
         )
 
     # TODO: remove
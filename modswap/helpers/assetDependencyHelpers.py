@@ -0,0 +1,64 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from .uassetHelpers import (AssetPathGamePrefix, ImportGraph, ImportsFieldName,
+                            getObjectNameValue, uassetToJson)
+from .unrealEngineHelpers import UassetFilenameSuffix, UmapFilenameSuffix
+
+DependencyFileSuffixes = (UassetFilenameSuffix, UmapFilenameSuffix)
+
+
+def getGameImportStemPaths(imports):
+    """The asset stem paths (relative to the content folder) of the `/Game/` packages in an asset's imports"""
+    stemPaths = set()
+    for package in ImportGraph(imports).packagesByIndex.values():
+        packagePath = getObjectNameValue(package)
+        if packagePath and packagePath.startswith(AssetPathGamePrefix):
+            stemPaths.add(packagePath[len(AssetPathGamePrefix):])
+    return sorted(stemPaths)
+
+
+def readAssetGameImports(assetPath, jsonPath, uassetGuiPath, unrealEngineVersion):
+    """The `/Game/` imports of an asset, from its UAssetGUI JSON file, converting the asset to `jsonPath` first if `assetPath` is given"""
+    if assetPath:
+        uassetToJson(assetPath, jsonPath, uassetGuiPath, unrealEngineVersion)
+    with open(jsonPath, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    return getGameImportStemPaths(data.get(ImportsFieldName, None))
+
+
+def getAssetDependencyClosure(assets, getImports, canAdd, jobs=4):
+    """Follows the imports of `assets` breadth first, reading each level's imports in parallel, and adds the imported assets `canAdd`.
+    An asset whose imports can't be read is kept, without following its imports.
+    Returns all the assets (`assets` first), the assets added, the dependency edges (importing asset, imported asset) followed,
+    and the (asset, error) of each asset whose imports couldn't be read."""
+
+    def tryGetImports(asset):
+        try:
+            return getImports(asset), None
+        except Exception as e:
+            return [], e
+
+    allAssets = list(dict.fromkeys(assets))
+    seenAssets = set(allAssets)
+    addedAssets = []
+    edges = []
+    errors = []
+    level = list(allAssets)
+    with ThreadPoolExecutor(max_workers=jobs or None) as executor:
+        while level:
+            nextLevel = []
+            for asset, (imports, error) in zip(level, executor.map(tryGetImports, level)):
+                if error is not None:
+                    errors.append((asset, error))
+                for importedAsset in imports:
+                    if importedAsset == asset or not canAdd(importedAsset):
+                        continue
+                    edges.append((asset, importedAsset))
+                    if importedAsset not in seenAssets:
+                        seenAssets.add(importedAsset)
+                        nextLevel.append(importedAsset)
+            allAssets.extend(nextLevel)
+            addedAssets.extend(nextLevel)
+            level = nextLevel
+    return allAssets, addedAssets, edges, errors
@@ -1,29 +1,9 @@
-from .uassetHelpers import (ClassNameFieldName, ClassNameSkeleton,
-                            ClassPackageFieldName, ClassPackageScriptEngine,
-                            ImportType, ItemTypeName, findNextItemByFields,
-                            getImportPathFromObjectName, getObjectNameValue)
+from .uassetHelpers import ClassNameSkeleton, ImportGraph
 
 
 def getSkeletonImportObjectName(imports):
-    return getObjectNameValue(
-        findNextItemByFields(
-            imports,
-            [
-                ItemTypeName,
-                ClassPackageFieldName,
-                ClassNameFieldName,
-            ],
-            [
-                ImportType,
-                ClassPackageScriptEngine,
-                ClassNameSkeleton,
-            ]
-        ),
-    )
+    return ImportGraph(imports).getClassImportObjectName(ClassNameSkeleton)
 
 
 def getSkeletonPath(imports):
-    return getImportPathFromObjectName(
-        imports,
-        getSkeletonImportObjectName(imports),
-    )
+    return ImportGraph(imports).getSkeletonPath()
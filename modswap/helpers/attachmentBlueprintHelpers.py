@@ -1,60 +1,110 @@
-from .uassetHelpers import (ClassNameAnimBlueprintGeneratedClass,
-                            ClassNameFieldName, ClassNameSkeletalMesh,
-                            ClassPackageFieldName, ClassPackageScriptEngine,
-                            ClassSuffix, ImportType, ItemTypeName,
-                            findNextItemByFields, getImportPathFromObjectName,
-                            getObjectNameValue)
+import os
+
+from .uassetHelpers import (AssetPathGamePrefix,
+                            ClassNameAnimBlueprintGeneratedClass,
+                            ClassNameSkeletalMesh, ImportGraph)
 
 
 def getSkeletalMeshImportObjectName(imports):
-    return getObjectNameValue(
-        findNextItemByFields(
-            imports,
-            [
-                ItemTypeName,
-                ClassPackageFieldName,
-                ClassNameFieldName,
-            ],
-            [
-                ImportType,
-                ClassPackageScriptEngine,
-                ClassNameSkeletalMesh,
-            ]
-        ),
-    )
+    return ImportGraph(imports).getClassImportObjectName(ClassNameSkeletalMesh)
 
 
 def getSkeletalMeshPath(imports):
-    return getImportPathFromObjectName(
-        imports,
-        getSkeletalMeshImportObjectName(imports),
-    )
+    return ImportGraph(imports).getSkeletalMeshPath()
 
 
 def getAnimBlueprintImportObjectName(imports):
-    return getObjectNameValue(
-        findNextItemByFields(
-            imports,
-            [
-                ItemTypeName,
-                ClassPackageFieldName,
-                ClassNameFieldName,
-            ],
-            [
-                ImportType,
-                ClassPackageScriptEngine,
-                ClassNameAnimBlueprintGeneratedClass,
-            ]
-        ),
-    )
+    return ImportGraph(imports).getClassImportObjectName(ClassNameAnimBlueprintGeneratedClass)
 
 
 def getAnimBlueprintPath(imports):
-    objectName = getAnimBlueprintImportObjectName(imports)
-    if objectName and objectName.endswith(ClassSuffix):
-        objectName = objectName[:-len(ClassSuffix)]
+    return ImportGraph(imports).getAnimBlueprintPath()
+
+
+def getPackageStemPath(shortStemPath):
+    if shortStemPath:
+        return f'{"" if shortStemPath.startswith("/") else AssetPathGamePrefix}{shortStemPath}'
+
+
+def getBlueprintCloneNames(newMeshPackageStemPath):
+    """The paths of the assets of a cloned attachment blueprint, all named after its new skeletal mesh"""
+    if not newMeshPackageStemPath.endswith('_REF'):
+        newMeshPackageStemPath = f'{newMeshPackageStemPath}_REF'
+    newMeshPackageStemPath = getPackageStemPath(newMeshPackageStemPath)
+
+    assetGameRelBaseStemPath = newMeshPackageStemPath.removeprefix(AssetPathGamePrefix).removesuffix('_REF')
+    assert(not assetGameRelBaseStemPath.startswith('/'))
+    assetBaseStem = os.path.basename(assetGameRelBaseStemPath)
+    assetGameRelBaseDir = os.path.dirname(assetGameRelBaseStemPath)
+    if assetGameRelBaseDir.endswith('/Models'):
+        assetGameRelBaseDir = os.path.dirname(assetGameRelBaseDir)
+    gameRelBlueprintsDir = f'{assetGameRelBaseDir}/Blueprints'
+    meshName = os.path.basename(newMeshPackageStemPath)
+
+    blueprintName = f'BP_{assetBaseStem}'
+    blueprintGameRelStemPath = f'{gameRelBlueprintsDir}/{blueprintName}'
+    animBlueprintName = f'AB_{assetBaseStem}'
+    animBlueprintGameRelStemPath = f'{gameRelBlueprintsDir}/{animBlueprintName}'
+    skeletonGameRelStemPath = f'{assetGameRelBaseDir}/Skeletons/{meshName}_Skeleton'
+
+    return {
+        'meshPackageStemPath': newMeshPackageStemPath,
+        'meshName': meshName,
+        'assetBaseStem': assetBaseStem,
+        'assetGameRelBaseDir': assetGameRelBaseDir,
+        'assetsPackageRelBaseDir': f'{AssetPathGamePrefix}{assetGameRelBaseDir}',
+        'blueprintName': blueprintName,
+        'blueprintGameRelStemPath': blueprintGameRelStemPath,
+        'blueprintPackageStemPath': f'{AssetPathGamePrefix}{blueprintGameRelStemPath}',
+        'animBlueprintName': animBlueprintName,
+        'animBlueprintGameRelStemPath': animBlueprintGameRelStemPath,
+        'animBlueprintPackageStemPath': f'{AssetPathGamePrefix}{animBlueprintGameRelStemPath}',
+        'skeletonGameRelStemPath': skeletonGameRelStemPath,
+        'skeletonPackageStemPath': f'{AssetPathGamePrefix}{skeletonGameRelStemPath}',
+        'physicsAssetGameRelStemPath': f'{assetGameRelBaseDir}/Physics/{meshName}_PhysicsAsset',
+    }
+
+
+def getBlueprintCloneReplacements(
+    cloneNames,
+    blueprintPackageStemPath,
+    meshPackageStemPath=None,
+    animBlueprintPackageStemPath=None,
+    skeletonPackageStemPath=None,
+):
+    """What to replace in the JSON of a blueprint (and its animation blueprint) to clone it. Earlier entries take precedence."""
+    meshName = os.path.basename(meshPackageStemPath) if meshPackageStemPath else None
+    meshStem = meshName.removesuffix('_REF') if meshName else None
+    animBlueprintName = os.path.basename(animBlueprintPackageStemPath) if animBlueprintPackageStemPath else None
+
+    replacements = {}
+    for original, replacement in (
+        (blueprintPackageStemPath, cloneNames['blueprintPackageStemPath']),
+        (os.path.basename(blueprintPackageStemPath), cloneNames['blueprintName']),
+        (meshPackageStemPath, cloneNames['meshPackageStemPath']),
+        (meshName, cloneNames['meshName']),
+        (animBlueprintPackageStemPath, cloneNames['animBlueprintPackageStemPath']),
+        (animBlueprintName, cloneNames['animBlueprintName']),
+        (skeletonPackageStemPath, cloneNames['skeletonPackageStemPath']),
+        (meshStem, cloneNames['assetBaseStem']),
+        # TODO: remove? unnecessary
+        (os.path.dirname(os.path.dirname(blueprintPackageStemPath)), cloneNames['assetsPackageRelBaseDir']),
+    ):
+        if original and original not in replacements:
+            replacements[original] = replacement
+    return replacements
+
 
-    return getImportPathFromObjectName(
-        imports,
-        objectName,
+def getBlueprintCloneDestPakAssets(cloneNames):
+    """The `destPakAssets` entries of a cloned blueprint: (saved in `extraContentDir`, cooked in unreal engine)"""
+    return (
+        [
+            cloneNames['blueprintGameRelStemPath'],
+            cloneNames['animBlueprintGameRelStemPath'],
+        ],
+        [
+            cloneNames['meshPackageStemPath'].removeprefix(AssetPathGamePrefix),
+            cloneNames['skeletonGameRelStemPath'],
+            cloneNames['physicsAssetGameRelStemPath'],
+        ],
     )
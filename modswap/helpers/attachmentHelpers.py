@@ -79,6 +79,16 @@ basicAttachmentTemplate = {'attachmentId': '',
                                           'DuplicationIndex': 0,
                                           'IsZero': False}]}]}}
 
+AttachmentModelCategories = (
+    'SurvivorTorso',
+    'SurvivorLegs',
+    'SurvivorHead',
+    'KillerBody',
+    'KillerHead',
+    'KillerWeapon',
+    'Charm',
+)
+
 def getAttachmentFilename(attachmentId):
     return f'SocketAttachment_{attachmentId}.yaml'
 
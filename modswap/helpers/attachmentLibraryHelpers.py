@@ -0,0 +1,227 @@
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+from .jsonHelpers import jsonDumpToFile
+from .yamlHelpers import yamlLoad
+
+AttachmentSnapshotVersion = 2
+AttachmentLibraryVersion = 2
+AttachmentFileSuffixes = ('.yaml', '.json')
+# below this many files to parse, starting worker processes takes longer than parsing
+MinParallelAttachmentFiles = 64
+
+
+def isValidAttachmentFilename(filename):
+    """Whether `filename` names an attachment file directly in `attachmentsDir` (e.g. one read from an attachment library),
+    rather than a path that could lead outside it"""
+    return (
+        isinstance(filename, str)
+        and filename.endswith(AttachmentFileSuffixes)
+        and '..' not in filename
+        and not any(separator in filename for separator in ('/', '\\', ':', os.sep, os.altsep) if separator)
+    )
+
+
+def readAttachmentFile(filePath):
+    with open(filePath, 'r', encoding='utf-8') as file:
+        if filePath.endswith('.yaml'):
+            return yamlLoad(file)
+        elif filePath.endswith('.json'):
+            return json.load(file)
+        else:
+            raise ValueError(f'Invalid file type: {os.path.basename(filePath)}')
+
+
+def tryReadAttachmentFile(filePath):
+    """Returns the data in an attachment file, or the exception raised reading it (so one bad file doesn't stop a pool)"""
+    try:
+        return readAttachmentFile(filePath)
+    except Exception as e:
+        return e
+
+
+class AttachmentSnapshot():
+    """Attachment definitions already parsed, kept in a single JSON file, by filename in `attachmentsDir`.
+    An entry is only used while its file's size and modification time are unchanged."""
+
+    def __init__(self, path, attachmentsDir=None):
+        self.path = path
+        self.attachmentsDir = os.path.abspath(attachmentsDir) if attachmentsDir else None
+        self.entries = None
+        self.dirty = False
+
+    def load(self):
+        if self.entries is not None:
+            return
+
+        self.entries = {}
+        if self.path and os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                if (
+                    data.get('version', None) == AttachmentSnapshotVersion
+                    and data.get('attachmentsDir', None) == self.attachmentsDir
+                ):
+                    self.entries = data.get('entries', {})
+            except Exception:
+                # an unreadable snapshot is just an empty one
+                pass
+
+    def get(self, filename, size, mtime):
+        self.load()
+        entry = self.entries.get(filename, None)
+        if entry is not None and entry[0] == size and entry[1] == mtime:
+            return entry[2]
+
+    def set(self, filename, size, mtime, data):
+        self.load()
+        self.entries[filename] = [size, mtime, data]
+        self.dirty = True
+
+    def rename(self, filename, newFilename):
+        self.load()
+        entry = self.entries.pop(filename, None)
+        if entry is not None:
+            self.entries[newFilename] = entry
+            self.dirty = True
+
+    def prune(self, filenames):
+        """Forgets files no longer in the library"""
+        self.load()
+        for filename in set(self.entries) - set(filenames):
+            del self.entries[filename]
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty or not self.path:
+            return
+
+        jsonDumpToFile({'version': AttachmentSnapshotVersion, 'attachmentsDir': self.attachmentsDir, 'entries': self.entries}, self.path)
+        self.dirty = False
+
+
+def readAttachmentFiles(attachmentsDir, snapshot=None, jobs=1):
+    """Reads every attachment definition file in `attachmentsDir`, from `snapshot` where unchanged.
+    Returns a list of (filename, data or the exception raised reading it) in directory listing order,
+    and how many were read from the snapshot."""
+    files = []
+    with os.scandir(attachmentsDir) as iterator:
+        for entry in iterator:
+            if entry.name.endswith(AttachmentFileSuffixes) and entry.is_file():
+                stat = entry.stat()
+                files.append((entry.name, entry.path, stat.st_size, stat.st_mtime_ns))
+
+    results = {}
+    filesToRead = []
+    for filename, filePath, size, mtime in files:
+        data = snapshot.get(filename, size, mtime) if snapshot is not None else None
+        if data is None:
+            filesToRead.append((filename, filePath, size, mtime))
+        else:
+            results[filename] = data
+    snapshotCount = len(results)
+
+    filePaths = [filePath for _, filePath, _, _ in filesToRead]
+    if jobs != 1 and len(filePaths) >= MinParallelAttachmentFiles:
+        with ProcessPoolExecutor(max_workers=jobs or None) as executor:
+            chunkSize = max(1, len(filePaths) // ((jobs or os.cpu_count() or 1) * 4))
+            datas = list(executor.map(tryReadAttachmentFile, filePaths, chunksize=chunkSize))
+    else:
+        datas = [tryReadAttachmentFile(filePath) for filePath in filePaths]
+
+    for (filename, filePath, size, mtime), data in zip(filesToRead, datas):
+        results[filename] = data
+        if snapshot is not None and not isinstance(data, Exception):
+            snapshot.set(filename, size, mtime, data)
+
+    if snapshot is not None:
+        snapshot.prune(filename for filename, _, _, _ in files)
+
+    return [(filename, results[filename]) for filename, _, _, _ in files], snapshotCount
+
+
+class AttachmentLibrary():
+    """Attachment definitions packed into a single SQLite file, indexed by modelCategory and attachmentId.
+    Each definition is stored as JSON, along with the filename it was packed from (or unpacks to).
+    Definitions are read back in the order they were packed in (the order their files were found in `attachmentsDir`),
+    since the order attachments are mixed in decides the combinations made and their IDs."""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        if self.connection is not None:
+            return
+
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS attachments (
+                modelCategory TEXT NOT NULL,
+                attachmentId TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (modelCategory, attachmentId)
+            );
+        ''')
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None:
+            with self.connection:
+                self.connection.execute("INSERT INTO meta (key, value) VALUES ('version', ?)", (str(AttachmentLibraryVersion),))
+        elif int(row[0]) != AttachmentLibraryVersion:
+            self.close()
+            raise ValueError(f'Unsupported attachment library version {row[0]} in "{self.path}"')
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def getCount(self):
+        return self.connection.execute('SELECT COUNT(*) FROM attachments').fetchone()[0]
+
+    def getCategoryNames(self):
+        return [row[0] for row in self.connection.execute('SELECT DISTINCT modelCategory FROM attachments ORDER BY modelCategory')]
+
+    def get(self, modelCategory, attachmentId):
+        row = self.connection.execute(
+            'SELECT data FROM attachments WHERE modelCategory = ? AND attachmentId = ?',
+            (modelCategory, attachmentId),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def readAll(self, categoryNames=None):
+        """Returns a list of (filename, data) in the order they were packed in, optionally only for `categoryNames`"""
+        # replacing a definition inserts a new row, so rowids are in the order definitions were last packed in
+        if categoryNames is None:
+            rows = self.connection.execute('SELECT filename, data FROM attachments ORDER BY rowid')
+        else:
+            categoryNames = list(categoryNames)
+            rows = self.connection.execute(
+                f'SELECT filename, data FROM attachments WHERE modelCategory IN ({", ".join("?" * len(categoryNames))}) ORDER BY rowid',
+                categoryNames,
+            )
+        return [(filename, json.loads(data)) for filename, data in rows]
+
+    def writeAll(self, attachments):
+        """Adds or replaces (filename, data) definitions (by modelCategory and attachmentId) in one transaction. Returns how many were written."""
+        with self.connection:
+            cursor = self.connection.executemany(
+                'INSERT OR REPLACE INTO attachments (modelCategory, attachmentId, filename, data) VALUES (?, ?, ?, ?)',
+                (
+                    (data['modelCategory'], data['attachmentId'], filename, json.dumps(data, separators=(',', ':')))
+                    for filename, data in attachments
+                ),
+            )
+        return cursor.rowcount
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+
+from .jsonHelpers import jsonDump
+from .pakManifestHelpers import getPakManifestPath
+from .unrealEngineHelpers import getAssetStemPathInfo
+
+BatchIndexVersion = 2
+
+
+def getSettingsHash(settings):
+    return hashlib.md5(json.dumps(settings, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def getFileStat(path):
+    if path and os.path.isfile(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+
+def getBatchEntryGroups(entryResources):
+    """Groups batch entries that can't run at the same time: those using a file or folder one of them writes
+    (e.g. the folder a source pakchunk is unpaked to). `entryResources` has each entry's paths, with whether it writes to them,
+    or None if unknown (run on its own). Returns lists of entry indexes, in batch order, each to run one after another."""
+    groupIndexes = list(range(len(entryResources)))
+
+    def findGroup(index):
+        while groupIndexes[index] != index:
+            groupIndexes[index] = groupIndexes[groupIndexes[index]]
+            index = groupIndexes[index]
+        return index
+
+    pathUsers = {}
+    for index, resources in enumerate(entryResources):
+        for path, writes in (resources or {}).items():
+            pathUsers.setdefault(path, []).append((index, writes))
+    for users in pathUsers.values():
+        if any(writes for _, writes in users):
+            firstGroup = findGroup(users[0][0])
+            for index, _ in users[1:]:
+                groupIndexes[findGroup(index)] = firstGroup
+
+    groups = {}
+    for index in range(len(entryResources)):
+        groups.setdefault(findGroup(index), []).append(index)
+    return sorted(groups.values())
+
+
+class BatchIndex():
+    """What each batch settings file last paked: its settings, its pakchunk, and the size and modification time
+    of its assets' files, by content folder and asset stem path. The reverse index (from each asset to the batch
+    settings files paking it) finds the mods to pak again after assets change, so the rest can be skipped.
+    Only the folders of the recorded assets are listed, never whole content folders."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        # file names by folder, listed once per check
+        self.dirFilenames = {}
+        self.changedAssets = set()
+        # how many of each batch settings file's assets changed since it was last paked
+        self.changedAssetCounts = {}
+        self.dirty = False
+
+    def load(self):
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                if data.get('version', None) == BatchIndexVersion:
+                    self.entries = data.get('entries', {})
+            except (OSError, ValueError):
+                # an unreadable index just means paking every mod
+                pass
+
+    def getReverseIndex(self):
+        """The batch settings files paking each asset, by content folder and asset stem path"""
+        reverseIndex = {}
+        for settingsFilePath, entry in self.entries.items():
+            for contentDir, assetStats in entry['assets'].items():
+                for stemPath in assetStats:
+                    reverseIndex.setdefault((contentDir, stemPath), []).append(settingsFilePath)
+        return reverseIndex
+
+    def getDirFilenames(self, dir):
+        filenames = self.dirFilenames.get(dir, None)
+        if filenames is None:
+            try:
+                with os.scandir(dir) as iterator:
+                    filenames = [entry.name for entry in iterator if entry.is_file()]
+            except OSError:
+                filenames = []
+            self.dirFilenames[dir] = filenames
+        return filenames
+
+    def getAssetStats(self, contentDir, stemPath):
+        """The relative path, size and modification time of each of an asset's files (including UAssetGUI JSON files)"""
+        relDir, _, stem = stemPath.rpartition('/')
+        stem = os.path.normcase(stem)
+        assetStats = []
+        for filename in self.getDirFilenames(os.path.join(contentDir, relDir) if relDir else contentDir):
+            assetPathInfo = getAssetStemPathInfo(filename)
+            if assetPathInfo and os.path.normcase(assetPathInfo['stemPath']) == stem:
+                relPath = f'{relDir}/{filename}' if relDir else filename
+                assetStats.append([relPath, *(getFileStat(os.path.join(contentDir, relPath)) or [])])
+        return sorted(assetStats)
+
+    def findChangedAssets(self):
+        """Compares the files of every asset paked by the batch with when they were paked, and looks for copies of them
+        in content folders with higher precedence than the one they were paked from. Returns the reverse index."""
+        reverseIndex = self.getReverseIndex()
+        self.dirFilenames = {}
+        self.changedAssets = set()
+        self.changedAssetCounts = {}
+        for (contentDir, stemPath), settingsFilePaths in reverseIndex.items():
+            assetStats = self.getAssetStats(contentDir, stemPath)
+            for settingsFilePath in settingsFilePaths:
+                entry = self.entries[settingsFilePath]
+                contentDirs = entry['contentDirs']
+                higherContentDirs = contentDirs[:contentDirs.index(contentDir)] if contentDir in contentDirs else []
+                if (
+                    entry['assets'][contentDir][stemPath] != assetStats
+                    or any(self.getAssetStats(higherContentDir, stemPath) for higherContentDir in higherContentDirs)
+                ):
+                    self.changedAssets.add((contentDir, stemPath))
+                    self.changedAssetCounts[settingsFilePath] = self.changedAssetCounts.get(settingsFilePath, 0) + 1
+        return reverseIndex
+
+    def getStaleReason(self, settingsFilePath, settingsHash, srcPakPath):
+        """Why the mod of a batch settings file needs paking again, or None if it doesn't"""
+        entry = self.entries.get(settingsFilePath, None)
+        if entry is None:
+            return 'not paked by this batch before'
+        if entry['settingsHash'] != settingsHash:
+            return 'settings changed'
+        if entry['srcPak'] != getFileStat(srcPakPath):
+            return 'source pakchunk changed'
+        destPakPath = entry['destPakPath']
+        if not os.path.isfile(destPakPath) and not os.path.isfile(getPakManifestPath(destPakPath)):
+            return 'pakchunk missing'
+        changedCount = self.changedAssetCounts.get(settingsFilePath, 0)
+        if changedCount:
+            return f'{changedCount} asset{"" if changedCount == 1 else "s"} changed'
+
+    def setEntry(self, settingsFilePath, settingsHash, srcPakPath, destPakPath, contentDirAssets, contentDirs):
+        """Records what a batch settings file just paked: asset stem paths by the content folder they were paked from,
+        and the content folders it read, in order of precedence"""
+        # the mod may have written to its content folders (e.g. converting UAssetGUI JSON files), so list them again
+        self.dirFilenames = {}
+        self.entries[settingsFilePath] = {
+            'settingsHash': settingsHash,
+            'srcPak': getFileStat(srcPakPath),
+            'destPakPath': destPakPath,
+            'contentDirs': list(contentDirs),
+            'assets': {
+                contentDir: {stemPath: self.getAssetStats(contentDir, stemPath) for stemPath in sorted(stemPaths)}
+                for contentDir, stemPaths in contentDirAssets.items()
+            },
+        }
+        self.dirty = True
+
+    def removeEntry(self, settingsFilePath):
+        if self.entries.pop(settingsFilePath, None) is not None:
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+
+        tempPath = f'{self.path}.tmp'
+        with open(tempPath, 'w', encoding='utf-8') as file:
+            jsonDump({'version': BatchIndexVersion, 'entries': self.entries}, file)
+        os.replace(tempPath, self.path)
+        self.dirty = False
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+
+from .fileHelpers import listFilesRecursively
+from .jsonHelpers import jsonDump, jsonDumpToFile
+
+JsonFileCacheVersion = 1
+
+
+class JsonFileCache():
+    """Values kept in a JSON file between runs, grouped by scope (e.g. a game build).
+    Only the most recently used scopes are kept. Saving merges in values other processes saved since loading
+    (e.g. parallel batch workers sharing the cache)."""
+
+    def __init__(self, path, maxScopes=4):
+        self.path = path
+        self.maxScopes = maxScopes
+        self.scopes = None
+        # values set since loading, by scope
+        self.updates = {}
+        self.dirty = False
+
+    def readScopes(self):
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                if data.get('version', None) == JsonFileCacheVersion:
+                    return data.get('scopes', {})
+            except (OSError, ValueError):
+                # an unreadable cache is just an empty one
+                pass
+        return {}
+
+    def load(self):
+        if self.scopes is not None:
+            return
+
+        self.scopes = self.readScopes()
+
+    def addScope(self, scope, values):
+        self.scopes[scope] = values
+        while len(self.scopes) > self.maxScopes:
+            self.scopes.pop(next(iter(self.scopes)))
+
+    def getScope(self, scope, creating=False):
+        self.load()
+        values = self.scopes.get(scope, None)
+        if values is None and creating:
+            values = {}
+            self.addScope(scope, values)
+        return values
+
+    def get(self, scope, key, default=None):
+        return (self.getScope(scope) or {}).get(key, default)
+
+    def set(self, scope, key, value):
+        values = self.getScope(scope, creating=True)
+        if values.get(key, None) != value:
+            values[key] = value
+            self.updates.setdefault(scope, {})[key] = value
+            # most recently used last
+            self.scopes[scope] = self.scopes.pop(scope)
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+
+        scopes = self.scopes
+        self.scopes = self.readScopes()
+        # most recently used last
+        for scope in scopes:
+            if scope in self.updates:
+                self.addScope(scope, {**self.scopes.pop(scope, {}), **self.updates[scope]})
+        jsonDumpToFile({'version': JsonFileCacheVersion, 'scopes': self.scopes}, self.path)
+        self.updates = {}
+        self.dirty = False
+
+
+def getDirFingerprint(dir, suffixes=None):
+    """Hashes the relative paths, sizes and modification times of the files in `dir` and its subfolders (e.g. `Paks/~mods`),
+    optionally only those with one of `suffixes`"""
+    entries = []
+    for relPath in listFilesRecursively(dir):
+        if suffixes and os.path.splitext(relPath)[1].lower() not in suffixes:
+            continue
+        stat = os.stat(os.path.join(dir, relPath))
+        entries.append((relPath, stat.st_size, stat.st_mtime_ns))
+    entries.sort()
+    return hashlib.md5(jsonDump(entries).encode('utf-8')).hexdigest()
@@ -0,0 +1,162 @@
+import copy
+import sys
+from collections.abc import Mapping, MutableMapping
+
+
+class RecordShape():
+    """The keys of a CompactRecord, in order. Shapes are shared by every record with the same keys."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.positions = {key: position for position, key in enumerate(keys)}
+        self.shapesWithKey = {}
+        self.shapesWithoutKey = {}
+
+    def withKey(self, key):
+        shape = self.shapesWithKey.get(key, None)
+        if shape is None:
+            shape = getRecordShape(self.keys + (key,))
+            self.shapesWithKey[key] = shape
+        return shape
+
+    def withoutKey(self, key):
+        shape = self.shapesWithoutKey.get(key, None)
+        if shape is None:
+            shape = getRecordShape(tuple(k for k in self.keys if k != key))
+            self.shapesWithoutKey[key] = shape
+        return shape
+
+
+recordShapes = {}
+
+
+def getRecordShape(keys):
+    shape = recordShapes.get(keys, None)
+    if shape is None:
+        keys = tuple(sys.intern(key) if isinstance(key, str) else key for key in keys)
+        shape = RecordShape(keys)
+        recordShapes[keys] = shape
+    return shape
+
+
+class CompactRecord(MutableMapping):
+    """A dict-like record that stores only its values, with its keys held in a shared RecordShape.
+    UAssetAPI properties all have the same handful of keys, so this is much smaller than a dict per property."""
+
+    __slots__ = ('shape', 'values')
+
+    def __init__(self, pairs=()):
+        if isinstance(pairs, Mapping):
+            pairs = pairs.items()
+        keys = []
+        values = []
+        for key, value in pairs:
+            keys.append(key)
+            values.append(value)
+        self.shape = getRecordShape(tuple(keys))
+        self.values = values
+
+    def __getitem__(self, key):
+        return self.values[self.shape.positions[key]]
+
+    def __setitem__(self, key, value):
+        position = self.shape.positions.get(key, None)
+        if position is None:
+            self.shape = self.shape.withKey(key)
+            self.values.append(value)
+        else:
+            self.values[position] = value
+
+    def __delitem__(self, key):
+        position = self.shape.positions[key]
+        self.shape = self.shape.withoutKey(key)
+        del self.values[position]
+
+    def __iter__(self):
+        return iter(self.shape.keys)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, key):
+        return key in self.shape.positions
+
+    def get(self, key, default=None):
+        position = self.shape.positions.get(key, None)
+        return default if position is None else self.values[position]
+
+    def items(self):
+        return zip(self.shape.keys, self.values)
+
+    def copy(self):
+        record = CompactRecord.__new__(CompactRecord)
+        record.shape = self.shape
+        record.values = self.values.copy()
+        return record
+
+    def __deepcopy__(self, memo):
+        record = CompactRecord.__new__(CompactRecord)
+        memo[id(self)] = record
+        record.shape = self.shape
+        record.values = [copy.deepcopy(value, memo) for value in self.values]
+        return record
+
+    def __eq__(self, other):
+        if isinstance(other, CompactRecord) and other.shape is self.shape:
+            return self.values == other.values
+        if isinstance(other, Mapping):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def __getstate__(self):
+        return (self.shape.keys, self.values)
+
+    def __setstate__(self, state):
+        keys, values = state
+        self.shape = getRecordShape(keys)
+        self.values = values
+
+
+def toCompact(value):
+    """Converts the dicts in `value` (recursively) to CompactRecords"""
+    if isinstance(value, CompactRecord):
+        # already compact (e.g. read with a CompactRecord object_pairs_hook)
+        return value
+    if isinstance(value, Mapping):
+        return CompactRecord((k, toCompact(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [toCompact(item) for item in value]
+    return value
+
+
+def fromCompact(value):
+    """Converts the CompactRecords in `value` (recursively) back to dicts"""
+    if isinstance(value, Mapping):
+        return {k: fromCompact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [fromCompact(item) for item in value]
+    return value
+
+
+def getDeepSize(value, seen=None):
+    """Approximate memory used by `value` and everything in it, in bytes"""
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, CompactRecord):
+        # the shape is shared, so only the values are counted
+        size += getDeepSize(value.values, seen)
+    elif isinstance(value, Mapping):
+        for k, v in value.items():
+            size += getDeepSize(k, seen) + getDeepSize(v, seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += getDeepSize(item, seen)
+    return size
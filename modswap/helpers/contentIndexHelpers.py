@@ -0,0 +1,139 @@
+import os
+import pathlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from .unrealEngineHelpers import getAssetStemPathInfo
+
+
+def scanFilesRecursively(dir):
+    """Lists all files in a directory recursively as relative paths (in the same order as `listFilesRecursively`), with os.scandir"""
+    paths = []
+
+    def scan(relDir):
+        subDirs = []
+        with os.scandir(os.path.join(dir, relDir) if relDir else dir) as iterator:
+            for entry in iterator:
+                relPath = f'{relDir}/{entry.name}' if relDir else entry.name
+                if entry.is_dir():
+                    subDirs.append(relPath)
+                else:
+                    paths.append(relPath)
+        for subDir in subDirs:
+            scan(subDir)
+
+    scan('')
+    return paths
+
+
+def globToRegex(pattern):
+    """Translates a glob pattern (with `**` matching any number of folders) into a regex matching whole relative paths"""
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:[^/]*/)*'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            characters = pattern[i + 1:end]
+            if characters.startswith('!'):
+                characters = f'^{characters[1:]}'
+            regex += f'[{characters}]'
+            i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    # match paths the way the file system would (case insensitive on windows)
+    flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+    return re.compile(f'{regex}\\Z', flags)
+
+
+class ContentIndex():
+    """The files in content folders, and the asset files they make up, by asset stem path (relative to the content folder).
+    When an asset is in more than one content folder, the folder added first has precedence."""
+
+    def __init__(self):
+        self.contentDirs = []
+        self.paths = {}
+        self.normalizedPaths = {}
+        self.assetPathsMaps = {}
+        self.unrecognizedPaths = {}
+        # the content folder and files of each asset, by stem path, across all content folders
+        self.sourceFiles = {}
+
+    def build(self, contentDirs, keepingUnrecognizedIn=None, jobs=None):
+        """Scans `contentDirs` at the same time, then indexes them in order.
+        Unrecognized files in `keepingUnrecognizedIn` folders are indexed by their last suffix, instead of skipped."""
+        contentDirs = [contentDir for contentDir in contentDirs if contentDir not in self.paths]
+        if not contentDirs:
+            return
+
+        with ThreadPoolExecutor(max_workers=jobs or len(contentDirs)) as executor:
+            pathLists = list(executor.map(scanFilesRecursively, contentDirs))
+        for contentDir, paths in zip(contentDirs, pathLists):
+            self.add(contentDir, paths, keepingUnrecognized=contentDir in (keepingUnrecognizedIn or ()))
+
+    def add(self, contentDir, paths, keepingUnrecognized=False):
+        self.contentDirs.append(contentDir)
+        self.paths[contentDir] = []
+        self.normalizedPaths[contentDir] = set()
+        self.assetPathsMaps[contentDir] = {}
+        self.unrecognizedPaths[contentDir] = []
+        self.extend(contentDir, paths, keepingUnrecognized=keepingUnrecognized)
+
+    def extend(self, contentDir, paths, keepingUnrecognized=False):
+        """Indexes more files of an added content folder (e.g. extracted after it was added), with the folder's precedence"""
+        self.paths[contentDir].extend(paths)
+        self.normalizedPaths[contentDir].update(os.path.normcase(path) for path in paths)
+        assetPathsMap = self.assetPathsMaps[contentDir]
+        unrecognizedPaths = self.unrecognizedPaths[contentDir]
+        precedence = self.contentDirs.index(contentDir)
+
+        for path in paths:
+            assetPathInfo = getAssetStemPathInfo(path)
+            if assetPathInfo:
+                stemPath = assetPathInfo['stemPath']
+                suffix = assetPathInfo['suffix']
+            else:
+                unrecognizedPaths.append(path)
+                if not keepingUnrecognized:
+                    continue
+                suffix = pathlib.PurePosixPath(path).suffix
+                stemPath = path[:-len(suffix)] if suffix else None
+
+            if not stemPath:
+                continue
+
+            suffixes = assetPathsMap.get(stemPath, None)
+            if suffixes is None:
+                suffixes = []
+                assetPathsMap[stemPath] = suffixes
+                sourceFilesInfo = self.sourceFiles.get(stemPath, None)
+                if sourceFilesInfo is None or (
+                    # an asset indexed from a later folder, not one set from outside the index
+                    sourceFilesInfo['contentDir'] in self.paths
+                    and self.contentDirs.index(sourceFilesInfo['contentDir']) > precedence
+                ):
+                    self.sourceFiles[stemPath] = {
+                        'contentDir': contentDir,
+                        'fileSuffixes': suffixes,
+                    }
+            suffixes.append(suffix)
+
+    def hasFile(self, contentDir, relPath):
+        return os.path.normcase(relPath) in self.normalizedPaths.get(contentDir, ())
+
+    def glob(self, contentDir, pattern):
+        """The relative paths of the files in `contentDir` matching a glob pattern (relative to `contentDir`)"""
+        regex = globToRegex(pattern)
+        return [path for path in self.paths.get(contentDir, []) if regex.match(path)]
@@ -1,19 +1,23 @@
+import copy
 import hashlib
+import json
+import os
 import secrets
+from collections.abc import Mapping
 
 import semver
 
-from modswap.helpers.uassetHelpers import NameMapFieldName
-
 from .consoleHelpers import sprint, sprintPad
+from .jsonHelpers import jsonDumpToFile
+from .migrationHelpers import MigrationRegistry
 from .uassetHelpers import (ArrayPropertyDataType, EnumPropertyDataType,
-                            ExportsFieldName, IntPropertyDataType,
-                            ItemTypeName, NameFieldName, NamePropertyDataType,
-                            SoftObjectPropertyDataType, StringPropertyDataType,
-                            StructPropertyDataType, StructTypeFieldName,
-                            TextPropertyDataType, ValueFieldName,
-                            findNextItemByFields, findStructByType,
-                            getPropertyValue)
+                            IntPropertyDataType, ItemTypeName, NameFieldName,
+                            NamePropertyDataType, SoftObjectPropertyDataType,
+                            StringPropertyDataType, TextPropertyDataType,
+                            ValueFieldName,
+                            findEnumByType, findNextItemByFields,
+                            findStructByType, getEnumValue, getPropertyValue,
+                            setPropertyValue)
 
 CustomizationItemDbAssetName = 'CustomizationItemDB'
 ECustomizationCategoryName = 'ECustomizationCategory'
@@ -23,6 +27,7 @@ AssetPathFieldName = 'AssetPath'
 AssetNameFieldName = 'AssetName'
 AttachmentBlueprintName = 'AttachementBlueprint'
 AccessoryBlueprintName = 'AccessoryBlueprint'
+ModelIndexVersion = 1
 
 def generateRandomHexString(length):
     return secrets.token_hex(length // 2)
@@ -80,8 +85,8 @@ def getModelIdProperty(modelValues, gameVersion):
                 else [StringPropertyDataType, NamePropertyDataType] if gameVersionSemver.match('6.5.2') \
                 # >= 6.5.2
                 else StringPropertyDataType,
-        ],
             'CustomizationId' if gameVersionSemver.match('>=6.7.0') else 'ID',
+        ],
     )
 
 
@@ -241,7 +246,7 @@ def addAllToNameMap(value, nameMapSet, path=''):
                 sprint(f'NameMap++|{name}|')
             nameMapSet.add(name)
 
-    if isinstance(value, dict):
+    if isinstance(value, Mapping):
         itemType = value.get(ItemTypeName, None)
 
         for k, v in value.items():
@@ -300,211 +305,255 @@ def addAllToNameMap(value, nameMapSet, path=''):
                         addName(path)
                 else:
                     addName(v)
-            elif isinstance(v, dict) or isinstance(v, list):
+            elif isinstance(v, Mapping) or isinstance(v, list):
                 addAllToNameMap(v, nameMapSet, path=f'{path}{itemType or ""}.{k}/')
     elif isinstance(value, list):
         for vIndex, v in enumerate(value):
             addAllToNameMap(v, nameMapSet, f'{path}[{vIndex}]/')
 
 
-def upgradeCustomizationItemDb(customizationItemDb, gameVersion, newGameVersion, dryRun=False, debug=False):
-    gameVersionSemver = semver.VersionInfo.parse(gameVersion)
-    if not gameVersionSemver.match('6.5.2'):
-        raise ValueError('Only supports upgrading from version 6.5.2')
-
-    newGameVersionSemver = semver.VersionInfo.parse(newGameVersion)
-    if not (newGameVersionSemver.match('>=6.7.0') and newGameVersionSemver.match('<=6.7.2')):
-        raise ValueError('Only supports upgrading to version >=6.7.0 & <=6.7.2')
-
-    # TODO: use this in a different function to "unlock" items, levels, etc., in base game files.
-    # Another way of doing this is to not rename the field, but to change the value of the field.
-    lockReplacements = [
-        {
-            'from': {
-                'structType': 'CustomizationItemData',
-                'Name': 'PrestigeUlockLevex',
-                '$type': 'UAssetAPI.PropertyTypes.Objects.IntPropertyData, UAssetAPI',
-            },
-            'to': {
-                'Name': 'PrestigeUlockLevel',
-            },
+def getNameMapNames(value):
+    nameMapSet = set()
+    addAllToNameMap(value, nameMapSet)
+    return nameMapSet
+
+
+def getComboModelSharedNames(model, gameVersion):
+    """Get the NameMap names that every combo model made from `model` has in common (all but the ID and attachments)"""
+    comboModel = copy.deepcopy(model)
+    comboModelValues = getPropertyValue(comboModel)
+    setModelName(comboModel, '')
+    setPropertyValue(getModelIdProperty(comboModelValues, gameVersion), '')
+    socketAttachmentsStruct = findSocketAttachmentsStruct(comboModelValues)
+    socketAttachmentsStruct.pop('DummyStruct', None)
+    getPropertyValue(socketAttachmentsStruct).clear()
+    return getNameMapNames(comboModel)
+
+
+def getModelBaseName(model):
+    return getModelName(model).split('_')[0]
+
+
+def getModelCategoryName(model):
+    categoryFullName = getEnumValue(findEnumByType(getPropertyValue(model), ECustomizationCategoryName))
+    return categoryFullName[len(ECustomizationCategoryNamePrefix):]
+
+
+def getModelAssociatedCharacterId(model):
+    return getAssociatedCharacterId(getPropertyValue(model))
+
+
+ModelFilterKeyGetters = {
+    'characterIds': getModelAssociatedCharacterId,
+    'categories': getModelCategoryName,
+    'baseModels': getModelBaseName,
+}
+
+
+class ModelIndex():
+    """Indexes the positions of CustomizationItemDB models by associated character ID, category, and base model name,
+    and keeps each model's NameMap names. Each index is built the first time it's needed, reading only its own field
+    from each model. Saved to a file, it's reused while the CustomizationItemDB it was built from is unchanged."""
+
+    def __init__(self, models):
+        self.models = models
+        self.indices = {}
+        self.modelNames = [None] * len(models)
+        self.dirty = False
+
+    def load(self, path, key):
+        """Reads the indices and names saved for `key` (e.g. the hashes of the CustomizationItemDB files).
+        Returns whether they were read."""
+        if not os.path.isfile(path):
+            return False
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get('version', None) != ModelIndexVersion or data.get('key', None) != key or data.get('modelCount', None) != len(self.models):
+            return False
+
+        # JSON object keys are always strings, so index keys (e.g. character IDs) are kept in pairs
+        self.indices = {filterKey: {k: set(v) for k, v in pairs} for filterKey, pairs in data['indices'].items()}
+        names = data['names']
+        self.modelNames = [None if nameIds is None else [names[i] for i in nameIds] for nameIds in data['modelNames']]
+        self.dirty = False
+        return True
+
+    def save(self, path, key):
+        if not self.dirty:
+            return
+
+        nameIds = {}
+        jsonDumpToFile({
+            'version': ModelIndexVersion,
+            'key': key,
+            'modelCount': len(self.models),
+            'indices': {filterKey: [[k, sorted(v)] for k, v in index.items()] for filterKey, index in self.indices.items()},
+            'modelNames': [None if names is None else [nameIds.setdefault(name, len(nameIds)) for name in names] for names in self.modelNames],
+            'names': list(nameIds),
+        }, path)
+        self.dirty = False
+
+    def getModelNames(self, modelIndex):
+        """The NameMap names of a model, walking it only the first time"""
+        names = self.modelNames[modelIndex]
+        if names is None:
+            names = sorted(getNameMapNames(self.models[modelIndex]))
+            self.modelNames[modelIndex] = names
+            self.dirty = True
+        return names
+
+    def getIndex(self, filterKey):
+        index = self.indices.get(filterKey, None)
+        if index is None:
+            getKey = ModelFilterKeyGetters.get(filterKey, None)
+            if getKey is None:
+                raise ValueError(f'Unsupported model filter: {filterKey}')
+
+            index = {}
+            for modelIndex, model in enumerate(self.models):
+                try:
+                    key = getKey(model)
+                except Exception:
+                    key = None
+                if key not in index:
+                    index[key] = set()
+                index[key].add(modelIndex)
+            self.indices[filterKey] = index
+            self.dirty = True
+        return index
+
+    def getMatchingModelIndices(self, modelFilters):
+        """Returns the positions of the models matching every filter (and any of each filter's values),
+        or None if no filters are given"""
+        matching = None
+        for filterKey, values in modelFilters.items():
+            if not values:
+                continue
+
+            index = self.getIndex(filterKey)
+            filterMatching = set()
+            for value in values:
+                filterMatching |= index.get(value, set())
+            matching = filterMatching if matching is None else matching & filterMatching
+        return matching
+
+
+# TODO: use this in a different function to "unlock" items, levels, etc., in base game files.
+# Another way of doing this is to not rename the field, but to change the value of the field.
+CustomizationItemDbLockRenames = [
+    {
+        'from': {
+            'structType': 'CustomizationItemData',
+            'Name': 'PrestigeUlockLevex',
+            '$type': 'UAssetAPI.PropertyTypes.Objects.IntPropertyData, UAssetAPI',
         },
-        {
-            'from': {
-                'structType': 'CustomizationItemData',
-                'Name': 'EventIx',
-                '$type': 'UAssetAPI.PropertyTypes.Objects.NamePropertyData, UAssetAPI',
-            },
-            'to': {
-                'Name': 'EventId',
-            },
+        'to': {
+            'Name': 'PrestigeUlockLevel',
         },
-        {
-            'from': {
-                'structType': 'CustomizationItemData',
-                'Name': 'IsInStorx',
-                '$type': 'UAssetAPI.PropertyTypes.Objects.BoolPropertyData, UAssetAPI',
-            },
-            'to': {
-                'Name': 'IsInStore',
-            },
+    },
+    {
+        'from': {
+            'structType': 'CustomizationItemData',
+            'Name': 'EventIx',
+            '$type': 'UAssetAPI.PropertyTypes.Objects.NamePropertyData, UAssetAPI',
         },
-        {
-            'from': {
-                'structType': 'CustomizationItemData',
-                'Name': 'PlatformExclusiveFlax',
-                '$type': 'UAssetAPI.PropertyTypes.Objects.UInt32PropertyData, UAssetAPI',
-            },
-            'to': {
-                'Name': 'PlatformExclusiveFlag',
-            },
+        'to': {
+            'Name': 'EventId',
         },
-        {
-            'from': {
-                'structType': 'ItemAvailability',
-                'Name': 'itemAvailabilitx',
-                '$type': EnumPropertyDataType,
-            },
-            'to': {
-                'Name': 'itemAvailability',
-            },
+    },
+    {
+        'from': {
+            'structType': 'CustomizationItemData',
+            'Name': 'IsInStorx',
+            '$type': 'UAssetAPI.PropertyTypes.Objects.BoolPropertyData, UAssetAPI',
         },
-        {
-            'from': {
-                'structType': 'ItemAvailability',
-                'Name': 'DLCIx',
-                '$type': StringPropertyDataType,
-            },
-            'to': {
-                'Name': 'DLCId',
-            },
+        'to': {
+            'Name': 'IsInStore',
         },
-        {
-            'from': {
-                'structType': 'ItemAvailability',
-                'Name': 'CloudInventoryIx',
-                '$type': 'UAssetAPI.PropertyTypes.Objects.IntPropertyData, UAssetAPI',
-            },
-            'to': {
-                'Name': 'CloudInventoryId',
-            },
+    },
+    {
+        'from': {
+            'structType': 'CustomizationItemData',
+            'Name': 'PlatformExclusiveFlax',
+            '$type': 'UAssetAPI.PropertyTypes.Objects.UInt32PropertyData, UAssetAPI',
         },
-        {
-            'from': {
-                'structType': 'ItemAvailability',
-                'Name': 'CommunityIx',
-                '$type': StringPropertyDataType,
-            },
-            'to': {
-                'Name': 'CommunityId',
-            },
+        'to': {
+            'Name': 'PlatformExclusiveFlag',
         },
-    ]
-
-    replacements = [
-        {
-            'from': {
-                'structType': 'CustomizationItemData',
-                'Name': 'ID',
-                '$type': [
-                    'UAssetAPI.PropertyTypes.Objects.NamePropertyData, UAssetAPI',
-                    StringPropertyDataType,
-                ],
-            },
-            'to': {
-                'Name': 'CustomizationId',
-                '$type': StringPropertyDataType,
-                'index': -1,
-            },
+    },
+    {
+        'from': {
+            'structType': 'ItemAvailability',
+            'Name': 'itemAvailabilitx',
+            '$type': EnumPropertyDataType,
         },
-    ]
-
-    structTypeReplacementsMap = {}
-    nameReplacementMap = {}
-    for replacement in replacements:
-        nameReplacementMap[replacement['from'][NameFieldName]] = replacement
-        structType = replacement['from']['structType']
-        if structType not in structTypeReplacementsMap:
-            structTypeReplacementsMap[structType] = []
-        structTypeReplacementsMap[structType].append(replacement)
-
-    if debug:
-        sprintPad()
-        sprint('Names to replace:')
-        for name, replacement in nameReplacementMap.items():
-            sprint(f"{name} -> {replacement['to'][NameFieldName]}")
-        sprintPad()
-
-    nameMapArray = customizationItemDb[NameMapFieldName]
-    nameMapSet = set(nameMapArray)
-
-    if debug:
-        sprintPad()
+        'to': {
+            'Name': 'itemAvailability',
+        },
+    },
+    {
+        'from': {
+            'structType': 'ItemAvailability',
+            'Name': 'DLCIx',
+            '$type': StringPropertyDataType,
+        },
+        'to': {
+            'Name': 'DLCId',
+        },
+    },
+    {
+        'from': {
+            'structType': 'ItemAvailability',
+            'Name': 'CloudInventoryIx',
+            '$type': 'UAssetAPI.PropertyTypes.Objects.IntPropertyData, UAssetAPI',
+        },
+        'to': {
+            'Name': 'CloudInventoryId',
+        },
+    },
+    {
+        'from': {
+            'structType': 'ItemAvailability',
+            'Name': 'CommunityIx',
+            '$type': StringPropertyDataType,
+        },
+        'to': {
+            'Name': 'CommunityId',
+        },
+    },
+]
+
+# the CustomizationItemDB changes between game versions, by the game versions migrated between
+CustomizationItemDbMigrations = MigrationRegistry()
+CustomizationItemDbMigrations.addStep('6.5.2', '6.7.0', [
+    {
+        'from': {
+            'structType': 'CustomizationItemData',
+            'Name': 'ID',
+            '$type': [
+                'UAssetAPI.PropertyTypes.Objects.NamePropertyData, UAssetAPI',
+                StringPropertyDataType,
+            ],
+        },
+        'to': {
+            'Name': 'CustomizationId',
+            '$type': StringPropertyDataType,
+            # TODO: handle 'index' for repositioning elements?
+            'index': -1,
+        },
+    },
+])
+CustomizationItemDbMigrations.addStep('6.7.0', '6.7.1', [])
+CustomizationItemDbMigrations.addStep('6.7.0', '6.7.2', [])
 
-    for name in nameMapSet.copy():
-        if False and debug:
-            sprint(f'NameMap name: {name}')
-        replacement = nameReplacementMap.get(name, None)
-        if replacement is not None:
-            newName = replacement['to'][NameFieldName]
-            if debug:
-                sprint(f'Replacing NameMap name from `{name}` to `{newName}`')
-            nameMapSet.remove(name)
-            nameMapSet.add(newName)
 
+def upgradeCustomizationItemDb(customizationItemDb, gameVersion, newGameVersion, dryRun=False, debug=False):
+    """Migrates a CustomizationItemDB along the shortest chain of migration steps between the game versions.
+    Returns how many properties each migration rule touched."""
+    migration = CustomizationItemDbMigrations.compile(gameVersion, newGameVersion)
     if debug:
         sprintPad()
-
-    def traverse(value, structType=None):
-        if value is None:
-            return
-
-        if isinstance(value, dict):
-            itemType = value.get(ItemTypeName, None)
-            itemName = value.get(NameFieldName, None)
-
-            if False and debug:
-                sprint(f'{structType or "[]"}.{itemType}.{itemName}')
-
-            if itemType == StructPropertyDataType:
-                traverse(value[ValueFieldName], structType=value[StructTypeFieldName])
-            elif structType in structTypeReplacementsMap:
-                for replacement in structTypeReplacementsMap[structType]:
-                    fromTypeData = replacement['from'].get(ItemTypeName, None)
-                    replacementFromTypes = [fromTypeData] if isinstance(fromTypeData, str) else fromTypeData
-                    if (
-                        replacement['from'][NameFieldName] == itemName
-                        and (
-                            not fromTypeData or (
-                                itemType in replacementFromTypes
-                            )
-                        )
-                    ):
-                        newName = replacement['to'][NameFieldName]
-                        newType = replacement['to'].get(ItemTypeName, None)
-
-                        # TODO: handle 'index' for repositioning elements?
-
-                        if debug:
-                            sprint(f'Renaming {structType}.{itemType}.{itemName} to {newType or itemType}.{newName}')
-
-                        if not dryRun:
-                            if newType is not None:
-                                value[ItemTypeName] = newType
-                            value[NameFieldName] = replacement['to'][NameFieldName]
-        elif isinstance(value, list):
-            for vIndex, v in enumerate(value):
-                traverse(v, structType=structType)
-
-    exports = customizationItemDb.get(ExportsFieldName, [])
-    for export in exports:
-        traverse(export['Table']['Data'])
-
-    if debug:
+        sprint(f'Migrating through game versions {" -> ".join(migration.versions)}')
         sprintPad()
 
-    if not dryRun:
-        nameMapArray.clear()
-        for name in nameMapSet:
-            nameMapArray.append(name)
-        nameMapArray.sort(key=lambda v: v.upper())
+    return migration.apply(customizationItemDb, dryRun=dryRun, debug=debug)
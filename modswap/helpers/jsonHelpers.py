@@ -1,8 +1,12 @@
 import json
+import os
+import tempfile
+import uuid
+from collections.abc import Mapping
 
 
 def jsonifyDataRecursive(value, isKey=False):
-    if isinstance(value, dict):
+    if isinstance(value, Mapping):
         newValue = {jsonifyDataRecursive(k, isKey=True): jsonifyDataRecursive(v) for k, v in value.items()}
     elif isinstance(value, set) or isinstance(value, frozenset):
         listVersion = sorted([jsonifyDataRecursive(v, isKey=isKey) for v in value], key=lambda x: x.upper() if isinstance(x, str) else x)
@@ -22,12 +26,132 @@ class JsonSetEncoder(json.JSONEncoder):
     def default(self, value):
         if isinstance(value, set) or isinstance(value, frozenset):
             return sorted(list(value), key=lambda v: v.upper() if isinstance(v, str) else v)
+        if isinstance(value, Mapping):
+            # e.g. CompactRecord
+            return dict(value.items())
         return json.JSONEncoder.default(self, value)
 
 
+class InterningJsonHook():
+    """A json.load() object_pairs_hook that makes equal keys and string values share one string object.
+    UAssetGUI JSON repeats the same type names, property names and values many thousands of times.
+    Strings are shared across every load that uses the same hook."""
+
+    def __init__(self, makeObject=dict, maxLength=256):
+        self.makeObject = makeObject
+        self.maxLength = maxLength
+        self.strings = {}
+
+    def intern(self, value):
+        if isinstance(value, str):
+            if len(value) <= self.maxLength:
+                return self.strings.setdefault(value, value)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                if isinstance(item, str) and len(item) <= self.maxLength:
+                    value[index] = self.strings.setdefault(item, item)
+        return value
+
+    def __call__(self, pairs):
+        strings = self.strings
+        return self.makeObject([(strings.setdefault(k, k), self.intern(v)) for k, v in pairs])
+
+
 def jsonDump(value, stream=None, pretty=False):
     indent = 2 if pretty else None
     if stream:
         return json.dump(value, stream, indent=indent, cls=JsonSetEncoder)
     else:
         return json.dumps(value, indent=indent, cls=JsonSetEncoder)
+
+
+def jsonDumpToFile(value, path):
+    """Writes `value` as JSON through a uniquely named temporary file next to `path`, replacing `path` once written.
+    Readers never see a partly written file, and processes saving the same file at once don't share a temporary file."""
+    file = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(path) or '.', prefix=f'{os.path.basename(path)}.', suffix='.tmp', delete=False)
+    try:
+        with file:
+            jsonDump(value, file)
+        os.replace(file.name, path)
+    except BaseException:
+        try:
+            os.remove(file.name)
+        except OSError:
+            pass
+        raise
+
+
+class JsonListSpool():
+    """A list of JSON values kept in a temporary file (one compact value per line) instead of memory"""
+
+    def __init__(self, dir=None, prefix=None):
+        self.file = tempfile.TemporaryFile('w+', encoding='utf-8', dir=dir, prefix=prefix, suffix='.jsonl')
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, value):
+        self.appendJson(jsonDump(value))
+
+    def appendJson(self, jsonString):
+        self.file.write(jsonString)
+        self.file.write('\n')
+        self.count += 1
+
+    def iterLines(self):
+        self.file.flush()
+        self.file.seek(0)
+        try:
+            for line in self.file:
+                yield line.rstrip('\n')
+        finally:
+            self.file.seek(0, 2)
+
+    def __iter__(self):
+        for line in self.iterLines():
+            yield json.loads(line)
+
+    def close(self):
+        self.file.close()
+
+
+def dumpWithSpooledList(value, spooledList, dumpValue):
+    """Dumps `value` with a string token in place of the items of `spooledList`, and yields the text
+    before the token, the indentation of the token line, and the text after the token"""
+    token = f'__spooled_{uuid.uuid4().hex}__'
+    items = spooledList.copy()
+    spooledList[:] = [token]
+    try:
+        text = dumpValue(value)
+    finally:
+        spooledList[:] = items
+    tokenIndex = text.index(token)
+    lineStart = text.rfind('\n', 0, tokenIndex) + 1
+    return text[:tokenIndex], text[lineStart:tokenIndex], text[tokenIndex + len(token):]
+
+
+def jsonDumpWithSpooledList(value, spooledList, spool, stream, pretty=False):
+    """Writes `value` as JSON, with the items of `spool` written in place of `spooledList`, one at a time"""
+    if not len(spool):
+        return jsonDump(value, stream, pretty=pretty)
+
+    before, indent, after = dumpWithSpooledList(value, spooledList, lambda v: jsonDump(v, pretty=pretty))
+    # strip the token's quotes
+    stream.write(before[:-1])
+    indent = indent[:-1]
+    separator = f',\n{indent}' if pretty else ', '
+    for index, line in enumerate(spool.iterLines()):
+        if index:
+            stream.write(separator)
+        if pretty:
+            stream.write(jsonDump(json.loads(line), pretty=True).replace('\n', f'\n{indent}'))
+        else:
+            stream.write(line)
+    stream.write(after[1:])
@@ -0,0 +1,163 @@
+from collections import deque
+from collections.abc import Mapping
+
+import semver
+
+from .consoleHelpers import sprint, sprintPad
+from .uassetHelpers import (ExportsFieldName, ItemTypeName, NameFieldName,
+                            NameMapFieldName, StructPropertyDataType,
+                            StructTypeFieldName, ValueFieldName)
+
+
+def normalizeVersion(version):
+    return str(semver.VersionInfo.parse(version))
+
+
+def getMigrationRuleId(fromVersion, toVersion, rule):
+    return f"{fromVersion}->{toVersion} {rule['from']['structType']}.{rule['from'][NameFieldName]}"
+
+
+class CompiledMigration():
+    """The rules of a chain of migration steps composed into one table, by struct type and (property name, property type).
+    A property renamed by one step and again by a later one maps straight to its final name and type."""
+
+    def __init__(self, versions, steps):
+        self.versions = versions
+        # struct type -> (name, type) -> (new name, new type, ids of the rules applied)
+        self.table = {}
+        for fromVersion, toVersion, rules in steps:
+            self.addStep(fromVersion, toVersion, rules)
+
+        # names to replace in the name map
+        self.nameReplacements = {}
+        for structType, structRules in self.table.items():
+            for (name, _), (newName, _, _) in structRules.items():
+                if newName != name:
+                    self.nameReplacements.setdefault(name, set()).add(newName)
+
+    def addStep(self, fromVersion, toVersion, rules):
+        stepTable = {}
+        for rule in rules:
+            fromTypes = rule['from'][ItemTypeName]
+            for fromType in [fromTypes] if isinstance(fromTypes, str) else fromTypes:
+                key = (rule['from'][NameFieldName], fromType)
+                newType = rule['to'].get(ItemTypeName, None) or fromType
+                target = (rule['to'][NameFieldName], newType, getMigrationRuleId(fromVersion, toVersion, rule))
+                stepTable.setdefault(rule['from']['structType'], {})[key] = target
+
+        for structType, stepRules in stepTable.items():
+            structRules = self.table.setdefault(structType, {})
+            # properties already renamed by earlier steps are matched by their current name and type
+            for key, (name, itemType, ruleIds) in structRules.items():
+                stepRule = stepRules.get((name, itemType), None)
+                if stepRule is not None:
+                    structRules[key] = (stepRule[0], stepRule[1], ruleIds + (stepRule[2],))
+            # the rest are properties no earlier step touched
+            for key, (newName, newType, ruleId) in stepRules.items():
+                if key not in structRules:
+                    structRules[key] = (newName, newType, (ruleId,))
+
+    def apply(self, dataTable, dryRun=False, debug=False):
+        """Renames (and retypes) the properties of a data table (UAssetGUI JSON) in a single traversal.
+        Returns how many properties each rule touched (counted in a dry run too)."""
+        ruleCounts = {}
+
+        if debug:
+            sprintPad()
+            sprint('Names to replace:')
+            for name, newNames in self.nameReplacements.items():
+                sprint(f"{name} -> {', '.join(sorted(newNames))}")
+            sprintPad()
+
+        stack = []
+        for export in reversed(dataTable.get(ExportsFieldName, [])):
+            stack.append((export['Table']['Data'], None))
+
+        while stack:
+            value, structType = stack.pop()
+            if isinstance(value, Mapping):
+                itemType = value.get(ItemTypeName, None)
+                if itemType == StructPropertyDataType:
+                    stack.append((value[ValueFieldName], value[StructTypeFieldName]))
+                elif structType in self.table:
+                    itemName = value.get(NameFieldName, None)
+                    target = self.table[structType].get((itemName, itemType), None)
+                    if target is not None:
+                        newName, newType, ruleIds = target
+                        if debug:
+                            sprint(f'Renaming {structType}.{itemType}.{itemName} to {newType}.{newName}')
+                        for ruleId in ruleIds:
+                            ruleCounts[ruleId] = ruleCounts.get(ruleId, 0) + 1
+                        if not dryRun:
+                            value[ItemTypeName] = newType
+                            value[NameFieldName] = newName
+            elif isinstance(value, list):
+                for v in reversed(value):
+                    stack.append((v, structType))
+
+        if not dryRun and self.nameReplacements:
+            nameMapArray = dataTable[NameMapFieldName]
+            nameMapSet = set(nameMapArray)
+            for name, newNames in self.nameReplacements.items():
+                if name in nameMapSet:
+                    if debug:
+                        sprint(f"Replacing NameMap name from `{name}` to `{', '.join(sorted(newNames))}`")
+                    nameMapSet.remove(name)
+                    nameMapSet |= newNames
+            nameMapArray.clear()
+            for name in nameMapSet:
+                nameMapArray.append(name)
+            nameMapArray.sort(key=lambda v: v.upper())
+
+        return ruleCounts
+
+
+class MigrationRegistry():
+    """Migration steps between pairs of versions. Migrating between any two versions chains the steps
+    along the shortest path between them, compiled once into a single rule table."""
+
+    def __init__(self):
+        # from version -> to version -> rules
+        self.steps = {}
+        self.compiled = {}
+
+    def addStep(self, fromVersion, toVersion, rules):
+        """Adds the rules migrating `fromVersion` to `toVersion`. Each rule renames (and optionally retypes) properties
+        matching a struct type, property name, and property type (or list of types)."""
+        for rule in rules:
+            if ItemTypeName not in rule['from']:
+                raise ValueError(f'Migration rule {getMigrationRuleId(fromVersion, toVersion, rule)} is missing a property type')
+        self.steps.setdefault(normalizeVersion(fromVersion), {})[normalizeVersion(toVersion)] = rules
+        self.compiled = {}
+
+    def findPath(self, fromVersion, toVersion):
+        """The versions along the shortest chain of steps from `fromVersion` to `toVersion`, or None if there is none"""
+        fromVersion = normalizeVersion(fromVersion)
+        toVersion = normalizeVersion(toVersion)
+        previousVersions = {fromVersion: None}
+        queue = deque([fromVersion])
+        while queue:
+            version = queue.popleft()
+            if version == toVersion:
+                path = []
+                while version is not None:
+                    path.append(version)
+                    version = previousVersions[version]
+                return path[::-1]
+            for nextVersion in sorted(self.steps.get(version, {}), key=semver.VersionInfo.parse):
+                if nextVersion not in previousVersions:
+                    previousVersions[nextVersion] = version
+                    queue.append(nextVersion)
+
+    def compile(self, fromVersion, toVersion):
+        key = (normalizeVersion(fromVersion), normalizeVersion(toVersion))
+        if key not in self.compiled:
+            path = self.findPath(*key)
+            if path is None:
+                supported = sorted({*self.steps, *(v for steps in self.steps.values() for v in steps)}, key=semver.VersionInfo.parse)
+                raise ValueError(f'Cannot migrate from version {key[0]} to {key[1]} (supported versions: {", ".join(supported)})')
+            self.compiled[key] = CompiledMigration(path, [
+                (fromStepVersion, toStepVersion, self.steps[fromStepVersion][toStepVersion])
+                for fromStepVersion, toStepVersion in zip(path, path[1:])
+            ])
+        return self.compiled[key]
@@ -0,0 +1,352 @@
+import copy
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import semver
+
+from .attachmentHelpers import getAttachmentDisplayName
+from .customizationItemDbHelpers import (AccessoryBlueprintName,
+                                         AttachmentBlueprintName,
+                                         ModelDisplayNamePropNameFieldName,
+                                         findSocketAttachmentsStruct,
+                                         generateRandomHexString,
+                                         getAttachmentBlueprintProperty,
+                                         getModelDisplayNameProperty,
+                                         getModelIdProperty, getUiDataValues,
+                                         md5Hash, setModelName, sha256Hash)
+from .jsonHelpers import jsonDump, jsonifyDataRecursive
+from .uassetHelpers import (NameFieldName, ValueFieldName, getPropertyValue,
+                            setPropertyValue)
+
+
+class ComboRules():
+    """Attachment combination exclusion rules, by category"""
+
+    def __init__(
+        self,
+        combinationsToSkip=None,
+        combinationSubsetsToSkip=None,
+        combinationsRequired=None,
+        combinationSubsetsRequired=None,
+    ):
+        self.combinationsToSkip = combinationsToSkip or {}
+        self.combinationSubsetsToSkip = combinationSubsetsToSkip or {}
+        self.combinationsRequired = combinationsRequired or {}
+        self.combinationSubsetsRequired = combinationSubsetsRequired or {}
+
+    def isBaseModelSkipped(self, categoryName, modelBaseName):
+        emptySet = frozenset()
+        for combosToSkip in (self.combinationsToSkip, self.combinationSubsetsToSkip):
+            baseModels = combosToSkip.get(categoryName, {}).get(emptySet, None)
+            if baseModels is not None and (not baseModels or modelBaseName in baseModels):
+                return True
+        return False
+
+    def isComboSkipped(self, categoryName, modelBaseName, attachmentIdsSet):
+        baseModels = self.combinationsToSkip.get(categoryName, {}).get(attachmentIdsSet, None)
+        if baseModels is not None:
+            if len(baseModels) == 0 or modelBaseName in baseModels:
+                return True
+
+        for combosToSkip, baseModels in self.combinationSubsetsToSkip.get(categoryName, {}).items():
+            if (len(baseModels) == 0 or modelBaseName in baseModels) and combosToSkip <= attachmentIdsSet:
+                return True
+
+        for combosRequired, baseModels in self.combinationsRequired.get(categoryName, {}).items():
+            if len(baseModels) and modelBaseName not in baseModels:
+                continue
+
+            if combosRequired != attachmentIdsSet:
+                return True
+
+        for combosRequired, baseModels in self.combinationSubsetsRequired.get(categoryName, {}).items():
+            if len(baseModels) and modelBaseName not in baseModels:
+                continue
+
+            if not combosRequired <= attachmentIdsSet:
+                return True
+
+        # allow all by default
+        return False
+
+    def getCategoryHash(self, categoryName):
+        """Hashes the rules for a category, so changes to them can be detected"""
+        return getJsonHash([
+            self.combinationsToSkip.get(categoryName, {}),
+            self.combinationSubsetsToSkip.get(categoryName, {}),
+            self.combinationsRequired.get(categoryName, {}),
+            self.combinationSubsetsRequired.get(categoryName, {}),
+        ], sortingKeys=True)
+
+
+def getJsonHash(value, sortingKeys=False):
+    return md5Hash(json.dumps(jsonifyDataRecursive(value), sort_keys=sortingKeys))
+
+
+MixManifestVersion = 2
+
+
+class MixManifest():
+    """What the last mix was made from, and where each combo model is in the models file written with it.
+    A combo model is reused when its base model's inputs (the row, its category's rules, the game version) and its
+    attachments are unchanged. Rows are keyed by the CustomizationItemDB files' fingerprint (`sourcesKey`),
+    and only hashed again when those files changed."""
+
+    def __init__(self, manifestPath, modelsPath, sourcesKey=None):
+        self.manifestPath = manifestPath
+        self.modelsPath = modelsPath
+        self.sourcesKey = sourcesKey
+        self.previous = {}
+        self.previousModels = {}
+        self.previousModelIdsByBaseModel = {}
+        self.previousModelsFile = None
+        self.attachmentHashes = {}
+        self.baseModels = {}
+        self.models = {}
+        self.reusedCount = 0
+
+    def load(self):
+        if not os.path.isfile(self.manifestPath) or not os.path.isfile(self.modelsPath):
+            return False
+
+        with open(self.manifestPath, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+
+        if manifest.get('version', None) != MixManifestVersion:
+            return False
+
+        self.previous = manifest
+        self.previousModels = manifest.get('models', {})
+        for modelId, info in self.previousModels.items():
+            self.previousModelIdsByBaseModel.setdefault(info['baseModel'], set()).add(modelId)
+        self.previousModelsFile = open(self.modelsPath, 'rb')
+        return True
+
+    def getUnchangedAttachmentIds(self, attachmentHashes):
+        """The attachment IDs of each category whose attachment hasn't changed since the last mix"""
+        self.attachmentHashes = attachmentHashes
+        previousAttachmentHashes = self.previous.get('attachmentHashes', {})
+        return {
+            categoryName: {
+                attachmentId for attachmentId, attachmentHash in categoryHashes.items()
+                if previousAttachmentHashes.get(categoryName, {}).get(attachmentId, None) == attachmentHash
+            }
+            for categoryName, categoryHashes in attachmentHashes.items()
+        }
+
+    def getReusableModelIds(self, baseModelKey, model, rulesHash, gameVersion, separator):
+        """The IDs of the combo models made from a base model in the last mix, if its inputs haven't changed since (otherwise None)"""
+        previousBaseModel = self.previous.get('baseModels', {}).get(baseModelKey, None)
+        if previousBaseModel is not None and self.sourcesKey is not None and self.previous.get('sourcesKey', None) == self.sourcesKey:
+            # same CustomizationItemDB files, so the same row
+            rowHash = previousBaseModel['rowHash']
+        else:
+            rowHash = getJsonHash(model)
+        inputsHash = md5Hash(jsonDump([rowHash, rulesHash, gameVersion, separator]))
+        self.baseModels[baseModelKey] = {'rowHash': rowHash, 'inputsHash': inputsHash}
+        if previousBaseModel is not None and previousBaseModel['inputsHash'] == inputsHash:
+            return self.previousModelIdsByBaseModel.get(baseModelKey, set())
+
+    def readPreviousModelJson(self, modelId):
+        self.previousModelsFile.seek(self.previousModels[modelId]['offset'])
+        self.reusedCount += 1
+        return self.previousModelsFile.readline().decode('utf-8').rstrip('\n')
+
+    def addModel(self, modelId, baseModelKey, spoolIndex):
+        self.models[modelId] = {'baseModel': baseModelKey, 'index': spoolIndex}
+
+    def save(self, spool):
+        """Replaces the last mix's manifest and models file with the models in `spool`"""
+        modelIdsByIndex = {info['index']: modelId for modelId, info in self.models.items()}
+        manifestModels = {}
+        modelsTempPath = f'{self.modelsPath}.tmp'
+        with open(modelsTempPath, 'wb') as file:
+            for index, line in enumerate(spool.iterLines()):
+                modelId = modelIdsByIndex.get(index, None)
+                if modelId is not None:
+                    manifestModels[modelId] = {
+                        'baseModel': self.models[modelId]['baseModel'],
+                        'offset': file.tell(),
+                    }
+                file.write(line.encode('utf-8'))
+                file.write(b'\n')
+
+        # remove the old manifest first, so an interrupted save just means a full mix next time
+        self.close()
+        if os.path.isfile(self.manifestPath):
+            os.remove(self.manifestPath)
+        os.replace(modelsTempPath, self.modelsPath)
+        with open(self.manifestPath, 'w', encoding='utf-8') as file:
+            jsonDump({
+                'version': MixManifestVersion,
+                'sourcesKey': self.sourcesKey,
+                'attachmentHashes': self.attachmentHashes,
+                'baseModels': self.baseModels,
+                'models': manifestModels,
+            }, file)
+
+    def close(self):
+        if self.previousModelsFile is not None:
+            self.previousModelsFile.close()
+            self.previousModelsFile = None
+
+
+def getModelDisplayNameBase(modelDisplayName):
+    openParenIndex = modelDisplayName.find('(')
+    if openParenIndex > -1:
+        closeParenIndex = modelDisplayName.find(')', openParenIndex + 1)
+        if closeParenIndex > -1:
+            return modelDisplayName[:openParenIndex].rstrip()
+    return modelDisplayName
+
+
+def fixAttachmentBlueprintPropertyName(attachmentData, gameVersion):
+    """Corrects the blueprint property name for different game versions. Returns the new name if it was changed."""
+    attachmentValues = getPropertyValue(attachmentData)
+    blueprintAttachmentProperty = getAttachmentBlueprintProperty(attachmentValues)
+    if blueprintAttachmentProperty is None:
+        return None
+
+    if semver.VersionInfo.parse(gameVersion).match('>=6.5.2'):
+        name = AccessoryBlueprintName
+    else:
+        name = AttachmentBlueprintName
+
+    if blueprintAttachmentProperty[NameFieldName] != name:
+        blueprintAttachmentProperty[NameFieldName] = name
+        return name
+
+
+def getComboModelId(modelBaseName, shortCategoryName, attachmentIds, separator):
+    attachmentNamesString = separator.join(attachmentIds)
+    if True:
+        attachmentNamesHashed = md5Hash(attachmentNamesString).upper()
+        return f'{modelBaseName}_{shortCategoryName}_{attachmentNamesHashed}'
+    else:
+        # TODO: use UUID instead?
+        return f'{modelBaseName}_{shortCategoryName}_{attachmentNamesString}'
+
+
+def makeComboModel(model, newModelId, modelDisplayNameBase, combo, gameVersion):
+    attachmentDisplayNames = [getAttachmentDisplayName(a) for a in combo]
+    attachmentDisplayNamesString = ', '.join([name for name in attachmentDisplayNames if name])
+    newModelDisplayName = f'{modelDisplayNameBase}{f" ({attachmentDisplayNamesString})" if attachmentDisplayNamesString else ""}'
+
+    newModel = copy.deepcopy(model)
+    newModelValues = getPropertyValue(newModel)
+    newModelIdProp = getModelIdProperty(newModelValues, gameVersion)
+    setPropertyValue(newModelIdProp, newModelId)
+    setModelName(newModel, newModelId)
+
+    newUiDataValues = getUiDataValues(newModelValues)
+
+    newModelDisplayNameProp = getModelDisplayNameProperty(newUiDataValues)
+    newModelDisplayNameProp[ModelDisplayNamePropNameFieldName] = newModelDisplayName
+
+    if False:
+        newModelDisplayNameProp[ValueFieldName] = generateRandomHexString(32).upper()
+    elif False:
+        # TODO: use same algorithm unreal engine uses - this is not identical, but it seems to do the trick anyway
+        newModelDisplayNameProp[ValueFieldName] = sha256Hash(newModelDisplayName.lower()).upper()
+    else:
+        newModelDisplayNameProp[ValueFieldName] = md5Hash(newModelDisplayName.lower()).upper()
+
+    newSocketAttachmentsStruct = findSocketAttachmentsStruct(newModelValues)
+    newSocketAttachmentsStruct.pop('DummyStruct', None)
+    newSocketAttachments = getPropertyValue(newSocketAttachmentsStruct)
+
+    for attachment in combo:
+        newSocketAttachments.append(attachment['attachmentData'])
+
+    # TODO: alter model icons and descriptions if specified
+
+    return newModel
+
+
+def generateComboModels(
+    model,
+    modelBaseName,
+    categoryName,
+    shortCategoryName,
+    modelDisplayNameBase,
+    attachmentsForCategory,
+    rules,
+    gameVersion,
+    separator,
+    serializing=False,
+    reusableModelIds=None,
+    unchangedAttachmentIds=None,
+):
+    """Yields (attachment IDs, new model ID, new model) for each combination of attachments.
+    The new model ID and model are None for skipped combinations. The new model is None if it can be reused from the last mix:
+    its ID is in `reusableModelIds` and its attachments are all in `unchangedAttachmentIds`."""
+    for r in range(1, len(attachmentsForCategory) + 1):
+        # TODO: use names instead of values in combinations()
+        for combo in combinations(attachmentsForCategory.values(), r):
+            attachmentIds = [a['attachmentId'] for a in combo]
+
+            if rules.isComboSkipped(categoryName, modelBaseName, frozenset(attachmentIds)):
+                yield attachmentIds, None, None
+                continue
+
+            # TODO: warn if this ID has already been used
+            newModelId = getComboModelId(modelBaseName, shortCategoryName, attachmentIds, separator)
+
+            if (
+                reusableModelIds
+                and newModelId in reusableModelIds
+                and all(attachmentId in unchangedAttachmentIds for attachmentId in attachmentIds)
+            ):
+                yield attachmentIds, newModelId, None
+                continue
+
+            newModel = makeComboModel(model, newModelId, modelDisplayNameBase, combo, gameVersion)
+            yield attachmentIds, newModelId, jsonDump(newModel) if serializing else newModel
+
+
+mixingWorkerContext = {}
+
+
+def initMixingWorker(attachmentsToMix, rules, gameVersion, separator, unchangedAttachmentIds):
+    mixingWorkerContext['attachmentsToMix'] = attachmentsToMix
+    mixingWorkerContext['rules'] = rules
+    mixingWorkerContext['gameVersion'] = gameVersion
+    mixingWorkerContext['separator'] = separator
+    mixingWorkerContext['unchangedAttachmentIds'] = unchangedAttachmentIds
+
+
+def mixModelInWorker(model, modelBaseName, categoryName, shortCategoryName, modelDisplayNameBase, reusableModelIds=None):
+    """Makes every combo model for a base model in a mixing pool worker. The models are returned as JSON strings."""
+    unchangedAttachmentIds = mixingWorkerContext['unchangedAttachmentIds']
+    return list(generateComboModels(
+        model,
+        modelBaseName,
+        categoryName,
+        shortCategoryName,
+        modelDisplayNameBase,
+        mixingWorkerContext['attachmentsToMix'][categoryName],
+        mixingWorkerContext['rules'],
+        mixingWorkerContext['gameVersion'],
+        mixingWorkerContext['separator'],
+        serializing=True,
+        reusableModelIds=reusableModelIds,
+        unchangedAttachmentIds=unchangedAttachmentIds[categoryName] if unchangedAttachmentIds is not None else None,
+    ))
+
+
+def startMixingPool(
+    jobs,
+    attachmentsToMix,
+    rules,
+    gameVersion,
+    separator,
+    unchangedAttachmentIds=None,
+):
+    """Starts worker processes for mixing. The attachments and rules are sent to each worker once, up front."""
+    return ProcessPoolExecutor(
+        max_workers=jobs or None,
+        initializer=initMixingWorker,
+        initargs=(attachmentsToMix, rules, gameVersion, separator, unchangedAttachmentIds),
+    )
@@ -1,9 +1,11 @@
 import os
 import re
+import string
 
 from modswap.metadata.programMetaData import ProgramName
 
 from .consoleHelpers import esprint, sprint, sprintP, sprintPad
+from .contentIndexHelpers import globToRegex
 from .pathHelpers import getPathInfo, normPath
 from .processHelpers import runCall, runCommand
 from .tempFileHelpers import openTemporaryFile
@@ -17,6 +19,21 @@ PakchunkFilenamePrefix = 'pakchunk'
 PakchunkFilenameSuffix = '.pak'
 PakchunkSigFilenameSuffix = '.sig'
 
+AsciiLowercaseTable = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# `staged` copies files into a pak folder to pak, `direct` paks them from where they are
+PakingModes = ('staged', 'direct')
+DefaultPakingMode = 'staged'
+
+# `full` extracts a whole source pakchunk, `selective` only the files of the assets needed (found in the pakchunk's file list)
+SrcPakExtractionModes = ('full', 'selective')
+DefaultSrcPakExtractionMode = 'full'
+
+UnrealPakMountPointPrefix = 'Mount point '
+# past this many `-Filter` runs, extracting the whole pakchunk once is faster
+MaxUnrealUnpakFilterRuns = 16
+UnrealPakListEntryRegex = re.compile(r'"(?P<path>[^"]+)"\s+offset:\s*(?P<offset>\d+),\s*size:\s*(?P<size>\d+)')
+
 pakchunkRefnameRegexCompiled = None
 
 def getPakContentDir(pakDir, gameName):
@@ -99,9 +116,43 @@ def pakchunkToSigFilePath(path):
     return f'{path}{PakchunkSigFilenameSuffix}'
 
 
-def unrealPak(pakDir, destPakPath, unrealPakPath, compress=True, debug=False, extraCompressionSettings=True, checkInput=None):
-    pakDirPathInfo = getPathInfo(pakDir)
-    responseFileContent = f'"{pakDirPathInfo["absolute"]}\*.*" "..\..\..\*.*" '
+def getUnrealPakFileOrderKey(pakPath):
+    """UnrealPak sorts the files found for a response file line by path in pak (`/` separated), compared like `FCString::Stricmp`:
+    code point by code point, with only ASCII letters lowercased"""
+    return pakPath.replace('\\', '/').translate(AsciiLowercaseTable)
+
+
+def getUnrealPakResponseFileContent(files):
+    """One line per (source path, path in pak) file, in the order UnrealPak paks the files of a staged folder
+    (see `getUnrealPakFileOrderKey`), so the pak is byte-identical to a staged one"""
+    lines = []
+    for srcPath, pakPath in sorted(files, key=lambda file: getUnrealPakFileOrderKey(file[1])):
+        lines.append(f'"{getPathInfo(srcPath)["absolute"]}" "../../../{pakPath.replace(os.sep, "/")}"')
+    return ''.join(f'{line}\n' for line in lines)
+
+
+def getUnrealPakCompressionArgs(compress=True, extraCompressionSettings=True):
+    args = []
+    if compress:
+        args.append('-compress')
+
+        if extraCompressionSettings:
+            args.append('-asynccompression')
+            args.append('-compressionformat=Oodle')
+            args.append('-compressmethod=Leviathan')
+            args.append('-compresslevel=6')
+            args.append('-compressionblocksize=256KB')
+            args.append('-multiprocess')
+    return args
+
+
+def unrealPak(pakDir, destPakPath, unrealPakPath, compress=True, debug=False, extraCompressionSettings=True, checkInput=None, files=None):
+    """Paks `pakDir`, or only `files` (source path, path in pak) if given"""
+    if files is not None:
+        responseFileContent = getUnrealPakResponseFileContent(files)
+    else:
+        pakDirPathInfo = getPathInfo(pakDir)
+        responseFileContent = f'"{pakDirPathInfo["absolute"]}\*.*" "..\..\..\*.*" '
     if debug:
         sprintPad()
         sprint(f'Response file content: {responseFileContent}')
@@ -126,17 +177,8 @@ def unrealPak(pakDir, destPakPath, unrealPakPath, compress=True, debug=False, ex
         args = [
             getPathInfo(destPakPath)['absolute'],
             f'-create={normPath(responseFile.name)}',
+            *getUnrealPakCompressionArgs(compress, extraCompressionSettings),
         ]
-        if compress:
-            args.append('-compress')
-
-            if extraCompressionSettings:
-                args.append('-asynccompression')
-                args.append('-compressionformat=Oodle')
-                args.append('-compressmethod=Leviathan')
-                args.append('-compresslevel=6')
-                args.append('-compressionblocksize=256KB')
-                args.append('-multiprocess')
 
         if debug:
             sprintPad()
@@ -197,11 +239,109 @@ def unrealPak(pakDir, destPakPath, unrealPakPath, compress=True, debug=False, ex
     return responseFilePath
 
 
-def unrealUnpak(pakPath, destDir, gameName, unrealPakPath, checkInput=None, debug=False):
-    pakPathInfo = getPathInfo(pakPath)
+def runUnrealPak(unrealPakPath, args, checkInput=None, debug=False):
+    """Runs UnrealPak with `args`. Returns its standard output lines."""
     programPathInfo = getPathInfo(unrealPakPath)
     programFilename = programPathInfo['basename']
     programPath = normPath(os.path.join(programPathInfo['dir'], programFilename))
+
+    outputLines = []
+    commandReturnCode = None
+    commandError = None
+    for commandStreamName, commandLine, commandStop in runCommand(
+        programPath,
+        args,
+        cwd=programPathInfo['dir'],
+    ):
+        if checkInput is not None and not checkInput():
+            commandStop()
+        if commandStreamName == 'return_code':
+            commandReturnCode = commandLine
+        elif commandStreamName == 'stderr':
+            if commandError is None or commandError is True:
+                commandError = commandLine or True
+            if debug:
+                sprintPad()
+                esprint(commandLine or '[stderr].')
+                sprintPad()
+        else:
+            outputLines.append(commandLine)
+            if debug:
+                sprint(commandLine)
+
+    if commandReturnCode:
+        quoted = [f'"{arg}"' for arg in [programPath, *args]]
+        raise ValueError(f'subprocess call failed: cwd="{programPathInfo["dir"]}" {" ".join(quoted)}. Exit code: {commandReturnCode}. Error: {commandError}')
+
+    if debug:
+        sprint(f'Exit code: {commandReturnCode}')
+
+    return outputLines
+
+
+def getUnrealPakListEntries(outputLines):
+    """The files listed by `UnrealPak -List`: path (relative to the mount point, which `-Filter` matches),
+    path from the mount point (e.g. `DeadByDaylight/Content/...`), offset, and size"""
+    mountPoint = ''
+    entries = []
+    for line in outputLines:
+        if UnrealPakMountPointPrefix in line:
+            mountPoint = line[line.index(UnrealPakMountPointPrefix) + len(UnrealPakMountPointPrefix):].strip()
+            continue
+        match = UnrealPakListEntryRegex.search(line)
+        if match:
+            path = normPath(match.group('path'))
+            fullPath = normPath(f'{mountPoint.rstrip("/")}/{path}' if mountPoint else path)
+            while fullPath.startswith('../'):
+                fullPath = fullPath[3:]
+            entries.append({
+                'path': path,
+                'fullPath': fullPath,
+                'offset': int(match.group('offset')),
+                'size': int(match.group('size')),
+            })
+    return entries
+
+
+def unrealPakList(pakPath, unrealPakPath, checkInput=None, debug=False):
+    """The files in a pakchunk, read from its index (nothing is extracted)"""
+    outputLines = runUnrealPak(unrealPakPath, [getPathInfo(pakPath)['absolute'], '-List'], checkInput=checkInput, debug=debug)
+    return getUnrealPakListEntries(outputLines)
+
+
+def getPakContentRelativePath(entry, gameName):
+    """The content folder relative path of a listed pakchunk file, or None if it is outside the game's content folder"""
+    contentPrefix = f'{gameName}/Content/'
+    if entry['fullPath'].startswith(contentPrefix):
+        return entry['fullPath'][len(contentPrefix):]
+
+
+def getPakAssetEntries(entries, gameName):
+    """The listed files of each asset in the game's content folder, by asset stem path"""
+    assetEntries = {}
+    for entry in entries:
+        relPath = getPakContentRelativePath(entry, gameName)
+        if relPath is not None:
+            assetEntries.setdefault(os.path.splitext(relPath)[0], []).append(entry)
+    return assetEntries
+
+
+def getMatchingPakAssetEntries(entries, gameName, patterns):
+    """The listed files of each asset (by asset stem path) with a file matching one of `patterns`
+    (content folder relative globs). An asset's other files (e.g. `.uexp`) come along with the matching one."""
+    regexes = [globToRegex(pattern) for pattern in patterns]
+    assetEntries = getPakAssetEntries(entries, gameName)
+    matchingStemPaths = {
+        stemPath
+        for stemPath, stemEntries in assetEntries.items()
+        if any(regex.match(getPakContentRelativePath(entry, gameName)) for entry in stemEntries for regex in regexes)
+    }
+    return {stemPath: assetEntries[stemPath] for stemPath in sorted(matchingStemPaths)}
+
+
+def unrealUnpak(pakPath, destDir, gameName, unrealPakPath, checkInput=None, debug=False, filter=None):
+    """Extracts a pakchunk to `destDir`, or only its files matching `filter` (an UnrealPak wildcard) if given"""
+    pakPathInfo = getPathInfo(pakPath)
     destDirPathInfo = getPathInfo(destDir)
     actualDestDir = getPakContentDir(destDirPathInfo['absolute'], gameName)
     if not os.path.exists(actualDestDir):
@@ -212,39 +352,70 @@ def unrealUnpak(pakPath, destDir, gameName, unrealPakPath, checkInput=None, debu
         '-Extract',
         actualDestDir,
     ]
+    if filter:
+        args.append(f'-Filter={filter}')
 
     # no need for this because we construct the base files ahead of time. TODO: use this so we don't have to create the base folder hierarchy.
     extractingToMountPoint = False
     if extractingToMountPoint:
         args.append('-extracttomountpoint')
 
-    if True:
-        commandReturnCode = None
-        commandError = None
-        for commandStreamName, commandLine, commandStop in runCommand(
-            programPath,
-            args,
-            cwd=programPathInfo['dir'],
-        ):
-            if checkInput is not None and not checkInput():
-                commandStop()
-            if commandStreamName == 'return_code':
-                commandReturnCode = commandLine
-            elif commandStreamName == 'stderr':
-                if commandError is None or commandError is True:
-                    commandError = commandLine or True
-                if debug:
-                    sprintPad()
-                    esprint(commandLine or '[stderr].')
-                    sprintPad()
-            elif debug:
-                sprint(commandLine)
-
-        if commandReturnCode:
-            quoted = [f'"{arg}"' for arg in [programPath, *args]]
-            raise ValueError(f'subprocess call failed: cwd="{programPathInfo["dir"]}" {" ".join(quoted)}. Exit code: {commandReturnCode}. Error: {commandError}')
-
-        if debug:
-            sprint(f'Exit code: {commandReturnCode}')
-    else:
-        runCall([programPath, *args], cwd=programPathInfo['dir'])
+    runUnrealPak(unrealPakPath, args, checkInput=checkInput, debug=debug)
+
+
+def getUnrealUnpakFilters(entries, assetEntries):
+    """The fewest `-Filter` wildcards extracting the files of `assetEntries` (by asset stem path) out of all listed `entries`:
+    one per folder whose files all belong to those assets (the topmost such folder), and one per asset elsewhere.
+    Returns [None] if every listed file belongs to them (extract everything)."""
+    extractedPaths = {entry['path'] for stemEntries in assetEntries.values() for entry in stemEntries}
+    if len(extractedPaths) == len(entries):
+        return [None]
+
+    # the folders with a file that isn't extracted (and all folders above them)
+    mixedDirs = set()
+    for entry in entries:
+        if entry['path'] not in extractedPaths:
+            dir = os.path.dirname(entry['path'])
+            while dir and dir not in mixedDirs:
+                mixedDirs.add(dir)
+                dir = os.path.dirname(dir)
+
+    filters = []
+    for stemEntries in assetEntries.values():
+        # `-Filter` matches paths relative to the mount point, and an asset's files only differ by suffix
+        entryStemPath = os.path.splitext(stemEntries[0]['path'])[0]
+        filter = f'{entryStemPath}.*'
+        dir = os.path.dirname(entryStemPath)
+        while dir and dir not in mixedDirs:
+            # `*` matches across folders, so this takes all of the folder's files, in subfolders too
+            filter = f'{dir}/*'
+            dir = os.path.dirname(dir)
+        filters.append(filter)
+    return list(dict.fromkeys(filters))
+
+
+def getUnrealUnpakRuns(entries, assetEntries):
+    """The `-Filter` of each UnrealPak run extracting the files of `assetEntries` (by asset stem path) out of all listed `entries`
+    (None to extract everything): a single run extracting everything if the filters take more than `MaxUnrealUnpakFilterRuns` runs"""
+    if not assetEntries:
+        return []
+    filters = getUnrealUnpakFilters(entries, assetEntries)
+    if len(filters) > MaxUnrealUnpakFilterRuns:
+        return [None]
+    return filters
+
+
+def unrealUnpakAssets(pakPath, destDir, gameName, unrealPakPath, entries, assetEntries, checkInput=None, debug=False):
+    """Extracts the files of `assetEntries` (by asset stem path) out of a pakchunk's listed `entries`, in as few UnrealPak runs as possible"""
+    for filter in getUnrealUnpakRuns(entries, assetEntries):
+        unrealUnpak(pakPath, destDir, gameName, unrealPakPath, checkInput=checkInput, debug=debug, filter=filter)
+
+
+def unrealUnpakSelectively(pakPath, destDir, gameName, unrealPakPath, patterns, checkInput=None, debug=False):
+    """Extracts only the assets of a pakchunk with a file matching `patterns` (content folder relative globs),
+    found in the pakchunk's file list, in as few UnrealPak runs as possible (extracting the whole pakchunk if that takes too many).
+    Returns the listed files of the extracted assets by asset stem path, and all listed files."""
+    entries = unrealPakList(pakPath, unrealPakPath, checkInput=checkInput, debug=debug)
+    assetEntries = getMatchingPakAssetEntries(entries, gameName, patterns)
+    unrealUnpakAssets(pakPath, destDir, gameName, unrealPakPath, entries, assetEntries, checkInput=checkInput, debug=debug)
+    return assetEntries, entries
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .jsonHelpers import jsonDump
+from .pakHelpers import PakchunkFilenameSuffix
+
+PakManifestVersion = 2
+PakManifestFilenameSuffix = '.manifest.json'
+HashChunkSize = 1024 * 1024
+
+
+def hashFile(path):
+    fileHash = hashlib.md5()
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(HashChunkSize)
+            if not chunk:
+                break
+            fileHash.update(chunk)
+    return fileHash.hexdigest()
+
+
+def getFileInfo(path, previousInfo=None):
+    """Size, modification time and content hash of a file. The hash in `previousInfo` is reused if the size and modification time match."""
+    stat = os.stat(path)
+    if previousInfo and previousInfo.get('size', None) == stat.st_size and previousInfo.get('mtime', None) == stat.st_mtime_ns:
+        fileHash = previousInfo['hash']
+    else:
+        fileHash = hashFile(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': fileHash}
+
+
+def getPakManifestPath(pakPath):
+    if pakPath.lower().endswith(PakchunkFilenameSuffix):
+        pakPath = pakPath[:-len(PakchunkFilenameSuffix)]
+
+    return f'{pakPath}{PakManifestFilenameSuffix}'
+
+
+class PakManifest():
+    """The inputs of a pakchunk from when it was built (the size, modification time and content hash of each file,
+    by path in the pak, and the UnrealPak settings), kept next to it, so an unchanged pakchunk doesn't need to be built again"""
+
+    def __init__(self, pakPath):
+        self.pakPath = pakPath
+        self.path = getPakManifestPath(pakPath)
+        self.previous = None
+        self.assets = []
+        self.files = {}
+        self.settings = {}
+
+    def load(self):
+        if self.previous is not None:
+            return
+
+        self.previous = {}
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                if data.get('version', None) == PakManifestVersion:
+                    self.previous = data
+            except (OSError, ValueError):
+                # an unreadable manifest just means building the pakchunk again
+                pass
+
+    def collect(self, files, settings, assets=None, jobs=4):
+        """Records the inputs of the pakchunk about to be built: (source path, path in pak) files and UnrealPak settings.
+        Files are only hashed if their size or modification time changed since the last build."""
+        self.load()
+        previousFiles = self.previous.get('files', {})
+        self.assets = sorted(assets or [])
+        self.settings = settings
+
+        def getInfo(file):
+            srcPath, pakPath = file
+            return pakPath, getFileInfo(srcPath, previousFiles.get(pakPath, None))
+
+        if jobs == 1 or len(files) < 2:
+            infos = [getInfo(file) for file in files]
+        else:
+            with ThreadPoolExecutor(max_workers=jobs or None) as executor:
+                infos = list(executor.map(getInfo, files))
+        self.files = dict(sorted(infos))
+
+    def getUpToDatePakPath(self, pakPaths):
+        """The first of `pakPaths` that is the pakchunk last built from the same inputs, or None"""
+        self.load()
+        previousPak = self.previous.get('pak', None)
+        if not previousPak or self.previous.get('settings', None) != self.settings:
+            return None
+
+        previousFiles = self.previous.get('files', {})
+        if previousFiles.keys() != self.files.keys():
+            return None
+        for pakPath, info in self.files.items():
+            if previousFiles[pakPath]['hash'] != info['hash']:
+                return None
+
+        for pakPath in pakPaths:
+            if pakPath and os.path.isfile(pakPath) and os.path.getsize(pakPath) == previousPak['size']:
+                if getFileInfo(pakPath, previousPak)['hash'] == previousPak['hash']:
+                    return pakPath
+
+    def save(self):
+        """Records the pakchunk just built from the collected inputs"""
+        tempPath = f'{self.path}.tmp'
+        with open(tempPath, 'w', encoding='utf-8') as file:
+            jsonDump({
+                'version': PakManifestVersion,
+                'settings': self.settings,
+                'assets': self.assets,
+                'files': self.files,
+                'pak': getFileInfo(self.pakPath),
+            }, file)
+        os.replace(tempPath, self.path)
+
+
+def getPakchunkHash(pakPath):
+    """The content hash of a pakchunk, from its manifest if it is the pakchunk the manifest was written for"""
+    manifest = PakManifest(pakPath)
+    manifest.load()
+    return getFileInfo(pakPath, manifest.previous.get('pak', None))['hash']
+
+
+def pakchunksMatch(pakPath, otherPakPath):
+    return os.path.getsize(pakPath) == os.path.getsize(otherPakPath) and getPakchunkHash(pakPath) == hashFile(otherPakPath)
@@ -1,5 +1,7 @@
+import functools
 import os
 import pathlib
+from collections.abc import Mapping
 
 from .consoleHelpers import sprintP, sprintPad
 
@@ -14,54 +16,168 @@ def normPath(path):
     return path.as_posix()
 
 
+PathInfoKeys = (
+    'path',
+    'normalized',
+    'relativeDir',
+    'relativeDirResolved',
+    'isAbsolute',
+    'absolute',
+    'relative',
+    'dirname',
+    'dir',
+    'basename',
+    'stem',
+    'suffix',
+    'suffixLower',
+    'best',
+)
+MaxResolvedDirs = 4096
+
+
+@functools.lru_cache(maxsize=MaxResolvedDirs)
+def resolveDir(cwd, dir):
+    """Resolves a folder path relative to `cwd`. The same few folders are resolved over and over, so results are cached."""
+    return normPath(pathlib.Path(os.path.join(cwd, dir)).resolve())
+
+
+def clearResolvedDirs():
+    resolveDir.cache_clear()
+
+
+def isLink(path):
+    return os.path.islink(path) or (hasattr(os.path, 'isjunction') and os.path.isjunction(path))
+
+
+def resolvePath(path, relativeDir='.'):
+    """Like pathlib's resolve(), with the folder resolved from the cache.
+    A symlinked (or junctioned) file or folder at the end of the path is followed too, without caching it."""
+    cwd = os.getcwd()
+    head, tail = os.path.split(path)
+    if not tail or tail in ('.', '..'):
+        return resolveDir(cwd, os.path.join(relativeDir, path))
+    dir = resolveDir(cwd, os.path.join(relativeDir, head))
+    resolved = f'{dir}{tail}' if dir.endswith('/') else f'{dir}/{tail}'
+    if isLink(resolved):
+        return normPath(pathlib.Path(resolved).resolve())
+    return resolved
+
+
+class PathInfo(Mapping):
+    """Details of a path, each computed when first needed.
+    Can be used like the dict that getPathInfo used to return, with the same keys."""
+
+    __slots__ = ('_path', '_baseDir', '_relativeDirResolved', '_absolute', '_relative', '_hasRelative')
+
+    def __init__(self, path, relativeDir='.'):
+        self._path = path or ''
+        self._baseDir = relativeDir
+        self._relativeDirResolved = None
+        self._absolute = None
+        self._relative = None
+        self._hasRelative = False
+
+    def isEmpty(self):
+        return not self._path.strip()
+
+    def getNormalized(self):
+        return '' if self.isEmpty() else normPath(self._path)
+
+    def getIsAbsolute(self):
+        return not self.isEmpty() and os.path.isabs(self._path)
+
+    def getRelativeDirResolved(self):
+        if self._relativeDirResolved is None:
+            self._relativeDirResolved = '' if self.isEmpty() else resolveDir(os.getcwd(), self._baseDir)
+        return self._relativeDirResolved
+
+    def getAbsolute(self):
+        if self._absolute is None:
+            if self.isEmpty():
+                self._absolute = ''
+            elif os.path.isabs(self._path):
+                self._absolute = resolvePath(self._path)
+            else:
+                self._absolute = resolvePath(self._path, self._baseDir)
+        return self._absolute
+
+    def getRelative(self):
+        if not self._hasRelative:
+            self._hasRelative = True
+            if not self.isEmpty():
+                absolute = self.getAbsolute()
+                relativeDirResolved = self.getRelativeDirResolved()
+                if not os.path.isabs(self._path) or normPath(os.path.commonpath([absolute, relativeDirResolved])) == relativeDirResolved:
+                    self._relative = normPath(os.path.relpath(absolute, relativeDirResolved))
+        return self._relative
+
+    def getRelativeDir(self):
+        relative = self.getRelative()
+        return '' if relative is None else os.path.dirname(relative)
+
+    def getDirname(self):
+        return os.path.dirname(self.getNormalized())
+
+    def getDir(self):
+        return os.path.dirname(self.getAbsolute())
+
+    def getBasename(self):
+        return os.path.basename(self.getAbsolute())
+
+    def getStem(self):
+        return pathlib.PurePath(self.getAbsolute()).stem if not self.isEmpty() else ''
+
+    def getSuffix(self):
+        return pathlib.PurePath(self.getAbsolute()).suffix if not self.isEmpty() else ''
+
+    def getSuffixLower(self):
+        return self.getSuffix().lower()
+
+    def getBest(self):
+        relative = self.getRelative()
+        return self.getAbsolute() if relative is None else relative
+
+    def __getitem__(self, key):
+        if key == 'path':
+            return self._path
+        getter = PathInfoGetters.get(key, None)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self)
+
+    def __iter__(self):
+        return iter(PathInfoKeys)
+
+    def __len__(self):
+        return len(PathInfoKeys)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+PathInfoGetters = {
+    'normalized': PathInfo.getNormalized,
+    'relativeDir': PathInfo.getRelativeDir,
+    'relativeDirResolved': PathInfo.getRelativeDirResolved,
+    'isAbsolute': PathInfo.getIsAbsolute,
+    'absolute': PathInfo.getAbsolute,
+    'relative': PathInfo.getRelative,
+    'dirname': PathInfo.getDirname,
+    'dir': PathInfo.getDir,
+    'basename': PathInfo.getBasename,
+    'stem': PathInfo.getStem,
+    'suffix': PathInfo.getSuffix,
+    'suffixLower': PathInfo.getSuffixLower,
+    'best': PathInfo.getBest,
+}
+
+
 def getPathInfo(path, relativeDir='.', debug=False):
-    result = {
-        'path': path or '',
-        'normalized': '',
-        'relativeDir': '',
-        'relativeDirResolved': '',
-        'isAbsolute': False,
-        'absolute': '',
-        'relative': None,
-        'dirname': '',
-        'dir': '',
-        'basename': '',
-        'stem': '',
-        'suffix': '',
-        'suffixLower': '',
-        'best': '',
-    }
-
-    if (path or '').strip():
-        result['normalized'] = normPath(path)
-        result['dirname'] = os.path.dirname(result['normalized'])
-        relativeDirResolved = normPath(pathlib.Path(relativeDir).resolve())
-        result['relativeDirResolved'] = relativeDirResolved
-
-        if os.path.isabs(path):
-            result['isAbsolute'] = True
-            result['absolute'] = normPath(pathlib.Path(path).resolve())
-            commonPath = normPath(os.path.commonpath([result['absolute'], relativeDirResolved]))
-            if commonPath == relativeDirResolved:
-                result['relative'] = normPath(os.path.relpath(result['absolute'], relativeDirResolved))
-        else:
-            result['absolute'] = normPath(pathlib.Path(os.path.join(relativeDir, path)).resolve())
-            result['relative'] = normPath(os.path.relpath(result['absolute'], relativeDirResolved))
-
-        pathlibPath = pathlib.Path(result['absolute'])
-
-        result['dir'] = os.path.dirname(result['absolute'])
-        if result['relative'] is not None:
-            result['relativeDir'] = os.path.dirname(result['relative'])
-        result['basename'] = os.path.basename(result['absolute'])
-        result['stem'] = pathlibPath.stem
-        result['suffix'] = pathlibPath.suffix
-        result['suffixLower'] = result['suffix'].lower()
-        result['best'] = result['absolute'] if result['relative'] is None else result['relative']
+    result = PathInfo(path, relativeDir)
 
     if debug:
         sprintPad()
-        sprintP(result)
+        sprintP(dict(result.items()))
         sprintPad()
 
     return result
@@ -1,5 +1,38 @@
 import asyncio
+import multiprocessing
+import os
 import subprocess
+from contextlib import contextmanager
+
+# at most this many of each program (by lowercase file stem) run at a time, when running in parallel
+DefaultToolJobs = {
+    'unrealpak': 2,
+    'umodel': 2,
+}
+
+# shared across worker processes (see `setToolSemaphores`)
+toolSemaphores = {}
+
+
+def createToolSemaphores(toolJobs=None):
+    """Semaphores bounding how many of each program run at a time, to share with worker processes. 0 means no limit."""
+    limits = {**DefaultToolJobs, **{tool.lower(): jobs for tool, jobs in (toolJobs or {}).items()}}
+    return {tool: multiprocessing.BoundedSemaphore(int(jobs)) for tool, jobs in limits.items() if jobs}
+
+
+def setToolSemaphores(semaphores):
+    global toolSemaphores
+    toolSemaphores = semaphores or {}
+
+
+@contextmanager
+def limitingTool(program):
+    semaphore = toolSemaphores.get(os.path.splitext(os.path.basename(str(program)))[0].lower(), None)
+    if semaphore is None:
+        yield
+    else:
+        with semaphore:
+            yield
 
 
 async def _readStream(stream, streamName, queue, process, data, stop):
@@ -49,13 +82,14 @@ def runCommand(command, args, cwd=None):
         await _runCommandAsync(command, args, queue, cwd=cwd)
         await queue.put(None)
 
-    loop.create_task(_internal())
+    with limitingTool(command):
+        loop.create_task(_internal())
 
-    while True:
-        item = loop.run_until_complete(queue.get())
-        if item is None:
-            break
-        yield item
+        while True:
+            item = loop.run_until_complete(queue.get())
+            if item is None:
+                break
+            yield item
 
 
 def run(args, cwd=None, shell=False):
@@ -64,7 +98,8 @@ def run(args, cwd=None, shell=False):
 
 def runCall(args, cwd=None, shell=False):
     try:
-        code = subprocess.call(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=cwd, shell=shell)
+        with limitingTool(args[0]):
+            code = subprocess.call(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=cwd, shell=shell)
         if code:
             raise ValueError(f'subprocess returned error exit code: {code}')
     except:
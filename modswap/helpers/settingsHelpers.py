@@ -18,6 +18,9 @@ DefaultSettingsPath = f'{DefaultSettingsFileStem}.yaml'
 DefaultCustomizationItemDbPath = f'{CustomizationItemDbAssetName}{UassetFilenameSuffix}'
 DefaultAttachmentsDir = 'attachments'
 DefaultPakingDir = 'paking'
+DefaultBlueprintCacheFilename = 'blueprintCache.json'
+DefaultAssetImportsCacheFilename = 'assetImportsCache.json'
+DefaultAttachmentsSnapshotFilename = 'attachmentsSnapshot.json'
 
 def getGameName(settings):
     gameName = (settings.get('gameName', None) or '').strip() or DefaultGameName
@@ -73,6 +76,14 @@ f'''# {ProgramName} {Version} settings.
 #batch:
 #- settings_mod1.yaml
 #- settings_mod2.yaml
+# When only paking, mods whose settings and assets haven't changed since the batch last paked them are skipped
+# (see the `-batchIndex.json` file written next to this one)
+#targetedBatchPaking: true
+# How many batch settings files to run at a time, in worker processes (0 for one per CPU). Each one's output is shown
+# in batch order once it finishes. Workers run non-interactively. Installing and launching still happen once, at the end.
+# Settings files sharing a source pakchunk, a destination pakchunk number, or a folder one of them writes to
+# (`extraContentDir` when paking, `attachmentsDir` when extracting attachments) run one after another in one worker.
+#batchJobs: 1
 
 ## Tools paths
 
@@ -233,6 +244,26 @@ reservedPakchunks:
 # This takes precedence over `unrealProjectDir`.
 #srcPakPath: C:/ModTools/UnrealPak/pakchunk4321-WindowsNoEditor
 
+# How much of a `srcPakPath` pakchunk to extract: `full` (the default), or `selective` to only extract
+# the assets matching `customizationItemDbPath` (when upgrading or mixing) and `destPakAssets` (when paking),
+# found in the pakchunk's file list. When paking without `destPakAssets` while upgrading or mixing (e.g. `upgrade pak`),
+# the rest of the pakchunk's files are extracted just before paking, so that the destination pak has all of them.
+# Inspecting, extracting attachments, paking without `destPakAssets` otherwise, and `expandingAssetDependencies`
+# need the whole pakchunk, so `full` is used for those.
+#srcPakExtraction: full
+
+# When `srcPakPath` is a wildcard matching several pakchunks, how many of them to run at a time
+# in worker processes (0 for one per CPU). Mods are installed afterwards, once every pakchunk is paked.
+# Pakchunks run in parallel add their name to their outputs next to this file (e.g. the altered {CustomizationItemDbAssetName}).
+# They run one at a time when `destPakNumber` is set, since they would all be paked into the same pakchunk.
+#pakchunkJobs: 1
+
+# At most how many of each external program run at a time across those workers (0 for no limit).
+#toolJobs:
+#  UnrealPak: 2
+#  umodel: 2
+#  UAssetGUI: 0
+
 # Path to cooked assets outside of a pakchunk or unreal project. {ProgramName} will generate
 # new asset files here when copying attachment blueprints to make new attachments.
 {
@@ -380,6 +411,95 @@ combosRequired:
   # this base mode is incomplete without this attachment, so always include it
   - - KateBouncingBellyTorso:KatePregnant
 
+# Rebuild the mixed {CustomizationItemDbAssetName} NameMap from scratch and compare it against the
+# incrementally maintained one (slower - for troubleshooting)
+#verifyingNameMap: true
+
+# Write the altered {CustomizationItemDbAssetName} JSON indented for readability (larger and slower to write)
+#prettyJson: true
+
+# Number of worker processes used to make attachment combinations (0 uses one per CPU core).
+# The default (1) mixes without any extra processes.
+#mixingJobs: 4
+
+# Keep a manifest of what each combo model was made from (next to the altered {CustomizationItemDbAssetName} JSON),
+# and reuse combo models whose base model, attachments, and rules haven't changed since the last mix.
+# Models are only hashed again when the {CustomizationItemDbAssetName} files changed since then.
+#incrementalMixing: true
+
+# Read {CustomizationItemDbAssetName} JSON straight into a compact form, and mix models in it (uses less memory).
+# With `debug`, the memory the models take is reported.
+#compactRecords: true
+
+# Share one copy of each repeated string (type names, property names, values) when reading UAssetGUI JSON.
+# Reading is a little slower, but uses much less memory. With `compactRecords`, every object read is compact.
+# With `debug`, how much the process's resident memory (working set) grew while reading is reported.
+#interningJson: true
+
+# Where attachment blueprints' resolved animation blueprints and meshes are remembered between game asset searches,
+# per game version and set of game pakchunks, including those in subfolders like `~mods` (default: `{DefaultBlueprintCacheFilename}` next to the settings file; empty to disable).
+# Relative paths are relative to the settings file's folder.
+#blueprintCachePath: {DefaultBlueprintCacheFilename}
+
+# Where parsed attachment definitions are kept between runs, so unchanged attachment files aren't parsed again
+# (default: `{DefaultAttachmentsSnapshotFilename}` next to the settings file; empty to disable).
+# Keep it out of `attachmentsDir`, which is shared with other people.
+#attachmentsSnapshotPath: {DefaultAttachmentsSnapshotFilename}
+# How many processes parse changed attachment files, for large attachment libraries (0 for one per CPU)
+#attachmentJobs: 1
+
+# A single file packing all attachment definitions, read along with (and overridden by) the files in `attachmentsDir`.
+# Fill it with `--packAttachments`, or write it back out to files with `--unpackAttachments`
+#attachmentsLibrary: attachments.db
+
+# Attachment blueprints to clone for new skeletal meshes when creating attachment definitions,
+# without prompting. Each source blueprint is extracted once, and up to `cloningJobs` are extracted and written at a time.
+# Writes the new blueprints to `extraContentDir` and their attachment definitions to `attachmentsDir`.
+#blueprintClones:
+#- blueprint: /Game/Characters/Campers/CommonAcc/Blueprints/Bags/BP_Bag_001
+#  mesh: /Game/Characters/Campers/CommonAcc/Models/Bags/MyBag
+#  modelCategory: SurvivorTorso
+#  attachmentId: MyBag
+#  displayName: My Bag
+#cloningJobs: 4
+
+# How files are put into the folder to be paked: `copy`, `hardlink`, `reflink` (copy-on-write, where the file system supports it),
+# or `auto` to reflink where that works for each pair of source and destination folders, and copy otherwise
+# (on Windows, NTFS has no reflinks, so `auto` copies). Hardlinks and reflinks fall back to copying (e.g. across drives).
+# Hardlinks are only used when chosen: staged files are then the same files as the cooked and extra content sources,
+# not copies, so editing one edits the other. Up to `stagingJobs` files are staged at a time.
+# With `incrementalPaking`, copies are checked against the hashes recorded for their source files.
+#stagingStrategy: auto
+#stagingJobs: 4
+
+# `staged` (default) puts the files to pak into the destination pak folder first (see `stagingStrategy`).
+# `direct` lists each file's source path in UnrealPak's response file instead, skipping the pak folder entirely.
+# Files are listed in the order UnrealPak paks a staged folder in, so direct paks are byte-identical to staged ones.
+#pakingMode: staged
+
+# Keeps a manifest next to each pakchunk built (the size, modification time and hash of each file paked, and the UnrealPak settings).
+# A pakchunk whose files and settings haven't changed since it was built (and installed) isn't paked again,
+# and its staging folder and UAssetGUI JSON files are left alone (assets converted from JSON are checked by their JSON files).
+#incrementalPaking: true
+
+# Adds the assets that `destPakAssets` import (from `/Game/`, and transitively) to the pak, if they are in the source content folders.
+# Imports are read from UAssetGUI JSON files, or by converting assets with UAssetGUI (`dependencyJobs` at a time),
+# cached in `assetImportsCachePath` (default: `{DefaultAssetImportsCacheFilename}` next to the settings file; empty to disable;
+# relative to the settings file's folder).
+#expandingAssetDependencies: true
+#dependencyJobs: 4
+#assetImportsCachePath: {DefaultAssetImportsCacheFilename}
+
+# Only read, extract from, and mix models matching all of these filters (any of the values listed for each).
+# Other models are left as they are.
+#modelFilters:
+#  characterIds:
+#  - 268435456
+#  categories:
+#  - SurvivorTorso
+#  baseModels:
+#  - DF
+
 ## Game asset searching parameters
 
 # These are all optional properties and you can comment out any that you don't need.
@@ -451,5 +571,9 @@ def getResultsFilePath(settingsFilePath):
     return f"{settingsFilePath.removesuffix('.yaml')}-results.yaml"
 
 
+def getBatchIndexFilePath(settingsFilePath):
+    return f"{settingsFilePath.removesuffix('.yaml')}-batchIndex.json"
+
+
 def getEnabledDisabledStr(flag):
     return 'enabled' if flag else 'disabled'
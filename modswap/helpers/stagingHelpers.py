@@ -0,0 +1,130 @@
+import hashlib
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+StagingStrategies = ('auto', 'copy', 'hardlink', 'reflink')
+DefaultStagingStrategy = 'auto'
+# the strategies `auto` tries, fastest first. A hardlinked file is its source file (editing one edits the other), so it's opt-in.
+AutoStagingStrategies = ('reflink', 'copy')
+CopyChunkSize = 1024 * 1024
+# linux FICLONE ioctl
+FicloneRequest = 0x40049409
+
+
+def reflinkFile(srcPath, destPath):
+    """Clones a file's data without copying it (copy-on-write), where the file system supports it. Raises OSError otherwise."""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError('reflinks are not supported on this platform')
+
+    with open(srcPath, 'rb') as srcFile, open(destPath, 'wb') as destFile:
+        try:
+            fcntl.ioctl(destFile.fileno(), FicloneRequest, srcFile.fileno())
+        except OSError:
+            destFile.close()
+            os.remove(destPath)
+            raise
+    shutil.copystat(srcPath, destPath)
+
+
+def copyAndHashFile(srcPath, destPath):
+    """Copies a file, hashing its data as it is copied. Returns the md5 hex digest."""
+    fileHash = hashlib.md5()
+    with open(srcPath, 'rb') as srcFile, open(destPath, 'wb') as destFile:
+        while True:
+            chunk = srcFile.read(CopyChunkSize)
+            if not chunk:
+                break
+            fileHash.update(chunk)
+            destFile.write(chunk)
+    shutil.copymode(srcPath, destPath)
+    return fileHash.hexdigest()
+
+
+class FileStager():
+    """Puts files into a staging folder (e.g. a folder to be paked) by copying, hardlinking, or reflinking them.
+    With `auto`, the fastest strategy that works is found once per pair of source and destination folders.
+    With `hashing`, copied files are hashed as they are copied, to check them against the source files' recorded hashes."""
+
+    def __init__(self, strategy=DefaultStagingStrategy, jobs=4, hashing=False):
+        if strategy not in StagingStrategies:
+            raise ValueError(f'Unsupported staging strategy "{strategy}" (must be one of {", ".join(StagingStrategies)})')
+        self.strategy = strategy
+        self.jobs = jobs
+        self.createdDirs = set()
+        self.autoStrategies = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+        self.hashing = hashing
+        # md5 of each file copied, by destination path (linked files are the same data as their source)
+        self.hashes = {}
+
+    def ensureDir(self, dir):
+        if dir not in self.createdDirs:
+            os.makedirs(dir, exist_ok=True)
+            self.createdDirs.add(dir)
+
+    def stageFile(self, srcPath, destPath, strategy):
+        if strategy == 'reflink':
+            reflinkFile(srcPath, destPath)
+        elif strategy == 'hardlink':
+            os.link(srcPath, destPath)
+        elif self.hashing:
+            fileHash = copyAndHashFile(srcPath, destPath)
+            with self.lock:
+                self.hashes[destPath] = fileHash
+        else:
+            shutil.copy(srcPath, destPath)
+
+    def stage(self, srcPath, destPath, srcRootDir=None, destRootDir=None):
+        """Returns the strategy used"""
+        self.ensureDir(os.path.dirname(destPath))
+        if os.path.lexists(destPath):
+            os.remove(destPath)
+
+        key = (srcRootDir, destRootDir)
+        if self.strategy == 'auto':
+            known = self.autoStrategies.get(key, None)
+            strategies = (known,) if known else AutoStagingStrategies
+        else:
+            # fall back to copying where the chosen strategy isn't supported
+            strategies = (self.strategy,) if self.strategy == 'copy' else (self.strategy, 'copy')
+
+        for strategy in strategies:
+            try:
+                self.stageFile(srcPath, destPath, strategy)
+                break
+            except OSError:
+                if strategy == strategies[-1]:
+                    raise
+
+        with self.lock:
+            if self.strategy == 'auto':
+                self.autoStrategies[key] = strategy
+            self.counts[strategy] = self.counts.get(strategy, 0) + 1
+        return strategy
+
+    def stageAll(self, files):
+        """Stages (srcPath, destPath, srcRootDir, destRootDir) files. The first file of each pair of root folders
+        is staged on its own (to find the `auto` strategy for them), the rest on a thread pool."""
+        pending = []
+        for srcPath, destPath, srcRootDir, destRootDir in files:
+            if self.strategy == 'auto' and (srcRootDir, destRootDir) not in self.autoStrategies:
+                self.stage(srcPath, destPath, srcRootDir, destRootDir)
+            else:
+                pending.append((srcPath, destPath, srcRootDir, destRootDir))
+
+        # create folders up front, so workers don't race to
+        for _, destPath, _, _ in pending:
+            self.ensureDir(os.path.dirname(destPath))
+
+        if self.jobs == 1 or len(pending) < 2:
+            for args in pending:
+                self.stage(*args)
+        else:
+            with ThreadPoolExecutor(max_workers=self.jobs or None) as executor:
+                for future in [executor.submit(self.stage, *args) for args in pending]:
+                    future.result()
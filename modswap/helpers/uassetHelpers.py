@@ -1,4 +1,7 @@
+import bisect
 import os
+import re
+from collections.abc import Mapping
 
 from modswap.helpers.pathHelpers import getPathInfo, normPath
 
@@ -31,9 +34,11 @@ ClassNameFieldName = 'ClassName'
 ClassNamePackage = 'Package'
 ClassNameSkeletalMesh = 'SkeletalMesh'
 ClassNameSkeleton = 'Skeleton'
+ClassNamePhysicsAsset = 'PhysicsAsset'
 ClassSuffix = '_C'
 ClassNameAnimBlueprintGeneratedClass = 'AnimBlueprintGeneratedClass'
 ObjectNameFieldName = 'ObjectName'
+OuterIndexFieldName = 'OuterIndex'
 ImportsFieldName = 'Imports'
 ExportsFieldName = 'Exports'
 ZeroGuid = '00000000-0000-0000-0000-000000000000'
@@ -47,12 +52,120 @@ def getShortenedAssetPath(assetPath):
         return normPath(os.path.join(assetPathInfo['dirname'], assetPathInfo['stem']))
 
 
+# fields that property lists are indexed by, most selective first
+IndexedFieldNames = (NameFieldName, StructTypeFieldName, EnumTypeFieldName, ItemTypeName)
+
+
+class PropertyList():
+    """A property list (e.g. a model's values) with the positions of its items by `Name`, `StructType`, `EnumType`
+    and `$type`, indexed the first time it's searched. The list is changed in place, so it stays part of its asset,
+    and changes made through append(), insert(), remove() and setField() keep the index current."""
+
+    def __init__(self, items):
+        self.items = items
+        self.index = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, position):
+        return self.items[position]
+
+    def getIndex(self):
+        if self.index is None:
+            self.index = {field: {} for field in IndexedFieldNames}
+            for position, item in enumerate(self.items):
+                self.indexItem(position, item)
+        return self.index
+
+    def indexItem(self, position, item):
+        if isinstance(item, Mapping):
+            for field, valuePositions in self.index.items():
+                value = item.get(field, None)
+                if isinstance(value, str):
+                    bisect.insort(valuePositions.setdefault(value, []), position)
+
+    def shiftPositions(self, fromPosition, offset):
+        for valuePositions in self.index.values():
+            for positions in valuePositions.values():
+                for i in range(bisect.bisect_left(positions, fromPosition), len(positions)):
+                    positions[i] += offset
+
+    def unindexItem(self, position, item):
+        if isinstance(item, Mapping):
+            for field, valuePositions in self.index.items():
+                value = item.get(field, None)
+                if isinstance(value, str):
+                    positions = valuePositions[value]
+                    positions.pop(bisect.bisect_left(positions, position))
+                    if not positions:
+                        del valuePositions[value]
+
+    def findByFields(self, fieldsValuesMap):
+        """The first item with one of the values of each field"""
+        indexedField = next((field for field in IndexedFieldNames if field in fieldsValuesMap), None)
+        if indexedField is None:
+            candidates = self.items
+        else:
+            valuePositions = self.getIndex()[indexedField]
+            positionLists = [valuePositions[value] for value in fieldsValuesMap[indexedField] if value in valuePositions]
+            positions = positionLists[0] if len(positionLists) == 1 else sorted(p for positions in positionLists for p in positions)
+            candidates = (self.items[position] for position in positions)
+        return next((
+            item for item in candidates
+            if all(item.get(field, None) in values for field, values in fieldsValuesMap.items())
+        ), None)
+
+    def append(self, item):
+        self.items.append(item)
+        if self.index is not None:
+            self.indexItem(len(self.items) - 1, item)
+
+    def insert(self, position, item):
+        position = min(max(position + len(self.items) if position < 0 else position, 0), len(self.items))
+        self.items.insert(position, item)
+        if self.index is not None:
+            self.shiftPositions(position, 1)
+            self.indexItem(position, item)
+
+    def remove(self, item):
+        """Removes an item (by identity)"""
+        position = next((p for p, i in enumerate(self.items) if i is item), None)
+        if position is None:
+            raise ValueError('item is not in the property list')
+        self.items.pop(position)
+        if self.index is not None:
+            self.unindexItem(position, item)
+            self.shiftPositions(position, -1)
+
+    def setField(self, item, field, value):
+        """Sets a field of one of the items"""
+        if self.index is not None and field in self.index:
+            position = next((p for p, i in enumerate(self.items) if i is item), None)
+            if position is None:
+                raise ValueError('item is not in the property list')
+            self.unindexItem(position, item)
+            item[field] = value
+            self.indexItem(position, item)
+        else:
+            item[field] = value
+
+
 def findNextItemByFields(items, fields, values):
     if items:
         fieldsValuesMap = {f: v for f, v in zip(fields, [{item} if isinstance(item, str) else set(item) for item in values])}
+        if isinstance(items, PropertyList):
+            return items.findByFields(fieldsValuesMap)
         return next((item for item in items if all(item[field] in values for field, values in fieldsValuesMap.items())), None)
 
 
+def findNextItemByName(items, name):
+    return findNextItemByFields(items, [NameFieldName], [name])
+
+
 def findNextItemByType(items, typeName):
     return findNextItemByFields(items, [ItemTypeName], [typeName])
 
@@ -127,3 +240,106 @@ def getImportPathFromObjectName(imports, objectName):
             None,
         )
         return (meshImport or {}).get(ObjectNameFieldName, None)
+
+
+class ImportGraph():
+    """An asset's imports, indexed once: packages by import index, and imports by class.
+    Resolves the assets a blueprint depends on without rescanning the imports for each one."""
+
+    def __init__(self, imports):
+        self.imports = imports or []
+        self.packagesByIndex = {}
+        self.importsByClass = {}
+        for importIndex, importEntry in enumerate(self.imports):
+            if importEntry.get(ItemTypeName, None) != ImportType:
+                continue
+
+            classKey = (importEntry.get(ClassPackageFieldName, None), importEntry.get(ClassNameFieldName, None))
+            if classKey == (ClassPackageCoreUObject, ClassNamePackage):
+                # imports are referred to by negative, 1-based indices
+                self.packagesByIndex[-(importIndex + 1)] = importEntry
+            if classKey not in self.importsByClass:
+                self.importsByClass[classKey] = importEntry
+        self.dependencyPaths = None
+
+    def getClassImport(self, className, classPackage=ClassPackageScriptEngine):
+        return self.importsByClass.get((classPackage, className), None)
+
+    def getClassImportObjectName(self, className, classPackage=ClassPackageScriptEngine):
+        return getObjectNameValue(self.getClassImport(className, classPackage))
+
+    def getPackagePath(self, importEntry, objectName=None):
+        """The path of the package an import is in, from its outer index (or else its object name)"""
+        if importEntry is None:
+            return None
+
+        package = self.packagesByIndex.get(importEntry.get(OuterIndexFieldName, None), None)
+        if package is not None:
+            return getObjectNameValue(package)
+
+        return getImportPathFromObjectName(self.imports, objectName or getObjectNameValue(importEntry))
+
+    def getClassPackagePath(self, className):
+        importEntry = self.getClassImport(className)
+        objectName = getObjectNameValue(importEntry)
+        if objectName and objectName.endswith(ClassSuffix):
+            objectName = objectName[:-len(ClassSuffix)]
+        return self.getPackagePath(importEntry, objectName)
+
+    def getDependencyPaths(self):
+        """The package paths of the skeletal mesh, animation blueprint, skeleton and physics asset (None if not imported)"""
+        if self.dependencyPaths is None:
+            self.dependencyPaths = {
+                'skeletalMesh': self.getClassPackagePath(ClassNameSkeletalMesh),
+                'animBlueprint': self.getClassPackagePath(ClassNameAnimBlueprintGeneratedClass),
+                'skeleton': self.getClassPackagePath(ClassNameSkeleton),
+                'physicsAsset': self.getClassPackagePath(ClassNamePhysicsAsset),
+            }
+        return self.dependencyPaths
+
+    def getSkeletalMeshPath(self):
+        return self.getDependencyPaths()['skeletalMesh']
+
+    def getAnimBlueprintPath(self):
+        return self.getDependencyPaths()['animBlueprint']
+
+    def getSkeletonPath(self):
+        return self.getDependencyPaths()['skeleton']
+
+    def getPhysicsAssetPath(self):
+        return self.getDependencyPaths()['physicsAsset']
+
+
+def rewriteAssetJson(jsonString, replacements, newPackageGuid=None):
+    """Replaces every occurrence of each key of `replacements` with its value (and the PackageGuid, if given) in one pass.
+    Longer keys win where keys overlap, and replaced text is never matched again.
+    Returns the new JSON string and the replaced locations (line, column, from, to)."""
+    patterns = [re.escape(original) for original in sorted((r for r in replacements if r), key=len, reverse=True)]
+    if newPackageGuid is not None:
+        patterns.insert(0, JsonPackageGuidRegex)
+    if not patterns:
+        return jsonString, []
+
+    locations = []
+    line = 1
+    lineStart = 0
+    lastIndex = 0
+
+    def replace(match):
+        nonlocal line, lineStart, lastIndex
+        start = match.start()
+        newlines = jsonString.count('\n', lastIndex, start)
+        if newlines:
+            line += newlines
+            lineStart = jsonString.rfind('\n', lastIndex, start) + 1
+        lastIndex = start
+
+        original = match.group(0)
+        if newPackageGuid is not None and match.group('guid') is not None:
+            replacement = f'"{PackageGuidFieldName}":{match.group("space")}"{newPackageGuid}"'
+        else:
+            replacement = replacements[original]
+        locations.append((line, start - lineStart + 1, original, replacement))
+        return replacement
+
+    return re.sub('|'.join(f'(?:{pattern})' for pattern in patterns), replace, jsonString), locations
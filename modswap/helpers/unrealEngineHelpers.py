@@ -69,11 +69,11 @@ def getAssetStemPathInfo(assetFilePath):
         stemPath = assetFilePath[:-len(UassetJsonSuffix)]
         assetSuffix = UassetFilenameSuffix
     else:
-        for suffix in AllAssetFileExtensions:
-            if assetPathLower.endswith(suffix):
-                assetSuffix = suffix
-                stemPath = assetFilePath[:-len(suffix)]
-                break
+        # every other asset file extension is a single suffix, so only the last one needs looking up
+        suffix = os.path.splitext(assetPathLower)[1]
+        if suffix in AllAssetFileExtensions:
+            assetSuffix = suffix
+            stemPath = assetFilePath[:-len(suffix)]
 
     if stemPath:
         result = {
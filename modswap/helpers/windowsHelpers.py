@@ -2,12 +2,43 @@ import ctypes
 import os
 import webbrowser
 import winreg
+from ctypes import wintypes
 
 
 def getIsRunningAsAdmin():
     return ctypes.windll.shell32.IsUserAnAdmin() == 1
 
 
+class ProcessMemoryCounters(ctypes.Structure):
+    # PROCESS_MEMORY_COUNTERS
+    _fields_ = [
+        ('cb', wintypes.DWORD),
+        ('PageFaultCount', wintypes.DWORD),
+        ('PeakWorkingSetSize', ctypes.c_size_t),
+        ('WorkingSetSize', ctypes.c_size_t),
+        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+        ('QuotaPagedPoolUsage', ctypes.c_size_t),
+        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+        ('PagefileUsage', ctypes.c_size_t),
+        ('PeakPagefileUsage', ctypes.c_size_t),
+    ]
+
+
+def getProcessMemoryInfo():
+    """The working set (resident memory) of this process and its peak so far, in bytes"""
+    getCurrentProcess = ctypes.windll.kernel32.GetCurrentProcess
+    getCurrentProcess.restype = wintypes.HANDLE
+    getProcessMemoryInfo = ctypes.windll.psapi.GetProcessMemoryInfo
+    getProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+    getProcessMemoryInfo.restype = wintypes.BOOL
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    if not getProcessMemoryInfo(getCurrentProcess(), ctypes.byref(counters), counters.cb):
+        raise ctypes.WinError()
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+
 def getStartCmd(programOrPath, params=None, title='', wait=False):
     cmd = f'start {"/WAIT" if wait else ""} "{title}" "{programOrPath}"'
     if params:
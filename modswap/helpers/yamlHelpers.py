@@ -2,7 +2,17 @@ import json
 
 import yaml
 
-from .jsonHelpers import jsonDump
+from .compactHelpers import CompactRecord
+from .jsonHelpers import dumpWithSpooledList, jsonDump
+
+yaml.add_representer(CompactRecord, lambda dumper, record: dumper.represent_dict(record.items()))
+
+# the libyaml loader is much faster, when PyYAML was built with it
+YamlSafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def yamlLoad(stream):
+    return yaml.load(stream, Loader=YamlSafeLoader)
 
 
 def yamlDump(value, stream=None, customTypes=False):
@@ -11,3 +21,18 @@ def yamlDump(value, stream=None, customTypes=False):
         value = json.loads(jsonStr)
 
     return yaml.dump(value, stream=stream, default_flow_style=False, sort_keys=False)
+
+
+def yamlDumpWithSpooledList(value, spooledList, spool, stream):
+    """Writes `value` as YAML, with the items of `spool` written in place of `spooledList`, one at a time"""
+    if not len(spool):
+        return yamlDump(value, stream)
+
+    before, tokenLinePrefix, after = dumpWithSpooledList(value, spooledList, yamlDump)
+    stream.write(before[:-len(tokenLinePrefix)])
+    # the token line prefix is the indentation followed by '- '
+    indent = tokenLinePrefix[:-2]
+    for item in spool:
+        text = yamlDump([item])[:-1].replace('\n', f'\n{indent}')
+        stream.write(f'{indent}{text}\n')
+    stream.write(after.removeprefix('\n'))
@@ -1,5 +1,4 @@
 import copy
-import glob
 import json
 import os
 import pathlib
@@ -8,39 +7,52 @@ import tempfile
 import time
 import traceback
 import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from itertools import chain, combinations
 
 import semver
-import yaml
 from pynput import keyboard
 
 from modswap.helpers import tempFileHelpers
-from modswap.helpers.attachmentAnimationBlueprintHelpers import getSkeletonPath
-from modswap.helpers.attachmentBlueprintHelpers import (getAnimBlueprintPath,
-                                                        getSkeletalMeshPath)
-from modswap.helpers.attachmentHelpers import (basicAttachmentTemplate,
-                                               getAttachmentDisplayName,
+from modswap.helpers.attachmentBlueprintHelpers import (
+    getBlueprintCloneDestPakAssets, getBlueprintCloneNames,
+    getBlueprintCloneReplacements, getPackageStemPath)
+from modswap.helpers.assetDependencyHelpers import (DependencyFileSuffixes,
+                                                    getAssetDependencyClosure,
+                                                    readAssetGameImports)
+from modswap.helpers.attachmentLibraryHelpers import (AttachmentLibrary,
+                                                      AttachmentSnapshot,
+                                                      isValidAttachmentFilename,
+                                                      readAttachmentFiles)
+from modswap.helpers.attachmentHelpers import (AttachmentModelCategories,
+                                               basicAttachmentTemplate,
                                                getAttachmentFilename)
+from modswap.helpers.batchHelpers import (BatchIndex, getBatchEntryGroups,
+                                          getSettingsHash)
 from modswap.helpers.consoleHelpers import (clearSprintRecording, confirm,
                                             confirmOverwrite, esprint,
                                             getConsoleWindow,
                                             getSprintIsRecording,
-                                            oneLinePrinter, promptToContinue,
+                                            promptToContinue,
                                             replaySprintRecording, sprint,
                                             sprintClear, sprintP, sprintPad,
                                             sprintput, sprintSeparator,
                                             startSprintRecording)
+from modswap.helpers.cacheHelpers import JsonFileCache, getDirFingerprint
+from modswap.helpers.contentIndexHelpers import ContentIndex
+from modswap.helpers.compactHelpers import CompactRecord, getDeepSize
 from modswap.helpers.customizationItemDbHelpers import (
-    AccessoryBlueprintName, AssetNameFieldName, AttachmentBlueprintName,
-    CustomizationItemDbAssetName, ECustomizationCategoryName,
-    ECustomizationCategoryNamePrefix, ModelDisplayNamePropNameFieldName,
-    addAllToNameMap, findSocketAttachmentsStruct, generateRandomHexString,
-    getAssetPath, getAssetPathProperty, getAssociatedCharacterId,
-    getAttachmentBlueprintPath, getAttachmentBlueprintProperty,
-    getAttachmentSkeletalMeshPath, getAttachmentSocketName,
-    getItemMeshProperty, getModelDisplayNameProperty, getModelIdProperty,
-    getModelName, getSocketAttachments, getUiDataValues, md5Hash, setModelName,
-    sha256Hash, upgradeCustomizationItemDb)
+    AccessoryBlueprintName, AssetNameFieldName, CustomizationItemDbAssetName,
+    ECustomizationCategoryName, ECustomizationCategoryNamePrefix,
+    ModelDisplayNamePropNameFieldName, ModelFilterKeyGetters, ModelIndex,
+    addAllToNameMap, getAssetPath,
+    getAssetPathProperty, getAssociatedCharacterId, getAttachmentBlueprintPath,
+    getAttachmentBlueprintProperty, getAttachmentSkeletalMeshPath,
+    getAttachmentSocketName, getComboModelSharedNames, getItemMeshProperty,
+    getModelDisplayNameProperty, getModelIdProperty, getModelName,
+    getNameMapNames, getSocketAttachments, getUiDataValues,
+    upgradeCustomizationItemDb)
 from modswap.helpers.fileHelpers import listFilesRecursively
 from modswap.helpers.gameHelpers import (DefaultGameVersion,
                                          DefaultPrevGameVersion,
@@ -52,35 +64,58 @@ from modswap.helpers.gameHelpers import (DefaultGameVersion,
                                          killGameLobby, killGameServer,
                                          openGameLauncher)
 from modswap.helpers.guiHelpers import getForegroundWindow
-from modswap.helpers.jsonHelpers import jsonDump, jsonifyDataRecursive
-from modswap.helpers.pakHelpers import (DefaultPlatform,
-                                        PakchunkFilenameSuffix,
+from modswap.helpers.jsonHelpers import (InterningJsonHook, JsonListSpool,
+                                         jsonDump,
+                                         jsonDumpWithSpooledList,
+                                         jsonifyDataRecursive)
+from modswap.helpers.mixingHelpers import (ComboRules, MixManifest,
+                                           fixAttachmentBlueprintPropertyName,
+                                           generateComboModels, getJsonHash,
+                                           getModelDisplayNameBase,
+                                           mixModelInWorker, startMixingPool)
+from modswap.helpers.pakHelpers import (DefaultPakingMode, DefaultPlatform,
+                                        DefaultSrcPakExtractionMode,
+                                        PakchunkFilenameSuffix, PakingModes,
+                                        SrcPakExtractionModes,
                                         getPakContentDir,
                                         pakchunkRefnamePartsDictToRefname,
                                         pakchunkRefnamePartsToRefname,
                                         pakchunkRefnameToFilename,
                                         pakchunkRefnameToParts,
+                                        getPakAssetEntries,
+                                        getPakContentRelativePath,
+                                        getUnrealPakCompressionArgs,
                                         pakchunkToSigFilePath, unrealPak,
-                                        unrealUnpak)
+                                        unrealUnpak, unrealUnpakAssets,
+                                        unrealUnpakSelectively)
+from modswap.helpers.pakManifestHelpers import (PakManifest, hashFile,
+                                                pakchunksMatch)
 from modswap.helpers.pathHelpers import getPathInfo, normPath
-from modswap.helpers.settingsHelpers import (DefaultAttachmentsDir,
+from modswap.helpers.settingsHelpers import (DefaultAssetImportsCacheFilename,
+                                             DefaultAttachmentsDir,
+                                             DefaultAttachmentsSnapshotFilename,
+                                             DefaultBlueprintCacheFilename,
                                              DefaultPakingDir,
                                              findSettingsFiles,
                                              getContentDirRelativePath,
+                                             getBatchIndexFilePath,
                                              getGameName, getGameProgramName,
                                              getResultsFilePath,
                                              getSettingsTemplate)
+from modswap.helpers.stagingHelpers import (DefaultStagingStrategy,
+                                            FileStager, StagingStrategies)
 from modswap.helpers.uassetHelpers import (AssetPathGamePrefix,
                                            ClassNameSkeletalMesh, ClassSuffix,
-                                           ExportsFieldName, ImportsFieldName,
+                                           ExportsFieldName, ImportGraph,
+                                           ImportsFieldName,
                                            NameFieldName, NameMapFieldName,
-                                           PackageGuidFieldName,
-                                           ValueFieldName, findEnumByType,
+                                           PackageGuidFieldName, PropertyList,
+                                           findEnumByType,
                                            findNextItemByFields,
                                            findNextItemByType, getEnumValue,
                                            getPropertyValue,
                                            getShortenedAssetPath, jsonToUasset,
-                                           setPropertyValue, uassetToJson)
+                                           rewriteAssetJson, uassetToJson)
 from modswap.helpers.umodelHelpers import (UmodelProgramStem,
                                            UmodelSaveFolderName,
                                            runUmodelCommand)
@@ -89,10 +124,13 @@ from modswap.helpers.unrealEngineHelpers import (
     UexpFilenameSuffix, UfontFilenameSuffix, UmapFilenameSuffix,
     getAssetSplitFilePaths, getAssetStemPathInfo,
     getUnrealProjectCookedContentDir)
-from modswap.helpers.windowsHelpers import (getIsRunningAsAdmin, openFolder,
+from modswap.helpers.windowsHelpers import (getIsRunningAsAdmin,
+                                            getProcessMemoryInfo, openFolder,
                                             setConsoleTitle)
-from modswap.helpers.yamlHelpers import yamlDump
+from modswap.helpers.yamlHelpers import (yamlDump, yamlDumpWithSpooledList,
+                                        yamlLoad)
 from modswap.metadata.programMetaData import ConsoleTitle
+from modswap.runtime.runWorkers import runSettingsFile, runSettingsFiles
 
 DefaultLauncherStartsGame = True
 def mergeSettings(parentData, childData):
@@ -113,7 +151,7 @@ def readSettingsRecursive(filePath, relativeDir='.', silent=False):
         raise ValueError(f'Could not read settings from "{filePath}" (file not found)')
 
     with open(filePath, 'r', encoding='utf-8') as file:
-        data = yaml.safe_load(file)
+        data = yamlLoad(file)
 
     # TODO: ensure relative paths in settings are converted to relative paths
     # to relativeDir
@@ -148,6 +186,7 @@ class ModSwapCommandRunner():
         self.unrealEngineVersion = None
         self.gameVersion = None
         self.prevGameVersion = None
+        self.jsonObjectPairsHook = None
         if False:
             self.importAttachmentsSeparator = 'And'
         else:
@@ -156,7 +195,10 @@ class ModSwapCommandRunner():
         self.shouldView = False
         self.searchingSlots = None
         self.wroteResults = False
+        self.results = None
         self.isBatchMode = False
+        self.blueprintCache = None
+        self.outputNameSuffix = ''
 
     def getUmodelGameTag(self):
         if self.unrealEngineVersion:
@@ -347,13 +389,35 @@ class ModSwapCommandRunner():
     def ensureAttachmentsDir(self):
         return self.ensureDir(self.attachmentsDir, '`attachmentsDir`')
 
+    def getModelIndexKey(self, customizationItemDbPath, upgrading):
+        """What a saved model index must have been built from: the hashes of the CustomizationItemDB files, and the game versions"""
+        filePaths = [customizationItemDbPath]
+        if customizationItemDbPath.lower().endswith(UassetFilenameSuffix):
+            filePaths.append(f'{customizationItemDbPath[:-len(UassetFilenameSuffix)]}{UexpFilenameSuffix}')
+        return jsonDump([
+            [hashFile(filePath) for filePath in filePaths if os.path.isfile(filePath)],
+            self.gameVersion,
+            self.prevGameVersion if upgrading else None,
+        ])
+
     def readUassetDataFromJson(self, customizationItemDbJsonPath, silent=False):
         result = None
         if not silent:
             sprintPad()
             sprint(f'Reading {CustomizationItemDbAssetName} JSON from "{customizationItemDbJsonPath}"...')
+        memoryBefore = None
+        if self.debug:
+            # resident memory of the whole process, which costs nothing to measure (unlike tracing allocations)
+            try:
+                memoryBefore, peakMemoryBefore = getProcessMemoryInfo()
+            except OSError as e:
+                self.printWarning(f'Unable to measure memory use: {e}')
         with open(customizationItemDbJsonPath, 'r', encoding='utf-8') as file:
-            result = json.load(file)
+            result = json.load(file, object_pairs_hook=self.jsonObjectPairsHook)
+        if memoryBefore is not None:
+            memoryAfter, peakMemoryAfter = getProcessMemoryInfo()
+            peakNote = f', peak {peakMemoryAfter / 1024 / 1024:.1f} MB while reading' if peakMemoryAfter > peakMemoryBefore else ''
+            sprint(f"Memory: {(memoryAfter - memoryBefore) / 1024 / 1024:+.1f} MB resident, {memoryAfter / 1024 / 1024:.1f} MB in all{peakNote}{' (interned)' if isinstance(self.jsonObjectPairsHook, InterningJsonHook) else ''}")
         if not silent:
             sprint('Done reading.')
             sprintPad()
@@ -415,6 +479,12 @@ class ModSwapCommandRunner():
         gamePaksDirPathInfo=None,
         writingAlteredDb=False,
         searchingGameAssets=False,
+        verifyingNameMap=False,
+        prettyJson=False,
+        mixingJobs=1,
+        incrementalMixing=False,
+        modelFilters=None,
+        compactRecords=False,
         checkInput=None,
     ):
         if attachmentsCreated is None:
@@ -435,615 +505,812 @@ class ModSwapCommandRunner():
         customizationItemDb = asset['data']
         customizationItemDbPathInfo = asset['pathInfo']
         customizationItemDbContentDirRelativePath = asset.get('contentDirRelativePath', None)
+        mixedModelsSpool = None
+        mixingPool = None
+        mixManifest = None
+        # models left out of the mixed table because they failed
+        failedModelCount = 0
 
-        sprintPad()
-        sprint(f'Processing CustomizationItemDB "{customizationItemDbPathInfo["best"]}"...')
-        sprintPad()
-
-        if upgrading:
+        try:
             sprintPad()
-            sprint(f'{self.dryRunPrefix}Upgrading CustomizationItemDB at "{customizationItemDbPathInfo["best"]}" from game version {self.prevGameVersion} to {self.gameVersion}...')
-            upgradeCustomizationItemDb(customizationItemDb, self.prevGameVersion, self.gameVersion, dryRun=False, debug=self.debug)
-            sprint(f'{self.dryRunPrefix}Done upgrading.')
+            sprint(f'Processing CustomizationItemDB "{customizationItemDbPathInfo["best"]}"...')
             sprintPad()
-            asset[f'upgraded-{self.prevGameVersion}-{self.gameVersion}'] = True
 
-        if inspecting or searchingGameAssets or mixingAttachments or extractingAttachments:
-            exports = customizationItemDb[ExportsFieldName]
-            dataTableExport = findNextItemByType(exports, 'UAssetAPI.ExportTypes.DataTableExport, UAssetAPI')
-            models = dataTableExport['Table']['Data']
-            modelsCopy = models.copy()
-            if mixingAttachments:
-                models.clear()
-                combinationsSkipped = {}
-                combinationsAdded = {}
-                asset['combinationsAdded'] = combinationsAdded
-                asset['combinationsSkipped'] = combinationsSkipped
+            if upgrading:
+                sprintPad()
+                sprint(f'{self.dryRunPrefix}Upgrading CustomizationItemDB at "{customizationItemDbPathInfo["best"]}" from game version {self.prevGameVersion} to {self.gameVersion}...')
+                ruleCounts = upgradeCustomizationItemDb(customizationItemDb, self.prevGameVersion, self.gameVersion, dryRun=False, debug=self.debug)
+                for ruleId, count in ruleCounts.items():
+                    sprint(f'{ruleId}: {count} properties')
+                sprint(f'{self.dryRunPrefix}Done upgrading. Migrated {sum(ruleCounts.values())} properties.')
+                sprintPad()
+                asset[f'upgraded-{self.prevGameVersion}-{self.gameVersion}'] = True
 
-            sprintPad()
-            sprint(f'Reading {len(modelsCopy)} models...')
-            for modelIndex, model in enumerate(modelsCopy):
-                if not checkInput():
-                    break
+            blueprintCacheScope = None
+            if searchingGameAssets and self.blueprintCache is not None and gamePaksDirPathInfo:
                 try:
-                    modelName = getModelName(model)
+                    blueprintCacheScope = f"{self.gameVersion}|{getDirFingerprint(gamePaksDirPathInfo['absolute'], {PakchunkFilenameSuffix})}"
+                except OSError as e:
+                    self.printWarning(f'Not using blueprint cache: {e}')
+
+            if inspecting or searchingGameAssets or mixingAttachments or extractingAttachments:
+                exports = customizationItemDb[ExportsFieldName]
+                dataTableExport = findNextItemByType(exports, 'UAssetAPI.ExportTypes.DataTableExport, UAssetAPI')
+                models = dataTableExport['Table']['Data']
+                if compactRecords and self.debug:
+                    # read as compact records (see `jsonObjectPairsHook`), so the dict form of the table is never held
                     sprintPad()
-                    sprint(f'{modelIndex + 1} - reading {modelName}...')
-
-                    modelValues = getPropertyValue(model)
-
-                    modelIdProp = getModelIdProperty(modelValues, self.gameVersion)
-                    modelId = getPropertyValue(modelIdProp)
-                    if modelId != modelName:
-                        self.printWarning(f'ID ({modelId}) does not match model name ({modelName})')
-
-                    modelNameParts = modelName.split('_')
-                    modelBaseName = modelNameParts.pop(0)
-                    sprint(f'Base Name: {modelBaseName}')
+                    sprint(f'{len(models)} compact models take {getDeepSize(models)} bytes')
+                    sprintPad()
+                modelsCopy = models.copy()
+                if mixingAttachments:
+                    models.clear()
+                    combinationsSkipped = {}
+                    combinationsAdded = {}
+                    baseModelsRemoved = []
+                    asset['combinationsAdded'] = combinationsAdded
+                    asset['combinationsSkipped'] = combinationsSkipped
+                    asset['baseModelsRemoved'] = baseModelsRemoved
+
+                    # The NameMap is maintained as models are added, rather than walking the whole
+                    # (much larger) mixed table afterward. Seed it with the names outside of the table rows.
+                    nameMapSet = getNameMapNames(customizationItemDb.get(ImportsFieldName, []))
+                    addAllToNameMap(exports, nameMapSet)
+                    attachmentNamesAdded = set()
+
+                    if writingAlteredDb:
+                        # Mixed models are streamed to a temporary file as they're made and written
+                        # out from there, so the whole mixed table is never held in memory.
+                        mixedModelsSpool = JsonListSpool(prefix=f'{CustomizationItemDbAssetName}_')
+                        mixedModels = mixedModelsSpool
+                    else:
+                        mixedModels = models
 
-                    meshAssetShortStemPath = getShortenedAssetPath(
-                        getAssetPath(
-                            getPropertyValue(
-                                getItemMeshProperty(modelValues),
-                            ),
-                        ),
+                    rules = ComboRules(
+                        categoryCombinationsToSkip,
+                        categoryCombinationSubsetsToSkip,
+                        categoryCombinationsRequired,
+                        categoryCombinationSubsetsRequired,
                     )
-                    sprint(f'Mesh: {meshAssetShortStemPath or "(none)"}')
-
-                    associatedCharacterId = getAssociatedCharacterId(modelValues)
-                    sprint(f"Character ID: {'(none)' if associatedCharacterId is None else associatedCharacterId}")
-
-                    uiDataValues = getUiDataValues(modelValues)
-
-                    modelDisplayNameProp = getModelDisplayNameProperty(uiDataValues)
-                    modelDisplayName = modelDisplayNameProp[ModelDisplayNamePropNameFieldName]
-                    sprint(f"Display Name: {modelDisplayName or '(none)'}")
-
-                    categoryEnum = findEnumByType(modelValues, ECustomizationCategoryName)
-                    categoryFullName = getEnumValue(categoryEnum)
-
-                    categoryName = categoryFullName[len(ECustomizationCategoryNamePrefix):]
-                    shortCategoryName = None
-                    if categoryName == 'SurvivorTorso':
-                        shortCategoryName = 'Torso'
-                    elif categoryName == f'SurvivorLegs':
-                        shortCategoryName = 'Legs'
-                    elif categoryName == f'SurvivorHead':
-                        shortCategoryName = 'Head'
-                    elif categoryName == 'KillerBody':
-                        shortCategoryName = 'Body'
-                    elif categoryName == 'KillerHead':
-                        shortCategoryName = 'Head'
-                    elif categoryName == 'KillerWeapon':
-                        shortCategoryName = 'Weapon'
-                    elif categoryName == 'Charm':
-                        shortCategoryName = 'Charm'
-                    else:
-                        raise ValueError(f'Unsupported customization category: {categoryFullName}')
 
-                    sprint(f'Category: {categoryName}')
+                    for attachmentsForCategory in attachmentsToMix.values():
+                        for attachment in attachmentsForCategory.values():
+                            newBlueprintPropertyName = fixAttachmentBlueprintPropertyName(attachment['attachmentData'], self.gameVersion)
+                            if newBlueprintPropertyName and self.debug:
+                                sprint(f"- Changing {attachment['attachmentId']} attachment blueprint property name field to `{newBlueprintPropertyName}`")
+
+                    rulesHashes = None
+                    unchangedAttachmentIds = None
+                    if incrementalMixing and mixedModelsSpool is not None:
+                        mixedOutPathBase = os.path.join(
+                            settingsPathInfo['dir'],
+                            f"{settingsPathInfo['stem']}_{customizationItemDbPathInfo['stem']}{self.outputNameSuffix}-altered",
+                        )
+                        mixManifestPaths = (
+                            getPathInfo(f'{mixedOutPathBase}-manifest.json')['best'],
+                            getPathInfo(f'{mixedOutPathBase}-models.jsonl')['best'],
+                        )
+                        # rows are only hashed again when the CustomizationItemDB files (or game versions) changed
+                        mixSourcesKey = None
+                        try:
+                            if os.path.isfile(customizationItemDbPathInfo['absolute']):
+                                mixSourcesKey = self.getModelIndexKey(customizationItemDbPathInfo['absolute'], upgrading)
+                        except OSError as e:
+                            self.printWarning(f'Unable to fingerprint the CustomizationItemDB (hashing every model): {e}')
+                        mixManifest = MixManifest(*mixManifestPaths, sourcesKey=mixSourcesKey)
+                        try:
+                            if mixManifest.load():
+                                sprintPad()
+                                sprint(f'Read {len(mixManifest.previousModels)} combo models from the last mix manifest "{mixManifest.manifestPath}"')
+                                sprintPad()
+                        except Exception as e:
+                            self.printWarning(f'Unable to read the last mix manifest "{mixManifest.manifestPath}" (mixing everything): {e}')
+                            mixManifest.close()
+                            mixManifest = MixManifest(*mixManifestPaths, sourcesKey=mixSourcesKey)
+                        unchangedAttachmentIds = mixManifest.getUnchangedAttachmentIds({
+                            categoryName: {attachmentId: getJsonHash(attachment) for attachmentId, attachment in attachmentsForCategory.items()}
+                            for categoryName, attachmentsForCategory in attachmentsToMix.items()
+                        })
+                        rulesHashes = {categoryName: rules.getCategoryHash(categoryName) for categoryName in attachmentsToMix}
 
-                    socketAttachments = getSocketAttachments(modelValues)
-                    sprint(f'Attachments: {len(socketAttachments)}')
+                    def addMixedModel(model, names=None):
+                        mixedModels.append(model)
+                        if names is None:
+                            addAllToNameMap(model, nameMapSet)
+                        else:
+                            nameMapSet.update(names)
 
-                    if len(socketAttachments):
-                        # TODO: ignore this - it's not a reliable way of determining attachment names
-                        otherNames = [n for n in modelNameParts if n.lower() not in {'torso', 'legs', 'head', 'body', 'weapon', 'outfits', 'charm'}]
-                        otherNamesString = '_'.join(otherNames)
-                        attachmentNames = otherNamesString.split(self.importAttachmentsSeparator) if otherNamesString else []
+                    def addComboModels(model, modelBaseName, categoryName, baseModelKey, comboModels):
+                        attachmentsForCategory = attachmentsToMix[categoryName]
+                        sprintPad()
+                        sprint(f'Mixing {len(attachmentsForCategory)} attachments into {categoryName}::{modelBaseName} combinations...')
+                        sprintPad()
 
-                        if self.debug:
-                            sprint(f"Potential attachments names: {', '.join(attachmentNames) if attachmentNames else '(unknown)'}")
+                        comboCount = 0
+                        reusedComboCount = 0
+                        comboModelSharedNames = None
+                        for attachmentIds, newModelId, newModel in comboModels:
+                            if not checkInput():
+                                break
 
-                        attachmentDisplayNamesString = ''
-                        openParenIndex = modelDisplayName.find('(')
-                        if openParenIndex > -1:
-                            closeParenIndex = modelDisplayName.find(')', openParenIndex + 1)
-                            if closeParenIndex > -1:
-                                attachmentDisplayNamesString = modelDisplayName[(openParenIndex + 1):closeParenIndex]
+                            attachmentIdsSet = frozenset(attachmentIds)
 
-                        if self.debug:
-                            sprint(f'Potential attachments display names string: {attachmentDisplayNamesString}')
+                            if newModelId is None:
+                                if self.debug:
+                                    if modelBaseName not in combinationsSkipped:
+                                        combinationsSkipped[modelBaseName] = {}
+                                    if categoryName not in combinationsSkipped[modelBaseName]:
+                                        combinationsSkipped[modelBaseName][categoryName] = set()
+                                    combinationsSkipped[modelBaseName][categoryName].add(attachmentIdsSet)
+                                continue
 
-                        attachmentDisplayNames = attachmentDisplayNamesString.split(', ') if attachmentDisplayNamesString else []
-                        if self.debug:
-                            sprint(f"Potential attachments display names: {', '.join(attachmentDisplayNames) if attachmentDisplayNames else '(unknown)'}")
+                            # TODO: maybe only do this if self.debug ?
+                            if True:
+                                if modelBaseName not in combinationsAdded:
+                                    combinationsAdded[modelBaseName] = {}
+                                if categoryName not in combinationsAdded[modelBaseName]:
+                                    combinationsAdded[modelBaseName][categoryName] = set()
+                                combinationsAdded[modelBaseName][categoryName].add(attachmentIdsSet)
+                            comboCount += 1
+
+                            if newModel is None:
+                                # unchanged since the last mix
+                                sprint(f"Reusing combo: {', '.join(attachmentIds)}")
+                                newModel = mixManifest.readPreviousModelJson(newModelId)
+                                reusedComboCount += 1
+                            else:
+                                sprint(f"Making combo: {', '.join(attachmentIds)}")
 
-                        if (
-                            len(attachmentDisplayNames) == len(socketAttachments)
-                            or (len(attachmentDisplayNames) > 1 and len(socketAttachments) == 1)
-                        ):
-                            attachmentNames = [''.join([word.capitalize() for word in displayName.split()]) for displayName in attachmentDisplayNames]
-                            # TODO: try to handle cases with aggregate attachments?
-                            if len(attachmentDisplayNames) > 1 and len(socketAttachments) == 1:
-                                attachmentNames = ['And'.join(attachmentNames)]
-                                attachmentDisplayNames = [', '.join(attachmentDisplayNames)]
+                            if mixManifest is not None:
+                                mixManifest.addModel(newModelId, baseModelKey, len(mixedModelsSpool))
 
-                        if len(attachmentNames) != len(socketAttachments):
-                            attachmentNames = []
+                            if isinstance(newModel, str):
+                                # already serialized by a mixing pool worker
+                                if mixedModelsSpool is not None:
+                                    mixedModelsSpool.appendJson(newModel)
+                                else:
+                                    mixedModels.append(json.loads(newModel))
+                            else:
+                                mixedModels.append(newModel)
+
+                            if comboModelSharedNames is None:
+                                comboModelSharedNames = getComboModelSharedNames(model, self.gameVersion)
+                                nameMapSet.update(comboModelSharedNames)
+                            nameMapSet.add(newModelId)
+                            for attachmentId in attachmentIds:
+                                attachmentKey = (categoryName, attachmentId)
+                                if attachmentKey not in attachmentNamesAdded:
+                                    addAllToNameMap(attachmentsForCategory[attachmentId]['attachmentData'], nameMapSet)
+                                    attachmentNamesAdded.add(attachmentKey)
+
+                        sprint(f'Created {comboCount} combos{f" ({reusedComboCount} reused)" if reusedComboCount else ""}')
+                        sprintPad()
 
-                        if len(attachmentDisplayNames) != len(socketAttachments):
-                            attachmentDisplayNames = []
+                    pendingMixedModels = deque()
+                    if mixingJobs != 1 and attachmentsToMix:
+                        mixingPool = startMixingPool(
+                            mixingJobs,
+                            attachmentsToMix,
+                            rules,
+                            self.gameVersion,
+                            self.exportAttachmentsSeparator,
+                            unchangedAttachmentIds,
+                        )
+                        maxPendingMixedModels = 4 * (mixingJobs or os.cpu_count() or 1)
 
-                        if self.debug:
-                            sprint(f"Synthesized attachments names: {', '.join(attachmentNames) if attachmentNames else '(unknown)'}")
+                    def flushMixedModels(waiting=False):
+                        nonlocal failedModelCount
 
-                        if extractingAttachments or searchingGameAssets:
-                            for attachmentIndex, attachmentData in enumerate(socketAttachments):
-                                if not checkInput():
-                                    break
+                        # models are added in their original order, as their combos become ready
+                        while pendingMixedModels:
+                            pendingModel, pendingMix = pendingMixedModels[0]
+                            if (
+                                pendingMix is not None
+                                and not pendingMix.done()
+                                and not waiting
+                                and len(pendingMixedModels) <= maxPendingMixedModels
+                            ):
+                                break
 
-                                animBlueprintShortStemPath = None
-                                meshShortStemPath = None
+                            pendingMixedModels.popleft()
+                            if pendingMix is None:
+                                addMixedModel(*pendingModel)
+                            else:
+                                try:
+                                    comboModels = pendingMix.result()
+                                except Exception as e:
+                                    self.printError(e)
+                                    failedModelCount += 1
+                                    continue
+                                addComboModels(*pendingModel, comboModels)
+
+                modelsIndex = None
+                modelIndexPath = None
+                modelIndexKey = None
+                modelIndicesInScope = None
+                if modelFilters:
+                    modelsIndex = ModelIndex(modelsCopy)
+                    if settingsPathInfo is not None and os.path.isfile(customizationItemDbPathInfo['absolute']):
+                        # kept with the other outputs made from this CustomizationItemDB, keyed by the files it was read from
+                        modelIndexPath = getPathInfo(os.path.join(
+                            settingsPathInfo['dir'],
+                            f"{settingsPathInfo['stem']}_{customizationItemDbPathInfo['stem']}{self.outputNameSuffix}-modelIndex.json",
+                        ))['best']
+                        try:
+                            modelIndexKey = self.getModelIndexKey(customizationItemDbPathInfo['absolute'], upgrading)
+                            if modelsIndex.load(modelIndexPath, modelIndexKey):
+                                sprintPad()
+                                sprint(f'Read the model index from "{modelIndexPath}"')
+                                sprintPad()
+                        except Exception as e:
+                            self.printWarning(f'Unable to read the model index "{modelIndexPath}" (indexing models again): {e}')
+                    modelIndicesInScope = modelsIndex.getMatchingModelIndices(modelFilters)
+                    if modelIndicesInScope is not None:
+                        sprintPad()
+                        sprint(f'{len(modelIndicesInScope)} of {len(modelsCopy)} models match `modelFilters`')
+                        sprintPad()
 
-                                attachmentValues = getPropertyValue(attachmentData, [])
-                                socketName = getAttachmentSocketName(attachmentValues)
-                                skeletalMeshShortStemPath = getShortenedAssetPath(
-                                    getAttachmentSkeletalMeshPath(attachmentValues),
-                                )
-                                blueprintPath = getAttachmentBlueprintPath(attachmentValues, self.gameVersion)
-                                blueprintShortStemPath = getShortenedAssetPath(blueprintPath)
-                                sprint(f'- Attachment {attachmentIndex + 1}:{f" {socketName}" if socketName else ""}{f" {blueprintShortStemPath}" if blueprintPath else ""}{f" {skeletalMeshShortStemPath}" if skeletalMeshShortStemPath else ""}')
-                                if blueprintPath is None and skeletalMeshShortStemPath is None:
-                                    sprintP(attachmentValues)
+                sprintPad()
+                sprint(f'Reading {len(modelsCopy) if modelIndicesInScope is None else len(modelIndicesInScope)} models...')
+                for modelIndex, model in enumerate(modelsCopy):
+                    if not checkInput():
+                        break
+
+                    if modelIndicesInScope is not None and modelIndex not in modelIndicesInScope:
+                        # out of scope models are left as they are, and their names come from the model index
+                        if mixingAttachments:
+                            modelNames = modelsIndex.getModelNames(modelIndex)
+                            if mixingPool is not None:
+                                pendingMixedModels.append(((model, modelNames), None))
+                            else:
+                                addMixedModel(model, modelNames)
+                        continue
 
-                                if searchingGameAssets and blueprintPath and self.umodelPath and umodelCwdPathInfo and gamePaksDirPathInfo:
-                                    # TODO: remove
-                                    if False:
-                                        sprint('Reading attachment blueprint...')
-                                    # try to load the attachment blueprint to discover the mesh
-                                    try:
-                                        saveFilePath = self.saveAsset(
-                                            gamePaksDirPathInfo['absolute'],
-                                            umodelCwdPathInfo['absolute'],
-                                            blueprintShortStemPath,
-                                            silent=True,
-                                        )
-                                    except Exception as e:
-                                        self.printError(e)
-                                        saveFilePath = None
+                    try:
+                        modelName = getModelName(model)
+                        sprintPad()
+                        sprint(f'{modelIndex + 1} - reading {modelName}...')
 
-                                    if saveFilePath and checkInput():
-                                        try:
-                                            # TODO: remove
-                                            if False:
-                                                sprint(f'Searching "{saveFilePath}"...')
-                                            saveFileDir = os.path.dirname(saveFilePath)
-                                            saveFileStem = os.path.basename(saveFilePath).removesuffix(UassetFilenameSuffix)
-                                            with tempFileHelpers.openTemporaryFile(
-                                                saveFileDir,
-                                                prefix=f'{saveFileStem}_',
-                                                suffix='.json',
-                                                deleteFirst=True,
-                                            ) as saveFileJsonFile:
-                                                saveFileJsonPath = getPathInfo(saveFileJsonFile.name)['best']
-                                                try:
-                                                    blueprintData = self.readDataFromUasset(
-                                                        saveFilePath,
-                                                        saveFileJsonPath,
-                                                        silent=True,
-                                                    )
-                                                except Exception as e:
-                                                    blueprintData = None
-                                                    self.printError(e)
+                        # looked up by many fields, so indexed
+                        modelValues = PropertyList(getPropertyValue(model))
 
-                                                if blueprintData:
-                                                    if False:
-                                                        for name in blueprintData[NameMapFieldName]:
-                                                            if not checkInput():
-                                                                break
-                                                            sprint(name)
-                                                    imports = blueprintData.get(ImportsFieldName, [])
-                                                    animBlueprintShortStemPath = getShortenedAssetPath(
-                                                        getAnimBlueprintPath(imports)
-                                                    )
-                                                    sprint(f'  - Animation blueprint: {animBlueprintShortStemPath or "(none)"}')
-                                                    meshShortStemPath = getShortenedAssetPath(
-                                                        getSkeletalMeshPath(imports)
-                                                    )
-                                                    sprint(f'  - Attachment mesh: {meshShortStemPath or "(none)"}')
-                                                    if meshShortStemPath and self.shouldView:
-                                                        fullMeshPath = f'{"" if meshShortStemPath.startswith("/") else AssetPathGamePrefix}{meshShortStemPath}{UassetFilenameSuffix}'
-                                                        viewReturnCode = None
-                                                        viewError = False
-                                                        for viewStreamName, viewLine, viewStop in runUmodelCommand(
-                                                            self.umodelPath,
-                                                            [
-                                                                '-view',
-                                                                f'-game={self.getUmodelGameTag()}',
-                                                                f'-path={gamePaksDirPathInfo["absolute"]}',
-                                                                fullMeshPath,
-                                                                # TODO: remove
-                                                                #ClassNameSkeletalMesh,
-                                                            ],
-                                                            cwd=umodelCwdPathInfo['absolute'],
-                                                            debug=self.debug,
-                                                        ):
-                                                            if not checkInput():
-                                                                viewStop()
-                                                            if viewStreamName == 'return_code':
-                                                                viewReturnCode = viewLine
-                                                            elif viewStreamName == 'stderr' and 'ERROR' in viewLine:
-                                                                self.printError(viewLine)
-                                                                viewError = viewLine
-                                                            elif self.debug:
-                                                                sprint(viewLine)
-                                                        if viewReturnCode or viewError:
-                                                            self.printError(f'Failed to view "{fullMeshPath}"')
-
-                                                checkInput(inBlueprintJson=True)
-                                        finally:
-                                            for path in getAssetSplitFilePaths(saveFilePath):
-                                                pathlib.Path.unlink(path, missing_ok=True)
+                        modelIdProp = getModelIdProperty(modelValues, self.gameVersion)
+                        modelId = getPropertyValue(modelIdProp)
+                        if modelId != modelName:
+                            self.printWarning(f'ID ({modelId}) does not match model name ({modelName})')
 
-                                nameIsh = socketName
-                                if not nameIsh and blueprintPath:
-                                    nameIsh = os.path.basename(blueprintPath)
-                                if not nameIsh and skeletalMeshShortStemPath:
-                                    nameIsh = os.path.basename(skeletalMeshShortStemPath)
-                                if not nameIsh and modelDisplayName:
-                                    nameIsh = modelDisplayName.replace(' ', '_')
-                                if not nameIsh and modelName:
-                                    nameIsh = modelName
-
-                                displayNameIsh = modelDisplayName
-                                if not displayNameIsh and modelName:
-                                    displayNameIsh = modelName
-                                if not displayNameIsh and nameIsh:
-                                    displayNameIsh = nameIsh
-
-                                if extractingAttachments:
-                                    if attachmentIndex < len(attachmentNames):
-                                        attachmentId = attachmentNames[attachmentIndex]
-                                    else:
-                                        attachmentId = '_'.join([part for part in [nameIsh, f'{attachmentIndex + 1}'] if part])
+                        modelNameParts = modelName.split('_')
+                        modelBaseName = modelNameParts.pop(0)
+                        sprint(f'Base Name: {modelBaseName}')
 
-                                    if attachmentIndex < len(attachmentDisplayNames):
-                                        attachmentDisplayName = attachmentDisplayNames[attachmentIndex]
-                                    else:
-                                        attachmentDisplayName = ' '.join(
-                                            part for part in [
-                                                displayNameIsh,
-                                                'Attachment' if len(socketAttachments) > 1 else '',
-                                                f'{attachmentIndex + 1}/{len(socketAttachments)}' if len(socketAttachments) > 1 else '',
-                                            ] if part
-                                        )
+                        meshAssetShortStemPath = getShortenedAssetPath(
+                            getAssetPath(
+                                getPropertyValue(
+                                    getItemMeshProperty(modelValues),
+                                ),
+                            ),
+                        )
+                        sprint(f'Mesh: {meshAssetShortStemPath or "(none)"}')
+
+                        associatedCharacterId = getAssociatedCharacterId(modelValues)
+                        sprint(f"Character ID: {'(none)' if associatedCharacterId is None else associatedCharacterId}")
+
+                        uiDataValues = getUiDataValues(modelValues)
+
+                        modelDisplayNameProp = getModelDisplayNameProperty(uiDataValues)
+                        modelDisplayName = modelDisplayNameProp[ModelDisplayNamePropNameFieldName]
+                        sprint(f"Display Name: {modelDisplayName or '(none)'}")
+
+                        categoryEnum = findEnumByType(modelValues, ECustomizationCategoryName)
+                        categoryFullName = getEnumValue(categoryEnum)
+
+                        categoryName = categoryFullName[len(ECustomizationCategoryNamePrefix):]
+                        shortCategoryName = None
+                        if categoryName == 'SurvivorTorso':
+                            shortCategoryName = 'Torso'
+                        elif categoryName == f'SurvivorLegs':
+                            shortCategoryName = 'Legs'
+                        elif categoryName == f'SurvivorHead':
+                            shortCategoryName = 'Head'
+                        elif categoryName == 'KillerBody':
+                            shortCategoryName = 'Body'
+                        elif categoryName == 'KillerHead':
+                            shortCategoryName = 'Head'
+                        elif categoryName == 'KillerWeapon':
+                            shortCategoryName = 'Weapon'
+                        elif categoryName == 'Charm':
+                            shortCategoryName = 'Charm'
+                        else:
+                            raise ValueError(f'Unsupported customization category: {categoryFullName}')
 
-                                    filename = f'SocketAttachment_{modelBaseName}_{shortCategoryName}_{attachmentId}.yaml'
-                                    filePath = getPathInfo(os.path.join(self.ensureAttachmentsDir(), filename))['best']
+                        sprint(f'Category: {categoryName}')
 
-                                    if os.path.exists(filePath):
-                                        self.printWarning(f'Skipping attachment {attachmentIndex + 1} (file already exists): "{filePath}"', pad=False)
-                                    else:
-                                        sprint(f'{self.dryRunPrefix}Extracting attachment {attachmentIndex + 1}: {attachmentId} ({attachmentDisplayName}) to "{filePath}"')
-
-                                        attachmentInfo = {
-                                            'attachmentId': attachmentId,
-                                            'modelCategory': categoryName,
-                                            'displayName': attachmentDisplayName,
-                                            'associatedModelId': modelName,
-                                            'associatedCharacterId': associatedCharacterId,
-                                            'associatedCharacterMesh': meshAssetShortStemPath,
-                                            'animationBlueprint': animBlueprintShortStemPath,
-                                            'attachmentMesh': meshShortStemPath,
-                                            'attachmentData': attachmentData,
-                                        }
+                        socketAttachments = getSocketAttachments(modelValues)
+                        sprint(f'Attachments: {len(socketAttachments)}')
 
-                                        if not self.dryRun:
-                                            with open(filePath, 'w', encoding='utf-8') as file:
-                                                yamlDump(attachmentInfo, file)
-
-                                        attachmentsCreated.append(filePath)
-                    elif mixingAttachments:
-                        shouldAddThisModel = True
-                        emptySet = frozenset()
-
-                        if shouldAddThisModel:
-                            if emptySet in categoryCombinationsToSkip.get(categoryName, {}):
-                                baseModels = categoryCombinationsToSkip[categoryName][emptySet]
-                                if not baseModels or modelBaseName in baseModels:
-                                    shouldAddThisModel = False
-
-                        if shouldAddThisModel:
-                            if emptySet in categoryCombinationSubsetsToSkip.get(categoryName, {}):
-                                baseModels = categoryCombinationsToSkip[categoryName][emptySet]
-                                if not baseModels or modelBaseName in baseModels:
-                                    shouldAddThisModel = False
-
-                        if shouldAddThisModel:
-                            sprintPad()
-                            sprint(f'Adding base model {categoryName}::{modelBaseName}')
-                            sprintPad()
-                            models.append(model)
-                        else:
-                            sprintPad()
-                            sprint(f'Skipping base model {categoryName}::{modelBaseName}')
-                            sprintPad()
+                        if len(socketAttachments):
+                            # TODO: ignore this - it's not a reliable way of determining attachment names
+                            otherNames = [n for n in modelNameParts if n.lower() not in {'torso', 'legs', 'head', 'body', 'weapon', 'outfits', 'charm'}]
+                            otherNamesString = '_'.join(otherNames)
+                            attachmentNames = otherNamesString.split(self.importAttachmentsSeparator) if otherNamesString else []
 
-                        if categoryName in attachmentsToMix:
-                            modelDisplayNameBase = modelDisplayName
+                            if self.debug:
+                                sprint(f"Potential attachments names: {', '.join(attachmentNames) if attachmentNames else '(unknown)'}")
+
+                            attachmentDisplayNamesString = ''
                             openParenIndex = modelDisplayName.find('(')
                             if openParenIndex > -1:
                                 closeParenIndex = modelDisplayName.find(')', openParenIndex + 1)
                                 if closeParenIndex > -1:
-                                    modelDisplayNameBase = modelDisplayName[:openParenIndex].rstrip()
-
-                            comboCount = 0
+                                    attachmentDisplayNamesString = modelDisplayName[(openParenIndex + 1):closeParenIndex]
 
-                            attachmentsForCategory = attachmentsToMix[categoryName]
-                            sprintPad()
-                            sprint(f'Mixing {len(attachmentsForCategory)} attachments into combinations...')
-                            sprintPad()
-                            for r in range(1, len(attachmentsForCategory) + 1):
-                                if not checkInput():
-                                    break
-
-                                # TODO: use names instead of values in combinations()
-                                for combo in combinations(attachmentsForCategory.values(), r):
-                                    if not checkInput():
-                                        break
-
-                                    attachmentIds = [a['attachmentId'] for a in combo]
+                            if self.debug:
+                                sprint(f'Potential attachments display names string: {attachmentDisplayNamesString}')
 
-                                    attachmentIdsSet = frozenset(attachmentIds)
+                            attachmentDisplayNames = attachmentDisplayNamesString.split(', ') if attachmentDisplayNamesString else []
+                            if self.debug:
+                                sprint(f"Potential attachments display names: {', '.join(attachmentDisplayNames) if attachmentDisplayNames else '(unknown)'}")
 
-                                    shouldSkipCombo = None
+                            if (
+                                len(attachmentDisplayNames) == len(socketAttachments)
+                                or (len(attachmentDisplayNames) > 1 and len(socketAttachments) == 1)
+                            ):
+                                attachmentNames = [''.join([word.capitalize() for word in displayName.split()]) for displayName in attachmentDisplayNames]
+                                # TODO: try to handle cases with aggregate attachments?
+                                if len(attachmentDisplayNames) > 1 and len(socketAttachments) == 1:
+                                    attachmentNames = ['And'.join(attachmentNames)]
+                                    attachmentDisplayNames = [', '.join(attachmentDisplayNames)]
 
-                                    if shouldSkipCombo is None:
-                                        baseModels = categoryCombinationsToSkip.get(categoryName, {}).get(attachmentIdsSet, None)
-                                        if baseModels is not None:
-                                            if len(baseModels) == 0 or modelBaseName in baseModels:
-                                                shouldSkipCombo = True
+                            if len(attachmentNames) != len(socketAttachments):
+                                attachmentNames = []
 
-                                    if shouldSkipCombo is None:
-                                        for combosToSkip, baseModels in categoryCombinationSubsetsToSkip.get(categoryName, {}).items():
-                                            if (len(baseModels) == 0 or modelBaseName in baseModels) and combosToSkip <= attachmentIdsSet:
-                                                shouldSkipCombo = True
-                                                break
+                            if len(attachmentDisplayNames) != len(socketAttachments):
+                                attachmentDisplayNames = []
 
-                                    if shouldSkipCombo is None:
-                                        for combosRequired, baseModels in categoryCombinationsRequired.get(categoryName, {}).items():
-                                            if len(baseModels) and modelBaseName not in baseModels:
-                                                continue
+                            if self.debug:
+                                sprint(f"Synthesized attachments names: {', '.join(attachmentNames) if attachmentNames else '(unknown)'}")
 
-                                            if combosRequired != attachmentIdsSet:
-                                                shouldSkipCombo = True
-                                                break
+                            if extractingAttachments or searchingGameAssets:
+                                for attachmentIndex, attachmentData in enumerate(socketAttachments):
+                                    if not checkInput():
+                                        break
 
-                                    if shouldSkipCombo is None:
-                                        for combosRequired, baseModels in categoryCombinationSubsetsRequired.get(categoryName, {}).items():
-                                            if len(baseModels) and modelBaseName not in baseModels:
-                                                continue
+                                    animBlueprintShortStemPath = None
+                                    meshShortStemPath = None
+
+                                    attachmentValues = getPropertyValue(attachmentData, [])
+                                    socketName = getAttachmentSocketName(attachmentValues)
+                                    skeletalMeshShortStemPath = getShortenedAssetPath(
+                                        getAttachmentSkeletalMeshPath(attachmentValues),
+                                    )
+                                    blueprintPath = getAttachmentBlueprintPath(attachmentValues, self.gameVersion)
+                                    blueprintShortStemPath = getShortenedAssetPath(blueprintPath)
+                                    sprint(f'- Attachment {attachmentIndex + 1}:{f" {socketName}" if socketName else ""}{f" {blueprintShortStemPath}" if blueprintPath else ""}{f" {skeletalMeshShortStemPath}" if skeletalMeshShortStemPath else ""}')
+                                    if blueprintPath is None and skeletalMeshShortStemPath is None:
+                                        sprintP(attachmentValues)
+
+                                    blueprintResolution = None
+                                    if searchingGameAssets and blueprintPath and blueprintCacheScope is not None:
+                                        # resolved on an earlier run against the same game files
+                                        blueprintResolution = self.blueprintCache.get(blueprintCacheScope, blueprintShortStemPath)
+                                        if blueprintResolution is not None:
+                                            animBlueprintShortStemPath = blueprintResolution['animationBlueprint']
+                                            meshShortStemPath = blueprintResolution['attachmentMesh']
+                                            sprint(f'  - Animation blueprint: {animBlueprintShortStemPath or "(none)"}')
+                                            sprint(f'  - Attachment mesh: {meshShortStemPath or "(none)"}')
+                                            if meshShortStemPath and self.shouldView and self.umodelPath and umodelCwdPathInfo:
+                                                self.viewMesh(meshShortStemPath, gamePaksDirPathInfo, umodelCwdPathInfo, checkInput)
+
+                                    if blueprintResolution is None and searchingGameAssets and blueprintPath and self.umodelPath and umodelCwdPathInfo and gamePaksDirPathInfo:
+                                        # TODO: remove
+                                        if False:
+                                            sprint('Reading attachment blueprint...')
+                                        # try to load the attachment blueprint to discover the mesh
+                                        try:
+                                            saveFilePath = self.saveAsset(
+                                                gamePaksDirPathInfo['absolute'],
+                                                umodelCwdPathInfo['absolute'],
+                                                blueprintShortStemPath,
+                                                silent=True,
+                                            )
+                                        except Exception as e:
+                                            self.printError(e)
+                                            saveFilePath = None
 
-                                            if not combosRequired <= attachmentIdsSet:
-                                                shouldSkipCombo = True
-                                                break
+                                        if saveFilePath and checkInput():
+                                            try:
+                                                # TODO: remove
+                                                if False:
+                                                    sprint(f'Searching "{saveFilePath}"...')
+                                                saveFileDir = os.path.dirname(saveFilePath)
+                                                saveFileStem = os.path.basename(saveFilePath).removesuffix(UassetFilenameSuffix)
+                                                with tempFileHelpers.openTemporaryFile(
+                                                    saveFileDir,
+                                                    prefix=f'{saveFileStem}_',
+                                                    suffix='.json',
+                                                    deleteFirst=True,
+                                                ) as saveFileJsonFile:
+                                                    saveFileJsonPath = getPathInfo(saveFileJsonFile.name)['best']
+                                                    try:
+                                                        blueprintData = self.readDataFromUasset(
+                                                            saveFilePath,
+                                                            saveFileJsonPath,
+                                                            silent=True,
+                                                        )
+                                                    except Exception as e:
+                                                        blueprintData = None
+                                                        self.printError(e)
 
-                                    if shouldSkipCombo is None:
-                                        # allow all by default
-                                        shouldSkipCombo = False
+                                                    if blueprintData:
+                                                        if False:
+                                                            for name in blueprintData[NameMapFieldName]:
+                                                                if not checkInput():
+                                                                    break
+                                                                sprint(name)
+                                                        importGraph = ImportGraph(blueprintData.get(ImportsFieldName, []))
+                                                        animBlueprintShortStemPath = getShortenedAssetPath(
+                                                            importGraph.getAnimBlueprintPath()
+                                                        )
+                                                        sprint(f'  - Animation blueprint: {animBlueprintShortStemPath or "(none)"}')
+                                                        meshShortStemPath = getShortenedAssetPath(
+                                                            importGraph.getSkeletalMeshPath()
+                                                        )
+                                                        sprint(f'  - Attachment mesh: {meshShortStemPath or "(none)"}')
+                                                        if blueprintCacheScope is not None:
+                                                            self.blueprintCache.set(blueprintCacheScope, blueprintShortStemPath, {
+                                                                'animationBlueprint': animBlueprintShortStemPath,
+                                                                'attachmentMesh': meshShortStemPath,
+                                                            })
+                                                        if meshShortStemPath and self.shouldView:
+                                                            self.viewMesh(meshShortStemPath, gamePaksDirPathInfo, umodelCwdPathInfo, checkInput)
+
+                                                    checkInput(inBlueprintJson=True)
+                                            finally:
+                                                for path in getAssetSplitFilePaths(saveFilePath):
+                                                    pathlib.Path.unlink(path, missing_ok=True)
+
+                                    nameIsh = socketName
+                                    if not nameIsh and blueprintPath:
+                                        nameIsh = os.path.basename(blueprintPath)
+                                    if not nameIsh and skeletalMeshShortStemPath:
+                                        nameIsh = os.path.basename(skeletalMeshShortStemPath)
+                                    if not nameIsh and modelDisplayName:
+                                        nameIsh = modelDisplayName.replace(' ', '_')
+                                    if not nameIsh and modelName:
+                                        nameIsh = modelName
+
+                                    displayNameIsh = modelDisplayName
+                                    if not displayNameIsh and modelName:
+                                        displayNameIsh = modelName
+                                    if not displayNameIsh and nameIsh:
+                                        displayNameIsh = nameIsh
+
+                                    if extractingAttachments:
+                                        if attachmentIndex < len(attachmentNames):
+                                            attachmentId = attachmentNames[attachmentIndex]
+                                        else:
+                                            attachmentId = '_'.join([part for part in [nameIsh, f'{attachmentIndex + 1}'] if part])
 
-                                    if shouldSkipCombo:
-                                        if self.debug:
-                                            if modelBaseName not in combinationsSkipped:
-                                                combinationsSkipped[modelBaseName] = {}
-                                            if categoryName not in combinationsSkipped[modelBaseName]:
-                                                combinationsSkipped[modelBaseName][categoryName] = set()
-                                            combinationsSkipped[modelBaseName][categoryName].add(attachmentIdsSet)
-                                        continue
+                                        if attachmentIndex < len(attachmentDisplayNames):
+                                            attachmentDisplayName = attachmentDisplayNames[attachmentIndex]
+                                        else:
+                                            attachmentDisplayName = ' '.join(
+                                                part for part in [
+                                                    displayNameIsh,
+                                                    'Attachment' if len(socketAttachments) > 1 else '',
+                                                    f'{attachmentIndex + 1}/{len(socketAttachments)}' if len(socketAttachments) > 1 else '',
+                                                ] if part
+                                            )
+
+                                        filename = f'SocketAttachment_{modelBaseName}_{shortCategoryName}_{attachmentId}.yaml'
+                                        filePath = getPathInfo(os.path.join(self.ensureAttachmentsDir(), filename))['best']
+
+                                        if os.path.exists(filePath):
+                                            self.printWarning(f'Skipping attachment {attachmentIndex + 1} (file already exists): "{filePath}"', pad=False)
+                                        else:
+                                            sprint(f'{self.dryRunPrefix}Extracting attachment {attachmentIndex + 1}: {attachmentId} ({attachmentDisplayName}) to "{filePath}"')
+
+                                            attachmentInfo = {
+                                                'attachmentId': attachmentId,
+                                                'modelCategory': categoryName,
+                                                'displayName': attachmentDisplayName,
+                                                'associatedModelId': modelName,
+                                                'associatedCharacterId': associatedCharacterId,
+                                                'associatedCharacterMesh': meshAssetShortStemPath,
+                                                'animationBlueprint': animBlueprintShortStemPath,
+                                                'attachmentMesh': meshShortStemPath,
+                                                'attachmentData': attachmentData,
+                                            }
 
-                                    # TODO: maybe only do this if self.debug ?
-                                    if True:
-                                        if modelBaseName not in combinationsAdded:
-                                            combinationsAdded[modelBaseName] = {}
-                                        if categoryName not in combinationsAdded[modelBaseName]:
-                                            combinationsAdded[modelBaseName][categoryName] = set()
-                                        combinationsAdded[modelBaseName][categoryName].add(attachmentIdsSet)
-                                    comboCount += 1
-
-                                    attachmentNamesString = self.exportAttachmentsSeparator.join(attachmentIds)
-                                    attachmentDisplayNames = [getAttachmentDisplayName(a) for a in combo]
-                                    attachmentDisplayNamesString = ', '.join([name for name in attachmentDisplayNames if name])
-                                    newModelDisplayName = f'{modelDisplayNameBase}{f" ({attachmentDisplayNamesString})" if attachmentDisplayNamesString else ""}'
-                                    if True:
-                                        attachmentNamesHashed = md5Hash(attachmentNamesString).upper()
-                                        newModelId = f'{modelBaseName}_{shortCategoryName}_{attachmentNamesHashed}'
-                                    else:
-                                        # TODO: use UUID instead?
-                                        newModelId = f'{modelBaseName}_{shortCategoryName}_{attachmentNamesString}'
-                                    # TODO: warn if this ID has already been used
-                                    sprint(f"Making combo: {', '.join(attachmentIds)}")
-                                    newModel = copy.deepcopy(model)
-                                    newModelValues = getPropertyValue(newModel)
-                                    newModelIdProp = getModelIdProperty(newModelValues, self.gameVersion)
-                                    setPropertyValue(newModelIdProp, newModelId)
-                                    setModelName(newModel, newModelId)
+                                            if not self.dryRun:
+                                                with open(filePath, 'w', encoding='utf-8') as file:
+                                                    yamlDump(attachmentInfo, file)
 
-                                    newUiDataValues = getUiDataValues(newModelValues)
+                                            attachmentsCreated.append(filePath)
+                        elif mixingAttachments:
+                            if rules.isBaseModelSkipped(categoryName, modelBaseName):
+                                sprintPad()
+                                sprint(f'Skipping base model {categoryName}::{modelBaseName}')
+                                sprintPad()
+                                baseModelsRemoved.append(modelName)
+                            else:
+                                sprintPad()
+                                sprint(f'Adding base model {categoryName}::{modelBaseName}')
+                                sprintPad()
+                                if mixingPool is not None:
+                                    pendingMixedModels.append(((model,), None))
+                                else:
+                                    addMixedModel(model)
+
+                            if categoryName in attachmentsToMix:
+                                baseModelKey = f'{categoryName}::{modelName}'
+                                reusableModelIds = None
+                                if mixManifest is not None:
+                                    reusableModelIds = mixManifest.getReusableModelIds(
+                                        baseModelKey,
+                                        model,
+                                        rulesHashes[categoryName],
+                                        self.gameVersion,
+                                        self.exportAttachmentsSeparator,
+                                    )
+                                comboModelsArgs = (
+                                    model,
+                                    modelBaseName,
+                                    categoryName,
+                                    shortCategoryName,
+                                    getModelDisplayNameBase(modelDisplayName),
+                                )
+                                if mixingPool is not None:
+                                    pendingMixedModels.append((
+                                        (model, modelBaseName, categoryName, baseModelKey),
+                                        mixingPool.submit(mixModelInWorker, *comboModelsArgs, reusableModelIds=reusableModelIds),
+                                    ))
+                                    flushMixedModels()
+                                else:
+                                    addComboModels(model, modelBaseName, categoryName, baseModelKey, generateComboModels(
+                                        *comboModelsArgs,
+                                        attachmentsToMix[categoryName],
+                                        rules,
+                                        self.gameVersion,
+                                        self.exportAttachmentsSeparator,
+                                        reusableModelIds=reusableModelIds,
+                                        unchangedAttachmentIds=unchangedAttachmentIds[categoryName] if unchangedAttachmentIds is not None else None,
+                                    ))
+                    except Exception as e:
+                        self.printError(e)
+                        if mixingAttachments:
+                            failedModelCount += 1
 
-                                    newModelDisplayNameProp = getModelDisplayNameProperty(newUiDataValues)
-                                    newModelDisplayNameProp[ModelDisplayNamePropNameFieldName] = newModelDisplayName
+                if mixingPool is not None:
+                    try:
+                        flushMixedModels(waiting=True)
+                    finally:
+                        mixingPool.shutdown(cancel_futures=True)
 
-                                    if False:
-                                        newModelDisplayNameProp[ValueFieldName] = generateRandomHexString(32).upper()
-                                    elif False:
-                                        # TODO: use same algorithm unreal engine uses - this is not identical, but it seems to do the trick anyway
-                                        newModelDisplayNameProp[ValueFieldName] = sha256Hash(newModelDisplayName.lower()).upper()
-                                    else:
-                                        newModelDisplayNameProp[ValueFieldName] = md5Hash(newModelDisplayName.lower()).upper()
-
-                                    newSocketAttachmentsStruct = findSocketAttachmentsStruct(newModelValues)
-                                    newSocketAttachmentsStruct.pop('DummyStruct', None)
-                                    newSocketAttachments = getPropertyValue(newSocketAttachmentsStruct)
-
-                                    for attachment in combo:
-                                        # Correct the blueprint property name for different game versions
-                                        attachmentValues = getPropertyValue(attachment['attachmentData'])
-                                        blueprintAttachmentProperty = getAttachmentBlueprintProperty(attachmentValues)
-                                        if semver.VersionInfo.parse(self.gameVersion).match('>=6.5.2'):
-                                            if blueprintAttachmentProperty[NameFieldName] != AccessoryBlueprintName:
-                                                blueprintAttachmentProperty[NameFieldName] = AccessoryBlueprintName
-                                                if self.debug:
-                                                    sprint(f'- Changing attachment blueprint property name field to `{blueprintAttachmentProperty[NameFieldName]}`')
-                                        else:
-                                            if blueprintAttachmentProperty[NameFieldName] != AttachmentBlueprintName:
-                                                blueprintAttachmentProperty[NameFieldName] = AttachmentBlueprintName
-                                                if self.debug:
-                                                    sprint(f'- Changing attachment blueprint property name field to `{blueprintAttachmentProperty[NameFieldName]}`')
+                if modelIndexKey is not None and not self.dryRun:
+                    try:
+                        modelsIndex.save(modelIndexPath, modelIndexKey)
+                    except OSError as e:
+                        self.printWarning(f'Unable to write the model index "{modelIndexPath}": {e}')
 
-                                        newSocketAttachments.append(attachment['attachmentData'])
+                sprintPad()
+                sprint('Models processed.')
+                if mixManifest is not None and mixManifest.reusedCount:
+                    sprint(f'Reused {mixManifest.reusedCount} of {len(mixManifest.models)} combo models from the last mix.')
+                sprintPad()
 
-                                    # TODO: alter model icons and descriptions if specified
+            if mixingAttachments:
+                nameMapArray = customizationItemDb[NameMapFieldName]
+                nameMapArrayCopy = nameMapArray.copy()
+                nameMapArray.clear()
 
-                                    models.append(newModel)
-                            sprint(f'Created {comboCount} combos')
-                            sprintPad()
-                except Exception as e:
-                    self.printError(e)
-            sprintPad()
-            sprint('Models processed.')
-            sprintPad()
+                if verifyingNameMap:
+                    sprintPad()
+                    sprint(f'Verifying {NameMapFieldName}...')
+                    nameMapSetRewalked = getNameMapNames(customizationItemDb.get(ImportsFieldName, []))
+                    addAllToNameMap(customizationItemDb.get(ExportsFieldName, []), nameMapSetRewalked)
+                    if mixedModelsSpool is not None:
+                        for mixedModel in mixedModelsSpool:
+                            addAllToNameMap(mixedModel, nameMapSetRewalked)
+                    if nameMapSetRewalked == nameMapSet:
+                        sprint(f'{NameMapFieldName} verified.')
+                    else:
+                        self.printError(f'{NameMapFieldName} mismatch. Missing: {sorted(nameMapSetRewalked - nameMapSet)}. Extra: {sorted(nameMapSet - nameMapSetRewalked)}.')
+                    sprintPad()
 
-        if mixingAttachments:
-            nameMapArray = customizationItemDb[NameMapFieldName]
-            nameMapArrayCopy = nameMapArray.copy()
-            nameMapArray.clear()
-            nameMapSet = set()
-            addAllToNameMap(customizationItemDb.get(ImportsFieldName, []), nameMapSet)
-            addAllToNameMap(customizationItemDb.get(ExportsFieldName, []), nameMapSet)
-
-            if True:
-                # could other names be required?
-                for name in {
-                    'EnumProperty',
-                    'TextProperty',
-                    'ObjectProperty',
-                    'BoolProperty',
-                    'UInt32Property',
-                    'MapProperty',
-                    'IntProperty',
-                    'ArrayProperty',
-                    # only on UE 4.27 (>= EFog 6.5.2)?
-                    'FloatProperty',
-                    'ByteProperty',
-                }:
-                    nameMapSet.add(name)
-
-            # TODO: remove? doesn't seem to be required
-            if False:
-                customizationItemDbName = next((name for name in nameMapArrayCopy if name.startswith(f'{AssetPathGamePrefix}Data/Dlc/') and name.endswith(f'/{CustomizationItemDbAssetName}')), None)
-                if customizationItemDbName:
-                    nameMapSet.add(customizationItemDbName)
-
-            for name in nameMapSet:
-                nameMapArray.append(name)
-            nameMapArray.sort(key=lambda v: v.upper())
-
-            nameMapSetOld = set(nameMapArrayCopy)
-
-            nameMapNamesRemoved = nameMapSetOld - nameMapSet
-            nameMapNamesAdded = nameMapSet - nameMapSetOld
-
-            asset['nameMapAlterations'] = {
-                'namesAdded': nameMapNamesAdded,
-                'namesRemoved': nameMapNamesRemoved,
-            },
+                if True:
+                    # could other names be required?
+                    for name in {
+                        'EnumProperty',
+                        'TextProperty',
+                        'ObjectProperty',
+                        'BoolProperty',
+                        'UInt32Property',
+                        'MapProperty',
+                        'IntProperty',
+                        'ArrayProperty',
+                        # only on UE 4.27 (>= EFog 6.5.2)?
+                        'FloatProperty',
+                        'ByteProperty',
+                    }:
+                        nameMapSet.add(name)
+
+                # TODO: remove? doesn't seem to be required
+                if False:
+                    customizationItemDbName = next((name for name in nameMapArrayCopy if name.startswith(f'{AssetPathGamePrefix}Data/Dlc/') and name.endswith(f'/{CustomizationItemDbAssetName}')), None)
+                    if customizationItemDbName:
+                        nameMapSet.add(customizationItemDbName)
 
-            if self.debug:
-                sprintPad()
-                sprint(f'{NameMapFieldName} names removed:')
-                sprint(yamlDump(jsonifyDataRecursive(nameMapNamesRemoved)))
-                sprintPad()
+                for name in nameMapSet:
+                    nameMapArray.append(name)
+                nameMapArray.sort(key=lambda v: v.upper())
 
-            if self.debug:
-                sprintPad()
-                sprint(f'{NameMapFieldName} names added:')
-                sprint(yamlDump(jsonifyDataRecursive(nameMapNamesAdded)))
-                sprintPad()
+                nameMapSetOld = set(nameMapArrayCopy)
 
-        if upgrading or mixingAttachments:
-            if writingAlteredDb:
-                jsonOutPath = getPathInfo(os.path.join(
-                    settingsPathInfo['dir'],
-                    # TODO: make path unique if writing multiple CustomizationItemDB assets
-                    f"{settingsPathInfo['stem']}_{customizationItemDbPathInfo['stem']}-altered.json",
-                ))['best']
-                sprintPad()
-                sprint(f'{self.dryRunPrefix}Writing altered {CustomizationItemDbAssetName} to "{jsonOutPath}"...')
-                shouldWrite = not self.dryRun
-                written = False
-                if shouldWrite:
-                    if self.readyToWrite(jsonOutPath, overwrite=True, dryRunHere=False):
-                        with open(jsonOutPath, 'w', encoding='utf-8') as file:
-                            jsonDump(customizationItemDb, file, pretty=True)
-                            written = True
-                if written or self.dryRun:
-                    sprint(f'{self.dryRunPrefix if not written else ""}Done writing.')
-                sprintPad()
+                nameMapNamesRemoved = nameMapSetOld - nameMapSet
+                nameMapNamesAdded = nameMapSet - nameMapSetOld
 
-                if customizationItemDbPathInfo['suffixLower'] == UassetFilenameSuffix:
-                    customizationItemDbDestContentDir = None
-                    if customizationItemDbContentDirRelativePath is not None:
-                        customizationItemDbDestContentDir = getPathInfo(os.path.join(settingsPathInfo['dir'], f'{customizationItemDbPathInfo["stem"]}-{settingsPathInfo["stem"]}'))['best']
-                        customizationItemDbDestDir = getPathInfo(os.path.join(customizationItemDbDestContentDir, os.path.dirname(customizationItemDbContentDirRelativePath)))['best']
-                        customizationItemDbPathInfo = getPathInfo(os.path.join(customizationItemDbDestDir, customizationItemDbPathInfo['basename']))
+                asset['nameMapAlterations'] = {
+                    'namesAdded': nameMapNamesAdded,
+                    'namesRemoved': nameMapNamesRemoved,
+                },
 
+                if self.debug:
+                    sprintPad()
+                    sprint(f'{NameMapFieldName} names removed:')
+                    sprint(yamlDump(jsonifyDataRecursive(nameMapNamesRemoved)))
                     sprintPad()
-                    sprint(f'{self.dryRunPrefix}Writing altered {CustomizationItemDbAssetName} to "{customizationItemDbPathInfo["best"]}"...')
-                    if os.path.exists(self.uassetGuiPath):
-                        shouldWrite = not self.dryRun
-                        written = False
-                        if shouldWrite:
-                            if self.readyToWrite(customizationItemDbPathInfo['best'], dryRunHere=False):
-                                self.ensureDir(customizationItemDbPathInfo['dir'], f'{CustomizationItemDbAssetName} dest folder')
-                                jsonToUasset(jsonOutPath, customizationItemDbPathInfo['best'], self.uassetGuiPath)
-                                written = True
-                        if written or self.dryRun:
-                            sprint(f'{self.dryRunPrefix if not written else ""}Done writing.')
-                            if (
-                                customizationItemDbContentDirRelativePath is not None
-                                and customizationItemDbDestContentDir is not None
-                                and assetStemPathSourceFilesMap is not None
-                            ):
-                                assetStemPath = getAssetStemPathInfo(customizationItemDbContentDirRelativePath)['stemPath']
-                                assetStemPathSourceFilesMap[assetStemPath] = {
-                                    'contentDir': customizationItemDbDestContentDir,
-                                    'fileSuffixes': [UassetFilenameSuffix, UexpFilenameSuffix],
-                                }
-                                if self.debug:
-                                    sprintPad()
-                                    sprint(customizationItemDbContentDirRelativePath)
-                                    sprint(assetStemPath)
-                                    sprint(assetStemPathSourceFilesMap[assetStemPath])
-
-                        sprintPad()
-                    else:
-                        self.printError(f'`uassetGuiPath` "{self.uassetGuiPath}" does not exist')
 
                 if self.debug:
-                    yamlOutPath = getPathInfo(os.path.join(
+                    sprintPad()
+                    sprint(f'{NameMapFieldName} names added:')
+                    sprint(yamlDump(jsonifyDataRecursive(nameMapNamesAdded)))
+                    sprintPad()
+
+            if upgrading or mixingAttachments:
+                if writingAlteredDb and failedModelCount:
+                    # the mixed table is missing those models, so it must not replace the game's
+                    self.printError(f'Not writing altered {CustomizationItemDbAssetName}: {failedModelCount} models failed to mix')
+                elif writingAlteredDb:
+                    jsonOutPath = getPathInfo(os.path.join(
                         settingsPathInfo['dir'],
                         # TODO: make path unique if writing multiple CustomizationItemDB assets
-                        f"{settingsPathInfo['stem']}_{customizationItemDbPathInfo['stem']}-altered.yaml",
+                        f"{settingsPathInfo['stem']}_{customizationItemDbPathInfo['stem']}{self.outputNameSuffix}-altered.json",
                     ))['best']
                     sprintPad()
-                    sprint(f'{self.dryRunPrefix}Writing altered {CustomizationItemDbAssetName} to "{yamlOutPath}"...')
+                    sprint(f'{self.dryRunPrefix}Writing altered {CustomizationItemDbAssetName} to "{jsonOutPath}"...')
                     shouldWrite = not self.dryRun
                     written = False
                     if shouldWrite:
-                        if self.readyToWrite(yamlOutPath, overwrite=True, dryRunHere=False):
-                            with open(yamlOutPath, 'w', encoding='utf-8') as file:
-                                yamlDump(customizationItemDb, file)
+                        if self.readyToWrite(jsonOutPath, overwrite=True, dryRunHere=False):
+                            with open(jsonOutPath, 'w', encoding='utf-8') as file:
+                                if mixedModelsSpool is not None:
+                                    jsonDumpWithSpooledList(customizationItemDb, models, mixedModelsSpool, file, pretty=prettyJson)
+                                else:
+                                    jsonDump(customizationItemDb, file, pretty=prettyJson)
                                 written = True
                     if written or self.dryRun:
                         sprint(f'{self.dryRunPrefix if not written else ""}Done writing.')
                     sprintPad()
 
+                    if mixManifest is not None:
+                        sprintPad()
+                        sprint(f'{self.dryRunPrefix}Writing mix manifest to "{mixManifest.manifestPath}"...')
+                        if written:
+                            mixManifest.save(mixedModelsSpool)
+                        if written or self.dryRun:
+                            sprint(f'{self.dryRunPrefix if not written else ""}Done writing.')
+                        sprintPad()
+
+                    if customizationItemDbPathInfo['suffixLower'] == UassetFilenameSuffix:
+                        customizationItemDbDestContentDir = None
+                        if customizationItemDbContentDirRelativePath is not None:
+                            customizationItemDbDestContentDir = getPathInfo(os.path.join(settingsPathInfo['dir'], f'{customizationItemDbPathInfo["stem"]}-{settingsPathInfo["stem"]}{self.outputNameSuffix}'))['best']
+                            customizationItemDbDestDir = getPathInfo(os.path.join(customizationItemDbDestContentDir, os.path.dirname(customizationItemDbContentDirRelativePath)))['best']
+                            customizationItemDbPathInfo = getPathInfo(os.path.join(customizationItemDbDestDir, customizationItemDbPathInfo['basename']))
+
+                        sprintPad()
+                        sprint(f'{self.dryRunPrefix}Writing altered {CustomizationItemDbAssetName} to "{customizationItemDbPathInfo["best"]}"...')
+                        if os.path.exists(self.uassetGuiPath):
+                            shouldWrite = not self.dryRun
+                            written = False
+                            if shouldWrite:
+                                if self.readyToWrite(customizationItemDbPathInfo['best'], dryRunHere=False):
+                                    self.ensureDir(customizationItemDbPathInfo['dir'], f'{CustomizationItemDbAssetName} dest folder')
+                                    jsonToUasset(jsonOutPath, customizationItemDbPathInfo['best'], self.uassetGuiPath)
+                                    written = True
+                            if written or self.dryRun:
+                                sprint(f'{self.dryRunPrefix if not written else ""}Done writing.')
+                                if (
+                                    customizationItemDbContentDirRelativePath is not None
+                                    and customizationItemDbDestContentDir is not None
+                                    and assetStemPathSourceFilesMap is not None
+                                ):
+                                    assetStemPath = getAssetStemPathInfo(customizationItemDbContentDirRelativePath)['stemPath']
+                                    assetStemPathSourceFilesMap[assetStemPath] = {
+                                        'contentDir': customizationItemDbDestContentDir,
+                                        'fileSuffixes': [UassetFilenameSuffix, UexpFilenameSuffix],
+                                    }
+                                    if self.debug:
+                                        sprintPad()
+                                        sprint(customizationItemDbContentDirRelativePath)
+                                        sprint(assetStemPath)
+                                        sprint(assetStemPathSourceFilesMap[assetStemPath])
+
+                            sprintPad()
+                        else:
+                            self.printError(f'`uassetGuiPath` "{self.uassetGuiPath}" does not exist')
+
+                    if self.debug:
+                        yamlOutPath = getPathInfo(os.path.join(
+                            settingsPathInfo['dir'],
+                            # TODO: make path unique if writing multiple CustomizationItemDB assets
+                            f"{settingsPathInfo['stem']}_{customizationItemDbPathInfo['stem']}{self.outputNameSuffix}-altered.yaml",
+                        ))['best']
+                        sprintPad()
+                        sprint(f'{self.dryRunPrefix}Writing altered {CustomizationItemDbAssetName} to "{yamlOutPath}"...')
+                        shouldWrite = not self.dryRun
+                        written = False
+                        if shouldWrite:
+                            if self.readyToWrite(yamlOutPath, overwrite=True, dryRunHere=False):
+                                with open(yamlOutPath, 'w', encoding='utf-8') as file:
+                                    if mixedModelsSpool is not None:
+                                        yamlDumpWithSpooledList(customizationItemDb, models, mixedModelsSpool, file)
+                                    else:
+                                        yamlDump(customizationItemDb, file)
+                                    written = True
+                        if written or self.dryRun:
+                            sprint(f'{self.dryRunPrefix if not written else ""}Done writing.')
+                        sprintPad()
+
+            if blueprintCacheScope is not None and not self.dryRun:
+                try:
+                    self.blueprintCache.save()
+                except OSError as e:
+                    self.printWarning(f'Unable to write blueprint cache "{self.blueprintCache.path}": {e}')
+        finally:
+            if mixingPool is not None:
+                mixingPool.shutdown(cancel_futures=True)
+            if mixManifest is not None:
+                mixManifest.close()
+            if mixedModelsSpool is not None:
+                mixedModelsSpool.close()
+
         sprintPad()
         sprint('Done processing.')
         sprintPad()
 
-    def saveAsset(self, paksDir, destDir, assetPath, silent=False, setExitCode=True):
+    def viewMesh(self, meshShortStemPath, gamePaksDirPathInfo, umodelCwdPathInfo, checkInput):
+        fullMeshPath = f'{"" if meshShortStemPath.startswith("/") else AssetPathGamePrefix}{meshShortStemPath}{UassetFilenameSuffix}'
+        viewReturnCode = None
+        viewError = False
+        for viewStreamName, viewLine, viewStop in runUmodelCommand(
+            self.umodelPath,
+            [
+                '-view',
+                f'-game={self.getUmodelGameTag()}',
+                f'-path={gamePaksDirPathInfo["absolute"]}',
+                fullMeshPath,
+                # TODO: remove
+                #ClassNameSkeletalMesh,
+            ],
+            cwd=umodelCwdPathInfo['absolute'],
+            debug=self.debug,
+        ):
+            if not checkInput():
+                viewStop()
+            if viewStreamName == 'return_code':
+                viewReturnCode = viewLine
+            elif viewStreamName == 'stderr' and 'ERROR' in viewLine:
+                self.printError(viewLine)
+                viewError = viewLine
+            elif self.debug:
+                sprint(viewLine)
+        if viewReturnCode or viewError:
+            self.printError(f'Failed to view "{fullMeshPath}"')
+
+    def saveAsset(self, paksDir, destDir, assetPath, silent=False, setExitCode=True, printingErrors=True):
+        """Saves a game asset with umodel. Without `printingErrors` (e.g. on a worker thread), errors are only raised, never printed or prompted about."""
         assetPath = assetPath.removesuffix(UassetFilenameSuffix)
         assetStem = os.path.basename(assetPath)
 
@@ -1073,18 +1340,21 @@ class ModSwapCommandRunner():
             if saveStreamName == 'return_code':
                 saveReturnCode = saveLine
             elif saveStreamName == 'stderr' and 'ERROR' in saveLine:
-                self.printError(saveLine, setExitCode=setExitCode)
+                if printingErrors:
+                    self.printError(saveLine, setExitCode=setExitCode)
                 saveError = saveLine
                 saveStop()
         if saveReturnCode or saveError:
             message = f'Failed to extract "{packagePath}"'
+            if saveError and not printingErrors:
+                message = f'{message}: {saveError}'
             raise ValueError(message)
 
         saveFilePackageRelPath = packagePath.removeprefix('/')
         saveFilePath = normPath(os.path.join(umodelCwdPathInfo['best'], UmodelSaveFolderName, saveFilePackageRelPath))
         if not os.path.isfile(saveFilePath):
             message = f'Asset not saved to the expected location: "{saveFilePath}"'
-            if self.debug and not self.nonInteractive:
+            if printingErrors and self.debug and not self.nonInteractive:
                 self.printError(message)
                 promptToContinue()
             raise ValueError(message)
@@ -1094,6 +1364,507 @@ class ModSwapCommandRunner():
 
         return saveFilePath
 
+    def packAttachments(self, attachmentsLibraryPath, attachmentSnapshot=None, jobs=1):
+        """Packs the attachment definition files in `attachmentsDir` into the attachment library (replacing any with the same modelCategory and attachmentId)"""
+        sprintPad()
+        sprint(f'{self.dryRunPrefix}Packing attachments from "{self.attachmentsDir}" into "{attachmentsLibraryPath}"...')
+        if not os.path.isdir(self.attachmentsDir):
+            self.printError(f'`attachmentsDir` "{self.attachmentsDir}" does not exist')
+            return
+
+        attachmentFiles, _ = readAttachmentFiles(self.attachmentsDir, snapshot=attachmentSnapshot, jobs=jobs)
+        attachmentsToPack = []
+        for filename, attachmentData in attachmentFiles:
+            if isinstance(attachmentData, Exception):
+                self.printError(f'Could not read {filename}: {attachmentData}')
+            elif not attachmentData.get('attachmentId', None) or not attachmentData.get('modelCategory', None):
+                self.printError(f'Missing attachmentId or modelCategory in {filename}')
+            else:
+                attachmentsToPack.append((filename, attachmentData))
+
+        if not self.dryRun:
+            self.ensureDir(os.path.dirname(attachmentsLibraryPath) or '.', 'attachment library folder')
+            with AttachmentLibrary(attachmentsLibraryPath) as attachmentLibrary:
+                attachmentLibrary.writeAll(attachmentsToPack)
+                count = attachmentLibrary.getCount()
+            sprint(f'Packed {len(attachmentsToPack)} attachments. The library has {count} in all.')
+        else:
+            sprint(f'{self.dryRunPrefix}Would pack {len(attachmentsToPack)} attachments.')
+        sprintPad()
+
+    def unpackAttachments(self, attachmentsLibraryPath):
+        """Writes each attachment definition in the attachment library to its own file in `attachmentsDir`"""
+        sprintPad()
+        sprint(f'{self.dryRunPrefix}Unpacking attachments from "{attachmentsLibraryPath}" into "{self.attachmentsDir}"...')
+        if not os.path.isfile(attachmentsLibraryPath):
+            self.printError(f'Attachment library "{attachmentsLibraryPath}" does not exist')
+            return
+
+        with AttachmentLibrary(attachmentsLibraryPath) as attachmentLibrary:
+            attachmentFiles = attachmentLibrary.readAll()
+        attachmentsDir = self.ensureAttachmentsDir()
+        writtenCount = 0
+        for filename, attachmentData in attachmentFiles:
+            if not isValidAttachmentFilename(filename):
+                self.printError(f'Not unpacking attachment {attachmentData.get("attachmentId", None)} to invalid filename "{filename}"')
+                continue
+            filePath = normPath(os.path.join(attachmentsDir, filename))
+            if self.readyToWrite(filePath):
+                if not self.dryRun:
+                    with open(filePath, 'w', encoding='utf-8') as file:
+                        if filename.endswith('.json'):
+                            jsonDump(attachmentData, file, pretty=True)
+                        else:
+                            yamlDump(attachmentData, file)
+                writtenCount += 1
+        sprint(f'{self.dryRunPrefix}Unpacked {writtenCount} of {len(attachmentFiles)} attachments.')
+        sprintPad()
+
+    def newAttachmentDefinition(self):
+        attachment = copy.deepcopy(basicAttachmentTemplate)
+        attachmentValues = getPropertyValue(attachment['attachmentData'])
+        attachmentBlueprintProperty = getAttachmentBlueprintProperty(attachmentValues)
+        if semver.VersionInfo.parse(self.gameVersion).match('>=6.5.2'):
+            attachmentBlueprintProperty[NameFieldName] = AccessoryBlueprintName
+        assetPath = getAssetPathProperty(getPropertyValue(attachmentBlueprintProperty))
+        assetPath[AssetNameFieldName] = ''
+        return attachment, assetPath
+
+    def rewriteBlueprintJson(self, jsonString, replacements):
+        """Makes all of `replacements` in a blueprint's JSON (and gives it a new PackageGuid) in one pass"""
+        newPackageGuid = '{' + str(uuid.uuid4()).upper() + '}'
+        # all at once, so nothing replaced is replaced again
+        jsonString, replacedLocations = rewriteAssetJson(jsonString, replacements, newPackageGuid)
+        changedPackageGuid = False
+        replacedCounts = {}
+        for line, column, original, replacement in replacedLocations:
+            if original.startswith(f'"{PackageGuidFieldName}"'):
+                changedPackageGuid = True
+            else:
+                replacedCounts[original] = replacedCounts.get(original, 0) + 1
+        return jsonString, changedPackageGuid, replacedCounts, replacedLocations
+
+    def rewriteBlueprintJsonFile(self, jsonPath, replacements):
+        with open(jsonPath, 'r+', encoding='utf-8') as jsonFile:
+            jsonString, changedPackageGuid, replacedCounts, replacedLocations = self.rewriteBlueprintJson(jsonFile.read(), replacements)
+            jsonFile.seek(0)
+            jsonFile.truncate()
+            jsonFile.write(jsonString)
+        return changedPackageGuid, replacedCounts, replacedLocations
+
+    def extractBlueprintSource(self, blueprintShortStemPath, gamePaksDirPathInfo, tempDir):
+        """Extracts a blueprint and its animation blueprint and reads their JSON. Runs on a worker thread, so doesn't prompt or print."""
+        startTime = time.perf_counter()
+        source = {
+            'blueprintPackageStemPath': getPackageStemPath(blueprintShortStemPath),
+            'meshPackageStemPath': None,
+            'animBlueprintPackageStemPath': None,
+            'skeletonPackageStemPath': None,
+            'blueprintJson': None,
+            'animBlueprintJson': None,
+        }
+
+        def readAsset(packageStemPath):
+            saveFilePath = self.saveAsset(
+                gamePaksDirPathInfo['absolute'],
+                tempDir,
+                packageStemPath,
+                silent=True,
+                setExitCode=False,
+                printingErrors=False,
+            )
+            jsonPath = f'{saveFilePath.removesuffix(UassetFilenameSuffix)}{UassetJsonSuffix}'
+            uassetToJson(saveFilePath, jsonPath, self.uassetGuiPath, self.unrealEngineVersion)
+            with open(jsonPath, 'r', encoding='utf-8') as file:
+                jsonString = file.read()
+            return jsonString, json.loads(jsonString)
+
+        source['blueprintJson'], blueprintData = readAsset(source['blueprintPackageStemPath'])
+        importGraph = ImportGraph(blueprintData.get(ImportsFieldName, []))
+        source['meshPackageStemPath'] = getPackageStemPath(getShortenedAssetPath(importGraph.getSkeletalMeshPath()))
+        source['animBlueprintPackageStemPath'] = getPackageStemPath(getShortenedAssetPath(importGraph.getAnimBlueprintPath()))
+        if source['animBlueprintPackageStemPath']:
+            source['animBlueprintJson'], animBlueprintData = readAsset(source['animBlueprintPackageStemPath'])
+            source['skeletonPackageStemPath'] = getPackageStemPath(getShortenedAssetPath(
+                ImportGraph(animBlueprintData.get(ImportsFieldName, [])).getSkeletonPath()
+            ))
+
+        source['seconds'] = time.perf_counter() - startTime
+        return source
+
+    def writeBlueprintClone(self, source, cloneNames, destPaths, tempDir):
+        """Rewrites a blueprint's JSON for a clone and converts it back to uassets at `destPaths`. Runs on a worker thread."""
+        startTime = time.perf_counter()
+        replacements = getBlueprintCloneReplacements(
+            cloneNames,
+            source['blueprintPackageStemPath'],
+            meshPackageStemPath=source['meshPackageStemPath'],
+            animBlueprintPackageStemPath=source['animBlueprintPackageStemPath'],
+            skeletonPackageStemPath=source['skeletonPackageStemPath'],
+        )
+        result = {
+            'changedPackageGuids': True,
+            'replacedCounts': {},
+        }
+        for jsonKey, nameKey in (
+            ('blueprintJson', 'blueprintName'),
+            ('animBlueprintJson', 'animBlueprintName'),
+        ):
+            jsonString = source[jsonKey]
+            if jsonString is None:
+                continue
+
+            jsonString, changedPackageGuid, replacedCounts, _ = self.rewriteBlueprintJson(jsonString, replacements)
+            result['changedPackageGuids'] = result['changedPackageGuids'] and changedPackageGuid
+            for original, count in replacedCounts.items():
+                result['replacedCounts'][original] = result['replacedCounts'].get(original, 0) + count
+
+            destPath = destPaths.get(nameKey, None)
+            if not destPath:
+                continue
+            jsonPath = normPath(os.path.join(tempDir, f'{cloneNames[nameKey]}{UassetJsonSuffix}'))
+            with open(jsonPath, 'w', encoding='utf-8') as file:
+                file.write(jsonString)
+            jsonToUasset(jsonPath, destPath, self.uassetGuiPath)
+
+        result['seconds'] = time.perf_counter() - startTime
+        return result
+
+    def getBatchSettingsResources(self, settings, srcPakPath, pakingDir, extraContentDir, extractingAttachments, paking):
+        """The folders a batch settings file's run uses, with whether it writes to them, resolved like the run resolves them.
+        Batch settings files sharing a folder one of them writes to can't run in parallel."""
+        resources = {}
+
+        def addResource(path, writes):
+            if path:
+                # Windows paths aren't case sensitive
+                key = getPathInfo(path)['absolute'].lower()
+                resources[key] = resources.get(key, False) or writes
+
+        pakingDir = settings.get('pakingDir', pakingDir) or f'{DefaultPakingDir}-{self.gameVersion}'
+        srcPakPath = (settings.get('srcPakPath', None) or '').strip() or srcPakPath
+        pakNumbers = set()
+        if srcPakPath:
+            if os.path.isdir(srcPakPath):
+                addResource(srcPakPath, False)
+            else:
+                # unpaked into the paking folder
+                srcPakStem = getPathInfo(srcPakPath)['stem']
+                addResource(os.path.join(pakingDir, srcPakStem), True)
+                srcPakFilenameParts = pakchunkRefnameToParts(srcPakStem)
+                if srcPakFilenameParts:
+                    pakNumbers.add(srcPakFilenameParts['number'])
+        destPakNumber = int(settings.get('destPakNumber', -1))
+        if destPakNumber >= 0:
+            pakNumbers.add(destPakNumber)
+        for pakNumber in pakNumbers:
+            # the pakchunk's folders and files in the paking folder, whatever their name and platform
+            addResource(os.path.join(pakingDir, pakchunkRefnamePartsToRefname(pakNumber, addSuffix=False)), True)
+        # paking converts UAssetGUI JSON files in it
+        addResource(extraContentDir or settings.get('extraContentDir', ''), paking)
+        addResource(settings.get('attachmentsDir', self.attachmentsDir) or f'{DefaultAttachmentsDir}-{self.gameVersion}', extractingAttachments)
+        return resources
+
+    def getSrcPakExtractionPatterns(self,
+        customizationItemDbPath,
+        destPakAssets,
+        inspecting,
+        extractingAttachments,
+        upgradingMods,
+        mixingAttachments,
+        paking,
+        expandingAssetDependencies,
+    ):
+        """The content folder relative globs of the source pakchunk files needed, or None if it all needs extracting.
+        When paking without `destPakAssets` (e.g. `upgrade pak`), only the assets upgraded or mixed are needed at first:
+        the rest of the pakchunk is carried over to the destination pak afterwards (see `carryOverSrcPakAssets`)."""
+        if inspecting or extractingAttachments:
+            self.printWarning('Extracting the whole source pakchunk, since inspecting and extracting attachments use all of its content')
+            return None
+        if paking and expandingAssetDependencies:
+            self.printWarning('Extracting the whole source pakchunk, since the assets to pak are only known after extracting it (`expandingAssetDependencies` is enabled)')
+            return None
+        if paking and destPakAssets is None and not (upgradingMods or mixingAttachments):
+            self.printWarning('Extracting the whole source pakchunk, since all of it is paked (missing `destPakAssets`)')
+            return None
+
+        patterns = []
+        if upgradingMods or mixingAttachments:
+            customizationItemDbContentDirRelativePath = getContentDirRelativePath(getPathInfo(customizationItemDbPath)['normalized']) if customizationItemDbPath else None
+            if customizationItemDbContentDirRelativePath is None:
+                self.printWarning('Extracting the whole source pakchunk, since `customizationItemDbPath` is not a content folder relative path')
+                return None
+            if not getPathInfo(customizationItemDbContentDirRelativePath)['suffixLower']:
+                customizationItemDbContentDirRelativePath = f'{customizationItemDbContentDirRelativePath}{UassetFilenameSuffix}'
+            patterns.append(customizationItemDbContentDirRelativePath)
+        if paking and destPakAssets is not None:
+            patterns.extend(f'{getPathInfo(asset)["normalized"]}.*' for asset in destPakAssets)
+        return patterns
+
+    def carryOverSrcPakAssets(self, srcPakPath, srcPakDir, srcPakContentDir, gameName, unrealPakPath, srcPakEntries, srcPakAssetEntries, contentIndex):
+        """Extracts the source pakchunk assets left out by a selective extraction (found in its file list),
+        and indexes them in its content folder, so that paking it again leaves nothing out"""
+        assetEntries = {
+            stemPath: entries
+            for stemPath, entries in getPakAssetEntries(srcPakEntries, gameName).items()
+            if stemPath not in srcPakAssetEntries
+        }
+        if not assetEntries:
+            return
+
+        sprintPad()
+        sprint(f'Unpaking the other {len(assetEntries)} assets from "{srcPakPath}" to "{srcPakDir}", to carry them over...')
+        checkInput = self.startKeyboardListener()
+        try:
+            unrealUnpakAssets(srcPakPath, srcPakDir, gameName, unrealPakPath, srcPakEntries, assetEntries, debug=self.debug, checkInput=checkInput)
+        finally:
+            self.stopKeyboardListener()
+        contentIndex.extend(
+            srcPakContentDir,
+            [getPakContentRelativePath(entry, gameName) for entries in assetEntries.values() for entry in entries],
+            keepingUnrecognized=True,
+        )
+        srcPakAssetEntries.update(assetEntries)
+        sprint('Done unpaking.')
+        sprintPad()
+
+    def expandAssetDependencies(self, assets, assetStemPathSourceFilesMap, settingsDir, importsCache=None, jobs=4):
+        """Adds the assets imported by `assets` (and by those, and so on) that are in the source content folders.
+        Imports are read from each asset's UAssetGUI JSON file, or by converting it (cached by file size and modification time).
+        Returns the expanded asset list and the dependency edges (importing asset, imported asset)."""
+        sprintPad()
+        sprint(f'Expanding {len(assets)} assets to pak with the assets they import...')
+        missingUassetGui = not os.path.isfile(self.uassetGuiPath or '')
+        cacheUpdates = []
+
+        with tempfile.TemporaryDirectory(dir=settingsDir, prefix='assetImports_') as tempDir:
+            def getImports(asset):
+                sourceFilesInfo = assetStemPathSourceFilesMap.get(asset, None)
+                suffix = next((s for s in DependencyFileSuffixes if s in (sourceFilesInfo or {}).get('fileSuffixes', [])), None)
+                if suffix is None:
+                    return []
+
+                contentDir = sourceFilesInfo['contentDir']
+                jsonPath = os.path.join(contentDir, f'{asset}{UassetJsonSuffix}')
+                if suffix == UassetFilenameSuffix and os.path.isfile(jsonPath):
+                    return readAssetGameImports(None, jsonPath, None, None)
+
+                assetPath = os.path.join(contentDir, f'{asset}{suffix}')
+                stat = os.stat(assetPath)
+                cacheKey = f'{asset}{suffix}'
+                cached = importsCache.get(contentDir, cacheKey) if importsCache is not None else None
+                if cached and cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime_ns:
+                    return cached['imports']
+                if missingUassetGui:
+                    return []
+
+                imports = readAssetGameImports(
+                    assetPath,
+                    os.path.join(tempDir, f'{uuid.uuid4().hex}{UassetJsonSuffix}'),
+                    self.uassetGuiPath,
+                    self.unrealEngineVersion,
+                )
+                cacheUpdates.append((contentDir, cacheKey, {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'imports': imports}))
+                return imports
+
+            allAssets, addedAssets, edges, errors = getAssetDependencyClosure(
+                assets,
+                getImports,
+                lambda asset: asset in assetStemPathSourceFilesMap,
+                jobs=jobs,
+            )
+
+        for asset, error in errors:
+            self.printWarning(f'Unable to read the imports of "{asset}" (paking it without its imports): {error}')
+
+        if missingUassetGui:
+            self.printWarning(f'`uassetGuiPath` "{self.uassetGuiPath}" does not exist. Only read imports from UAssetGUI JSON files and the imports cache.')
+
+        if importsCache is not None and cacheUpdates and not self.dryRun:
+            for contentDir, cacheKey, value in cacheUpdates:
+                importsCache.set(contentDir, cacheKey, value)
+            try:
+                importsCache.save()
+            except OSError as e:
+                self.printWarning(f'Unable to write asset imports cache "{importsCache.path}": {e}')
+
+        if self.debug:
+            sprintPad()
+            sprint(f'Dependency edges ({len(edges)}):')
+            for asset, importedAsset in edges:
+                sprint(f'{asset} -> {importedAsset}')
+            sprintPad()
+
+        importedBy = {}
+        for asset, importedAsset in edges:
+            importedBy.setdefault(importedAsset, asset)
+        sprint(f'Added {len(addedAssets)} imported assets ({len(cacheUpdates)} converted to read imports):')
+        for i, asset in enumerate(addedAssets):
+            sprint(f'{i + 1} - {asset} (imported by {importedBy[asset]})')
+        sprint('Done expanding.')
+        sprintPad()
+
+        return allAssets, edges
+
+    def cloneBlueprints(self, blueprintClones, gamePaksDirPathInfo, extraContentDir, settingsDir, jobs=1):
+        """Clones attachment blueprints for new skeletal meshes and writes their attachment definitions, without prompting"""
+        sprintPad()
+        sprint(f'{self.dryRunPrefix}Cloning {len(blueprintClones)} attachment blueprint{"" if len(blueprintClones) == 1 else "s"}...')
+        sprintPad()
+
+        clones = []
+        # each clone's attachment definition is named by its attachmentId, and its blueprints by its mesh,
+        # so two clones sharing either would write the same files from different worker threads
+        attachmentIdIndexes = {}
+        blueprintPathIndexes = {}
+        for i, clone in enumerate(blueprintClones):
+            missingKeys = [key for key in ('blueprint', 'mesh', 'modelCategory', 'attachmentId') if not clone.get(key, None)]
+            if missingKeys:
+                self.printError(f'`blueprintClones` item {i} is missing {", ".join(missingKeys)}')
+                continue
+            if clone['modelCategory'] not in AttachmentModelCategories:
+                self.printError(f'`blueprintClones` item {i} has unsupported modelCategory: {clone["modelCategory"]}')
+                continue
+            cloneNames = getBlueprintCloneNames(clone['mesh'].strip())
+            attachmentIdKey = getAttachmentFilename(clone['attachmentId']).lower()
+            blueprintPathKey = cloneNames['blueprintPackageStemPath'].lower()
+            if attachmentIdKey in attachmentIdIndexes:
+                self.printError(f'`blueprintClones` item {i} has the same attachmentId as item {attachmentIdIndexes[attachmentIdKey]}: {clone["attachmentId"]}')
+                continue
+            if blueprintPathKey in blueprintPathIndexes:
+                self.printError(f'`blueprintClones` item {i} would write the same blueprints as item {blueprintPathIndexes[blueprintPathKey]}: {cloneNames["blueprintPackageStemPath"]}')
+                continue
+            attachmentIdIndexes[attachmentIdKey] = i
+            blueprintPathIndexes[blueprintPathKey] = i
+            clones.append({
+                **clone,
+                'blueprintShortStemPath': getShortenedAssetPath(clone['blueprint'].strip()),
+                'cloneNames': cloneNames,
+            })
+
+        if not clones:
+            return
+
+        extraContentDir = self.ensureDir(extraContentDir, '`extraContentDir`')
+        attachmentsDir = self.ensureAttachmentsDir()
+        sources = {}
+        with tempfile.TemporaryDirectory(dir=settingsDir, prefix='blueprintClones_') as tempDir:
+            # each blueprint is extracted once, however many clones are made of it
+            blueprintShortStemPaths = list(dict.fromkeys(clone['blueprintShortStemPath'] for clone in clones))
+            sprint(f'Extracting {len(blueprintShortStemPaths)} blueprint{"" if len(blueprintShortStemPaths) == 1 else "s"}...')
+            with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+                futures = {}
+                for i, blueprintShortStemPath in enumerate(blueprintShortStemPaths):
+                    sourceTempDir = os.path.join(tempDir, f'source{i}')
+                    os.makedirs(sourceTempDir)
+                    futures[blueprintShortStemPath] = executor.submit(
+                        self.extractBlueprintSource,
+                        blueprintShortStemPath,
+                        gamePaksDirPathInfo,
+                        sourceTempDir,
+                    )
+                for blueprintShortStemPath, future in futures.items():
+                    try:
+                        sources[blueprintShortStemPath] = future.result()
+                    except Exception as e:
+                        self.printError(e)
+                        self.printError(f'Failed to extract blueprint "{blueprintShortStemPath}"')
+            sprint('Done extracting.')
+            sprintPad()
+
+            # prompts and overwrite checks happen here, before any work is handed to the pool
+            jobsByClone = []
+            for clone in clones:
+                source = sources.get(clone['blueprintShortStemPath'], None)
+                if not source:
+                    continue
+                cloneNames = clone['cloneNames']
+                blueprintsDir = normPath(os.path.join(extraContentDir, cloneNames['assetGameRelBaseDir'], 'Blueprints'))
+                destPaths = {}
+                for nameKey in ('blueprintName', 'animBlueprintName'):
+                    destPath = normPath(os.path.join(blueprintsDir, f'{cloneNames[nameKey]}{UassetFilenameSuffix}'))
+                    if self.readyToWrite(destPath):
+                        destPaths[nameKey] = destPath
+                if destPaths:
+                    self.ensureDir(blueprintsDir, 'new Blueprints dest folder')
+                jobsByClone.append((clone, source, destPaths))
+
+            sprint(f'{self.dryRunPrefix}Writing {len(jobsByClone)} blueprint clone{"" if len(jobsByClone) == 1 else "s"}...')
+            results = {}
+            with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+                futures = {}
+                for i, (clone, source, destPaths) in enumerate(jobsByClone):
+                    if self.dryRun:
+                        # still rewritten, to report what would be replaced
+                        destPaths = {}
+                    cloneTempDir = os.path.join(tempDir, f'clone{i}')
+                    os.makedirs(cloneTempDir)
+                    futures[clone['attachmentId']] = executor.submit(
+                        self.writeBlueprintClone,
+                        source,
+                        clone['cloneNames'],
+                        destPaths,
+                        cloneTempDir,
+                    )
+                for attachmentId, future in futures.items():
+                    try:
+                        results[attachmentId] = future.result()
+                    except Exception as e:
+                        self.printError(e)
+                        self.printError(f'Failed to write blueprint clone for "{attachmentId}"')
+            sprint(f'{self.dryRunPrefix}Done writing.')
+            sprintPad()
+
+        allBlueprintAssets = []
+        allModelAssets = []
+        for clone, source, destPaths in jobsByClone:
+            result = results.get(clone['attachmentId'], None)
+            if not result:
+                continue
+            cloneNames = clone['cloneNames']
+            if not result['changedPackageGuids']:
+                self.printWarning(f'No {PackageGuidFieldName} found to change for "{clone["attachmentId"]}"')
+            if self.debug:
+                for original, count in result['replacedCounts'].items():
+                    sprint(f'{clone["attachmentId"]}: replaced "{original}" {count} time{"" if count == 1 else "s"}')
+
+            attachment, assetPath = self.newAttachmentDefinition()
+            attachment['modelCategory'] = clone['modelCategory']
+            attachment['attachmentId'] = clone['attachmentId']
+            attachment['displayName'] = clone.get('displayName', None)
+            assetPath[AssetNameFieldName] = f'{cloneNames["blueprintPackageStemPath"]}.{cloneNames["blueprintName"]}{ClassSuffix}'
+            filePath = normPath(os.path.join(attachmentsDir, getAttachmentFilename(clone['attachmentId'])))
+            if self.readyToWrite(filePath):
+                sprint(f'{self.dryRunPrefix}Writing attachment definition to "{filePath}"...')
+                if not self.dryRun:
+                    with open(filePath, 'w', encoding='utf-8') as file:
+                        yamlDump(attachment, file)
+
+            blueprintAssets, modelAssets = getBlueprintCloneDestPakAssets(cloneNames)
+            allBlueprintAssets += blueprintAssets
+            allModelAssets += modelAssets
+
+        sprintPad()
+        sprint('New asset paths (can add to `destPakAssets`):')
+        sprintPad()
+        sprint('# attachment blueprint assets (saved in `extraContentDir`)')
+        for path in allBlueprintAssets:
+            sprint(f'- {path}')
+        sprint('# attachment model assets (cooked in unreal engine)')
+        for path in allModelAssets:
+            sprint(f'- {path}')
+        sprintPad()
+
+        sprint('Blueprint clones:')
+        for clone, source, destPaths in jobsByClone:
+            result = results.get(clone['attachmentId'], None)
+            status = f'{source["seconds"]:.2f}s extracting, {result["seconds"]:.2f}s writing' if result else 'failed'
+            sprint(f'- {clone["attachmentId"]}: {clone["cloneNames"]["blueprintName"]} ({status})')
+        for clone in clones:
+            if clone['blueprintShortStemPath'] not in sources:
+                sprint(f'- {clone["attachmentId"]}: failed to extract {clone["blueprintShortStemPath"]}')
+        sprintPad()
+
     def runCommand(self, **kwargs):
         """ Main entry point of the app """
 
@@ -1103,6 +1874,8 @@ class ModSwapCommandRunner():
         creatingAttachments = kwargs.get('creatingAttachments', False)
         extractingAttachments = kwargs.get('extractingAttachments', False)
         renamingAttachmentFiles = kwargs.get('renamingAttachmentFiles', False)
+        packingAttachments = kwargs.get('packingAttachments', False)
+        unpackingAttachments = kwargs.get('unpackingAttachments', False)
         mixingAttachments = kwargs.get('mixingAttachments', False)
         upgradingMods = kwargs.get('upgradingMods', False)
         paking = kwargs.get('paking', False)
@@ -1132,8 +1905,12 @@ class ModSwapCommandRunner():
         srcPakPath = (kwargs.get('srcPakPath', None) or '').strip()
         customizationItemDbPath = (kwargs.get('customizationItemDbPath', None) or '').strip()
         self.isBatchMode = kwargs.get('isBatchMode', False)
+        # added to the names of outputs written next to the settings file (e.g. when several runs share a settings file)
+        self.outputNameSuffix = kwargs.get('outputNameSuffix', None) or ''
+        # where to write the command results instead of next to the settings file (e.g. when several runs share a settings file)
+        resultsFilePath = kwargs.get('resultsFilePath', None)
 
-        # TODO: attachmemt filters: characterID(s), item role(s), attachment type(s)
+        # TODO: attachmemt filters: item role(s), attachment type(s)
         # TODO: be able to specify regex and case insensitivity
         prevSearchResume = None
         searchPakchunkNameMatchers = None
@@ -1163,6 +1940,7 @@ class ModSwapCommandRunner():
         self.dryRunPrefix = self.DryRunPrefix if self.dryRun else ''
 
         self.wroteResults = False
+        self.results = None
 
         launcherClearsScreenBuffer = False
         if launcherStartsGame is None:
@@ -1213,11 +1991,16 @@ class ModSwapCommandRunner():
         srcPakDir = ''
         srcPakDirAlreadyExisted = None
         srcPakDirWasWritten = False
+        # the source pakchunk's listed files, and those extracted by asset stem path (when extracted selectively)
+        srcPakEntries = None
+        srcPakAssetEntries = None
         srcPakNumber = -1
         srcPakName = None
         srcPakPlatform = None
         srcPakPlatformSuffix = None
-        assetStemPathSourceFilesMap = {}
+        contentIndex = ContentIndex()
+        contentDirsToIndex = []
+        assetStemPathSourceFilesMap = contentIndex.sourceFiles
         srcPakContentDir = ''
         srcPakContentPaths = []
         srcPakContentAssetPathsMap = {}
@@ -1225,6 +2008,7 @@ class ModSwapCommandRunner():
         destPakName = ''
         destPakPlatformSuffix = ''
         destPakAssets = None
+        destPakAssetDependencies = []
 
         destPakStem = ''
         destPakDir = ''
@@ -1293,28 +2077,158 @@ class ModSwapCommandRunner():
 
             settingsBatch = settings.get('batch', [])
             if settingsBatch:
+                batchIndex = None
+                if (
+                    paking
+                    and settings.get('targetedBatchPaking', True)
+                    and not self.dryRun
+                    and not (inspecting or extractingAttachments or upgradingMods or mixingAttachments or searchingGameAssets)
+                ):
+                    batchIndex = BatchIndex(getBatchIndexFilePath(settingsFilePath))
+                    batchIndex.load()
+                    reverseIndex = batchIndex.findChangedAssets()
+                    sprintPad()
+                    sprint(f'{len(batchIndex.changedAssets)} of {len(reverseIndex)} assets paked by this batch changed since last paked.')
+                    if self.debug:
+                        for contentDir, stemPath in sorted(batchIndex.changedAssets):
+                            sprint(f'- "{stemPath}" ({len(reverseIndex[(contentDir, stemPath)])} mod(s)) in "{contentDir}"')
+                    sprintPad()
+
+                skippedBatchSettingsFiles = []
+                # (settings file path, batch index key, settings hash, source pakchunk path) of each batch settings file to run
+                batchEntries = []
                 for otherSettingsFilePath in settingsBatch:
+                    if batchIndex is None:
+                        batchEntries.append((otherSettingsFilePath, None, None, None))
+                        continue
                     try:
-                        sprintPad()
-                        sprint(f'Running batch settings file "{otherSettingsFilePath}"...')
-                        sprintPad()
-                        otherRunner = ModSwapCommandRunner()
-                        otherExitCode = otherRunner.runCommand(**{
-                            **kwargs,
-                            'settingsFilePath': otherSettingsFilePath,
-                            'isBatchMode': True,
-                            'installingMods': False,
-                            'openingGameLauncher': False,
-                            'killingGame': False,
-                            'creatingAttachments': False,
-                            'renamingAttachmentFiles': False,
-                        })
-                        if otherExitCode:
-                            raise ValueError(f'Error running batch settings file "{otherSettingsFilePath}"')
-                        sprintPad()
-                        sprint(f'Done running batch settings file "{otherSettingsFilePath}".')
+                        otherSettingsFileKey = getPathInfo(otherSettingsFilePath)['best']
+                        otherSettings = readSettingsRecursive(otherSettingsFilePath, silent=True)
+                        otherSettingsHash = getSettingsHash(otherSettings)
+                        otherSrcPakPath = getPathInfo((otherSettings.get('srcPakPath', None) or '').strip() or srcPakPath)['best']
+                        staleReason = batchIndex.getStaleReason(otherSettingsFileKey, otherSettingsHash, otherSrcPakPath)
                     except Exception as e:
                         self.printError(e)
+                        continue
+                    if not staleReason:
+                        skippedBatchSettingsFiles.append(otherSettingsFilePath)
+                        continue
+                    if self.debug:
+                        sprint(f'Paking batch settings file "{otherSettingsFilePath}" again ({staleReason})')
+                    batchEntries.append((otherSettingsFilePath, otherSettingsFileKey, otherSettingsHash, otherSrcPakPath))
+
+                batchKwargs = {
+                    **kwargs,
+                    'isBatchMode': True,
+                    'batchJobs': 1,
+                    'resultsFilePath': None,
+                    # installing and launching happen once, after the whole batch
+                    'installingMods': False,
+                    'openingGameLauncher': False,
+                    'killingGame': False,
+                    'creatingAttachments': False,
+                    'renamingAttachmentFiles': False,
+                    'packingAttachments': False,
+                    'unpackingAttachments': False,
+                }
+                batchJobs = int(kwargs.get('batchJobs', None) or settings.get('batchJobs', 1))
+                runningBatchInParallel = batchJobs != 1 and len(batchEntries) > 1
+                if runningBatchInParallel:
+                    # batch settings files sharing a source pakchunk or a folder one of them writes run one after another, in one worker
+                    batchEntryResources = []
+                    for otherSettingsFilePath, _, _, _ in batchEntries:
+                        try:
+                            batchEntryResources.append(self.getBatchSettingsResources(
+                                readSettingsRecursive(otherSettingsFilePath, silent=True),
+                                srcPakPath,
+                                pakingDir,
+                                extraContentDir,
+                                extractingAttachments,
+                                paking,
+                            ))
+                        except Exception:
+                            # reported when it runs
+                            batchEntryResources.append(None)
+                    batchGroups = getBatchEntryGroups(batchEntryResources)
+                    runningBatchInParallel = len(batchGroups) > 1
+                if runningBatchInParallel:
+                    sprintPad()
+                    sprint(f'Running {len(batchEntries)} batch settings files in parallel (up to {batchJobs or os.cpu_count()} at a time)...')
+                    for batchGroup in batchGroups:
+                        if len(batchGroup) > 1:
+                            sprint(f'These share folders, so run one after another: {", ".join(batchEntries[i][0] for i in batchGroup)}')
+                    sprintPad()
+                    # workers can't prompt, and their output is replayed in batch order as each finishes
+                    batchExecutor = ProcessPoolExecutor(max_workers=batchJobs or None)
+                    # the future of each batch entry's group, and the entry's place in it
+                    batchFutures = [None] * len(batchEntries)
+                    for batchGroup in batchGroups:
+                        batchGroupFuture = batchExecutor.submit(runSettingsFiles, [
+                            {
+                                **batchKwargs,
+                                'settingsFilePath': batchEntries[i][0],
+                                'nonInteractive': True,
+                            }
+                            for i in batchGroup
+                        ], capturingOutput=True)
+                        for groupIndex, i in enumerate(batchGroup):
+                            batchFutures[i] = (batchGroupFuture, groupIndex)
+                elif batchJobs != 1 and len(batchEntries) > 1:
+                    sprintPad()
+                    sprint('Running batch settings files one after another, since they all share folders.')
+                    sprintPad()
+
+                try:
+                    for batchEntryIndex, (otherSettingsFilePath, otherSettingsFileKey, otherSettingsHash, otherSrcPakPath) in enumerate(batchEntries):
+                        try:
+                            sprintPad()
+                            sprint(f'Running batch settings file "{otherSettingsFilePath}"...')
+                            sprintPad()
+                            if runningBatchInParallel:
+                                batchGroupFuture, groupIndex = batchFutures[batchEntryIndex]
+                                otherExitCode, otherOutput, otherResults = batchGroupFuture.result()[groupIndex]
+                                sprint(otherOutput, end='')
+                            else:
+                                otherExitCode, _, otherResults = runSettingsFile({
+                                    **batchKwargs,
+                                    'settingsFilePath': otherSettingsFilePath,
+                                })
+                            if batchIndex is not None:
+                                otherResults = otherResults or {}
+                                if otherExitCode or not otherResults.get('destPakPath', None):
+                                    batchIndex.removeEntry(otherSettingsFileKey)
+                                else:
+                                    batchIndex.setEntry(
+                                        otherSettingsFileKey,
+                                        otherSettingsHash,
+                                        otherSrcPakPath,
+                                        otherResults['destPakPath'],
+                                        {
+                                            contentDir: assets
+                                            for contentDir, assets in otherResults['sourceDirDestAssets'].items()
+                                            # assets from the source pakchunk are covered by its size and modification time
+                                            if contentDir != otherResults['srcPakContentDir']
+                                        },
+                                        [contentDir for contentDir in otherResults['contentDirs'] if contentDir != otherResults['srcPakContentDir']],
+                                    )
+                                    batchIndex.save()
+                            if otherExitCode:
+                                raise ValueError(f'Error running batch settings file "{otherSettingsFilePath}"')
+                            sprintPad()
+                            sprint(f'Done running batch settings file "{otherSettingsFilePath}".')
+                        except Exception as e:
+                            self.printError(e)
+                finally:
+                    if runningBatchInParallel:
+                        batchExecutor.shutdown(cancel_futures=True)
+
+                if batchIndex is not None:
+                    batchIndex.save()
+                    sprintPad()
+                    sprint(f'Skipped {len(skippedBatchSettingsFiles)} unchanged batch settings file(s){":" if skippedBatchSettingsFiles else "."}')
+                    for otherSettingsFilePath in skippedBatchSettingsFiles:
+                        sprint(f'- {otherSettingsFilePath}')
+                    sprintPad()
 
             srcPakPath = getPathInfo((settings.get('srcPakPath', None) or '').strip() or srcPakPath)['best']
             if not srcPakPath and inspecting:
@@ -1416,6 +2330,8 @@ class ModSwapCommandRunner():
                     or extractingAttachments
                     or creatingAttachments
                     or renamingAttachmentFiles
+                    or packingAttachments
+                    or unpackingAttachments
                     or mixingAttachments
                 ):
                     self.printWarning(f'Missing or empty `attachmentsDir`. Defaulting to "{self.attachmentsDir}"')
@@ -1638,6 +2554,59 @@ class ModSwapCommandRunner():
             if self.searchingSlots is None:
                 self.searchingSlots = False
 
+            verifyingNameMap = settings.get('verifyingNameMap', False)
+            prettyJson = settings.get('prettyJson', False)
+            mixingJobs = int(settings.get('mixingJobs', 1))
+            incrementalMixing = settings.get('incrementalMixing', False)
+            compactRecords = settings.get('compactRecords', False)
+            blueprintClones = settings.get('blueprintClones', None) or []
+            attachmentsSnapshotPath = settings.get('attachmentsSnapshotPath', None)
+            if attachmentsSnapshotPath is None:
+                attachmentsSnapshotPath = os.path.join(settingsPathInfo['dir'], DefaultAttachmentsSnapshotFilename)
+            attachmentSnapshot = AttachmentSnapshot(getPathInfo(attachmentsSnapshotPath, relativeDir=settingsDir)['absolute'], self.attachmentsDir) if attachmentsSnapshotPath else None
+            attachmentJobs = int(settings.get('attachmentJobs', 1))
+            attachmentsLibraryPath = getPathInfo(settings.get('attachmentsLibrary', None) or '')['best']
+            cloningJobs = int(settings.get('cloningJobs', 4))
+            stagingStrategy = settings.get('stagingStrategy', None) or DefaultStagingStrategy
+            if stagingStrategy not in StagingStrategies:
+                self.printError(f'Unsupported `stagingStrategy` "{stagingStrategy}" (must be one of {", ".join(StagingStrategies)})')
+                stagingStrategy = DefaultStagingStrategy
+            stagingJobs = int(settings.get('stagingJobs', 4))
+            pakingMode = settings.get('pakingMode', None) or DefaultPakingMode
+            incrementalPaking = settings.get('incrementalPaking', True)
+            expandingAssetDependencies = settings.get('expandingAssetDependencies', False)
+            dependencyJobs = int(settings.get('dependencyJobs', 4))
+            assetImportsCachePath = settings.get('assetImportsCachePath', None)
+            if assetImportsCachePath is None:
+                assetImportsCachePath = os.path.join(settingsPathInfo['dir'], DefaultAssetImportsCacheFilename)
+            assetImportsCache = JsonFileCache(getPathInfo(assetImportsCachePath, relativeDir=settingsDir)['absolute'], maxScopes=8) if assetImportsCachePath else None
+            if pakingMode not in PakingModes:
+                self.printError(f'Unsupported `pakingMode` "{pakingMode}" (must be one of {", ".join(PakingModes)})')
+                pakingMode = DefaultPakingMode
+            srcPakExtraction = settings.get('srcPakExtraction', None) or DefaultSrcPakExtractionMode
+            if srcPakExtraction not in SrcPakExtractionModes:
+                self.printError(f'Unsupported `srcPakExtraction` "{srcPakExtraction}" (must be one of {", ".join(SrcPakExtractionModes)})')
+                srcPakExtraction = DefaultSrcPakExtractionMode
+
+            blueprintCachePath = settings.get('blueprintCachePath', None)
+            if blueprintCachePath is None:
+                blueprintCachePath = os.path.join(settingsPathInfo['dir'], DefaultBlueprintCacheFilename)
+            self.blueprintCache = JsonFileCache(getPathInfo(blueprintCachePath, relativeDir=settingsDir)['absolute']) if blueprintCachePath else None
+            self.jsonObjectPairsHook = None
+            if settings.get('interningJson', False):
+                self.jsonObjectPairsHook = InterningJsonHook(CompactRecord if compactRecords else dict)
+            elif compactRecords:
+                # built while parsing, rather than converting the whole table after it's read
+                self.jsonObjectPairsHook = CompactRecord
+
+            modelFilters = settings.get('modelFilters', None) or {}
+            for filterKey, values in list(modelFilters.items()):
+                if filterKey not in ModelFilterKeyGetters:
+                    self.printError(f'Unsupported `modelFilters` key: {filterKey}')
+                    modelFilters.pop(filterKey)
+                elif values is not None and not isinstance(values, list):
+                    modelFilters[filterKey] = [values]
+
             if (installingMods and not self.exitCode) or searchingGameAssets or creatingAttachments or inspecting:
                 sprintPad()
                 sprint(f'Resolving game Paks folder...')
@@ -1744,7 +2713,18 @@ class ModSwapCommandRunner():
                         sprint('Server is not running.')
                     sprintPad()
 
-            if creatingAttachments:
+            if creatingAttachments and blueprintClones:
+                if not (gamePaksDir and self.umodelPath and extraContentDir):
+                    self.printError('`blueprintClones` requires `gameDir`, `umodelPath`, and `extraContentDir`')
+                else:
+                    self.cloneBlueprints(
+                        blueprintClones,
+                        getPathInfo(gamePaksDir),
+                        extraContentDir,
+                        settingsDir,
+                        jobs=cloningJobs,
+                    )
+            elif creatingAttachments:
                 if self.nonInteractive:
                     self.printWarning('Cannot create attachment definition in non-interactive mode')
                 else:
@@ -1768,7 +2748,7 @@ class ModSwapCommandRunner():
                     sprintPad()
                     self.ensureAttachmentsDir()
                     while not done:
-                        attachment = copy.deepcopy(basicAttachmentTemplate)
+                        attachment, assetPath = self.newAttachmentDefinition()
 
                         gotOtherDetails = False
                         canceled = False
@@ -1780,15 +2760,7 @@ class ModSwapCommandRunner():
                             gotOtherDetails = True
 
                             attachment['modelCategory'] = ''
-                            categoryOptions = {
-                                'SurvivorTorso',
-                                'SurvivorLegs',
-                                'SurvivorHead',
-                                'KillerBody',
-                                'KillerHead',
-                                'KillerWeapon',
-                                'Charm',
-                            }
+                            categoryOptions = AttachmentModelCategories
                             while True:
                                 hasError = False
                                 attachment['modelCategory'] = sprintput(f"Model category ({', '.join(categoryOptions)}): ").strip()
@@ -1855,12 +2827,6 @@ class ModSwapCommandRunner():
 
                             return True
 
-                        attachmentValues = getPropertyValue(attachment['attachmentData'])
-                        attachmentBlueprintProperty = getAttachmentBlueprintProperty(attachmentValues)
-                        if semver.VersionInfo.parse(self.gameVersion).match('>=6.5.2'):
-                            attachmentBlueprintProperty[NameFieldName] = AccessoryBlueprintName
-                        assetPath = getAssetPathProperty(getPropertyValue(attachmentBlueprintProperty))
-                        assetPath[AssetNameFieldName] = ''
                         while True:
                             gotOtherDetails = False
                             hasError = False
@@ -1975,26 +2941,26 @@ class ModSwapCommandRunner():
                                                     if False:
                                                         for name in blueprintData[NameMapFieldName]:
                                                             sprint(name)
-                                                    imports = blueprintData.get(ImportsFieldName, [])
+                                                    importGraph = ImportGraph(blueprintData.get(ImportsFieldName, []))
                                                     animBlueprintShortStemPath = getShortenedAssetPath(
-                                                        getAnimBlueprintPath(imports)
+                                                        importGraph.getAnimBlueprintPath()
                                                     )
                                                     sprint(f'- Animation blueprint: {animBlueprintShortStemPath or "(none)"}')
                                                     animBlueprintPackageStemPath = f'{"" if animBlueprintShortStemPath.startswith("/") else AssetPathGamePrefix}{animBlueprintShortStemPath}' if animBlueprintShortStemPath else None
                                                     meshShortStemPath = getShortenedAssetPath(
-                                                        getSkeletalMeshPath(imports)
+                                                        importGraph.getSkeletalMeshPath()
                                                     )
                                                     meshPackageStemPath = f'{"" if meshShortStemPath.startswith("/") else AssetPathGamePrefix}{meshShortStemPath}' if meshShortStemPath else None
                                                     sprint(f'- Attachment mesh: {meshShortStemPath or "(none)"}')
 
                                                     def doViewMeshPart(animBlueprintData=None, animBlueprintJsonPath=None):
                                                         skeletonShortStemPath = None
-                                                        skeletonPackageRelPath = None
+                                                        skeletonPackageStemPath = None
                                                         if animBlueprintData:
                                                             skeletonShortStemPath = getShortenedAssetPath(
-                                                                getSkeletonPath(animBlueprintData[ImportsFieldName])
+                                                                ImportGraph(animBlueprintData[ImportsFieldName]).getSkeletonPath()
                                                             )
-                                                            skeletonPackageStemPath = f'{"" if skeletonShortStemPath.startswith("/") else AssetPathGamePrefix}{skeletonShortStemPath}' if skeletonShortStemPath else None
+                                                            skeletonPackageStemPath = getPackageStemPath(skeletonShortStemPath)
                                                             sprint(f'- Skeleton: {skeletonShortStemPath or "(none)"}')
 
                                                         if meshShortStemPath and (self.shouldView or True):
@@ -2036,91 +3002,48 @@ class ModSwapCommandRunner():
                                                                     extraContentDirAbsolute = getPathInfo(extraContentDir)['absolute']
                                                                     newMeshPackageStemPath = sprintput('New skeletal mesh path: ').strip()
                                                                     if newMeshPackageStemPath:
-                                                                        if not newMeshPackageStemPath.endswith('_REF'):
-                                                                            newMeshPackageStemPath = f'{newMeshPackageStemPath}_REF'
-                                                                        if not newMeshPackageStemPath.startswith('/'):
-                                                                            newMeshPackageStemPath = f'{AssetPathGamePrefix}{newMeshPackageStemPath}'
-
-                                                                        newAssetGameRelBaseStemPath = newMeshPackageStemPath.removeprefix(AssetPathGamePrefix).removesuffix('_REF')
-                                                                        assert(not newAssetGameRelBaseStemPath.startswith('/'))
-                                                                        newAssetBaseStem = os.path.basename(newAssetGameRelBaseStemPath)
-                                                                        newAssetGameRelBaseDir = os.path.dirname(newAssetGameRelBaseStemPath)
-                                                                        if newAssetGameRelBaseDir.endswith('/Models'):
-                                                                            newAssetGameRelBaseDir = os.path.dirname(newAssetGameRelBaseDir)
-                                                                        newBlueprintName = f'BP_{newAssetBaseStem}'
-                                                                        newAssetsPackageRelBaseDir = f'{AssetPathGamePrefix}{newAssetGameRelBaseDir}'
-                                                                        newGameRelBlueprintsDir = f'{newAssetGameRelBaseDir}/Blueprints'
-                                                                        newBlueprintGameRelStemPath = f'{newGameRelBlueprintsDir}/{newBlueprintName}'
-                                                                        newBlueprintPackageStemPath = f'{AssetPathGamePrefix}{newBlueprintGameRelStemPath}'
-                                                                        newAnimBlueprintName = f'AB_{newAssetBaseStem}'
-                                                                        newAnimBlueprintGameRelStemPath = f'{newGameRelBlueprintsDir}/{newAnimBlueprintName}'
-                                                                        newAnimBlueprintPackageStemPath = f'{AssetPathGamePrefix}{newAnimBlueprintGameRelStemPath}'
+                                                                        cloneNames = getBlueprintCloneNames(newMeshPackageStemPath)
+                                                                        newMeshPackageStemPath = cloneNames['meshPackageStemPath']
+                                                                        newAssetGameRelBaseDir = cloneNames['assetGameRelBaseDir']
+                                                                        newBlueprintName = cloneNames['blueprintName']
+                                                                        newBlueprintPackageStemPath = cloneNames['blueprintPackageStemPath']
+                                                                        newAnimBlueprintName = cloneNames['animBlueprintName']
 
                                                                         if True:
-                                                                            newMeshName = os.path.basename(newMeshPackageStemPath)
-                                                                            newSkeletonName = f'{newMeshName}_Skeleton'
-                                                                            newSkeletonGameRelStemPath = f'{newAssetGameRelBaseDir}/Skeletons/{newSkeletonName}'
-                                                                            newSkeletonPackageStemPath = f'{AssetPathGamePrefix}{newSkeletonGameRelStemPath}'
                                                                             jsonPaths = [blueprintJsonPath]
                                                                             if animBlueprintJsonPath:
                                                                                 jsonPaths.append(animBlueprintJsonPath)
 
-                                                                            meshName = os.path.basename(meshPackageStemPath) if meshPackageStemPath else None
-                                                                            meshStem = meshName.removesuffix('_REF') if meshName else None
-                                                                            blueprintName = os.path.basename(blueprintPackageStemPath)
-                                                                            animBlueprintName = os.path.basename(animBlueprintPackageStemPath) if animBlueprintPackageStemPath else None
-                                                                            assetsPackageRelBaseDir = os.path.dirname(os.path.dirname(blueprintPackageStemPath))
-
-                                                                            newPhysicsAssetName = f'{newMeshName}_PhysicsAsset'
-                                                                            newPhysicsAssetGameRelStemPath = f'{newAssetGameRelBaseDir}/Physics/{newPhysicsAssetName}'
+                                                                            replacements = getBlueprintCloneReplacements(
+                                                                                cloneNames,
+                                                                                blueprintPackageStemPath,
+                                                                                meshPackageStemPath=meshPackageStemPath,
+                                                                                animBlueprintPackageStemPath=animBlueprintPackageStemPath,
+                                                                                skeletonPackageStemPath=skeletonPackageStemPath,
+                                                                            )
 
                                                                             for path in jsonPaths:
-                                                                                with open(path, 'r+', encoding='utf-8') as jsonFile:
-                                                                                    sprintPad()
-                                                                                    sprint(f'Updating temporary file {getPathInfo(path)["best"]}...')
-                                                                                    jsonString = jsonFile.read()
-                                                                                    def replace(original, replacement):
-                                                                                        nonlocal jsonString
-                                                                                        if self.debug:
-                                                                                            sprint(f'Replacing "{original}" with "{replacement}"')
-                                                                                        jsonString = jsonString.replace(original, replacement)
-
-                                                                                    replace(blueprintPackageStemPath, newBlueprintPackageStemPath)
-                                                                                    replace(blueprintName, newBlueprintName)
-                                                                                    if meshPackageStemPath:
-                                                                                        replace(meshPackageStemPath, newMeshPackageStemPath)
-                                                                                    if meshName:
-                                                                                        replace(meshName, newMeshName)
-                                                                                    if animBlueprintPackageStemPath:
-                                                                                        replace(animBlueprintPackageStemPath, newAnimBlueprintPackageStemPath)
-                                                                                    if animBlueprintName:
-                                                                                        replace(animBlueprintName, newAnimBlueprintName)
-                                                                                    if skeletonPackageStemPath:
-                                                                                        replace(skeletonPackageStemPath, newSkeletonPackageStemPath)
-                                                                                    if meshStem:
-                                                                                        replace(meshStem, newAssetBaseStem)
-
-                                                                                    # TODO: remove? unnecessary
-                                                                                    replace(assetsPackageRelBaseDir, newAssetsPackageRelBaseDir)
-                                                                                    data = json.loads(jsonString)
-                                                                                    newPackageGuid = '{' + str(uuid.uuid4()).upper() + '}'
-                                                                                    if self.debug:
-                                                                                        sprint(f'Changing {PackageGuidFieldName} from {data[PackageGuidFieldName]} to {newPackageGuid}')
-                                                                                    data[PackageGuidFieldName] = newPackageGuid
-                                                                                    jsonFile.seek(0)
-                                                                                    jsonFile.truncate()
-                                                                                    jsonDump(data, jsonFile, pretty=True)
-
+                                                                                sprintPad()
+                                                                                sprint(f'Updating temporary file {getPathInfo(path)["best"]}...')
+                                                                                changedPackageGuid, replacedCounts, replacedLocations = self.rewriteBlueprintJsonFile(path, replacements)
+                                                                                if self.debug:
+                                                                                    for line, column, original, replacement in replacedLocations:
+                                                                                        sprint(f'{line}:{column} replaced {original} with {replacement}')
+                                                                                if not changedPackageGuid:
+                                                                                    self.printWarning(f'No {PackageGuidFieldName} found to change')
+                                                                                for original, count in replacedCounts.items():
+                                                                                    sprint(f'Replaced "{original}" {count} time{"" if count == 1 else "s"}')
+
+                                                                            blueprintAssets, modelAssets = getBlueprintCloneDestPakAssets(cloneNames)
                                                                             sprintPad()
                                                                             sprint('New asset paths (can add to `destPakAssets`):')
                                                                             sprintPad()
                                                                             sprint('# attachment blueprint assets (saved in `extraContentDir`)')
-                                                                            sprint(f'- {newBlueprintGameRelStemPath}')
-                                                                            sprint(f'- {newAnimBlueprintGameRelStemPath}')
+                                                                            for path in blueprintAssets:
+                                                                                sprint(f'- {path}')
                                                                             sprint('# attachment model assets (cooked in unreal engine)')
-                                                                            sprint(f'- {newMeshPackageStemPath.removeprefix(AssetPathGamePrefix)}')
-                                                                            sprint(f'- {newSkeletonGameRelStemPath}')
-                                                                            sprint(f'- {newPhysicsAssetGameRelStemPath}')
+                                                                            for path in modelAssets:
+                                                                                sprint(f'- {path}')
                                                                             sprintPad()
 
                                                                         # TODO: apply dryRun logic
@@ -2236,8 +3159,23 @@ class ModSwapCommandRunner():
                         srcPakPathInfo = getPathInfo(srcPakPath)
                         srcPakDir = getPathInfo(os.path.join(ensurePakingDir(), srcPakPathInfo['stem']))['best']
                         srcPakDirAlreadyExisted = os.path.exists(srcPakDir)
+                        srcPakExtractionPatterns = None
+                        if srcPakExtraction == 'selective':
+                            srcPakExtractionPatterns = self.getSrcPakExtractionPatterns(
+                                customizationItemDbPath,
+                                destPakAssets,
+                                inspecting,
+                                extractingAttachments,
+                                upgradingMods,
+                                mixingAttachments,
+                                paking,
+                                expandingAssetDependencies,
+                            )
                         sprintPad()
-                        sprint(f'{self.dryRunPrefix}Unpaking "{srcPakPath}" to "{srcPakDir}"...')
+                        if srcPakExtractionPatterns is not None:
+                            sprint(f'{self.dryRunPrefix}Unpaking assets matching {len(srcPakExtractionPatterns)} patterns from "{srcPakPath}" to "{srcPakDir}"...')
+                        else:
+                            sprint(f'{self.dryRunPrefix}Unpaking "{srcPakPath}" to "{srcPakDir}"...')
                         if os.path.exists(unrealPakPath):
                             ensurePakingDir()
                             shouldWrite = not self.dryRun or (not self.nonInteractive and confirm(f'write to source pak folder "{srcPakDir}" despite dry run', pad=True, emptyMeansNo=True))
@@ -2246,7 +3184,23 @@ class ModSwapCommandRunner():
                                 if self.readyToWrite(srcPakDir, dryRunHere=False):
                                     checkInput = self.startKeyboardListener()
                                     try:
-                                        unrealUnpak(srcPakPath, srcPakDir, gameName, unrealPakPath, debug=self.debug, checkInput=checkInput)
+                                        if srcPakExtractionPatterns is not None:
+                                            srcPakAssetEntries, srcPakEntries = unrealUnpakSelectively(
+                                                srcPakPath,
+                                                srcPakDir,
+                                                gameName,
+                                                unrealPakPath,
+                                                srcPakExtractionPatterns,
+                                                debug=self.debug,
+                                                checkInput=checkInput,
+                                            )
+                                            extractedEntries = [entry for entries in srcPakAssetEntries.values() for entry in entries]
+                                            sprint(
+                                                f'Extracted {len(srcPakAssetEntries)} assets: {len(extractedEntries)} of {len(srcPakEntries)} files'
+                                                f' ({sum(entry["size"] for entry in extractedEntries)} of {sum(entry["size"] for entry in srcPakEntries)} bytes).'
+                                            )
+                                        else:
+                                            unrealUnpak(srcPakPath, srcPakDir, gameName, unrealPakPath, debug=self.debug, checkInput=checkInput)
                                         written = True
                                     finally:
                                         self.stopKeyboardListener()
@@ -2273,39 +3227,8 @@ class ModSwapCommandRunner():
                             elif srcPakPlatform != destPlatform:
                                 self.printWarning(f'Source pakchunk platform "{srcPakPlatform}" is different than "{destPlatform}"')
                         srcPakContentDir = getPakContentDir(srcPakDir, gameName)
-                        sprintPad()
-                        sprint(f'Reading pak content at "{srcPakContentDir}"...')
                         if os.path.isdir(srcPakContentDir):
-                            for pathIndex, path in enumerate(listFilesRecursively(srcPakContentDir)):
-                                srcPakContentPaths.append(path)
-                                assetPathInfo = getAssetStemPathInfo(path)
-                                stemPath = None
-                                if assetPathInfo:
-                                    stemPath = assetPathInfo['stemPath']
-                                    pathSuffix = assetPathInfo['suffix']
-                                else:
-                                    self.printWarning(f'Unrecognized asset type: "{path}"')
-                                    pathSuffix = pathlib.Path(path).suffix
-                                    stemPath = path[:-len(pathSuffix)]
-
-                                if stemPath:
-                                    if stemPath not in srcPakContentAssetPathsMap:
-                                        srcPakContentAssetPathsMap[stemPath] = []
-                                        if self.debug:
-                                            sprint(f'Asset {len(srcPakContentAssetPathsMap)}: "{stemPath}"')
-                                    srcPakContentAssetPathsMap[stemPath].append(pathSuffix)
-                                    if stemPath not in assetStemPathSourceFilesMap:
-                                        assetStemPathSourceFilesMap[stemPath] = {
-                                            'contentDir': srcPakContentDir,
-                                            'fileSuffixes': srcPakContentAssetPathsMap[stemPath],
-                                        }
-
-                                if self.debug:
-                                    sprint(f'{pathIndex + 1} - {path}')
-                            if self.debug:
-                                sprintPad()
-                            sprint(f'Done reading. Discovered {len(srcPakContentAssetPathsMap)} pak assets ({len(srcPakContentPaths)} files)')
-                            sprintPad()
+                            contentDirsToIndex.append(srcPakContentDir)
                         else:
                             self.printError(f'Pak content folder "{srcPakContentDir}" does not exist')
                             srcPakContentDir = ''
@@ -2315,30 +3238,8 @@ class ModSwapCommandRunner():
                 if srcPakPath and not inspecting:
                     self.printWarning(f'Not looking for extra cooked content because `srcPakDir` has precedence')
                 else:
-                    sprintPad()
-                    sprint(f'Reading extra cooked content at "{extraContentDir}"')
                     if os.path.isdir(extraContentDir):
-                        for pathIndex, path in enumerate(listFilesRecursively(extraContentDir)):
-                            extraContentPaths.append(path)
-                            if path.lower().endswith(UassetJsonSuffix):
-                                path = f'{path[:-len(UassetJsonSuffix)]}{UassetFilenameSuffix}'
-                            assetPathInfo = getAssetStemPathInfo(path)
-                            if assetPathInfo:
-                                if assetPathInfo['stemPath'] not in extraContentAssetPathsMap:
-                                    extraContentAssetPathsMap[assetPathInfo['stemPath']] = []
-                                    if self.debug:
-                                        sprint(f'Asset {len(extraContentAssetPathsMap)}: {assetPathInfo["stemPath"]}')
-                                extraContentAssetPathsMap[assetPathInfo['stemPath']].append(assetPathInfo['suffix'])
-                                if assetPathInfo['stemPath'] not in assetStemPathSourceFilesMap:
-                                    assetStemPathSourceFilesMap[assetPathInfo['stemPath']] = {
-                                        'contentDir': extraContentDir,
-                                        'fileSuffixes': extraContentAssetPathsMap[assetPathInfo['stemPath']],
-                                    }
-
-                            if self.debug:
-                                sprint(f'{pathIndex + 1} - {path}')
-                        sprint(f'Done reading. Discovered {len(extraContentAssetPathsMap)} extra assets ({len(extraContentPaths)} files)')
-                        sprintPad()
+                        contentDirsToIndex.append(extraContentDir)
                     else:
                         self.printError(f'Extra content folder "{extraContentDir}" does not exist')
                         extraContentDir = ''
@@ -2353,32 +3254,47 @@ class ModSwapCommandRunner():
                         self.printError(f'Cannot resolve unreal project cooked content folder (missing `gameName`)')
                     else:
                         cookedContentDir = getUnrealProjectCookedContentDir(unrealProjectDir, destPlatform, gameName)
-                        sprintPad()
-                        sprint(f'Reading cooked content at "{cookedContentDir}"')
                         if os.path.isdir(cookedContentDir):
-                            for pathIndex, path in enumerate(listFilesRecursively(cookedContentDir)):
-                                cookedContentPaths.append(path)
-                                assetPathInfo = getAssetStemPathInfo(path)
-                                if assetPathInfo:
-                                    if assetPathInfo['stemPath'] not in cookedContentAssetPathsMap:
-                                        cookedContentAssetPathsMap[assetPathInfo['stemPath']] = []
-                                        if self.debug:
-                                            sprint(f'Asset {len(cookedContentAssetPathsMap)}: {assetPathInfo["stemPath"]}')
-                                    cookedContentAssetPathsMap[assetPathInfo['stemPath']].append(assetPathInfo['suffix'])
-                                    if assetPathInfo['stemPath'] not in assetStemPathSourceFilesMap:
-                                        assetStemPathSourceFilesMap[assetPathInfo['stemPath']] = {
-                                            'contentDir': cookedContentDir,
-                                            'fileSuffixes': cookedContentAssetPathsMap[assetPathInfo['stemPath']],
-                                        }
-
-                                if self.debug:
-                                    sprint(f'{pathIndex + 1} - {path}')
-                            sprint(f'Done reading. Discovered {len(cookedContentAssetPathsMap)} cooked assets ({len(cookedContentPaths)} files)')
-                            sprintPad()
+                            contentDirsToIndex.append(cookedContentDir)
                         else:
                             self.printError(f'Cooked content folder "{cookedContentDir}" does not exist')
                             cookedContentDir = ''
 
+            if contentDirsToIndex:
+                sprintPad()
+                sprint(f'Reading content in {len(contentDirsToIndex)} folder{"" if len(contentDirsToIndex) == 1 else "s"}...')
+                # in order of precedence: source pak, then extra, then unreal project cooked content
+                contentIndex.build(contentDirsToIndex, keepingUnrecognizedIn={srcPakContentDir})
+                for contentDir, contentTitle in (
+                    (srcPakContentDir, 'pak'),
+                    (extraContentDir, 'extra'),
+                    (cookedContentDir, 'cooked'),
+                ):
+                    if contentDir not in contentIndex.paths:
+                        continue
+                    contentPaths = contentIndex.paths[contentDir]
+                    contentAssetPathsMap = contentIndex.assetPathsMaps[contentDir]
+                    if contentDir == srcPakContentDir:
+                        srcPakContentPaths = contentPaths
+                        srcPakContentAssetPathsMap = contentAssetPathsMap
+                        for path in contentIndex.unrecognizedPaths[contentDir]:
+                            self.printWarning(f'Unrecognized asset type: "{path}"')
+                    elif contentDir == extraContentDir:
+                        extraContentPaths = contentPaths
+                        extraContentAssetPathsMap = contentAssetPathsMap
+                    else:
+                        cookedContentPaths = contentPaths
+                        cookedContentAssetPathsMap = contentAssetPathsMap
+                    if self.debug:
+                        for assetIndex, stemPath in enumerate(contentAssetPathsMap):
+                            sprint(f'Asset {assetIndex + 1}: "{stemPath}"')
+                        for pathIndex, path in enumerate(contentPaths):
+                            sprint(f'{pathIndex + 1} - {path}')
+                        sprintPad()
+                    sprint(f'Discovered {len(contentAssetPathsMap)} {contentTitle} assets ({len(contentPaths)} files) in "{contentDir}"')
+                sprint('Done reading.')
+                sprintPad()
+
             if (inspecting and customizationItemDbPath) or extractingAttachments or upgradingMods or mixingAttachments:
                 sprintPad()
                 sprint(f'Resolving {CustomizationItemDbAssetName} path...')
@@ -2425,7 +3341,10 @@ class ModSwapCommandRunner():
                             if srcPakContentDir:
                                 customizationItemDbPath = getPathInfo(os.path.join(srcPakContentDir, customizationItemDbContentDirRelativePath))['best']
                                 if customizationItemDbPathIsWildcard:
-                                    matchingFiles = [getPathInfo(p)['normalized'] for p in glob.glob(customizationItemDbPath, recursive=True)]
+                                    matchingFiles = [
+                                        getPathInfo(os.path.join(srcPakContentDir, p))['normalized']
+                                        for p in contentIndex.glob(srcPakContentDir, getPathInfo(customizationItemDbContentDirRelativePath)['normalized'])
+                                    ]
                                     sprintPad()
                                     sprint(f'CustomizationItemDB wildcard matches ({len(matchingFiles)}):')
                                     for i, filePath in enumerate(matchingFiles):
@@ -2442,7 +3361,7 @@ class ModSwapCommandRunner():
                                             })
                                     else:
                                         self.printWarning('No CustomizationItemDB wildcard matches')
-                                elif not os.path.exists(customizationItemDbPath):
+                                elif not contentIndex.hasFile(srcPakContentDir, customizationItemDbContentDirRelativePath):
                                     self.printWarning(f'Content dir relative path "{customizationItemDbPath}" does not exist')
                             else:
                                 message = 'Content folder relative path cannot be resolved because `srcPakPath` is missing content'
@@ -2456,7 +3375,7 @@ class ModSwapCommandRunner():
                         else:
                             if not customizationItemDbAssets and extraContentDir:
                                 customizationItemDbPath = getPathInfo(os.path.join(extraContentDir, customizationItemDbContentDirRelativePath))['best']
-                                if os.path.exists(customizationItemDbPath):
+                                if contentIndex.hasFile(extraContentDir, customizationItemDbContentDirRelativePath):
                                     customizationItemDbAssets.append({
                                         'path': customizationItemDbPath,
                                         'contentDirRelativePath': customizationItemDbContentDirRelativePath,
@@ -2467,7 +3386,7 @@ class ModSwapCommandRunner():
                             if not customizationItemDbAssets and unrealProjectDir:
                                 if cookedContentDir:
                                     customizationItemDbPath = getPathInfo(os.path.join(cookedContentDir, customizationItemDbContentDirRelativePath))['best']
-                                    if os.path.exists(customizationItemDbPath):
+                                    if contentIndex.hasFile(cookedContentDir, customizationItemDbContentDirRelativePath):
                                         customizationItemDbAssets.append({
                                             'path': customizationItemDbPath,
                                             'contentDirRelativePath': customizationItemDbContentDirRelativePath,
@@ -2553,7 +3472,7 @@ class ModSwapCommandRunner():
                         outPath = getPathInfo(os.path.join(
                             settingsDir,
                             # TODO: make path unique if writing multiple CustomizationItemDB assets
-                            f"{settingsPathInfo['stem']}_{customizationItemDbPathInfo['stem']}-unaltered.yaml",
+                            f"{settingsPathInfo['stem']}_{customizationItemDbPathInfo['stem']}{self.outputNameSuffix}-unaltered.yaml",
                         ))['best']
                         sprintPad()
                         sprint(f'{self.dryRunPrefix}Writing unaltered {CustomizationItemDbAssetName} to "{outPath}"...')
@@ -2573,68 +3492,103 @@ class ModSwapCommandRunner():
                     # TODO: optmize memory usage by not storing each table data in this list - read each one on the fly when needed for processing
                     asset['data'] = customizationItemDb
 
+            if packingAttachments or unpackingAttachments:
+                if not attachmentsLibraryPath:
+                    self.printError('Cannot pack or unpack attachments (missing or empty `attachmentsLibrary`)')
+                elif packingAttachments:
+                    self.packAttachments(attachmentsLibraryPath, attachmentSnapshot, jobs=attachmentJobs)
+                    if attachmentSnapshot is not None and not self.dryRun:
+                        attachmentSnapshot.save()
+                else:
+                    self.unpackAttachments(attachmentsLibraryPath)
+
             if inspecting or mixingAttachments or renamingAttachmentFiles:
                 sprintPad()
                 sprint(f'Reading attachments...')
-                attachmentFilenames = os.listdir(self.attachmentsDir) if os.path.isdir(self.attachmentsDir) else []
-                sprint(f'Done reading. Discovered {len(attachmentFilenames)} attachment files')
+                attachmentFiles = []
+                if attachmentsLibraryPath and os.path.isfile(attachmentsLibraryPath):
+                    try:
+                        with AttachmentLibrary(attachmentsLibraryPath) as attachmentLibrary:
+                            attachmentFiles += [(filename, data, True) for filename, data in attachmentLibrary.readAll()]
+                        sprint(f'Read {len(attachmentFiles)} attachments from library "{attachmentsLibraryPath}"')
+                    except Exception as e:
+                        self.printError(e)
+                        self.printError(f'Failed to read attachment library "{attachmentsLibraryPath}"')
+                attachmentSnapshotCount = 0
+                if os.path.isdir(self.attachmentsDir):
+                    dirAttachmentFiles, attachmentSnapshotCount = readAttachmentFiles(
+                        self.attachmentsDir,
+                        snapshot=attachmentSnapshot,
+                        jobs=attachmentJobs,
+                    )
+                    # definitions in files take precedence over those packed in the library
+                    attachmentFiles += [(filename, data, False) for filename, data in dirAttachmentFiles]
+                    sprint(f'Done reading. Discovered {len(dirAttachmentFiles)} attachment files ({attachmentSnapshotCount} unchanged since last read)')
                 sprintPad()
-                if len(attachmentFilenames):
-                    for filenameIndex, filename in enumerate(attachmentFilenames):
+                if len(attachmentFiles):
+                    # (modelCategory, attachmentId) of each attachment read from the library
+                    libraryAttachmentIds = set()
+                    for filenameIndex, (filename, attachmentData, isFromLibrary) in enumerate(attachmentFiles):
                         filePath = getPathInfo(os.path.join(self.ensureAttachmentsDir(), filename))['best']
                         try:
-                            if filename.endswith('.yaml') or filename.endswith('.json'):
-                                with oneLinePrinter() as printOneLine:
-                                    printOneLine(f'{filenameIndex + 1} - Reading {filename}...')
-                                    with open(filePath, 'r', encoding='utf-8') as file:
-                                        if filename.endswith('.yaml'):
-                                            attachmentData = yaml.safe_load(file)
-                                        elif filename.endswith('.json'):
-                                            attachmentData = json.load(file)
-                                        else:
-                                            raise ValueError(f'Invalid file type: {filename}')
+                            if isinstance(attachmentData, Exception):
+                                raise ValueError(f'Could not read {filename}: {attachmentData}')
 
-                                    attachmentName = attachmentData['attachmentId']
-                                    printOneLine(f'Loaded {attachmentName}.')
-
-                                if printingJson:
-                                    sprintPad()
-                                    sprint(jsonDump(attachmentData, pretty=True))
-                                    sprintPad()
-
-                                if printingYaml:
-                                    sprintPad()
-                                    sprint(yamlDump(attachmentData))
-                                    sprintPad()
+                            attachmentName = attachmentData['attachmentId']
+                            if self.debug:
+                                sprint(f'{filenameIndex + 1} - Loaded {attachmentName}.')
 
-                                categoryName = attachmentData['modelCategory']
+                            if printingJson:
+                                sprintPad()
+                                sprint(jsonDump(attachmentData, pretty=True))
+                                sprintPad()
 
-                                if attachmentName in attachmentsToMix.get(categoryName, {}):
-                                    self.printWarning(f'duplicate attachment {attachmentName}!')
+                            if printingYaml:
+                                sprintPad()
+                                sprint(yamlDump(attachmentData))
+                                sprintPad()
 
-                                if categoryName not in attachmentsToMix:
-                                    attachmentsToMix[categoryName] = {}
-                                attachmentsToMix[categoryName][attachmentName] = attachmentData
+                            categoryName = attachmentData['modelCategory']
 
-                                if renamingAttachmentFiles:
-                                    newFilename = getAttachmentFilename(attachmentName)
-                                    if newFilename == filename:
-                                        sprint(f'Rename not needed (already named correctly)')
-                                    else:
-                                        sprint(f'{self.dryRunPrefix}Renaming "{filename}" to "{newFilename}"...')
-                                        newFilePath = getPathInfo(os.path.join(self.ensureAttachmentsDir(), newFilename))['best']
-                                        if os.path.exists(newFilePath):
-                                            raise ValueError(f'Could not rename {filename} to {newFilename} (file already exists)')
+                            if isFromLibrary:
+                                libraryAttachmentIds.add((categoryName, attachmentName))
+                            elif (categoryName, attachmentName) in libraryAttachmentIds:
+                                if self.debug:
+                                    sprint(f'{filename} overrides packed attachment {attachmentName}')
+                            elif attachmentName in attachmentsToMix.get(categoryName, {}):
+                                self.printWarning(f'duplicate attachment {attachmentName}!')
+
+                            if categoryName not in attachmentsToMix:
+                                attachmentsToMix[categoryName] = {}
+                            attachmentsToMix[categoryName][attachmentName] = attachmentData
+
+                            if renamingAttachmentFiles and not isFromLibrary:
+                                newFilename = getAttachmentFilename(attachmentName)
+                                if newFilename == filename:
+                                    sprint(f'Rename not needed (already named correctly)')
+                                else:
+                                    sprint(f'{self.dryRunPrefix}Renaming "{filename}" to "{newFilename}"...')
+                                    newFilePath = getPathInfo(os.path.join(self.ensureAttachmentsDir(), newFilename))['best']
+                                    if os.path.exists(newFilePath):
+                                        raise ValueError(f'Could not rename {filename} to {newFilename} (file already exists)')
 
-                                        if not self.dryRun:
-                                            os.rename(filePath, newFilePath)
-                                        attachmentsRenamed[filename] = newFilename
-                                        sprint('Done renaming.')
+                                    if not self.dryRun:
+                                        os.rename(filePath, newFilePath)
+                                        if attachmentSnapshot is not None:
+                                            attachmentSnapshot.rename(filename, newFilename)
+                                    attachmentsRenamed[filename] = newFilename
+                                    sprint('Done renaming.')
                         except Exception as e:
                             self.printError(e)
                     sprint('Done loading attachments.')
                     sprintPad()
 
+                if attachmentSnapshot is not None and not self.dryRun:
+                    try:
+                        attachmentSnapshot.save()
+                    except Exception as e:
+                        self.printWarning(f'Unable to write attachments snapshot "{attachmentSnapshot.path}": {e}')
+
                 if mixingAttachments or inspecting:
                     sprintPad()
                     sprint('Generating exclusion rules...')
@@ -2939,6 +3893,12 @@ class ModSwapCommandRunner():
                             settingsPathInfo,
                             assetStemPathSourceFilesMap,
                             writingAlteredDb=True,
+                            verifyingNameMap=verifyingNameMap,
+                            prettyJson=prettyJson,
+                            mixingJobs=mixingJobs,
+                            incrementalMixing=incrementalMixing,
+                            modelFilters=modelFilters,
+                            compactRecords=compactRecords,
                             checkInput=checkInput,
                         )
                 finally:
@@ -2986,6 +3946,17 @@ class ModSwapCommandRunner():
 
                     if destPakAssets is None:
                         if srcPakPath:
+                            if paking and srcPakEntries is not None and srcPakContentDir and not self.exitCode:
+                                self.carryOverSrcPakAssets(
+                                    srcPakPath,
+                                    srcPakDir,
+                                    srcPakContentDir,
+                                    gameName,
+                                    unrealPakPath,
+                                    srcPakEntries,
+                                    srcPakAssetEntries,
+                                    contentIndex,
+                                )
                             sprintPad()
                             destPakAssets = [getPathInfo(p)['normalized'] for p in srcPakContentAssetPathsMap.keys()]
                             self.printWarning('Setting `destPakAssets` from `srcPakPath`')
@@ -3006,6 +3977,15 @@ class ModSwapCommandRunner():
                         else:
                             self.printWarning(message)
 
+                    if shouldSearchForSrcAssets and expandingAssetDependencies and destPakAssets:
+                        destPakAssets, destPakAssetDependencies = self.expandAssetDependencies(
+                            destPakAssets,
+                            assetStemPathSourceFilesMap,
+                            settingsDir,
+                            importsCache=assetImportsCache,
+                            jobs=dependencyJobs,
+                        )
+
                     if shouldSearchForSrcAssets:
                         sprintPad()
                         sprint(f'Searching source content folders for {len(destPakAssets)} assets to pak...')
@@ -3058,98 +4038,205 @@ class ModSwapCommandRunner():
                                 self.printError(f'Cannot create pak because destination content folder is missing')
                             else:
                                 assert destPakDir
-                                sprintPad()
-                                sprint(f'{self.dryRunPrefix}Copying {srcFileCount} files from source content folders to "{destPakContentDir}"...')
                                 ensurePakingDir()
                                 sameDir = srcPakDir == destPakDir
-                                if sameDir:
-                                    self.printWarning(f'Source and destination pak folder is the same. {self.dryRunPrefix}Files not in asset list will be removed.')
-                                if self.readyToWrite(destPakDir, delete=not sameDir):
-                                    def writeFiles(srcContentDir=None):
+                                pakingDirect = pakingMode == 'direct'
+                                if pakingDirect and sameDir:
+                                    self.printWarning(f'Cannot pak directly from the destination pak folder. Staging files instead.')
+                                    pakingDirect = False
+                                pakStager = FileStager(stagingStrategy, jobs=stagingJobs, hashing=incrementalPaking)
+                                # (source path, path in pak) of each file
+                                pakFiles = []
+                                pakManifest = PakManifest(destPakPath)
+                                pakSettings = {'compressionArgs': getUnrealPakCompressionArgs()}
+
+                                def getPakInputs(srcContentDir=None):
+                                    """The files of each asset to pak, and the UAssetGUI JSON file each `.uasset` file is converted from (if any)"""
+                                    pakInputs = []
+                                    for assetPath in destPakAssets:
+                                        srcFilesInfo = assetStemPathSourceFilesMap[assetPath]
+                                        fileSuffixes = srcFilesInfo['fileSuffixes']
+                                        if UassetFilenameSuffix in fileSuffixes:
+                                            fileSuffixes = [UassetFilenameSuffix] + [s for s in fileSuffixes if s != UassetFilenameSuffix]
+
+                                        assetSourceContentDir = srcFilesInfo['contentDir']
+                                        if assetSourceContentDir == destPakContentDir:
+                                            assetSourceContentDir = srcContentDir
+
+                                        for extension in fileSuffixes:
+                                            relFilePath = f'{assetPath}{extension}'
+                                            srcJsonPath = None
+                                            if extension == UassetFilenameSuffix:
+                                                relJsonFilePath = f'{assetPath}{UassetJsonSuffix}'
+                                                jsonPath = normPath(os.path.join(assetSourceContentDir, relJsonFilePath))
+                                                if (
+                                                    contentIndex.hasFile(assetSourceContentDir, relJsonFilePath)
+                                                    if assetSourceContentDir in contentIndex.paths
+                                                    else os.path.exists(jsonPath)
+                                                ):
+                                                    srcJsonPath = jsonPath
+                                            pakInputs.append({
+                                                'relPath': relFilePath,
+                                                'srcPath': normPath(os.path.join(assetSourceContentDir, relFilePath)),
+                                                'srcJsonPath': srcJsonPath,
+                                                'pakPath': f'{gameName}/Content/{relFilePath}',
+                                                'contentDir': assetSourceContentDir,
+                                            })
+                                    return pakInputs
+
+                                def getUpToDatePakPath():
+                                    """The path of the existing pakchunk if it was built from the same files and settings. Checked before anything
+                                    is deleted, staged or converted, so an up to date pakchunk doesn't touch its staging folder."""
+                                    # the source pak folder is being rebuilt in place when it's the same folder, so always pak it
+                                    if not incrementalPaking or sameDir or self.dryRun:
+                                        return None
+                                    # a converted `.uasset` file is recorded by the JSON file it's made from, so it isn't converted to be checked
+                                    try:
+                                        pakManifest.collect(
+                                            [(pakInput['srcJsonPath'] or pakInput['srcPath'], pakInput['pakPath']) for pakInput in getPakInputs()],
+                                            pakSettings,
+                                            assets=destPakAssets,
+                                            jobs=stagingJobs,
+                                        )
+                                    except OSError as e:
+                                        if self.debug:
+                                            self.printWarning(f'Unable to check whether "{destPakPath}" is up to date: {e}')
+                                        return None
+                                    return pakManifest.getUpToDatePakPath([
+                                        destPakPath,
+                                        normPath(os.path.join(gamePaksDir, destPakFilename)) if gamePaksDir else None,
+                                    ])
+
+                                def writeFiles(srcContentDir=None):
+                                    if not pakingDirect:
                                         self.ensureDir(destPakContentDir, warnIfNotExist=False)
-                                        for assetPath in destPakAssets:
-                                            srcFilesInfo = assetStemPathSourceFilesMap[assetPath]
-                                            fileSuffixes = srcFilesInfo['fileSuffixes']
-                                            if UassetFilenameSuffix in fileSuffixes:
-                                                fileSuffixes = [UassetFilenameSuffix] + [s for s in fileSuffixes if s != UassetFilenameSuffix]
-
-                                            assetSourceContentDir = assetStemPathSourceFilesMap[assetPath]['contentDir']
-                                            if assetSourceContentDir == destPakContentDir:
-                                                assetSourceContentDir = srcContentDir
-
-                                            for extension in fileSuffixes:
-                                                relFilePath = f'{assetPath}{extension}'
-                                                srcPath = normPath(os.path.join(assetSourceContentDir, relFilePath))
-
-                                                # if UassetGUI json file exists, convert it to uasset file before copying it
-                                                if extension == UassetFilenameSuffix:
-                                                    relJsonFilePath = f'{assetPath}{UassetJsonSuffix}'
-                                                    srcJsonPath = normPath(os.path.join(assetSourceContentDir, relJsonFilePath))
-                                                    if os.path.exists(srcJsonPath):
-                                                        sprintPad()
-                                                        sprint(f'{self.dryRunPrefix}Converting "{srcJsonPath}" to "{srcPath}"')
-                                                        sprintPad()
-                                                        if self.readyToWrite(srcPath):
-                                                            if not self.dryRun:
-                                                                jsonToUasset(srcJsonPath, srcPath, self.uassetGuiPath)
-
-                                                destPathFileInfo = getPathInfo(os.path.join(destPakContentDir, relFilePath))
-                                                self.ensureDir(destPathFileInfo['dir'], warnIfNotExist=False)
-                                                destPath = destPathFileInfo['best']
-                                                if self.debug:
-                                                    sprintPad()
-                                                    sprint(f'{self.dryRunPrefix}Copying file "{srcPath}" to "{destPath}"')
-                                                    sprintPad()
+                                    filesToStage = []
+                                    # (destination path, path in pak) of the staged files recorded in the manifest as they are
+                                    manifestFilesToCheck = []
+                                    for pakInput in getPakInputs(srcContentDir):
+                                        srcPath = pakInput['srcPath']
+                                        srcJsonPath = pakInput['srcJsonPath']
+                                        # if UassetGUI json file exists, convert it to uasset file before copying it
+                                        if srcJsonPath:
+                                            sprintPad()
+                                            sprint(f'{self.dryRunPrefix}Converting "{srcJsonPath}" to "{srcPath}"')
+                                            sprintPad()
+                                            if self.readyToWrite(srcPath):
                                                 if not self.dryRun:
-                                                    shutil.copy(srcPath, destPath)
-                                    if sameDir:
-                                        with tempfile.TemporaryDirectory(
-                                            dir=pakingDir,
-                                            prefix=f'{destPakStem}_',
-                                        ) as tempDir:
-                                            self.printWarning(f'{self.dryRunPrefix}Temporarily moving "{srcPakDir}" to temporary source pak folder "{tempDir}" for file copying')
-                                            if not self.dryRun:
-                                                os.rmdir(tempDir)
-                                                shutil.move(srcPakDir, tempDir)
-                                            assert gameName
-                                            try:
-                                                writeFiles(getPakContentDir(tempDir, gameName))
-                                            except Exception as e:
-                                                if not self.nonInteractive and self.debug:
-                                                    self.printError(e)
-                                                    promptToContinue(f'to open src content dir "{tempDir}"')
-                                                    openFolder(tempDir)
-                                                    promptToContinue()
-                                                raise e
-                                    else:
-                                        writeFiles()
+                                                    jsonToUasset(srcJsonPath, srcPath, self.uassetGuiPath)
+
+                                        pakFiles.append((srcPath, pakInput['pakPath']))
+                                        if pakingDirect:
+                                            if self.debug:
+                                                sprintPad()
+                                                sprint(f'{self.dryRunPrefix}Listing file "{srcPath}" to pak')
+                                                sprintPad()
+                                            continue
 
-                                    assert destPakPath
+                                        destPathFileInfo = getPathInfo(os.path.join(destPakContentDir, pakInput['relPath']))
+                                        destPath = destPathFileInfo['best']
+                                        if self.dryRun:
+                                            # the stager creates (and remembers) folders when actually writing
+                                            self.ensureDir(destPathFileInfo['dir'], warnIfNotExist=False)
+                                        if self.debug:
+                                            sprintPad()
+                                            sprint(f'{self.dryRunPrefix}Staging file "{srcPath}" to "{destPath}"')
+                                            sprintPad()
+                                        filesToStage.append((srcPath, destPath, pakInput['contentDir'], destPakContentDir))
+                                        if not srcJsonPath and pakInput['pakPath'] in pakManifest.files:
+                                            manifestFilesToCheck.append((destPath, pakInput['pakPath']))
+
+                                    if not self.dryRun and filesToStage:
+                                        pakStager.stageAll(filesToStage)
+                                        if pakStager.counts:
+                                            sprint(f'Staged files by {", ".join(f"{strategy} ({count})" for strategy, count in sorted(pakStager.counts.items()))}.')
+                                        changedPakPaths = [
+                                            pakPath
+                                            for destPath, pakPath in manifestFilesToCheck
+                                            if pakStager.hashes.get(destPath, pakManifest.files[pakPath]['hash']) != pakManifest.files[pakPath]['hash']
+                                        ]
+                                        if changedPakPaths:
+                                            # the pakchunk is built from what was staged, but it isn't what the manifest would record
+                                            self.printWarning(
+                                                f'{len(changedPakPaths)} files changed while paking (e.g. "{changedPakPaths[0]}").'
+                                                f' Not recording "{destPakPath}" as up to date.'
+                                            )
+                                            pakManifest.files = {}
+
+                                upToDatePakPath = getUpToDatePakPath()
+                                if upToDatePakPath:
                                     sprintPad()
-                                    sprint(f'{self.dryRunPrefix}Paking "{destPakDir}" into "{destPakPath}"...')
-                                    if os.path.exists(unrealPakPath):
-                                        # TODO: check readyToWrite()?
-                                        if not self.dryRun:
-                                            checkInput = self.startKeyboardListener()
-                                            try:
-                                                unrealPak(destPakDir, destPakPath, unrealPakPath, debug=self.debug, checkInput=checkInput)
-                                            finally:
-                                                self.stopKeyboardListener()
-                                            if sigFilePath:
-                                                # TODO: check readyToWrite()?
-                                                destSigPath = pakchunkToSigFilePath(destPakPath)
-                                                if self.debug:
-                                                    sprint(f'Copying "{sigFilePath}" to "{destSigPath}"')
-                                                shutil.copy(sigFilePath, pakchunkToSigFilePath(destPakPath))
-                                        else:
-                                            # simulate creating the pakchunk file
-                                            pakingDirPakchunkStems.append(destPakStem)
-                                        sprint(f'{self.dryRunPrefix}Done paking.')
+                                    sprint(f'"{upToDatePakPath}" is up to date (no source files or settings changed). Skipping paking.')
+                                    sprintPad()
+                                else:
+                                    sprintPad()
+                                    if pakingDirect:
+                                        sprint(f'{self.dryRunPrefix}Listing {srcFileCount} files from source content folders to pak directly...')
                                     else:
-                                        self.printError(f'`unrealPakPath` "{unrealPakPath}" does not exist')
+                                        sprint(f'{self.dryRunPrefix}Copying {srcFileCount} files from source content folders to "{destPakContentDir}"...')
+                                    if sameDir:
+                                        self.printWarning(f'Source and destination pak folder is the same. {self.dryRunPrefix}Files not in asset list will be removed.')
+                                    if pakingDirect or self.readyToWrite(destPakDir, delete=not sameDir):
+                                        if sameDir:
+                                            with tempfile.TemporaryDirectory(
+                                                dir=pakingDir,
+                                                prefix=f'{destPakStem}_',
+                                            ) as tempDir:
+                                                self.printWarning(f'{self.dryRunPrefix}Temporarily moving "{srcPakDir}" to temporary source pak folder "{tempDir}" for file copying')
+                                                if not self.dryRun:
+                                                    os.rmdir(tempDir)
+                                                    shutil.move(srcPakDir, tempDir)
+                                                assert gameName
+                                                try:
+                                                    writeFiles(getPakContentDir(tempDir, gameName))
+                                                except Exception as e:
+                                                    if not self.nonInteractive and self.debug:
+                                                        self.printError(e)
+                                                        promptToContinue(f'to open src content dir "{tempDir}"')
+                                                        openFolder(tempDir)
+                                                        promptToContinue()
+                                                    raise e
+                                        else:
+                                            writeFiles()
+
+                                        assert destPakPath
+                                        sprintPad()
+                                        if pakingDirect:
+                                            sprint(f'{self.dryRunPrefix}Paking {len(pakFiles)} files into "{destPakPath}"...')
+                                        else:
+                                            sprint(f'{self.dryRunPrefix}Paking "{destPakDir}" into "{destPakPath}"...')
+                                        if os.path.exists(unrealPakPath):
+                                            # TODO: check readyToWrite()?
+                                            if not self.dryRun:
+                                                checkInput = self.startKeyboardListener()
+                                                try:
+                                                    unrealPak(
+                                                        destPakDir,
+                                                        destPakPath,
+                                                        unrealPakPath,
+                                                        debug=self.debug,
+                                                        checkInput=checkInput,
+                                                        files=pakFiles if pakingDirect else None,
+                                                    )
+                                                finally:
+                                                    self.stopKeyboardListener()
+                                                if pakManifest.files:
+                                                    pakManifest.save()
+                                                if sigFilePath:
+                                                    # TODO: check readyToWrite()?
+                                                    destSigPath = pakchunkToSigFilePath(destPakPath)
+                                                    if self.debug:
+                                                        sprint(f'Copying "{sigFilePath}" to "{destSigPath}"')
+                                                    shutil.copy(sigFilePath, pakchunkToSigFilePath(destPakPath))
+                                            else:
+                                                # simulate creating the pakchunk file
+                                                pakingDirPakchunkStems.append(destPakStem)
+                                            sprint(f'{self.dryRunPrefix}Done paking.')
+                                        else:
+                                            self.printError(f'`unrealPakPath` "{unrealPakPath}" does not exist')
+                                        sprintPad()
+                                    sprint(f'{self.dryRunPrefix}Done {"listing" if pakingDirect else "copying"}.')
                                     sprintPad()
-                                sprint(f'{self.dryRunPrefix}Done copying.')
-                                sprintPad()
                 sprint('Done analyzing.')
 
             if srcPakDir and srcPakDirWasWritten and not self.debug:
@@ -3188,15 +4275,15 @@ class ModSwapCommandRunner():
                     sprint(f'Scanning "{gamePaksDir}" for pakchunk files...')
                     loggingReserved = self.debug
                     for relPath in listFilesRecursively(gamePaksDir):
-                        relPathInfo = getPathInfo(relPath, gamePaksDir)
-                        pakchunkFilenameParts = pakchunkRefnameToParts(relPathInfo['basename'])
+                        relDir, filename = os.path.split(relPath)
+                        pakchunkFilenameParts = pakchunkRefnameToParts(filename)
                         if pakchunkFilenameParts and pakchunkFilenameParts.get('suffix', None):
                             if pakchunkFilenameParts['suffix'] == PakchunkFilenameSuffix:
                                 allGamePakchunks.append(relPath)
                                 reserved = relPath.lower() in reservedPakchunksFilenameLower
                                 if not reserved:
                                     stem = pakchunkRefnamePartsDictToRefname(pakchunkFilenameParts, addSuffix=False)
-                                    relStemPath = getPathInfo(os.path.join(relPathInfo['relativeDir'], stem), gamePaksDir)['relative']
+                                    relStemPath = f'{relDir}/{stem}' if relDir else stem
                                     gamePakchunks.append(relStemPath)
                                 if not reserved or loggingReserved:
                                     sprint(f'{len(allGamePakchunks if loggingReserved else gamePakchunks)} - {relPath}{" -- RESERVED" if reserved else ""}')
@@ -3698,6 +4785,14 @@ class ModSwapCommandRunner():
                                 dest = normPath(os.path.join(gamePaksDir, pakchunkRelPath))
                                 if not self.dryRun and not os.path.exists(source):
                                     self.printError(f'Mod to be active source file not found "{source}"')
+                                elif (
+                                    source != dest
+                                    and os.path.isfile(source)
+                                    and os.path.isfile(dest)
+                                    and not os.path.samefile(source, dest)
+                                    and pakchunksMatch(source, dest)
+                                ):
+                                    sprint(f'"[Paks]/{pakchunkRelPath}" is identical to "{source}". Skipping moving it.')
                                 elif source != dest and (not os.path.exists(dest) or self.dryRun or not os.path.samefile(source, dest)):
                                     sprintPad()
                                     sprint(f'{self.dryRunPrefix}Moving "{source}" to "[Paks]/{pakchunkRelPath}"...')
@@ -3773,6 +4868,8 @@ class ModSwapCommandRunner():
             or searchingGameAssets
             or extractingAttachments
             or renamingAttachmentFiles
+            or packingAttachments
+            or unpackingAttachments
             or creatingAttachments
             or upgradingMods
             or mixingAttachments
@@ -3797,6 +4894,8 @@ class ModSwapCommandRunner():
                 'destPlatform': destPlatform,
                 'destPakDir': destPakDir,
                 'destPakPath': destPakPath,
+                'destPakAssets': destPakAssets,
+                'destPakAssetDependencies': destPakAssetDependencies,
                 'srcPakNumber': srcPakNumber,
                 'srcPakName': srcPakName,
                 'srcPakPlatform': srcPakPlatform,
@@ -3817,10 +4916,14 @@ class ModSwapCommandRunner():
                 'extraAssets': list(extraContentAssetPathsMap.keys()),
                 'extraFiles': extraContentPaths,
                 'sourceDirDestAssets': sourceDirDestAssetsMap,
+                # in order of precedence
+                'contentDirs': contentIndex.contentDirs,
                 'searchResume': searchResume,
             }
 
-            outputInfoFilename = getResultsFilePath(settingsFilePath)
+            self.results = outputInfo
+
+            outputInfoFilename = resultsFilePath or getResultsFilePath(settingsFilePath)
             sprintPad()
             sprint(f'{self.dryRunPrefix}Writing command results to "{outputInfoFilename}"')
             shouldWrite = not self.dryRun or (not self.nonInteractive and confirm(f'write command results "{outputInfoFilename}" despite dry run', pad=True, emptyMeansNo=True))
@@ -4,6 +4,7 @@ import pathlib
 import platform
 import shutil
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
 import semver
 import yaml
@@ -17,6 +18,8 @@ from modswap.helpers.gameHelpers import (KnownSupportedGameVersions,
 from modswap.helpers.guiHelpers import getDirectory, getFile
 from modswap.helpers.pakHelpers import UnrealPakProgramStem
 from modswap.helpers.pathHelpers import getPathInfo
+from modswap.helpers.processHelpers import (createToolSemaphores,
+                                            setToolSemaphores)
 from modswap.helpers.releaseHelpers import (getGithubProjectReleaseUrl,
                                             getLatestReleaseVersion)
 from modswap.helpers.settingsHelpers import (DefaultAttachmentsDir,
@@ -35,6 +38,7 @@ from modswap.metadata.programMetaData import ProgramName, Version
 from modswap.runtime.runCommand import (DefaultLauncherStartsGame,
                                         ModSwapCommandRunner,
                                         readSettingsRecursive)
+from modswap.runtime.runWorkers import runSettingsFile
 
 
 def getYesOrNoStr(flag, allowNone=False):
@@ -123,6 +127,43 @@ def parseMenuItemFromToken(token, menuItems, allowExact=True, allowSubset=True,
     return result
 
 
+# actions that only run once, after the last pakchunk
+LastPakchunkActionNames = (
+    'creatingAttachments',
+    'renamingAttachmentFiles',
+    'installingMods',
+    'openingGameLauncher',
+    'killingGame',
+    'searchingGameAssets',
+)
+
+
+def getPakchunkIterationKwargs(kwargs, srcPakPaths, i, iterations, runningInParallel=False):
+    """The `ModSwapCommandRunner.runCommand()` arguments to run pakchunk `i` of `iterations` with, from the arguments of a single run"""
+    srcPakPath = srcPakPaths[i] if i < len(srcPakPaths) else None
+    isLast = i == iterations - 1
+    return {
+        **kwargs,
+        **{name: kwargs.get(name, False) and isLast for name in LastPakchunkActionNames},
+        'srcPakPath': srcPakPath,
+        'isBatchMode': not isLast,
+        # pakchunks running at the same time share the settings file, so their outputs next to it need telling apart
+        'outputNameSuffix': f'-{getPathInfo(srcPakPath)["stem"]}' if runningInParallel and srcPakPath else '',
+    }
+
+
+def getPakchunksRunInParallel(iterations, settings):
+    """Whether to run `iterations` pakchunks in worker processes (with `pakchunkJobs`),
+    and the reason they run one at a time instead, if any"""
+    pakchunkJobs = int(settings.get('pakchunkJobs', 1))
+    if iterations <= 1 or pakchunkJobs == 1:
+        return False, None
+    if int(settings.get('destPakNumber', -1)) >= 0:
+        # every pakchunk would be paked into the same folder and pakchunk at once
+        return False, 'Running pakchunks one at a time, since `destPakNumber` gives them all the same destination pakchunk'
+    return True, None
+
+
 def runMenu(args, parser):
     menuSettingsPath = '.menu_settings.yaml'
     menuSettings = None
@@ -1275,61 +1316,141 @@ def runMenu(args, parser):
                             aggregateResultsFile.write('results:\n')
                             aggregateResultsFile.flush()
 
-                srcPakPathErrorCodeMap = {}
-                for i in range(iterations):
-                    srcPakPath = srcPakPaths[i] if i < len(srcPakPaths) else None
-                    isLast = i == iterations - 1
-
-                    runner = ModSwapCommandRunner()
-                    exitCode = runner.runCommand(
-                        fromMenu=True,
-                        settingsFilePath=settingsFilePath,
-                        gameDir=gameDir,
-                        gameVersion=gameVersion,
-                        pakingDir=pakingDir,
-                        attachmentsDir=attachmentsDir,
-                        unrealProjectDir=unrealProjectDir,
-                        uassetGuiPath=uassetGuiPath,
-                        unrealPakPath=unrealPakPath,
-                        sigFilePath=sigFilePath,
-                        umodelPath=umodelPath,
-                        activeModConfigName=activeModConfigName,
-                        inspecting=inspecting,
-                        creatingAttachments=creatingAttachments and isLast,
-                        extractingAttachments=extractingAttachments,
-                        renamingAttachmentFiles=renamingAttachmentFiles and isLast,
-                        srcPakPath=srcPakPath,
-                        customizationItemDbPath=customizationItemDbPath,
-                        prevGameVersion=prevGameVersion,
-                        upgradingMods=upgradingMods,
-                        mixingAttachments=mixingAttachments,
-                        paking=paking,
-                        installingMods=installingMods and isLast,
-                        openingGameLauncher=openingGameLauncher and isLast,
-                        launcherStartsGame=launcherStartsGame,
-                        killingGame=killingGame and isLast,
-                        searchingGameAssets=searchingGameAssets and isLast,
-                        nonInteractive=False,
-                        debug=debug,
-                        dryRun=dryRun,
-                        overwriteOverride=overwriteOverride,
-                        isBatchMode=not isLast,
+                # with `pakchunkJobs`, every pakchunk runs in a worker process, each stage (unpaking, converting, upgrading,
+                # paking) overlapping with other pakchunks' stages. Installing runs afterwards, once they are all paked.
+                pakchunkJobs = int(settings.get('pakchunkJobs', 1))
+                runningInParallel, sequentialReason = getPakchunksRunInParallel(iterations, settings)
+                if sequentialReason:
+                    esprint(sequentialReason)
+
+                def getIterationKwargs(i):
+                    return getPakchunkIterationKwargs({
+                        'fromMenu': True,
+                        'settingsFilePath': settingsFilePath,
+                        'gameDir': gameDir,
+                        'gameVersion': gameVersion,
+                        'pakingDir': pakingDir,
+                        'attachmentsDir': attachmentsDir,
+                        'unrealProjectDir': unrealProjectDir,
+                        'uassetGuiPath': uassetGuiPath,
+                        'unrealPakPath': unrealPakPath,
+                        'sigFilePath': sigFilePath,
+                        'umodelPath': umodelPath,
+                        'activeModConfigName': activeModConfigName,
+                        'inspecting': inspecting,
+                        'creatingAttachments': creatingAttachments,
+                        'extractingAttachments': extractingAttachments,
+                        'renamingAttachmentFiles': renamingAttachmentFiles,
+                        'customizationItemDbPath': customizationItemDbPath,
+                        'prevGameVersion': prevGameVersion,
+                        'upgradingMods': upgradingMods,
+                        'mixingAttachments': mixingAttachments,
+                        'paking': paking,
+                        'installingMods': installingMods,
+                        'openingGameLauncher': openingGameLauncher,
+                        'launcherStartsGame': launcherStartsGame,
+                        'killingGame': killingGame,
+                        'searchingGameAssets': searchingGameAssets,
+                        'nonInteractive': False,
+                        'debug': debug,
+                        'dryRun': dryRun,
+                        'overwriteOverride': overwriteOverride,
+                        'batchJobs': args.batchJobs,
+                    }, srcPakPaths, i, iterations, runningInParallel=runningInParallel)
+
+                pakchunkFutures = []
+                pakchunkExecutor = None
+                pakchunkResultsDir = None
+                runner = None
+                if runningInParallel:
+                    parallelOverwriteOverride = overwriteOverride
+                    if parallelOverwriteOverride is None:
+                        parallelOverwriteOverride = confirm('overwrite existing files while running pakchunks in parallel', pad=True, emptyMeansNo=True)
+                    sprintPad()
+                    sprint(f'Running {iterations} pakchunks in parallel (up to {pakchunkJobs or os.cpu_count()} at a time)...')
+                    sprintPad()
+                    if not dryRun:
+                        # (workers don't prompt to write results despite a dry run, so they write none)
+                        pakchunkResultsDir = tempfile.mkdtemp(dir=getPathInfo(settingsFilePath)['dir'], prefix=f'{getPathInfo(resultsFilePath)["stem"]}_')
+                    pakchunkExecutor = ProcessPoolExecutor(
+                        max_workers=pakchunkJobs or None,
+                        initializer=setToolSemaphores,
+                        initargs=(createToolSemaphores(settings.get('toolJobs', None)),),
                     )
-                    if exitCode:
-                        srcPakPathErrorCodeMap[srcPakPath] = exitCode
-
-                    if aggregateResultsFile is not None:
-                        if runner.wroteResults:
-                            with open(resultsFilePath, 'r', encoding='utf-8') as file:
-                                isFirstLine = True
-                                for line in file:
-                                    if isFirstLine:
-                                        aggregateResultsFile.write(f'- {srcPakPath}:\n')
+                    for i in range(iterations):
+                        pakchunkFutures.append(pakchunkExecutor.submit(runSettingsFile, {
+                            **getIterationKwargs(i),
+                            'installingMods': False,
+                            'isBatchMode': True,
+                            # workers can't prompt
+                            'nonInteractive': True,
+                            'overwriteOverride': parallelOverwriteOverride,
+                            'resultsFilePath': os.path.join(pakchunkResultsDir, f'{i}.yaml') if pakchunkResultsDir else None,
+                        }, capturingOutput=True))
+
+                srcPakPathErrorCodeMap = {}
+                try:
+                    for i in range(iterations):
+                        srcPakPath = srcPakPaths[i] if i < len(srcPakPaths) else None
+
+                        if runningInParallel:
+                            iterationResultsFilePath = os.path.join(pakchunkResultsDir, f'{i}.yaml') if pakchunkResultsDir else None
+                            try:
+                                exitCode, output, _ = pakchunkFutures[i].result()
+                                sprint(output, end='')
+                            except Exception as e:
+                                esprint(e)
+                                exitCode = 1
+                            wroteResults = iterationResultsFilePath is not None and os.path.isfile(iterationResultsFilePath)
+                        else:
+                            iterationResultsFilePath = resultsFilePath
+                            runner = ModSwapCommandRunner()
+                            exitCode = runner.runCommand(**getIterationKwargs(i))
+                            wroteResults = runner.wroteResults
+                        if exitCode:
+                            srcPakPathErrorCodeMap[srcPakPath] = exitCode
+
+                        if aggregateResultsFile is not None:
+                            if wroteResults:
+                                with open(iterationResultsFilePath, 'r', encoding='utf-8') as file:
+                                    isFirstLine = True
+                                    for line in file:
+                                        if isFirstLine:
+                                            aggregateResultsFile.write(f'- {srcPakPath}:\n')
+                                            aggregateResultsFile.flush()
+                                            isFirstLine = False
+
+                                        aggregateResultsFile.write(f'  {line}')
                                         aggregateResultsFile.flush()
-                                        isFirstLine = False
 
-                                    aggregateResultsFile.write(f'  {line}')
-                                    aggregateResultsFile.flush()
+                    if runningInParallel and installingMods:
+                        sprintSeparator()
+                        runner = ModSwapCommandRunner()
+                        installExitCode = runner.runCommand(**{
+                            **getIterationKwargs(iterations - 1),
+                            # only install: the pakchunks were all paked by the workers
+                            'srcPakPath': None,
+                            'inspecting': False,
+                            'extractingAttachments': False,
+                            'upgradingMods': False,
+                            'mixingAttachments': False,
+                            'paking': False,
+                            'resultsFilePath': os.path.join(pakchunkResultsDir, 'install.yaml') if pakchunkResultsDir else None,
+                        })
+                        if installExitCode:
+                            esprint(f'Error installing mods: error code {installExitCode}')
+                finally:
+                    if pakchunkExecutor is not None:
+                        pakchunkExecutor.shutdown(cancel_futures=True)
+                    if pakchunkResultsDir is not None:
+                        shutil.rmtree(pakchunkResultsDir, ignore_errors=True)
+
+                if runner is None:
+                    # nothing ran in this process, so this runner only writes the aggregate results
+                    runner = ModSwapCommandRunner()
+                    runner.dryRun = dryRun
+                    runner.dryRunPrefix = runner.DryRunPrefix if dryRun else ''
+                    runner.overwriteOverride = overwriteOverride
 
                 if iterations > 1 and srcPakPathErrorCodeMap:
                     sprintSeparator()
@@ -0,0 +1,37 @@
+import contextlib
+import io
+import traceback
+
+from modswap.helpers.jsonHelpers import jsonifyDataRecursive
+
+
+def runSettingsFile(kwargs, capturingOutput=False):
+    """Runs a settings file with a new runner (e.g. one of a batch, or for one of several source pakchunks).
+    With `capturingOutput` (e.g. in a worker process), console output is returned instead of printed, to be replayed in order.
+    Returns the exit code, the captured output (or None), and the command results."""
+    # imported here, since the runner imports this module
+    from modswap.runtime.runCommand import ModSwapCommandRunner
+
+    output = io.StringIO() if capturingOutput else None
+    with contextlib.ExitStack() as stack:
+        if capturingOutput:
+            stack.enter_context(contextlib.redirect_stdout(output))
+            stack.enter_context(contextlib.redirect_stderr(output))
+        runner = ModSwapCommandRunner()
+        try:
+            exitCode = runner.runCommand(**kwargs)
+        except Exception:
+            if not capturingOutput:
+                raise
+            # report it in the batch's output, like errors inside the runner
+            print(traceback.format_exc())
+            exitCode = 1
+
+    results = jsonifyDataRecursive(runner.results) if runner.results is not None else None
+    return exitCode, output.getvalue() if output is not None else None, results
+
+
+def runSettingsFiles(kwargsList, capturingOutput=False):
+    """Runs settings files one after another (e.g. batch settings files sharing folders, in one worker process).
+    Returns what `runSettingsFile` returns for each."""
+    return [runSettingsFile(kwargs, capturingOutput=capturingOutput) for kwargs in kwargsList]
@@ -0,0 +1,115 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from modswap.helpers.attachmentLibraryHelpers import (AttachmentLibrary,
+                                                      isValidAttachmentFilename,
+                                                      readAttachmentFiles)
+from modswap.helpers.yamlHelpers import yamlDump
+from modswap.runtime.runCommand import ModSwapCommandRunner
+
+
+def makeAttachment(modelCategory, attachmentId):
+    return {
+        'attachmentId': attachmentId,
+        'modelCategory': modelCategory,
+        'displayName': f'{attachmentId} ({modelCategory})',
+        'attachmentData': {'Name': attachmentId, 'Value': [1, 2.5, 'three']},
+    }
+
+
+class IsValidAttachmentFilenameTests(unittest.TestCase):
+    def testPlainFilenames(self):
+        for filename in ('SocketAttachment_Hat.yaml', 'Hat.json', 'Hat with spaces.yaml'):
+            with self.subTest(filename=filename):
+                self.assertTrue(isValidAttachmentFilename(filename))
+
+    def testPathsAndOtherFiles(self):
+        for filename in ('../Hat.yaml', '..\\Hat.yaml', 'Sub/Hat.yaml', 'Sub\\Hat.yaml', 'C:Hat.yaml', '/Hat.yaml', 'Hat..yaml', 'Hat.txt', '', None):
+            with self.subTest(filename=filename):
+                self.assertFalse(isValidAttachmentFilename(filename))
+
+
+class AttachmentLibraryTests(unittest.TestCase):
+    def setUp(self):
+        tempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempDir.cleanup)
+        self.root = tempDir.name
+        self.libraryPath = os.path.join(self.root, 'attachments.sqlite')
+        self.attachmentsDir = os.path.join(self.root, 'attachments')
+        os.makedirs(self.attachmentsDir)
+
+    def getRunner(self, attachmentsDir):
+        runner = ModSwapCommandRunner()
+        runner.attachmentsDir = attachmentsDir
+        runner.nonInteractive = True
+        runner.overwriteOverride = True
+        return runner
+
+    def writeAttachmentFiles(self, attachments):
+        for modelCategory, attachmentId, suffix in attachments:
+            with open(os.path.join(self.attachmentsDir, f'{attachmentId}{suffix}'), 'w', encoding='utf-8') as file:
+                if suffix == '.json':
+                    json.dump(makeAttachment(modelCategory, attachmentId), file)
+                else:
+                    yamlDump(makeAttachment(modelCategory, attachmentId), file)
+
+    def testReadsBackInPackingOrder(self):
+        attachments = [(f'Z{index}.yaml', makeAttachment('Survivor' if index % 2 else 'Killer', f'Z{index}')) for index in range(5, 0, -1)]
+        with AttachmentLibrary(self.libraryPath) as library:
+            library.writeAll(attachments)
+            self.assertEqual(library.readAll(), attachments)
+            self.assertEqual(library.readAll(['Killer']), [attachment for attachment in attachments if attachment[1]['modelCategory'] == 'Killer'])
+
+    def testRepackedDefinitionsTakeTheirNewPosition(self):
+        attachments = [(f'{attachmentId}.yaml', makeAttachment('Killer', attachmentId)) for attachmentId in ('B', 'A', 'C')]
+        changedAttachment = ('B.yaml', {**makeAttachment('Killer', 'B'), 'displayName': 'Changed'})
+        with AttachmentLibrary(self.libraryPath) as library:
+            library.writeAll(attachments)
+            library.writeAll([changedAttachment])
+            self.assertEqual(library.readAll(), [attachments[1], attachments[2], changedAttachment])
+            self.assertEqual(library.getCount(), 3)
+
+    def testPackUnpackRoundTrip(self):
+        self.writeAttachmentFiles([
+            ('Survivor', 'Hat', '.yaml'),
+            ('Killer', 'Mask', '.json'),
+            ('Survivor', 'Bag', '.yaml'),
+            ('Killer', 'Axe', '.yaml'),
+        ])
+        folderAttachments, _ = readAttachmentFiles(self.attachmentsDir)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            runner = self.getRunner(self.attachmentsDir)
+            runner.packAttachments(self.libraryPath)
+            unpackedDir = os.path.join(self.root, 'unpacked')
+            unpackRunner = self.getRunner(unpackedDir)
+            unpackRunner.unpackAttachments(self.libraryPath)
+        self.assertEqual((runner.exitCode, unpackRunner.exitCode), (0, 0))
+
+        # in the order the folder was scanned in, which is the order attachments are mixed in
+        with AttachmentLibrary(self.libraryPath) as library:
+            self.assertEqual(library.readAll(), folderAttachments)
+        self.assertEqual(sorted(os.listdir(unpackedDir)), sorted(os.listdir(self.attachmentsDir)))
+        unpackedAttachments, _ = readAttachmentFiles(unpackedDir)
+        self.assertEqual(dict(unpackedAttachments), dict(folderAttachments))
+
+    def testUnpackingSkipsInvalidFilenames(self):
+        with AttachmentLibrary(self.libraryPath) as library:
+            library.writeAll([
+                ('../Outside.yaml', makeAttachment('Killer', 'Outside')),
+                ('Sub/Nested.yaml', makeAttachment('Killer', 'Nested')),
+                ('Inside.yaml', makeAttachment('Killer', 'Inside')),
+            ])
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            runner = self.getRunner(self.attachmentsDir)
+            runner.unpackAttachments(self.libraryPath)
+        self.assertEqual(runner.exitCode, 1)
+        self.assertEqual(os.listdir(self.attachmentsDir), ['Inside.yaml'])
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'Outside.yaml')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import os
+import tempfile
+import unittest
+
+from modswap.helpers.batchHelpers import (BatchIndex, getBatchEntryGroups,
+                                          getSettingsHash)
+
+
+def writeFile(path, content='x'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content)
+
+
+class GetBatchEntryGroupsTests(unittest.TestCase):
+    def testEntriesWritingTheSamePathAreGrouped(self):
+        groups = getBatchEntryGroups([
+            {'unpak/pakchunk1': True, 'extra': False},
+            {'unpak/pakchunk2': True, 'extra': False},
+            {'unpak/pakchunk1': True},
+            {'unpak/pakchunk3': True, 'unpak/pakchunk2': False},
+        ])
+        self.assertEqual(groups, [[0, 2], [1, 3]])
+
+    def testEntriesOnlyReadingAPathAreNotGrouped(self):
+        self.assertEqual(getBatchEntryGroups([{'extra': False}, {'extra': False}]), [[0], [1]])
+
+    def testGroupsAreJoinedThroughSharedEntries(self):
+        groups = getBatchEntryGroups([{'a': True}, {'b': True}, {'a': False, 'b': False}, {'c': True}])
+        self.assertEqual(groups, [[0, 1, 2], [3]])
+
+    def testUnknownResourcesRunOnTheirOwn(self):
+        self.assertEqual(getBatchEntryGroups([None, {'a': True}, None]), [[0], [1], [2]])
+
+
+class BatchIndexTests(unittest.TestCase):
+    def setUp(self):
+        tempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempDir.cleanup)
+        self.root = tempDir.name
+        self.modDir = os.path.join(self.root, 'mod')
+        self.sharedDir = os.path.join(self.root, 'shared')
+        self.srcPakPath = os.path.join(self.root, 'pakchunk1-WindowsNoEditor.pak')
+        self.destPakPath = os.path.join(self.root, 'out', 'pakchunk1-WindowsNoEditor.pak')
+        self.settingsFilePath = os.path.join(self.root, 'mod.yaml')
+        self.settingsHash = getSettingsHash({'destPakNumber': 1})
+        writeFile(self.srcPakPath)
+        writeFile(self.destPakPath)
+        writeFile(os.path.join(self.sharedDir, 'Characters', 'Mesh.uasset'))
+        writeFile(os.path.join(self.sharedDir, 'Characters', 'Mesh.uexp'))
+        writeFile(os.path.join(self.sharedDir, 'Characters', 'Other.uasset'))
+        os.makedirs(self.modDir)
+        self.indexPath = os.path.join(self.root, 'batch-index.json')
+
+    def makeIndex(self):
+        index = BatchIndex(self.indexPath)
+        index.setEntry(
+            self.settingsFilePath,
+            self.settingsHash,
+            self.srcPakPath,
+            self.destPakPath,
+            {self.sharedDir: ['Characters/Mesh']},
+            [self.modDir, self.sharedDir],
+        )
+        return index
+
+    def getStaleReason(self, index):
+        index.findChangedAssets()
+        return index.getStaleReason(self.settingsFilePath, self.settingsHash, self.srcPakPath)
+
+    def testRecordsOnlyTheAssetsFiles(self):
+        index = self.makeIndex()
+        assetStats = index.entries[self.settingsFilePath]['assets'][self.sharedDir]['Characters/Mesh']
+        self.assertEqual([stats[0] for stats in assetStats], ['Characters/Mesh.uasset', 'Characters/Mesh.uexp'])
+
+    def testUnchanged(self):
+        self.assertIsNone(self.getStaleReason(self.makeIndex()))
+
+    def testNotPakedBefore(self):
+        index = BatchIndex(self.indexPath)
+        self.assertEqual(self.getStaleReason(index), 'not paked by this batch before')
+
+    def testSettingsChanged(self):
+        index = self.makeIndex()
+        index.findChangedAssets()
+        self.assertEqual(index.getStaleReason(self.settingsFilePath, getSettingsHash({'destPakNumber': 2}), self.srcPakPath), 'settings changed')
+
+    def testSourcePakchunkChanged(self):
+        index = self.makeIndex()
+        writeFile(self.srcPakPath, 'changed')
+        self.assertEqual(self.getStaleReason(index), 'source pakchunk changed')
+
+    def testPakchunkMissing(self):
+        index = self.makeIndex()
+        os.remove(self.destPakPath)
+        self.assertEqual(self.getStaleReason(index), 'pakchunk missing')
+
+    def testAssetFileChanged(self):
+        index = self.makeIndex()
+        writeFile(os.path.join(self.sharedDir, 'Characters', 'Mesh.uexp'), 'changed')
+        self.assertEqual(self.getStaleReason(index), '1 asset changed')
+
+    def testAssetFileAdded(self):
+        index = self.makeIndex()
+        writeFile(os.path.join(self.sharedDir, 'Characters', 'Mesh.json'))
+        self.assertEqual(self.getStaleReason(index), '1 asset changed')
+
+    def testOtherAssetChanged(self):
+        index = self.makeIndex()
+        writeFile(os.path.join(self.sharedDir, 'Characters', 'Other.uasset'), 'changed')
+        self.assertIsNone(self.getStaleReason(index))
+
+    def testAssetAddedToAHigherPrecedenceContentFolder(self):
+        index = self.makeIndex()
+        writeFile(os.path.join(self.modDir, 'Characters', 'Mesh.uasset'))
+        self.assertEqual(self.getStaleReason(index), '1 asset changed')
+
+    def testReverseIndex(self):
+        index = self.makeIndex()
+        self.assertEqual(index.findChangedAssets(), {(self.sharedDir, 'Characters/Mesh'): [self.settingsFilePath]})
+
+    def testSavesAndLoads(self):
+        index = self.makeIndex()
+        index.save()
+        self.assertFalse(index.dirty)
+
+        loadedIndex = BatchIndex(self.indexPath)
+        loadedIndex.load()
+        self.assertEqual(loadedIndex.entries, index.entries)
+        self.assertIsNone(self.getStaleReason(loadedIndex))
+
+    def testSavesOnlyWhenChanged(self):
+        BatchIndex(self.indexPath).save()
+        self.assertFalse(os.path.exists(self.indexPath))
+
+    def testRemovesEntries(self):
+        index = self.makeIndex()
+        index.save()
+        index.removeEntry(self.settingsFilePath)
+        self.assertTrue(index.dirty)
+        self.assertEqual(self.getStaleReason(index), 'not paked by this batch before')
+
+    def testIgnoresUnreadableIndex(self):
+        writeFile(self.indexPath, '{"version": ')
+        index = BatchIndex(self.indexPath)
+        index.load()
+        self.assertEqual(index.entries, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
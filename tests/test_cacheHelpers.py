@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from modswap.helpers.cacheHelpers import getDirFingerprint
+
+PakSuffixes = {'.pak'}
+
+
+def writeFile(path, content, mtimeNs=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content)
+    if mtimeNs is not None:
+        os.utime(path, ns=(mtimeNs, mtimeNs))
+
+
+class GetDirFingerprintTests(unittest.TestCase):
+    def setUp(self):
+        tempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempDir.cleanup)
+        self.paksDir = os.path.join(tempDir.name, 'Paks')
+        self.modPakPath = os.path.join(self.paksDir, '~mods', 'pakchunk99-Mod.pak')
+        writeFile(os.path.join(self.paksDir, 'pakchunk0-WindowsNoEditor.pak'), 'base', 1_000_000_000)
+        writeFile(self.modPakPath, 'mod', 1_000_000_000)
+
+    def getFingerprint(self):
+        return getDirFingerprint(self.paksDir, PakSuffixes)
+
+    def testUnchangedFolderKeepsItsFingerprint(self):
+        self.assertEqual(self.getFingerprint(), self.getFingerprint())
+
+    def testChangedNestedPakchunkChangesIt(self):
+        fingerprint = self.getFingerprint()
+        writeFile(self.modPakPath, 'mod', 2_000_000_000)
+        self.assertNotEqual(self.getFingerprint(), fingerprint)
+
+        fingerprint = self.getFingerprint()
+        writeFile(self.modPakPath, 'mod changed', 2_000_000_000)
+        self.assertNotEqual(self.getFingerprint(), fingerprint)
+
+    def testAddedNestedPakchunkChangesIt(self):
+        fingerprint = self.getFingerprint()
+        writeFile(os.path.join(self.paksDir, '~mods', 'Other', 'pakchunk98-Other.pak'), 'other', 1_000_000_000)
+        self.assertNotEqual(self.getFingerprint(), fingerprint)
+
+    def testMovedPakchunkChangesIt(self):
+        fingerprint = self.getFingerprint()
+        os.replace(self.modPakPath, os.path.join(self.paksDir, 'pakchunk99-Mod.pak'))
+        self.assertNotEqual(self.getFingerprint(), fingerprint)
+
+    def testOtherFilesAreIgnored(self):
+        fingerprint = self.getFingerprint()
+        writeFile(os.path.join(self.paksDir, '~mods', 'readme.txt'), 'notes')
+        self.assertEqual(self.getFingerprint(), fingerprint)
+        self.assertNotEqual(getDirFingerprint(self.paksDir), fingerprint)
+
+
+if __name__ == '__main__':
+    unittest.main()
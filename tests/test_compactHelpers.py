@@ -0,0 +1,148 @@
+import copy
+import json
+import pickle
+import unittest
+
+from modswap.helpers.compactHelpers import (CompactRecord, fromCompact,
+                                            getDeepSize, getRecordShape,
+                                            toCompact)
+from modswap.helpers.jsonHelpers import jsonDump
+
+
+def makeProperty(index):
+    return {
+        '$type': 'UAssetAPI.PropertyTypes.Objects.StrPropertyData, UAssetAPI',
+        'Name': f'Property{index % 10}',
+        'ArrayIndex': 0,
+        'IsZero': False,
+        'PropertyTagFlags': 'None',
+        'PropertyTagExtensions': 'NoExtension',
+        'Value': f'Value {index}',
+    }
+
+
+def makeTable(rowCount):
+    return {
+        'Name': 'CustomizationItemDB',
+        'Rows': [
+            {'Name': f'Row{index}', 'Value': [makeProperty(index), makeProperty(index + 1)]}
+            for index in range(rowCount)
+        ],
+    }
+
+
+class CompactConversionTests(unittest.TestCase):
+    def testRoundTrip(self):
+        table = makeTable(3)
+        compact = toCompact(table)
+        self.assertIsInstance(compact, CompactRecord)
+        self.assertIsInstance(compact['Rows'][0]['Value'][1], CompactRecord)
+        restored = fromCompact(compact)
+        self.assertEqual(restored, table)
+        self.assertIs(type(restored['Rows'][0]['Value'][1]), dict)
+        self.assertEqual(json.loads(jsonDump(compact)), table)
+
+    def testKeyOrderIsKept(self):
+        record = toCompact({'b': 1, 'a': 2, 'c': 3})
+        self.assertEqual(list(record), ['b', 'a', 'c'])
+        self.assertEqual(list(fromCompact(record)), ['b', 'a', 'c'])
+        self.assertEqual(jsonDump(record), '{"b": 1, "a": 2, "c": 3}')
+
+    def testCompactValuesAreKept(self):
+        record = CompactRecord({'a': 1})
+        self.assertIs(toCompact(record), record)
+
+
+class RecordShapeTests(unittest.TestCase):
+    def testRecordsWithTheSameKeysShareAShape(self):
+        rows = toCompact(makeTable(2))['Rows']
+        self.assertIs(rows[0].shape, rows[1].shape)
+        self.assertIs(rows[0]['Value'][0].shape, rows[1]['Value'][1].shape)
+        self.assertIs(rows[0].shape, getRecordShape(('Name', 'Value')))
+
+    def testKeyOrderMakesADifferentShape(self):
+        record = CompactRecord({'a': 1, 'b': 2})
+        otherRecord = CompactRecord({'b': 2, 'a': 1})
+        self.assertIsNot(record.shape, otherRecord.shape)
+        self.assertEqual(record, otherRecord)
+
+
+class CompactRecordTests(unittest.TestCase):
+    def testSettingANewKeyAppendsIt(self):
+        record = CompactRecord({'a': 1, 'b': 2})
+        otherRecord = CompactRecord({'a': 3, 'b': 4})
+        record['c'] = 5
+        otherRecord['c'] = 6
+        self.assertEqual(list(record.items()), [('a', 1), ('b', 2), ('c', 5)])
+        self.assertIs(record.shape, otherRecord.shape)
+        self.assertIs(record.shape, getRecordShape(('a', 'b', 'c')))
+        self.assertEqual(len(record), 3)
+        self.assertIn('c', record)
+
+    def testSettingAKeyKeepsItsPosition(self):
+        record = CompactRecord({'a': 1, 'b': 2})
+        shape = record.shape
+        record['a'] = 3
+        self.assertIs(record.shape, shape)
+        self.assertEqual(list(record.items()), [('a', 3), ('b', 2)])
+
+    def testDeletingAKey(self):
+        record = CompactRecord({'a': 1, 'b': 2, 'c': 3})
+        del record['b']
+        self.assertEqual(list(record.items()), [('a', 1), ('c', 3)])
+        self.assertIs(record.shape, getRecordShape(('a', 'c')))
+        self.assertNotIn('b', record)
+        self.assertIsNone(record.get('b'))
+        self.assertEqual(record['c'], 3)
+        with self.assertRaises(KeyError):
+            del record['b']
+        with self.assertRaises(KeyError):
+            record['b']
+
+    def testMutationsMatchADict(self):
+        record = CompactRecord()
+        expected = {}
+        for key, value in [('a', 1), ('b', 2), ('a', 3), ('c', 4)]:
+            record[key] = value
+            expected[key] = value
+        del record['a']
+        del expected['a']
+        record['a'] = 5
+        expected['a'] = 5
+        record.update({'d': 6}, b=7)
+        expected.update({'d': 6}, b=7)
+        self.assertEqual(list(record.items()), list(expected.items()))
+        self.assertEqual(record.pop('c'), expected.pop('c'))
+        self.assertEqual(record.setdefault('e', 8), expected.setdefault('e', 8))
+        self.assertEqual(list(record.items()), list(expected.items()))
+
+    def testCopiesAreIndependent(self):
+        record = toCompact({'a': [1], 'b': {'c': 2}})
+        shallowCopy = record.copy()
+        deepCopy = copy.deepcopy(record)
+        shallowCopy['d'] = 3
+        deepCopy['a'].append(4)
+        deepCopy['b']['c'] = 5
+        self.assertNotIn('d', record)
+        self.assertEqual(record, {'a': [1], 'b': {'c': 2}})
+        self.assertIs(shallowCopy['a'], record['a'])
+
+    def testPickling(self):
+        record = toCompact(makeTable(1))
+        restored = pickle.loads(pickle.dumps(record))
+        self.assertEqual(restored, record)
+        self.assertIs(restored.shape, record.shape)
+
+
+class CompactSizeTests(unittest.TestCase):
+    def testCompactRecordsAreSmallerThanDicts(self):
+        table = makeTable(200)
+        compact = toCompact(table)
+        self.assertLess(getDeepSize(compact), getDeepSize(table))
+        # keys are shared by every record with the same shape, so a record only holds its values
+        property = makeProperty(0)
+        self.assertLess(getDeepSize(CompactRecord(property)), getDeepSize(property) * 0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
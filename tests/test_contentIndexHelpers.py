@@ -0,0 +1,77 @@
+import os
+import unittest
+
+from modswap.helpers.contentIndexHelpers import ContentIndex, globToRegex
+
+
+class GlobToRegexTests(unittest.TestCase):
+    def assertMatches(self, pattern, paths, matching=True):
+        regex = globToRegex(pattern)
+        for path in paths:
+            with self.subTest(pattern=pattern, path=path):
+                self.assertEqual(bool(regex.match(path)), matching)
+
+    def testStarStaysInOneFolder(self):
+        self.assertMatches('Characters/*.uasset', ['Characters/Mesh.uasset', 'Characters/.uasset'])
+        self.assertMatches('Characters/*.uasset', ['Characters/Slasher/Mesh.uasset', 'Characters/Mesh.uexp'], matching=False)
+
+    def testDoubleStarFolderMatchesAnyDepth(self):
+        self.assertMatches('Characters/**/Mesh.uasset', [
+            'Characters/Mesh.uasset',
+            'Characters/Slasher/Mesh.uasset',
+            'Characters/Slasher/Legs/Mesh.uasset',
+        ])
+        self.assertMatches('Characters/**/Mesh.uasset', ['Characters/OtherMesh.uasset', 'Other/Mesh.uasset'], matching=False)
+
+    def testTrailingDoubleStarMatchesEverythingBelow(self):
+        self.assertMatches('Characters/**', ['Characters/Mesh.uasset', 'Characters/Slasher/Legs/Mesh.uexp'])
+        self.assertMatches('Characters/**', ['Other/Characters/Mesh.uasset'], matching=False)
+
+    def testQuestionMarkMatchesOneCharacter(self):
+        self.assertMatches('Mesh_?.uasset', ['Mesh_1.uasset', 'Mesh_a.uasset'])
+        self.assertMatches('Mesh_?.uasset', ['Mesh_.uasset', 'Mesh_12.uasset', 'Mesh_/.uasset'], matching=False)
+
+    def testCharacterClasses(self):
+        self.assertMatches('Mesh_[ab].uasset', ['Mesh_a.uasset', 'Mesh_b.uasset'])
+        self.assertMatches('Mesh_[ab].uasset', ['Mesh_c.uasset'], matching=False)
+        self.assertMatches('Mesh_[!ab].uasset', ['Mesh_c.uasset'])
+        self.assertMatches('Mesh_[!ab].uasset', ['Mesh_a.uasset'], matching=False)
+
+    def testOtherCharactersAreLiteral(self):
+        self.assertMatches('Mesh (1)+.uasset', ['Mesh (1)+.uasset'])
+        self.assertMatches('Mesh.uasset', ['MeshXuasset'], matching=False)
+        self.assertMatches('Mesh_[.uasset', ['Mesh_[.uasset'])
+
+    def testMatchesWholePaths(self):
+        self.assertMatches('Mesh.uasset', ['Mesh.uasset.bak', 'Other/Mesh.uasset'], matching=False)
+
+    def testCaseMatchesTheFileSystem(self):
+        caseInsensitive = os.path.normcase('A') == 'a'
+        self.assertMatches('characters/*.UASSET', ['Characters/Mesh.uasset'], matching=caseInsensitive)
+
+
+class ContentIndexTests(unittest.TestCase):
+    def testExtendKeepsTheFolderPrecedence(self):
+        contentIndex = ContentIndex()
+        contentIndex.add('pak', ['Data/DB.uasset'])
+        contentIndex.add('extra', ['Characters/Mesh.uasset', 'Characters/Other.uasset'])
+        pakPaths = contentIndex.paths['pak']
+        contentIndex.extend('pak', ['Characters/Mesh.uasset', 'Characters/Mesh.uexp'])
+
+        self.assertIs(contentIndex.paths['pak'], pakPaths)
+        self.assertEqual(pakPaths, ['Data/DB.uasset', 'Characters/Mesh.uasset', 'Characters/Mesh.uexp'])
+        self.assertTrue(contentIndex.hasFile('pak', 'Characters/Mesh.uexp'))
+        self.assertEqual(list(contentIndex.assetPathsMaps['pak']), ['Data/DB', 'Characters/Mesh'])
+        self.assertEqual(contentIndex.sourceFiles['Characters/Mesh'], {'contentDir': 'pak', 'fileSuffixes': ['.uasset', '.uexp']})
+        self.assertEqual(contentIndex.sourceFiles['Characters/Other']['contentDir'], 'extra')
+
+    def testExtendKeepsSourceFilesSetOutsideTheIndex(self):
+        contentIndex = ContentIndex()
+        contentIndex.add('pak', [])
+        contentIndex.sourceFiles['Data/DB'] = {'contentDir': 'altered', 'fileSuffixes': ['.uasset']}
+        contentIndex.extend('pak', ['Data/DB.uasset'])
+        self.assertEqual(contentIndex.sourceFiles['Data/DB']['contentDir'], 'altered')
+
+
+if __name__ == '__main__':
+    unittest.main()
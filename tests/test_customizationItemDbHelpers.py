@@ -0,0 +1,145 @@
+import itertools
+import os
+import tempfile
+import unittest
+
+from modswap.helpers.customizationItemDbHelpers import (ModelFilterKeyGetters,
+                                                        ModelIndex,
+                                                        getNameMapNames)
+from modswap.helpers.uassetHelpers import (EnumPropertyDataType,
+                                           IntPropertyDataType,
+                                           NamePropertyDataType,
+                                           StructPropertyDataType)
+
+CategoryNames = ['SurvivorTorso', 'SurvivorLegs', 'KillerBody']
+
+
+def makeProperty(propertyType, name, value, **fields):
+    return {'$type': propertyType, 'Name': name, **fields, 'Value': value}
+
+
+def makeModel(modelName, characterId, categoryName):
+    values = [
+        makeProperty(NamePropertyDataType, 'ID', modelName),
+        makeProperty(EnumPropertyDataType, 'Category', f'ECustomizationCategory::{categoryName}', EnumType='ECustomizationCategory'),
+    ]
+    if characterId is not None:
+        values.append(makeProperty(IntPropertyDataType, 'AssociatedCharacter', characterId))
+    return makeProperty(StructPropertyDataType, modelName, values, StructType='CustomizationItemData')
+
+
+def makeModels():
+    models = [
+        makeModel(f'M{i % 5}_{CategoryNames[i % 3]}_{i}', i % 4, CategoryNames[i % 3])
+        for i in range(24)
+    ]
+    # a model without an associated character, which only matches filters on other fields
+    models.append(makeModel('M9_SurvivorTorso', None, 'SurvivorTorso'))
+    return models
+
+
+def getLinearMatchingModelIndices(models, modelFilters):
+    """Filters the models one by one, checking each filter's field of every model"""
+    activeFilters = {filterKey: values for filterKey, values in modelFilters.items() if values}
+    if not activeFilters:
+        return None
+
+    matching = set()
+    for modelIndex, model in enumerate(models):
+        for filterKey, values in activeFilters.items():
+            try:
+                key = ModelFilterKeyGetters[filterKey](model)
+            except Exception:
+                key = None
+            if key not in values:
+                break
+        else:
+            matching.add(modelIndex)
+    return matching
+
+
+def getModelFiltersCases():
+    valuesByFilterKey = {
+        'characterIds': [[], [0], [1, 3], [7]],
+        'categories': [[], ['SurvivorTorso'], ['SurvivorLegs', 'KillerBody'], ['Unknown']],
+        'baseModels': [[], ['M2'], ['M0', 'M4', 'M9']],
+    }
+    for valuesCombo in itertools.product(*valuesByFilterKey.values()):
+        yield dict(zip(valuesByFilterKey.keys(), valuesCombo))
+
+
+class ModelIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.models = makeModels()
+
+    def testMatchesLinearFiltering(self):
+        modelIndex = ModelIndex(self.models)
+        for modelFilters in getModelFiltersCases():
+            with self.subTest(modelFilters=modelFilters):
+                self.assertEqual(
+                    modelIndex.getMatchingModelIndices(modelFilters),
+                    getLinearMatchingModelIndices(self.models, modelFilters),
+                )
+
+    def testSingleFilterFields(self):
+        modelIndex = ModelIndex(self.models)
+        self.assertEqual(modelIndex.getMatchingModelIndices({'characterIds': [2]}), {2, 6, 10, 14, 18, 22})
+        self.assertEqual(modelIndex.getMatchingModelIndices({'baseModels': ['M9']}), {24})
+        self.assertEqual(
+            modelIndex.getMatchingModelIndices({'categories': ['KillerBody'], 'characterIds': [1]}),
+            {5, 17},
+        )
+        self.assertIsNone(modelIndex.getMatchingModelIndices({}))
+        self.assertIsNone(modelIndex.getMatchingModelIndices({'categories': []}))
+
+    def testUnsupportedFilter(self):
+        with self.assertRaises(ValueError):
+            ModelIndex(self.models).getMatchingModelIndices({'colors': ['red']})
+
+    def testIndexIsBuiltOnlyForUsedFilters(self):
+        modelIndex = ModelIndex(self.models)
+        modelIndex.getMatchingModelIndices({'categories': ['SurvivorTorso'], 'baseModels': []})
+        self.assertEqual(set(modelIndex.indices), {'categories'})
+        self.assertTrue(modelIndex.dirty)
+
+    def testModelNames(self):
+        modelIndex = ModelIndex(self.models)
+        for i, model in enumerate(self.models):
+            self.assertEqual(modelIndex.getModelNames(i), sorted(getNameMapNames(model)))
+
+    def testSavedIndexMatchesLinearFiltering(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = os.path.join(tempDir, 'modelIndex.json')
+            modelIndex = ModelIndex(self.models)
+            for modelFilters in getModelFiltersCases():
+                modelIndex.getMatchingModelIndices(modelFilters)
+            modelIndex.getModelNames(3)
+            modelIndex.save(path, 'key')
+            self.assertFalse(modelIndex.dirty)
+
+            loadedIndex = ModelIndex(self.models)
+            self.assertTrue(loadedIndex.load(path, 'key'))
+            self.assertEqual(loadedIndex.getModelNames(3), modelIndex.getModelNames(3))
+            self.assertIsNone(loadedIndex.modelNames[4])
+            for modelFilters in getModelFiltersCases():
+                with self.subTest(modelFilters=modelFilters):
+                    self.assertEqual(
+                        loadedIndex.getMatchingModelIndices(modelFilters),
+                        getLinearMatchingModelIndices(self.models, modelFilters),
+                    )
+            self.assertFalse(loadedIndex.dirty)
+
+    def testSavedIndexIsIgnoredForOtherModels(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = os.path.join(tempDir, 'modelIndex.json')
+            modelIndex = ModelIndex(self.models)
+            modelIndex.getMatchingModelIndices({'characterIds': [0]})
+            modelIndex.save(path, 'key')
+
+            self.assertFalse(ModelIndex(self.models).load(path, 'otherKey'))
+            self.assertFalse(ModelIndex(self.models[:-1]).load(path, 'key'))
+            self.assertFalse(ModelIndex(self.models).load(os.path.join(tempDir, 'missing.json'), 'key'))
+
+
+if __name__ == '__main__':
+    unittest.main()
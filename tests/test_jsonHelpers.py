@@ -0,0 +1,106 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from modswap.helpers.jsonHelpers import (JsonListSpool, jsonDump,
+                                         jsonDumpToFile,
+                                         jsonDumpWithSpooledList)
+
+
+class JsonListSpoolTests(unittest.TestCase):
+    def setUp(self):
+        self.spool = JsonListSpool(prefix='test_')
+        self.addCleanup(self.spool.close)
+
+    def testReadsBackWhatWasAppended(self):
+        values = [{'Name': 'A', 'Value': [1, 2]}, 'text', 3, None, {'Name': 'ü "quoted"\nline'}]
+        for value in values:
+            self.spool.append(value)
+        self.assertEqual(len(self.spool), len(values))
+        self.assertEqual(list(self.spool), values)
+
+    def testAppendsSerializedValues(self):
+        self.spool.appendJson(jsonDump({'Name': 'A'}))
+        self.spool.append({'Name': 'B'})
+        self.assertEqual(list(self.spool.iterLines()), ['{"Name": "A"}', '{"Name": "B"}'])
+
+    def testAppendsAfterReading(self):
+        self.spool.append(1)
+        self.assertEqual(list(self.spool), [1])
+        self.spool.append(2)
+        self.assertEqual(list(self.spool), [1, 2])
+
+    def testReadsMoreThanOnce(self):
+        for i in range(3):
+            self.spool.append(i)
+        self.assertEqual(list(self.spool), list(self.spool))
+
+    def testClosesAsAContextManager(self):
+        with JsonListSpool() as spool:
+            spool.append(1)
+        self.assertTrue(spool.file.closed)
+
+
+class JsonDumpWithSpooledListTests(unittest.TestCase):
+    def getDumps(self, models, spooledModels, expectedModels, pretty):
+        value = {'Exports': [{'Table': {'Data': models}}], 'NameMap': ['A', 'B']}
+        spool = JsonListSpool()
+        self.addCleanup(spool.close)
+        for model in spooledModels:
+            spool.append(model)
+
+        stream = io.StringIO()
+        jsonDumpWithSpooledList(value, models, spool, stream, pretty=pretty)
+        expected = {'Exports': [{'Table': {'Data': expectedModels}}], 'NameMap': ['A', 'B']}
+        return stream.getvalue(), jsonDump(expected, pretty=pretty)
+
+    def testWritesTheSpoolInPlaceOfTheList(self):
+        spooledModels = [{'Name': 'A', 'Value': [{'Name': 'B', 'Value': 1}]}, {'Name': 'C', 'Value': []}]
+        for pretty in (False, True):
+            with self.subTest(pretty=pretty):
+                written, expected = self.getDumps([], spooledModels, spooledModels, pretty)
+                self.assertEqual(written, expected)
+                self.assertEqual(json.loads(written)['Exports'][0]['Table']['Data'], spooledModels)
+
+    def testEmptySpoolWritesTheListAsIs(self):
+        for pretty in (False, True):
+            with self.subTest(pretty=pretty):
+                written, expected = self.getDumps([{'Name': 'A'}], [], [{'Name': 'A'}], pretty)
+                self.assertEqual(written, expected)
+
+    def testListIsLeftAsItWas(self):
+        models = []
+        spool = JsonListSpool()
+        self.addCleanup(spool.close)
+        spool.append({'Name': 'A'})
+        jsonDumpWithSpooledList({'Data': models}, models, spool, io.StringIO())
+        self.assertEqual(models, [])
+
+
+class JsonDumpToFileTests(unittest.TestCase):
+    def testReplacesTheFileAndLeavesNoTemporaryFile(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, 'cache.json')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('old')
+            jsonDumpToFile({'version': 1, 'entries': {'a': [1, 2]}}, path)
+            with open(path, 'r', encoding='utf-8') as file:
+                self.assertEqual(json.load(file), {'version': 1, 'entries': {'a': [1, 2]}})
+            self.assertEqual(os.listdir(dir), ['cache.json'])
+
+    def testLeavesTheFileAsItWasIfWritingFails(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, 'cache.json')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('old')
+            with self.assertRaises(TypeError):
+                jsonDumpToFile({'value': object()}, path)
+            with open(path, 'r', encoding='utf-8') as file:
+                self.assertEqual(file.read(), 'old')
+            self.assertEqual(os.listdir(dir), ['cache.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
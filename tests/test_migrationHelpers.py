@@ -0,0 +1,146 @@
+import unittest
+
+from modswap.helpers.migrationHelpers import (CompiledMigration,
+                                              MigrationRegistry,
+                                              getMigrationRuleId)
+from modswap.helpers.uassetHelpers import (ExportsFieldName, ItemTypeName,
+                                           NameFieldName, NameMapFieldName,
+                                           NamePropertyDataType,
+                                           StringPropertyDataType,
+                                           StructPropertyDataType,
+                                           StructTypeFieldName, ValueFieldName)
+
+IntPropertyDataType = 'UAssetAPI.PropertyTypes.Objects.IntPropertyData, UAssetAPI'
+
+
+def makeRule(structType, name, itemType, newName, newType=None):
+    rule = {
+        'from': {'structType': structType, NameFieldName: name, ItemTypeName: itemType},
+        'to': {NameFieldName: newName},
+    }
+    if newType:
+        rule['to'][ItemTypeName] = newType
+    return rule
+
+
+def makeProperty(name, itemType, value=None):
+    return {ItemTypeName: itemType, NameFieldName: name, ValueFieldName: value}
+
+
+def makeStruct(structType, properties):
+    return {ItemTypeName: StructPropertyDataType, StructTypeFieldName: structType, NameFieldName: structType, ValueFieldName: properties}
+
+
+def makeDataTable(rows, names):
+    return {
+        NameMapFieldName: list(names),
+        ExportsFieldName: [{'Table': {'Data': rows}}],
+    }
+
+
+class MigrationRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.registry = MigrationRegistry()
+        self.registry.addStep('1.0.0', '1.1.0', [])
+        self.registry.addStep('1.1.0', '1.2.0', [])
+        self.registry.addStep('1.2.0', '2.0.0', [])
+        self.registry.addStep('1.1.0', '2.0.0', [])
+        self.registry.addStep('2.0.0', '1.1.0', [])
+
+    def testFindsShortestPath(self):
+        self.assertEqual(self.registry.findPath('1.0.0', '2.0.0'), ['1.0.0', '1.1.0', '2.0.0'])
+
+    def testFindsPathBackward(self):
+        self.assertEqual(self.registry.findPath('2.0.0', '1.2.0'), ['2.0.0', '1.1.0', '1.2.0'])
+
+    def testSameVersionIsAPathOfOne(self):
+        self.assertEqual(self.registry.findPath('1.2.0', '1.2.0'), ['1.2.0'])
+
+    def testNoPath(self):
+        self.assertIsNone(self.registry.findPath('1.2.0', '1.0.0'))
+        self.assertIsNone(self.registry.findPath('3.0.0', '1.0.0'))
+
+    def testVersionsMustBeSemanticVersions(self):
+        with self.assertRaises(ValueError):
+            self.registry.findPath('1.0', '1.1.0')
+
+    def testCompileWithoutPathRaises(self):
+        with self.assertRaises(ValueError) as context:
+            self.registry.compile('1.2.0', '1.0.0')
+        self.assertIn('supported versions: 1.0.0, 1.1.0, 1.2.0, 2.0.0', str(context.exception))
+
+    def testCompiledMigrationsAreCachedUntilAStepIsAdded(self):
+        migration = self.registry.compile('1.0.0', '2.0.0')
+        self.assertIs(self.registry.compile('1.0.0', '2.0.0'), migration)
+        self.registry.addStep('1.0.0', '2.0.0', [])
+        compiled = self.registry.compile('1.0.0', '2.0.0')
+        self.assertIsNot(compiled, migration)
+        self.assertEqual(compiled.versions, ['1.0.0', '2.0.0'])
+
+    def testRuleWithoutTypeIsRejected(self):
+        rule = makeRule('Item', 'ID', NamePropertyDataType, 'Id')
+        del rule['from'][ItemTypeName]
+        with self.assertRaises(ValueError):
+            self.registry.addStep('2.0.0', '3.0.0', [rule])
+
+
+class CompiledMigrationTests(unittest.TestCase):
+    def testChainedRenamesMapStraightToTheFinalNameAndType(self):
+        first = makeRule('Item', 'ID', NamePropertyDataType, 'Id', StringPropertyDataType)
+        second = makeRule('Item', 'Id', StringPropertyDataType, 'CustomizationId')
+        migration = CompiledMigration(['1.0.0', '1.1.0', '1.2.0'], [
+            ('1.0.0', '1.1.0', [first]),
+            ('1.1.0', '1.2.0', [second]),
+        ])
+        self.assertEqual(migration.table['Item'][('ID', NamePropertyDataType)], (
+            'CustomizationId',
+            StringPropertyDataType,
+            (getMigrationRuleId('1.0.0', '1.1.0', first), getMigrationRuleId('1.1.0', '1.2.0', second)),
+        ))
+        # a property already named like a later step's source is renamed by that step alone
+        self.assertEqual(migration.table['Item'][('Id', StringPropertyDataType)][0], 'CustomizationId')
+        self.assertEqual(migration.nameReplacements, {'ID': {'CustomizationId'}, 'Id': {'CustomizationId'}})
+
+    def testRuleWithAListOfTypes(self):
+        rule = makeRule('Item', 'ID', [NamePropertyDataType, StringPropertyDataType], 'Id', StringPropertyDataType)
+        migration = CompiledMigration(['1.0.0', '1.1.0'], [('1.0.0', '1.1.0', [rule])])
+        self.assertEqual(set(migration.table['Item']), {('ID', NamePropertyDataType), ('ID', StringPropertyDataType)})
+
+    def testApplyRenamesMatchingPropertiesOnly(self):
+        rule = makeRule('Item', 'ID', NamePropertyDataType, 'Id', StringPropertyDataType)
+        migration = CompiledMigration(['1.0.0', '1.1.0'], [('1.0.0', '1.1.0', [rule])])
+        rows = [
+            makeStruct('Item', [
+                makeProperty('ID', NamePropertyDataType, 'A'),
+                makeProperty('ID', IntPropertyDataType, 1),
+                makeStruct('Other', [makeProperty('ID', NamePropertyDataType, 'B')]),
+            ]),
+            makeStruct('Item', [makeProperty('ID', NamePropertyDataType, 'C')]),
+        ]
+        dataTable = makeDataTable(rows, ['ID', 'Item', 'Other'])
+
+        ruleCounts = migration.apply(dataTable)
+
+        self.assertEqual(ruleCounts, {getMigrationRuleId('1.0.0', '1.1.0', rule): 2})
+        itemProperties = rows[0][ValueFieldName]
+        self.assertEqual(itemProperties[0], makeProperty('Id', StringPropertyDataType, 'A'))
+        self.assertEqual(itemProperties[1], makeProperty('ID', IntPropertyDataType, 1))
+        self.assertEqual(itemProperties[2][ValueFieldName][0], makeProperty('ID', NamePropertyDataType, 'B'))
+        self.assertEqual(rows[1][ValueFieldName][0][NameFieldName], 'Id')
+        self.assertEqual(dataTable[NameMapFieldName], ['Id', 'Item', 'Other'])
+
+    def testDryRunCountsWithoutChanging(self):
+        rule = makeRule('Item', 'ID', NamePropertyDataType, 'Id')
+        migration = CompiledMigration(['1.0.0', '1.1.0'], [('1.0.0', '1.1.0', [rule])])
+        rows = [makeStruct('Item', [makeProperty('ID', NamePropertyDataType, 'A')])]
+        dataTable = makeDataTable(rows, ['ID', 'Item'])
+
+        ruleCounts = migration.apply(dataTable, dryRun=True)
+
+        self.assertEqual(ruleCounts, {getMigrationRuleId('1.0.0', '1.1.0', rule): 1})
+        self.assertEqual(rows[0][ValueFieldName][0][NameFieldName], 'ID')
+        self.assertEqual(dataTable[NameMapFieldName], ['ID', 'Item'])
+
+
+if __name__ == '__main__':
+    unittest.main()
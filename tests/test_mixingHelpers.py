@@ -0,0 +1,193 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from modswap.helpers import mixingHelpers
+from modswap.helpers.jsonHelpers import JsonListSpool
+from modswap.helpers.mixingHelpers import (ComboRules, MixManifest,
+                                           generateComboModels, getJsonHash)
+from modswap.helpers.uassetHelpers import (ArrayPropertyDataType,
+                                           EnumPropertyDataType,
+                                           NamePropertyDataType,
+                                           StructPropertyDataType,
+                                           TextPropertyDataType)
+
+CategoryName = 'SurvivorTorso'
+GameVersion = '6.5.1'
+Separator = '_'
+
+
+def makeProperty(propertyType, name, value, **fields):
+    return {'$type': propertyType, 'Name': name, **fields, 'Value': value}
+
+
+def makeAttachment(attachmentId, socketName='socket_0'):
+    return {
+        'attachmentId': attachmentId,
+        'modelCategory': CategoryName,
+        'displayName': attachmentId,
+        'attachmentData': makeProperty(StructPropertyDataType, 'SocketAttachements', [
+            makeProperty(NamePropertyDataType, 'SocketName', socketName),
+        ], StructType='BPAttachementSocketData'),
+    }
+
+
+def makeModel(modelId, displayName='Model'):
+    return makeProperty(StructPropertyDataType, modelId, [
+        makeProperty(NamePropertyDataType, 'ID', modelId),
+        makeProperty(EnumPropertyDataType, 'Category', f'ECustomizationCategory::{CategoryName}'),
+        makeProperty(StructPropertyDataType, 'UIData', [
+            makeProperty(TextPropertyDataType, 'DisplayName', '', CultureInvariantString=displayName),
+        ], StructType='ItemUIData'),
+        makeProperty(ArrayPropertyDataType, 'SocketAttachements', [], ArrayType='StructProperty'),
+    ], StructType='CustomizationItemData')
+
+
+class MixManifestTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.manifestPaths = (
+            os.path.join(self.tempDir.name, 'mix-manifest.json'),
+            os.path.join(self.tempDir.name, 'mix-models.jsonl'),
+        )
+        self.models = {f'{CategoryName}::M{i}': makeModel(f'M{i}') for i in range(2)}
+        self.attachments = {attachmentId: makeAttachment(attachmentId) for attachmentId in ('A', 'B', 'C')}
+        self.rules = ComboRules()
+        self.comboAttachmentIds = {}
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def mix(self, gameVersion=GameVersion, sourcesKey='sources'):
+        """Mixes every model like the runner does, returning the IDs of the combo models made and reused, and the models' JSON"""
+        manifest = MixManifest(*self.manifestPaths, sourcesKey=sourcesKey)
+        made = set()
+        reused = set()
+        modelJsons = {}
+        try:
+            manifest.load()
+            unchangedAttachmentIds = manifest.getUnchangedAttachmentIds({
+                CategoryName: {attachmentId: getJsonHash(attachment) for attachmentId, attachment in self.attachments.items()},
+            })
+            rulesHash = self.rules.getCategoryHash(CategoryName)
+            with JsonListSpool(dir=self.tempDir.name) as spool:
+                for baseModelKey, model in self.models.items():
+                    reusableModelIds = manifest.getReusableModelIds(baseModelKey, model, rulesHash, gameVersion, Separator)
+                    for attachmentIds, newModelId, newModel in generateComboModels(
+                        model,
+                        model['Name'],
+                        CategoryName,
+                        'Torso',
+                        'Model',
+                        self.attachments,
+                        self.rules,
+                        gameVersion,
+                        Separator,
+                        serializing=True,
+                        reusableModelIds=reusableModelIds,
+                        unchangedAttachmentIds=unchangedAttachmentIds[CategoryName],
+                    ):
+                        if newModelId is None:
+                            continue
+                        self.comboAttachmentIds[newModelId] = set(attachmentIds)
+                        if newModel is None:
+                            newModel = manifest.readPreviousModelJson(newModelId)
+                            reused.add(newModelId)
+                        else:
+                            made.add(newModelId)
+                        manifest.addModel(newModelId, baseModelKey, len(spool))
+                        spool.appendJson(newModel)
+                        modelJsons[newModelId] = newModel
+                manifest.save(spool)
+        finally:
+            manifest.close()
+        return made, reused, modelJsons
+
+    def getComboModelIds(self, attachmentId=None):
+        """The IDs of the combo models mixed so far, only those with `attachmentId` if given"""
+        return {
+            modelId for modelId, attachmentIds in self.comboAttachmentIds.items()
+            if attachmentId is None or attachmentId in attachmentIds
+        }
+
+    def mixFirst(self):
+        made, reused, modelJsons = self.mix()
+        self.assertEqual(len(made), 2 * 7)
+        self.assertEqual(reused, set())
+        return modelJsons
+
+    def testUnchangedMixReusesEveryComboModel(self):
+        firstModelJsons = self.mixFirst()
+        made, reused, modelJsons = self.mix()
+        self.assertEqual(made, set())
+        self.assertEqual(reused, self.getComboModelIds())
+        self.assertEqual(modelJsons, firstModelJsons)
+
+        # the reused models are saved again, so the next mix can reuse them too
+        made, reused, modelJsons = self.mix()
+        self.assertEqual(made, set())
+        self.assertEqual(modelJsons, firstModelJsons)
+
+    def testChangedAttachmentRemixesItsCombos(self):
+        self.mixFirst()
+        self.attachments['B'] = makeAttachment('B', socketName='socket_1')
+        made, reused, modelJsons = self.mix()
+        self.assertEqual(made, self.getComboModelIds('B'))
+        self.assertEqual(reused, self.getComboModelIds() - self.getComboModelIds('B'))
+        for modelId in made:
+            self.assertIn('socket_1', modelJsons[modelId])
+
+    def testAddedAttachmentIsMixed(self):
+        firstModelIds = set(self.mixFirst())
+        self.attachments['D'] = makeAttachment('D')
+        made, reused, _ = self.mix()
+        self.assertEqual(made, self.getComboModelIds('D'))
+        self.assertEqual(reused, firstModelIds)
+
+    def testChangedComboRuleRemixesCategory(self):
+        self.mixFirst()
+        self.rules = ComboRules(combinationsToSkip={CategoryName: {frozenset(('A', 'B')): set()}})
+        made, reused, _ = self.mix()
+        self.assertEqual(reused, set())
+        self.assertEqual(len(made), 2 * 6)
+
+    def testGameVersionBumpRemixesEverything(self):
+        self.mixFirst()
+        made, reused, _ = self.mix(gameVersion='6.5.2')
+        self.assertEqual(reused, set())
+        self.assertEqual(made, self.getComboModelIds())
+
+    def testManifestVersionBumpRemixesEverything(self):
+        self.mixFirst()
+        with mock.patch.object(mixingHelpers, 'MixManifestVersion', mixingHelpers.MixManifestVersion + 1):
+            made, reused, _ = self.mix()
+        self.assertEqual(reused, set())
+        self.assertEqual(made, self.getComboModelIds())
+
+    def testChangedRowRemixesItsCombos(self):
+        self.mixFirst()
+        changedKey = f'{CategoryName}::M1'
+        self.models[changedKey] = makeModel('M1', displayName='Changed')
+        made, reused, modelJsons = self.mix(sourcesKey='changedSources')
+        self.assertEqual(made, {modelId for modelId in modelJsons if modelId.startswith('M1_')})
+        self.assertEqual(reused, {modelId for modelId in modelJsons if modelId.startswith('M0_')})
+
+    def testSameSourcesKeySkipsRowHashing(self):
+        self.mixFirst()
+        with mock.patch.object(mixingHelpers, 'getJsonHash', wraps=getJsonHash) as getJsonHashMock:
+            made, _, _ = self.mix()
+        self.assertEqual(made, set())
+        # only the rules are hashed again, not the rows
+        self.assertEqual(getJsonHashMock.call_count, 1)
+
+    def testMissingModelsFileRemixesEverything(self):
+        self.mixFirst()
+        os.remove(self.manifestPaths[1])
+        made, reused, _ = self.mix()
+        self.assertEqual(reused, set())
+        self.assertEqual(made, self.getComboModelIds())
+
+
+if __name__ == '__main__':
+    unittest.main()
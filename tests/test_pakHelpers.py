@@ -0,0 +1,196 @@
+import functools
+import os
+import random
+import tempfile
+import unittest
+
+from modswap.helpers.pakHelpers import (MaxUnrealUnpakFilterRuns,
+                                        getMatchingPakAssetEntries,
+                                        getPakAssetEntries,
+                                        getUnrealPakListEntries,
+                                        getUnrealPakResponseFileContent,
+                                        getUnrealUnpakFilters,
+                                        getUnrealUnpakRuns)
+
+ListOutputLines = [
+    'LogPakFile: Display: Using command line for crypto configuration',
+    'LogPakFile: Display: Mount point ../../../',
+    'LogPakFile: Display: "DeadByDaylight/Content/Characters/Mesh.uasset" offset: 0, size: 1200 bytes, sha1: 0011, compression: Zlib.',
+    'LogPakFile: Display: "DeadByDaylight/Content/Characters/Mesh.uexp" offset: 1200, size: 34, sha1: 0022, compression: None.',
+    'LogPakFile: Display: "DeadByDaylight/Config/DefaultGame.ini" offset: 1234, size: 56, sha1: 0033, compression: None.',
+    'LogPakFile: Display: 3 files (1290 bytes), (0 filtered bytes).',
+]
+
+
+def makeEntries(paths):
+    return [{'path': path, 'fullPath': path, 'offset': 0, 'size': 0} for path in paths]
+
+
+class GetUnrealPakListEntriesTests(unittest.TestCase):
+    def testReadsListedFiles(self):
+        self.assertEqual(getUnrealPakListEntries(ListOutputLines), [
+            {
+                'path': 'DeadByDaylight/Content/Characters/Mesh.uasset',
+                'fullPath': 'DeadByDaylight/Content/Characters/Mesh.uasset',
+                'offset': 0,
+                'size': 1200,
+            },
+            {
+                'path': 'DeadByDaylight/Content/Characters/Mesh.uexp',
+                'fullPath': 'DeadByDaylight/Content/Characters/Mesh.uexp',
+                'offset': 1200,
+                'size': 34,
+            },
+            {
+                'path': 'DeadByDaylight/Config/DefaultGame.ini',
+                'fullPath': 'DeadByDaylight/Config/DefaultGame.ini',
+                'offset': 1234,
+                'size': 56,
+            },
+        ])
+
+    def testFullPathIncludesTheMountPoint(self):
+        entries = getUnrealPakListEntries([
+            'LogPakFile: Display: Mount point ../../../DeadByDaylight/Content/',
+            'LogPakFile: Display: "Characters/Mesh.uasset" offset: 10, size: 20, sha1: 00, compression: None.',
+        ])
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['path'], 'Characters/Mesh.uasset')
+        self.assertEqual(entries[0]['fullPath'], 'DeadByDaylight/Content/Characters/Mesh.uasset')
+
+    def testWithoutMountPoint(self):
+        entries = getUnrealPakListEntries(['"Characters/Mesh.uasset" offset: 10, size: 20'])
+        self.assertEqual(entries[0]['fullPath'], 'Characters/Mesh.uasset')
+
+    def testIgnoresOtherLines(self):
+        self.assertEqual(getUnrealPakListEntries(['LogPakFile: Display: 0 files (0 bytes).', '']), [])
+
+
+class GetMatchingPakAssetEntriesTests(unittest.TestCase):
+    def testMatchesAssetsWithAllTheirFiles(self):
+        entries = makeEntries([
+            'G/Content/A/Mesh.uasset',
+            'G/Content/A/Mesh.uexp',
+            'G/Content/A/Other.uasset',
+            'G/Config/A/Mesh.uasset',
+        ])
+        assetEntries = getMatchingPakAssetEntries(entries, 'G', ['A/Mesh.uasset'])
+        self.assertEqual(list(assetEntries), ['A/Mesh'])
+        self.assertEqual([entry['path'] for entry in assetEntries['A/Mesh']], ['G/Content/A/Mesh.uasset', 'G/Content/A/Mesh.uexp'])
+
+
+class GetUnrealUnpakFiltersTests(unittest.TestCase):
+    def getFilters(self, paths, patterns):
+        entries = makeEntries(paths)
+        return getUnrealUnpakFilters(entries, getMatchingPakAssetEntries(entries, 'G', patterns))
+
+    def testWholeFoldersTakeOneFilter(self):
+        paths = [
+            'G/Content/A/x.uasset',
+            'G/Content/A/x.uexp',
+            'G/Content/A/B/y.uasset',
+            'G/Content/C/z.uasset',
+            'G/Content/C/w.uasset',
+            'G/Config/c.ini',
+        ]
+        self.assertEqual(self.getFilters(paths, ['A/**', 'C/z.uasset']), ['G/Content/A/*', 'G/Content/C/z.*'])
+
+    def testEverythingExtractedTakesNoFilter(self):
+        self.assertEqual(self.getFilters(['G/Content/A/x.uasset', 'G/Content/B/y.uasset'], ['**']), [None])
+
+
+class GetUnrealUnpakRunsTests(unittest.TestCase):
+    def getRuns(self, assetCount, extractedCount):
+        # every folder has an asset that isn't extracted, so each extracted asset takes its own filter
+        paths = [f'G/Content/D{index}/{name}.uasset' for index in range(assetCount) for name in ('x', 'y')]
+        entries = makeEntries(paths)
+        patterns = [f'D{index}/x.uasset' for index in range(extractedCount)]
+        return getUnrealUnpakRuns(entries, getMatchingPakAssetEntries(entries, 'G', patterns))
+
+    def testNothingToExtractTakesNoRun(self):
+        self.assertEqual(self.getRuns(3, 0), [])
+
+    def testOneRunPerFilter(self):
+        runs = self.getRuns(MaxUnrealUnpakFilterRuns + 1, MaxUnrealUnpakFilterRuns)
+        self.assertEqual(sorted(runs), sorted(f'G/Content/D{index}/x.*' for index in range(MaxUnrealUnpakFilterRuns)))
+
+    def testTooManyFiltersExtractEverythingAtOnce(self):
+        self.assertEqual(self.getRuns(MaxUnrealUnpakFilterRuns + 2, MaxUnrealUnpakFilterRuns + 1), [None])
+
+
+class GetPakAssetEntriesTests(unittest.TestCase):
+    def testGroupsContentFilesByAsset(self):
+        entries = makeEntries(['G/Content/A/x.uasset', 'G/Content/A/x.uexp', 'G/Content/y.uasset', 'G/Config/c.ini'])
+        self.assertEqual(
+            {stemPath: [entry['path'] for entry in stemEntries] for stemPath, stemEntries in getPakAssetEntries(entries, 'G').items()},
+            {'A/x': ['G/Content/A/x.uasset', 'G/Content/A/x.uexp'], 'y': ['G/Content/y.uasset']},
+        )
+
+
+def compareStricmp(a, b):
+    """`FCString::Stricmp`: only ASCII letters are lowercased"""
+    for charA, charB in zip(a, b):
+        charA = ord(charA) + 32 if 'A' <= charA <= 'Z' else ord(charA)
+        charB = ord(charB) + 32 if 'A' <= charB <= 'Z' else ord(charB)
+        if charA != charB:
+            return charA - charB
+    return len(a) - len(b)
+
+
+def getStagedUnrealPakOrder(pakDir):
+    """Paths in pak, in the order UnrealPak paks the files found for `pakDir\\*.*`"""
+    pakPaths = []
+    for dirPath, dirNames, filenames in os.walk(pakDir):
+        for filename in filenames:
+            pakPaths.append(os.path.relpath(os.path.join(dirPath, filename), pakDir).replace(os.sep, '/'))
+    return sorted(pakPaths, key=functools.cmp_to_key(compareStricmp))
+
+
+class GetUnrealPakResponseFileContentTests(unittest.TestCase):
+    PakPaths = [
+        'G/Content/Mesh.uasset',
+        'G/Content/mesh_LOD.uasset',
+        'G/Content/MeshA.uasset',
+        'G/Content/Sub/b.uasset',
+        'G/Content/Sub_x.uasset',
+        'G/Content/sub2/a.uasset',
+        'G/Content/Zed.uasset',
+        'G/Content/[brackets].uasset',
+        'G/Content/\u00c9b.uasset',
+        'G/Content/\u00e9a.uasset',
+        'G/Config/DefaultGame.ini',
+    ]
+
+    def testFilesAreInStagedOrder(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            pakDir = os.path.join(tempDir, 'pak')
+            srcDir = os.path.join(tempDir, 'src')
+            for pakPath in self.PakPaths:
+                for dir in (pakDir, srcDir):
+                    path = os.path.join(dir, *pakPath.split('/'))
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, 'w'):
+                        pass
+
+            files = [(os.path.join(srcDir, *pakPath.split('/')), pakPath) for pakPath in self.PakPaths]
+            random.Random(0).shuffle(files)
+            lines = getUnrealPakResponseFileContent(files).splitlines()
+
+            self.assertEqual(
+                [line.split(' "../../../')[1][:-1] for line in lines],
+                getStagedUnrealPakOrder(pakDir),
+            )
+            for line in lines:
+                pakPath = line.split(' "../../../')[1][:-1]
+                self.assertTrue(line.startswith(f'"{os.path.join(srcDir, *pakPath.split("/"))}"'))
+
+    def testOnlyAsciiLettersAreCaseInsensitive(self):
+        files = [(f'/src/{index}', pakPath) for index, pakPath in enumerate(['G/\u00e9a', 'G/\u00c9b', 'G/Zed', 'G/[x]', 'G/a_b', 'G/A'])]
+        self.assertEqual(
+            [line.split(' "../../../')[1][:-1] for line in getUnrealPakResponseFileContent(files).splitlines()],
+            ['G/[x]', 'G/A', 'G/a_b', 'G/Zed', 'G/\u00c9b', 'G/\u00e9a'],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
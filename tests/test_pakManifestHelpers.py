@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from modswap.helpers import pakManifestHelpers
+from modswap.helpers.pakManifestHelpers import (PakManifest, getFileInfo,
+                                                getPakManifestPath, hashFile,
+                                                pakchunksMatch)
+
+
+def writeFile(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content)
+
+
+class GetPakManifestPathTests(unittest.TestCase):
+    def testReplacesThePakSuffix(self):
+        self.assertEqual(getPakManifestPath('out/pakchunk1-WindowsNoEditor.pak'), 'out/pakchunk1-WindowsNoEditor.manifest.json')
+        self.assertEqual(getPakManifestPath('out/pakchunk1-WindowsNoEditor.PAK'), 'out/pakchunk1-WindowsNoEditor.manifest.json')
+        self.assertEqual(getPakManifestPath('out/pakchunk1'), 'out/pakchunk1.manifest.json')
+
+
+class GetFileInfoTests(unittest.TestCase):
+    def testReusesThePreviousHashIfTheFileIsUnchanged(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, 'Mesh.uasset')
+            writeFile(path, 'mesh')
+            info = getFileInfo(path)
+            self.assertEqual(info['hash'], hashFile(path))
+            with mock.patch.object(pakManifestHelpers, 'hashFile') as hashFileMock:
+                self.assertEqual(getFileInfo(path, info), info)
+                hashFileMock.assert_not_called()
+                getFileInfo(path, {**info, 'mtime': info['mtime'] - 1})
+                hashFileMock.assert_called_once_with(path)
+
+
+class PakManifestTests(unittest.TestCase):
+    def setUp(self):
+        tempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempDir.cleanup)
+        self.root = tempDir.name
+        self.contentDir = os.path.join(self.root, 'content')
+        self.pakPath = os.path.join(self.root, 'out', 'pakchunk1-WindowsNoEditor.pak')
+        self.settings = {'compression': None}
+        writeFile(os.path.join(self.contentDir, 'Mesh.uasset'), 'mesh')
+        writeFile(os.path.join(self.contentDir, 'Mesh.uexp'), 'mesh data')
+        self.build()
+
+    def getFiles(self):
+        return [
+            (os.path.join(self.contentDir, filename), f'DeadByDaylight/Content/{filename}')
+            for filename in sorted(os.listdir(self.contentDir))
+        ]
+
+    def build(self):
+        """Pretends to build the pakchunk, and records it"""
+        manifest = PakManifest(self.pakPath)
+        manifest.collect(self.getFiles(), self.settings, assets=['Mesh'])
+        writeFile(self.pakPath, '\n'.join(pakPath for _, pakPath in self.getFiles()))
+        manifest.save()
+
+    def getUpToDatePakPath(self, pakPaths=None, jobs=4):
+        manifest = PakManifest(self.pakPath)
+        manifest.collect(self.getFiles(), self.settings, assets=['Mesh'], jobs=jobs)
+        return manifest.getUpToDatePakPath(pakPaths or [self.pakPath])
+
+    def testUnchanged(self):
+        self.assertEqual(self.getUpToDatePakPath(), self.pakPath)
+        self.assertEqual(self.getUpToDatePakPath(jobs=1), self.pakPath)
+
+    def testUnchangedFilesAreNotHashedAgain(self):
+        with mock.patch.object(pakManifestHelpers, 'hashFile') as hashFileMock:
+            self.assertEqual(self.getUpToDatePakPath(), self.pakPath)
+            hashFileMock.assert_not_called()
+
+    def testFileChanged(self):
+        writeFile(os.path.join(self.contentDir, 'Mesh.uexp'), 'other mesh data')
+        self.assertIsNone(self.getUpToDatePakPath())
+
+    def testFileTouchedButTheSame(self):
+        path = os.path.join(self.contentDir, 'Mesh.uexp')
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        self.assertEqual(self.getUpToDatePakPath(), self.pakPath)
+
+    def testFileAdded(self):
+        writeFile(os.path.join(self.contentDir, 'Mesh.ubulk'), 'bulk')
+        self.assertIsNone(self.getUpToDatePakPath())
+
+    def testSettingsChanged(self):
+        self.settings = {'compression': 'Zlib'}
+        self.assertIsNone(self.getUpToDatePakPath())
+
+    def testPakchunkChanged(self):
+        writeFile(self.pakPath, 'something else')
+        self.assertIsNone(self.getUpToDatePakPath())
+
+    def testPakchunkMissing(self):
+        os.remove(self.pakPath)
+        self.assertIsNone(self.getUpToDatePakPath())
+
+    def testFindsACopyOfThePakchunk(self):
+        copyPath = os.path.join(self.root, 'game', 'pakchunk1-WindowsNoEditor.pak')
+        os.makedirs(os.path.dirname(copyPath))
+        shutil.copy(self.pakPath, copyPath)
+        os.remove(self.pakPath)
+        self.assertEqual(self.getUpToDatePakPath([None, self.pakPath, copyPath]), copyPath)
+        self.assertTrue(pakchunksMatch(copyPath, copyPath))
+
+    def testUnreadableManifestIsIgnored(self):
+        writeFile(getPakManifestPath(self.pakPath), '{"version": ')
+        self.assertIsNone(self.getUpToDatePakPath())
+
+    def testPakchunksMatch(self):
+        otherPakPath = os.path.join(self.root, 'other.pak')
+        shutil.copy(self.pakPath, otherPakPath)
+        self.assertTrue(pakchunksMatch(self.pakPath, otherPakPath))
+        writeFile(otherPakPath, 'something else')
+        self.assertFalse(pakchunksMatch(self.pakPath, otherPakPath))
+
+
+if __name__ == '__main__':
+    unittest.main()
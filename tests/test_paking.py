@@ -0,0 +1,181 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from modswap.helpers import stagingHelpers
+from modswap.helpers.contentIndexHelpers import ContentIndex
+from modswap.helpers.pakManifestHelpers import getPakManifestPath
+from modswap.runtime import runCommand
+
+
+def writeFile(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content)
+
+
+def getTreeState(dir):
+    """The path, size, modification time and inode of everything in a folder"""
+    state = {}
+    for parentDir, dirNames, filenames in os.walk(dir):
+        for name in dirNames + filenames:
+            path = os.path.join(parentDir, name)
+            stat = os.stat(path)
+            state[os.path.relpath(path, dir)] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    return state
+
+
+def fakeUnrealPak(srcDir, pakPath, *args, **kwargs):
+    writeFile(pakPath, f'pak of {srcDir}')
+
+
+def fakeJsonToUasset(jsonPath, uassetPath, *args):
+    writeFile(uassetPath, f'converted from {jsonPath}')
+
+
+class IncrementalPakingTests(unittest.TestCase):
+    def setUp(self):
+        tempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempDir.cleanup)
+        self.root = tempDir.name
+        contentDir = os.path.join(self.root, 'extra')
+        writeFile(os.path.join(contentDir, 'Characters', 'Mesh.uasset'), 'mesh')
+        writeFile(os.path.join(contentDir, 'Characters', 'Mesh.uexp'), 'mesh data')
+        writeFile(os.path.join(contentDir, 'Characters', 'Other.uasset.json'), '{}')
+        unrealPakPath = os.path.join(self.root, 'UnrealPak.exe')
+        writeFile(unrealPakPath, '')
+        self.pakingDir = os.path.join(self.root, 'paking')
+        self.settingsFilePath = os.path.join(self.root, 'settings.yaml')
+        writeFile(self.settingsFilePath, '\n'.join([
+            'gameVersion: 6.5.2',
+            f'unrealPakPath: {unrealPakPath}',
+            f'pakingDir: {self.pakingDir}',
+            f'extraContentDir: {contentDir}',
+            'destPakNumber: 5',
+            'destPakAssets:',
+            '- Characters/Mesh',
+            '- Characters/Other',
+        ]))
+
+    def runPaking(self):
+        """Paks the settings file. Returns the exit code, and how many times UnrealPak and UAssetGUI ran."""
+        with (
+            mock.patch.object(runCommand, 'unrealPak', side_effect=fakeUnrealPak) as unrealPakMock,
+            mock.patch.object(runCommand, 'jsonToUasset', side_effect=fakeJsonToUasset) as jsonToUassetMock,
+            contextlib.redirect_stdout(io.StringIO()),
+            contextlib.redirect_stderr(io.StringIO()),
+        ):
+            exitCode = runCommand.ModSwapCommandRunner().runCommand(
+                settingsFilePath=self.settingsFilePath,
+                paking=True,
+                nonInteractive=True,
+                overwriteOverride=True,
+            )
+        return exitCode, unrealPakMock.call_count, jsonToUassetMock.call_count
+
+    def testSecondIdenticalRunTouchesNothing(self):
+        self.assertEqual(self.runPaking(), (0, 1, 1))
+        pakingDirState = getTreeState(self.pakingDir)
+        contentDirState = getTreeState(os.path.join(self.root, 'extra'))
+
+        with mock.patch.object(runCommand.ModSwapCommandRunner, 'readyToWrite', autospec=True, side_effect=runCommand.ModSwapCommandRunner.readyToWrite) as readyToWriteMock:
+            self.assertEqual(self.runPaking(), (0, 0, 0))
+        # no staging folder was deleted or prompted for, and nothing was converted
+        self.assertFalse(any(self.pakingDir in str(call.args[1]) for call in readyToWriteMock.call_args_list))
+        self.assertEqual(getTreeState(self.pakingDir), pakingDirState)
+        self.assertEqual(getTreeState(os.path.join(self.root, 'extra')), contentDirState)
+
+    def testChangedSourcePaksAgain(self):
+        self.runPaking()
+        writeFile(os.path.join(self.root, 'extra', 'Characters', 'Other.uasset.json'), '{"changed": true}')
+        self.assertEqual(self.runPaking(), (0, 1, 1))
+
+    def testFileChangedWhileStagingIsNotRecorded(self):
+        copyAndHashFile = stagingHelpers.copyAndHashFile
+
+        def changeAndCopy(srcPath, destPath):
+            if srcPath.endswith('Mesh.uexp'):
+                writeFile(srcPath, 'mesh data changed while staging')
+            return copyAndHashFile(srcPath, destPath)
+
+        with mock.patch.object(stagingHelpers, 'copyAndHashFile', side_effect=changeAndCopy):
+            with mock.patch.object(stagingHelpers, 'reflinkFile', side_effect=OSError('unsupported')):
+                self.assertEqual(self.runPaking(), (0, 1, 1))
+        self.assertFalse(os.path.exists(getPakManifestPath(os.path.join(self.pakingDir, 'pakchunk5-WindowsNoEditor.pak'))))
+        # so the next run paks again
+        self.assertEqual(self.runPaking(), (0, 1, 1))
+        self.assertEqual(self.runPaking(), (0, 0, 0))
+
+
+def makeEntries(paths):
+    return [{'path': path, 'fullPath': path, 'offset': 0, 'size': 0} for path in paths]
+
+
+class SelectiveSrcPakExtractionTests(unittest.TestCase):
+    def getPatterns(self, destPakAssets=None, upgradingMods=True, expandingAssetDependencies=False):
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return runCommand.ModSwapCommandRunner().getSrcPakExtractionPatterns(
+                '/Content/**/CustomizationItemDB',
+                destPakAssets,
+                False,
+                False,
+                upgradingMods,
+                False,
+                True,
+                expandingAssetDependencies,
+            )
+
+    def testUpgradePakOnlyExtractsTheCustomizationItemDbAtFirst(self):
+        self.assertEqual(self.getPatterns(), ['**/CustomizationItemDB.uasset'])
+
+    def testDestPakAssetsAreExtractedToo(self):
+        self.assertEqual(self.getPatterns(['Characters/Mesh']), ['**/CustomizationItemDB.uasset', 'Characters/Mesh.*'])
+
+    def testPakingEverythingOtherwiseExtractsEverything(self):
+        self.assertIsNone(self.getPatterns(upgradingMods=False))
+        self.assertIsNone(self.getPatterns(expandingAssetDependencies=True))
+
+    def testCarryOverExtractsAndIndexesTheOtherAssets(self):
+        srcPakEntries = makeEntries([
+            'G/Content/Data/CustomizationItemDB.uasset',
+            'G/Content/Data/CustomizationItemDB.uexp',
+            'G/Content/Characters/Mesh.uasset',
+            'G/Content/Characters/Mesh.uexp',
+            'G/Content/Characters/Other.uasset',
+        ])
+        srcPakAssetEntries = {'Data/CustomizationItemDB': srcPakEntries[:2]}
+        contentIndex = ContentIndex()
+        contentIndex.add('pak', ['Data/CustomizationItemDB.uasset', 'Data/CustomizationItemDB.uexp'])
+        contentIndex.add('extra', ['Characters/Mesh.uasset'])
+
+        with (
+            mock.patch.object(runCommand, 'unrealUnpakAssets') as unrealUnpakAssetsMock,
+            mock.patch.object(runCommand.ModSwapCommandRunner, 'startKeyboardListener'),
+            mock.patch.object(runCommand.ModSwapCommandRunner, 'stopKeyboardListener'),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            runCommand.ModSwapCommandRunner().carryOverSrcPakAssets(
+                'src.pak', 'srcDir', 'pak', 'G', 'UnrealPak.exe', srcPakEntries, srcPakAssetEntries, contentIndex,
+            )
+
+        unrealUnpakAssetsMock.assert_called_once()
+        self.assertEqual(list(unrealUnpakAssetsMock.call_args.args[5]), ['Characters/Mesh', 'Characters/Other'])
+        self.assertEqual(list(contentIndex.assetPathsMaps['pak']), ['Data/CustomizationItemDB', 'Characters/Mesh', 'Characters/Other'])
+        # the source pakchunk's files take precedence, as if it had been extracted in full
+        self.assertEqual(contentIndex.sourceFiles['Characters/Mesh']['contentDir'], 'pak')
+        self.assertEqual(set(srcPakAssetEntries), {'Data/CustomizationItemDB', 'Characters/Mesh', 'Characters/Other'})
+
+    def testNothingLeftToCarryOver(self):
+        srcPakEntries = makeEntries(['G/Content/Data/CustomizationItemDB.uasset'])
+        with mock.patch.object(runCommand, 'unrealUnpakAssets') as unrealUnpakAssetsMock:
+            runCommand.ModSwapCommandRunner().carryOverSrcPakAssets(
+                'src.pak', 'srcDir', 'pak', 'G', 'UnrealPak.exe', srcPakEntries, {'Data/CustomizationItemDB': srcPakEntries}, ContentIndex(),
+            )
+        unrealUnpakAssetsMock.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+from modswap.helpers.pathHelpers import (PathInfo, clearResolvedDirs,
+                                         getPathInfo, normPath)
+
+
+def getEagerPathInfo(path, relativeDir='.'):
+    """getPathInfo as it was before PathInfo: every field computed up front, with pathlib's resolve()"""
+    result = {
+        'path': path or '',
+        'normalized': '',
+        'relativeDir': '',
+        'relativeDirResolved': '',
+        'isAbsolute': False,
+        'absolute': '',
+        'relative': None,
+        'dirname': '',
+        'dir': '',
+        'basename': '',
+        'stem': '',
+        'suffix': '',
+        'suffixLower': '',
+        'best': '',
+    }
+
+    if (path or '').strip():
+        result['normalized'] = normPath(path)
+        result['dirname'] = os.path.dirname(result['normalized'])
+        relativeDirResolved = normPath(pathlib.Path(relativeDir).resolve())
+        result['relativeDirResolved'] = relativeDirResolved
+
+        if os.path.isabs(path):
+            result['isAbsolute'] = True
+            result['absolute'] = normPath(pathlib.Path(path).resolve())
+            commonPath = normPath(os.path.commonpath([result['absolute'], relativeDirResolved]))
+            if commonPath == relativeDirResolved:
+                result['relative'] = normPath(os.path.relpath(result['absolute'], relativeDirResolved))
+        else:
+            result['absolute'] = normPath(pathlib.Path(os.path.join(relativeDir, path)).resolve())
+            result['relative'] = normPath(os.path.relpath(result['absolute'], relativeDirResolved))
+
+        pathlibPath = pathlib.Path(result['absolute'])
+
+        result['dir'] = os.path.dirname(result['absolute'])
+        if result['relative'] is not None:
+            result['relativeDir'] = os.path.dirname(result['relative'])
+        result['basename'] = os.path.basename(result['absolute'])
+        result['stem'] = pathlibPath.stem
+        result['suffix'] = pathlibPath.suffix
+        result['suffixLower'] = result['suffix'].lower()
+        result['best'] = result['absolute'] if result['relative'] is None else result['relative']
+
+    return result
+
+
+class PathInfoTests(unittest.TestCase):
+    def setUp(self):
+        self.originalCwd = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        # resolved, so the folder's own path has no links in it
+        self.root = normPath(pathlib.Path(self.tempDir.name).resolve())
+        for dir in ('settings', 'settings/mods', 'other'):
+            os.makedirs(os.path.join(self.root, dir))
+        os.chdir(self.root)
+        clearResolvedDirs()
+
+    def tearDown(self):
+        os.chdir(self.originalCwd)
+        clearResolvedDirs()
+        self.tempDir.cleanup()
+
+    def assertSameAsEager(self, path, relativeDir='.'):
+        with self.subTest(path=path, relativeDir=relativeDir):
+            pathInfo = getPathInfo(path, relativeDir=relativeDir)
+            self.assertIsInstance(pathInfo, PathInfo)
+            self.assertEqual(dict(pathInfo), getEagerPathInfo(path, relativeDir=relativeDir))
+
+    def testRelativePaths(self):
+        for path in ('mod.yaml', 'settings/mods/Mod.PAK', 'settings/../other/x.tar.gz', './settings/', 'settings', 'missing/dir/file.json'):
+            self.assertSameAsEager(path)
+            self.assertSameAsEager(path, relativeDir='settings')
+            self.assertSameAsEager(path, relativeDir=f'{self.root}/settings/mods')
+
+    def testAbsolutePaths(self):
+        for path in (f'{self.root}/settings/mods/Mod.pak', f'{self.root}/other/x.json', self.root, f'{self.root}/settings/../other'):
+            self.assertSameAsEager(path)
+            self.assertSameAsEager(path, relativeDir='settings')
+            self.assertSameAsEager(path, relativeDir=f'{self.root}/other')
+
+    def testPathsAboveTheRelativeFolder(self):
+        for path in ('..', '../..', '.', '../other/file.txt'):
+            self.assertSameAsEager(path, relativeDir='settings/mods')
+
+    def testEmptyPaths(self):
+        for path in ('', '  ', None):
+            self.assertSameAsEager(path)
+
+    def testWorksLikeADict(self):
+        pathInfo = getPathInfo('settings/mods/Mod.pak')
+        self.assertEqual(set(pathInfo.keys()), set(getEagerPathInfo('x').keys()))
+        self.assertEqual(len(pathInfo), len(getEagerPathInfo('x')))
+        self.assertEqual(pathInfo.get('stem'), 'Mod')
+        self.assertIsNone(pathInfo.get('unknown'))
+        with self.assertRaises(KeyError):
+            pathInfo['unknown']
+
+    def testResolvedFoldersFollowTheCurrentFolder(self):
+        self.assertEqual(getPathInfo('x.json')['absolute'], f'{self.root}/x.json')
+        os.chdir(os.path.join(self.root, 'other'))
+        self.assertEqual(getPathInfo('x.json')['absolute'], f'{self.root}/other/x.json')
+
+    def makeSymlink(self, target, linkPath, isDir=False):
+        try:
+            os.symlink(target, os.path.join(self.root, linkPath), target_is_directory=isDir)
+        except (OSError, NotImplementedError) as e:
+            # e.g. Windows without the privilege to make symlinks
+            self.skipTest(f'Unable to make symlinks: {e}')
+
+    def testSymlinkedFinalComponents(self):
+        with open(os.path.join(self.root, 'other', 'target.json'), 'w') as file:
+            file.write('{}')
+        self.makeSymlink(os.path.join(self.root, 'other', 'target.json'), 'settings/link.json')
+        self.makeSymlink(os.path.join(self.root, 'other'), 'settings/linkDir', isDir=True)
+        self.makeSymlink('link.json', 'settings/chained.json')
+        self.makeSymlink(os.path.join(self.root, 'missing.json'), 'settings/broken.json')
+
+        for path in ('settings/link.json', 'settings/linkDir', 'settings/linkDir/', 'settings/chained.json', 'settings/broken.json'):
+            self.assertSameAsEager(path)
+            self.assertSameAsEager(path, relativeDir='settings/mods')
+            self.assertSameAsEager(f'{self.root}/{path}')
+        for path in ('link.json', 'linkDir', 'chained.json', 'linkDir/target.json', 'linkDir/../mods'):
+            self.assertSameAsEager(path, relativeDir='settings')
+
+        self.assertEqual(getPathInfo('settings/link.json')['absolute'], f'{self.root}/other/target.json')
+        self.assertEqual(getPathInfo('settings/linkDir')['stem'], 'other')
+
+    def testChangedSymlinkIsFollowedAgain(self):
+        self.makeSymlink(os.path.join(self.root, 'other'), 'settings/linkDir', isDir=True)
+        self.assertEqual(getPathInfo('settings/linkDir')['absolute'], f'{self.root}/other')
+        os.remove(os.path.join(self.root, 'settings', 'linkDir'))
+        self.makeSymlink(os.path.join(self.root, 'settings', 'mods'), 'settings/linkDir', isDir=True)
+        self.assertEqual(getPathInfo('settings/linkDir')['absolute'], f'{self.root}/settings/mods')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from modswap.runtime.runMenu import (LastPakchunkActionNames,
+                                     getPakchunkIterationKwargs,
+                                     getPakchunksRunInParallel)
+
+SrcPakPaths = ['C:/Mods/pakchunk1-Mod.pak', 'C:/Mods/pakchunk2-Other.pak']
+
+
+def getKwargs(**kwargs):
+    return {
+        'fromMenu': True,
+        'paking': True,
+        'upgradingMods': True,
+        **{name: True for name in LastPakchunkActionNames},
+        **kwargs,
+    }
+
+
+class GetPakchunkIterationKwargsTests(unittest.TestCase):
+    def testOnlyTheLastPakchunkRunsTheActionsRunOnce(self):
+        first = getPakchunkIterationKwargs(getKwargs(), SrcPakPaths, 0, 2)
+        last = getPakchunkIterationKwargs(getKwargs(), SrcPakPaths, 1, 2)
+        for name in LastPakchunkActionNames:
+            with self.subTest(name=name):
+                self.assertFalse(first[name])
+                self.assertTrue(last[name])
+        self.assertTrue(first['isBatchMode'])
+        self.assertFalse(last['isBatchMode'])
+        self.assertTrue(first['paking'] and first['upgradingMods'] and first['fromMenu'])
+
+    def testDisabledActionsStayDisabled(self):
+        kwargs = getPakchunkIterationKwargs(getKwargs(installingMods=False), SrcPakPaths, 1, 2)
+        self.assertFalse(kwargs['installingMods'])
+
+    def testEachPakchunkGetsItsSourcePak(self):
+        self.assertEqual([getPakchunkIterationKwargs(getKwargs(), SrcPakPaths, i, 2)['srcPakPath'] for i in range(2)], SrcPakPaths)
+        self.assertIsNone(getPakchunkIterationKwargs(getKwargs(), [], 0, 1)['srcPakPath'])
+
+    def testOutputNamesOnlyChangeInParallel(self):
+        self.assertEqual(
+            [getPakchunkIterationKwargs(getKwargs(), SrcPakPaths, i, 2, runningInParallel=True)['outputNameSuffix'] for i in range(2)],
+            ['-pakchunk1-Mod', '-pakchunk2-Other'],
+        )
+        self.assertEqual(
+            [getPakchunkIterationKwargs(getKwargs(), SrcPakPaths, i, 2)['outputNameSuffix'] for i in range(2)],
+            ['', ''],
+        )
+
+    def testSinglePakchunk(self):
+        kwargs = getPakchunkIterationKwargs(getKwargs(), SrcPakPaths[:1], 0, 1)
+        self.assertEqual(kwargs['srcPakPath'], SrcPakPaths[0])
+        self.assertTrue(kwargs['installingMods'])
+        self.assertFalse(kwargs['isBatchMode'])
+        self.assertEqual(kwargs['outputNameSuffix'], '')
+
+
+class GetPakchunksRunInParallelTests(unittest.TestCase):
+    def testSequentialByDefault(self):
+        self.assertEqual(getPakchunksRunInParallel(3, {}), (False, None))
+        self.assertEqual(getPakchunksRunInParallel(3, {'pakchunkJobs': 1}), (False, None))
+
+    def testParallelWithPakchunkJobs(self):
+        self.assertEqual(getPakchunksRunInParallel(3, {'pakchunkJobs': 4}), (True, None))
+        # one per CPU
+        self.assertEqual(getPakchunksRunInParallel(3, {'pakchunkJobs': 0}), (True, None))
+
+    def testSinglePakchunkRunsInProcess(self):
+        self.assertEqual(getPakchunksRunInParallel(1, {'pakchunkJobs': 4}), (False, None))
+
+    def testDestPakNumberFallsBackToSequential(self):
+        runningInParallel, reason = getPakchunksRunInParallel(3, {'pakchunkJobs': 4, 'destPakNumber': 5})
+        self.assertFalse(runningInParallel)
+        self.assertIn('destPakNumber', reason)
+        self.assertEqual(getPakchunksRunInParallel(3, {'pakchunkJobs': 4, 'destPakNumber': -1}), (True, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from modswap.helpers import stagingHelpers
+from modswap.helpers.stagingHelpers import FileStager
+
+
+def writeFile(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content)
+
+
+def readFile(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+class FileStagerTests(unittest.TestCase):
+    def setUp(self):
+        tempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempDir.cleanup)
+        self.srcDir = os.path.join(tempDir.name, 'src')
+        self.destDir = os.path.join(tempDir.name, 'dest')
+        self.files = []
+        for name in ('a.uasset', 'a.uexp', 'Sub/b.uasset'):
+            srcPath = os.path.join(self.srcDir, name)
+            writeFile(srcPath, f'data of {name}')
+            self.files.append((srcPath, os.path.join(self.destDir, name), self.srcDir, self.destDir))
+
+    def assertStagedCopies(self):
+        for srcPath, destPath, _, _ in self.files:
+            self.assertEqual(readFile(destPath), readFile(srcPath))
+            self.assertFalse(os.path.samefile(srcPath, destPath))
+
+    def testUnknownStrategy(self):
+        with self.assertRaises(ValueError):
+            FileStager('symlink')
+
+    def testAutoNeverHardlinks(self):
+        stager = FileStager('auto', jobs=2)
+        stager.stageAll(self.files)
+        self.assertStagedCopies()
+        self.assertNotIn('hardlink', stager.counts)
+        self.assertEqual(sum(stager.counts.values()), len(self.files))
+
+    def testAutoCopiesWithoutReflinks(self):
+        with mock.patch.object(stagingHelpers, 'reflinkFile', side_effect=OSError('unsupported')) as reflinkFileMock:
+            stager = FileStager('auto', jobs=2)
+            stager.stageAll(self.files)
+        self.assertStagedCopies()
+        self.assertEqual(stager.counts, {'copy': len(self.files)})
+        # the strategy is found once per pair of folders
+        reflinkFileMock.assert_called_once()
+
+    def testHardlinksAreOptIn(self):
+        stager = FileStager('hardlink', jobs=1)
+        stager.stageAll(self.files)
+        for srcPath, destPath, _, _ in self.files:
+            self.assertTrue(os.path.samefile(srcPath, destPath))
+        self.assertEqual(stager.counts, {'hardlink': len(self.files)})
+
+    def testStagingReplacesExistingFiles(self):
+        writeFile(self.files[0][1], 'old')
+        FileStager('copy').stageAll(self.files)
+        self.assertStagedCopies()
+
+    def testCopiesAreHashed(self):
+        stager = FileStager('copy', jobs=2, hashing=True)
+        stager.stageAll(self.files)
+        self.assertStagedCopies()
+        self.assertEqual(stager.hashes, {
+            destPath: hashlib.md5(readFile(srcPath).encode('utf-8')).hexdigest()
+            for srcPath, destPath, _, _ in self.files
+        })
+
+    def testCopiesAreOnlyHashedWhenAskedFor(self):
+        stager = FileStager('copy')
+        stager.stageAll(self.files)
+        self.assertEqual(stager.hashes, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
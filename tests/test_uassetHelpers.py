@@ -0,0 +1,241 @@
+import json
+import random
+import unittest
+
+from modswap.helpers.uassetHelpers import (ClassNameFieldName,
+                                           ClassNamePackage,
+                                           ClassNameSkeletalMesh,
+                                           ClassPackageCoreUObject,
+                                           ClassPackageFieldName,
+                                           ClassPackageScriptEngine,
+                                           EnumPropertyDataType,
+                                           EnumTypeFieldName, ImportGraph,
+                                           ImportType, ItemTypeName,
+                                           NameFieldName, NamePropertyDataType,
+                                           ObjectNameFieldName,
+                                           OuterIndexFieldName, PropertyList,
+                                           StringPropertyDataType,
+                                           StructPropertyDataType,
+                                           StructTypeFieldName,
+                                           findEnumByType, findNextItemByFields,
+                                           findNextItemByName,
+                                           findNextItemByType,
+                                           findStructByType, rewriteAssetJson)
+
+ItemTypes = [NamePropertyDataType, StringPropertyDataType, EnumPropertyDataType, StructPropertyDataType]
+Names = ['ID', 'CustomizationId', 'ItemMesh', 'Category', 'UIData']
+
+
+def makeItem(random):
+    itemType = random.choice(ItemTypes)
+    item = {ItemTypeName: itemType, NameFieldName: random.choice(Names), 'ArrayType': random.choice(['StructProperty', 'IntProperty'])}
+    if itemType == EnumPropertyDataType:
+        item[EnumTypeFieldName] = random.choice(['ECustomizationCategory', 'EItemAvailability'])
+    elif itemType == StructPropertyDataType:
+        item[StructTypeFieldName] = random.choice(['ItemUIData', 'ItemAvailability'])
+    return item
+
+
+def getLookups(items):
+    """Every kind of lookup, by a plain list or a property list"""
+    lookups = []
+    for name in Names:
+        lookups.append(findNextItemByName(items, name))
+        for itemType in ItemTypes:
+            lookups.append(findNextItemByFields(items, [ItemTypeName, NameFieldName], [itemType, name]))
+        lookups.append(findNextItemByFields(items, [ItemTypeName, NameFieldName], [[NamePropertyDataType, StringPropertyDataType], name]))
+        lookups.append(findNextItemByFields(items, ['ArrayType', NameFieldName], ['StructProperty', name]))
+    for itemType in ItemTypes:
+        lookups.append(findNextItemByType(items, itemType))
+    lookups.append(findNextItemByFields(items, ['ArrayType'], ['StructProperty']))
+    for enumType in ['ECustomizationCategory', 'EItemAvailability', 'Missing']:
+        lookups.append(findEnumByType(items, enumType))
+    for structType in ['ItemUIData', 'ItemAvailability', 'Missing']:
+        lookups.append(findStructByType(items, structType))
+    return [id(item) if item is not None else None for item in lookups]
+
+
+class PropertyListTests(unittest.TestCase):
+    def assertSameLookups(self, propertyList):
+        self.assertEqual(getLookups(propertyList), getLookups(list(propertyList.items)))
+
+    def testFindsTheFirstMatchingItem(self):
+        first = {ItemTypeName: NamePropertyDataType, NameFieldName: 'ID'}
+        second = {ItemTypeName: StringPropertyDataType, NameFieldName: 'ID'}
+        propertyList = PropertyList([{ItemTypeName: NamePropertyDataType, NameFieldName: 'Other'}, first, second])
+        self.assertIs(findNextItemByName(propertyList, 'ID'), first)
+        self.assertIs(findNextItemByFields(propertyList, [ItemTypeName, NameFieldName], [StringPropertyDataType, 'ID']), second)
+        self.assertIs(findNextItemByFields(propertyList, [ItemTypeName, NameFieldName], [[StringPropertyDataType, NamePropertyDataType], 'ID']), first)
+        self.assertIsNone(findNextItemByName(propertyList, 'Missing'))
+        self.assertIsNone(findNextItemByName(PropertyList([]), 'ID'))
+
+    def testChangesTheWrappedList(self):
+        items = [{NameFieldName: 'A'}]
+        propertyList = PropertyList(items)
+        findNextItemByName(propertyList, 'A')
+        item = {NameFieldName: 'B'}
+        propertyList.append(item)
+        propertyList.insert(0, {NameFieldName: 'C'})
+        propertyList.setField(item, NameFieldName, 'D')
+        propertyList.remove(items[1])
+        self.assertEqual(items, [{NameFieldName: 'C'}, {NameFieldName: 'D'}])
+        self.assertEqual(len(propertyList), 2)
+        self.assertEqual(list(propertyList), items)
+        self.assertIs(propertyList[1], item)
+
+    def testRemovesByIdentity(self):
+        item = {NameFieldName: 'A'}
+        equalItem = {NameFieldName: 'A'}
+        propertyList = PropertyList([equalItem, item])
+        findNextItemByName(propertyList, 'A')
+        propertyList.remove(item)
+        self.assertIs(propertyList[0], equalItem)
+        self.assertIs(findNextItemByName(propertyList, 'A'), equalItem)
+        with self.assertRaises(ValueError):
+            propertyList.remove(item)
+        with self.assertRaises(ValueError):
+            propertyList.setField(item, NameFieldName, 'B')
+
+    def testLookupsStayCorrectAfterChanges(self):
+        generator = random.Random(31)
+        for _ in range(20):
+            propertyList = PropertyList([makeItem(generator) for _ in range(generator.randrange(0, 12))])
+            self.assertSameLookups(propertyList)
+            for _ in range(40):
+                action = generator.randrange(4)
+                if action == 0:
+                    propertyList.append(makeItem(generator))
+                elif action == 1:
+                    propertyList.insert(generator.randrange(-3, len(propertyList) + 3), makeItem(generator))
+                elif propertyList.items and action == 2:
+                    propertyList.remove(generator.choice(propertyList.items))
+                elif propertyList.items:
+                    item = generator.choice(propertyList.items)
+                    field = generator.choice(list(item))
+                    if field == ItemTypeName:
+                        # struct and enum items always have their struct or enum type, so only those without one change type
+                        if item[field] in (NamePropertyDataType, StringPropertyDataType):
+                            propertyList.setField(item, field, generator.choice([NamePropertyDataType, StringPropertyDataType]))
+                    else:
+                        propertyList.setField(item, field, generator.choice([*Names, 'ItemUIData', 'ECustomizationCategory', 'StructProperty']))
+                self.assertSameLookups(propertyList)
+
+
+BlueprintJson = '\n'.join([
+    '{',
+    '  "PackageGuid": "{0A1B2C3D-0000-1111-2222-333344445555}",',
+    '  "NameMap": ["/Game/Items/BP_Hat", "BP_Hat", "BP_Hat_C", "BP_HatLarge", "Default__BP_Hat_C"],',
+    r'  "Description": "A \"BP_Hat\" with a \\ backslash, caf\u00e9 and a \"BP_HatLarge\"",',
+    '  "Path": "/Game/Items/BP_Hat.BP_Hat_C"',
+    '}',
+])
+NewPackageGuid = '{AAAAAAAA-BBBB-CCCC-DDDD-EEEEEEEEEEEE}'
+
+
+class RewriteAssetJsonTests(unittest.TestCase):
+    def rewrite(self, replacements, newPackageGuid=None):
+        jsonString, locations = rewriteAssetJson(BlueprintJson, replacements, newPackageGuid)
+        return json.loads(jsonString), locations
+
+    def testNameThatIsAPrefixOfAnother(self):
+        data, _ = self.rewrite({'BP_Hat': 'BP_Cap', 'BP_HatLarge': 'BP_Beanie'})
+        self.assertEqual(data['NameMap'], ['/Game/Items/BP_Cap', 'BP_Cap', 'BP_Cap_C', 'BP_Beanie', 'Default__BP_Cap_C'])
+        self.assertEqual(data['Path'], '/Game/Items/BP_Cap.BP_Cap_C')
+
+    def testReplacedTextIsNotReplacedAgain(self):
+        data, _ = self.rewrite({'BP_Hat': 'BP_HatLarge', 'BP_HatLarge': 'BP_Beanie', '/Game/Items/BP_Hat': '/Game/Clones/BP_Hat'})
+        self.assertEqual(data['NameMap'], ['/Game/Clones/BP_Hat', 'BP_HatLarge', 'BP_HatLarge_C', 'BP_Beanie', 'Default__BP_HatLarge_C'])
+        self.assertEqual(data['Path'], '/Game/Clones/BP_Hat.BP_HatLarge_C')
+
+    def testEscapedJsonString(self):
+        data, _ = self.rewrite({'BP_Hat': 'BP_Cap', 'BP_HatLarge': 'BP_Beanie'})
+        self.assertEqual(data['Description'], 'A "BP_Cap" with a \\ backslash, caf\u00e9 and a "BP_Beanie"')
+
+    def testPackageGuidReplacement(self):
+        data, locations = self.rewrite({'BP_Hat': 'BP_Cap'}, NewPackageGuid)
+        self.assertEqual(data['PackageGuid'], NewPackageGuid)
+        self.assertEqual(locations[0], (2, 3, '"PackageGuid": "{0A1B2C3D-0000-1111-2222-333344445555}"', f'"PackageGuid": "{NewPackageGuid}"'))
+
+        data, locations = self.rewrite({'BP_Hat': 'BP_Cap'})
+        self.assertEqual(data['PackageGuid'], '{0A1B2C3D-0000-1111-2222-333344445555}')
+        self.assertFalse(any(original.startswith('"PackageGuid"') for _, _, original, _ in locations))
+
+        jsonString, locations = rewriteAssetJson('{"PackageGuid":"{0A1B2C3D-0000-1111-2222-333344445555}"}', {}, NewPackageGuid)
+        self.assertEqual(jsonString, f'{{"PackageGuid":"{NewPackageGuid}"}}')
+
+    def testReturnedLocations(self):
+        _, locations = self.rewrite({'BP_Hat': 'BP_Cap', 'BP_HatLarge': 'BP_Beanie'}, NewPackageGuid)
+        lines = BlueprintJson.split('\n')
+
+        def getColumns(line, original, count):
+            """The 1-based columns of the first `count` occurrences of `original` in a line"""
+            columns = []
+            for _ in range(count):
+                columns.append(lines[line - 1].index(original, columns[-1] if columns else 0) + 1)
+            return columns
+
+        # "BP_HatLarge" occurs after every "BP_Hat" on lines 3 and 4, and isn't also found as "BP_Hat"
+        self.assertEqual([(line, column, original) for line, column, original, _ in locations], [
+            (2, 3, lines[1].strip().rstrip(',')),
+            *((3, column, 'BP_Hat') for column in getColumns(3, 'BP_Hat', 3)),
+            (3, getColumns(3, 'BP_HatLarge', 1)[0], 'BP_HatLarge'),
+            (3, getColumns(3, 'Default__BP_Hat', 1)[0] + len('Default__'), 'BP_Hat'),
+            (4, getColumns(4, 'BP_Hat', 1)[0], 'BP_Hat'),
+            (4, getColumns(4, 'BP_HatLarge', 1)[0], 'BP_HatLarge'),
+            *((5, column, 'BP_Hat') for column in getColumns(5, 'BP_Hat', 2)),
+        ])
+        for line, column, original, replacement in locations:
+            self.assertEqual(lines[line - 1][column - 1:column - 1 + len(original)], original)
+            if not original.startswith('"PackageGuid"'):
+                self.assertEqual(replacement, {'BP_Hat': 'BP_Cap', 'BP_HatLarge': 'BP_Beanie'}[original])
+
+    def testNothingToReplace(self):
+        self.assertEqual(rewriteAssetJson(BlueprintJson, {}), (BlueprintJson, []))
+        self.assertEqual(rewriteAssetJson(BlueprintJson, {'': 'x', 'Missing': 'x'}), (BlueprintJson, []))
+
+
+def makeImport(classPackage, className, objectName, outerIndex=0):
+    return {
+        ItemTypeName: ImportType,
+        ClassPackageFieldName: classPackage,
+        ClassNameFieldName: className,
+        ObjectNameFieldName: objectName,
+        OuterIndexFieldName: outerIndex,
+    }
+
+
+class ImportGraphTests(unittest.TestCase):
+    def setUp(self):
+        self.imports = [
+            makeImport(ClassPackageCoreUObject, ClassNamePackage, '/Game/Items/SK_Hat'),
+            makeImport(ClassPackageScriptEngine, ClassNameSkeletalMesh, 'SK_Hat', -1),
+            makeImport(ClassPackageCoreUObject, ClassNamePackage, '/Game/Items/ABP_Hat'),
+            # no outer package: found by object name
+            makeImport(ClassPackageScriptEngine, 'AnimBlueprintGeneratedClass', 'ABP_Hat_C'),
+            makeImport(ClassPackageScriptEngine, ClassNameSkeletalMesh, 'SK_Other', -1),
+            {ItemTypeName: 'UAssetAPI.ExportTypes.NormalExport, UAssetAPI', ClassNameFieldName: 'Skeleton', ObjectNameFieldName: 'Skel'},
+        ]
+        self.importGraph = ImportGraph(self.imports)
+
+    def testPackagesByImportIndex(self):
+        self.assertEqual(self.importGraph.packagesByIndex, {-1: self.imports[0], -3: self.imports[2]})
+
+    def testFirstImportOfEachClass(self):
+        self.assertIs(self.importGraph.getClassImport(ClassNameSkeletalMesh), self.imports[1])
+        self.assertEqual(self.importGraph.getClassImportObjectName(ClassNameSkeletalMesh), 'SK_Hat')
+        self.assertIsNone(self.importGraph.getClassImport('Skeleton'))
+
+    def testDependencyPaths(self):
+        self.assertEqual(self.importGraph.getDependencyPaths(), {
+            'skeletalMesh': '/Game/Items/SK_Hat',
+            'animBlueprint': '/Game/Items/ABP_Hat',
+            'skeleton': None,
+            'physicsAsset': None,
+        })
+
+    def testNoImports(self):
+        self.assertEqual(ImportGraph(None).getDependencyPaths(), {'skeletalMesh': None, 'animBlueprint': None, 'skeleton': None, 'physicsAsset': None})
+
+
+if __name__ == '__main__':
+    unittest.main()